@@ -10,6 +10,7 @@ from agent_extract.agents.extraction_agent import ContentExtractionAgent
 from agent_extract.agents.table_agent import TableParserAgent
 from agent_extract.agents.validation_agent import ValidationAgent
 from agent_extract.agents.vision_agent import DocumentVisionAgent
+from agent_extract.agents.fused_agent import FusedExtractionAgent
 from agent_extract.agents.graph import DocumentExtractionGraph
 
 __all__ = [
@@ -25,5 +26,6 @@ __all__ = [
     "TableParserAgent",
     "ValidationAgent",
     "DocumentVisionAgent",
+    "FusedExtractionAgent",
     "DocumentExtractionGraph",
 ]
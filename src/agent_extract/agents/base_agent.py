@@ -1,12 +1,41 @@
 """Base agent class for all extraction agents."""
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-from langchain_core.messages import SystemMessage, HumanMessage
+from typing import Callable, Dict, Any, Iterable, Optional
+from langchain_core.messages import AIMessage, SystemMessage, HumanMessage
+from langchain_core.messages.ai import add_usage
+from pydantic import BaseModel
 
 from agent_extract.core.config import config
-from agent_extract.core.llm_provider import LLMFactory
+from agent_extract.core.llm_provider import LLMFactory, StructuredResponse
+from agent_extract.core.hedging import hedge_delay, hedged, latencies
+from agent_extract.core.metrics import (
+    DEADLINES_EXCEEDED,
+    LLM_CALLS,
+    LLM_COST,
+    LLM_SECONDS,
+    LLM_STRUCTURED_OUTPUT,
+    LLM_TOKENS,
+)
+from agent_extract.core.rate_limit import OUTPUT_TOKEN_ALLOWANCE, limiter_for
+from agent_extract.core.tracing import annotate, span
+from agent_extract.core.usage import CHARS_PER_TOKEN, make_call, record_call
+from agent_extract.agents.responses import completed_fields
 from agent_extract.agents.state import AgentState
+from agent_extract.processors.prompt_budget import (
+    compress_text,
+    pack_text,
+    prompt_budget,
+    token_counter,
+)
+
+
+def _reported_tokens(response) -> Optional[int]:
+    """Total tokens of a response, if the provider reported them."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
 
 
 class BaseAgent(ABC):
@@ -37,6 +66,19 @@ class BaseAgent(ABC):
             temperature=self.temperature,
             is_vision=False,
         )
+
+        # Secondary model for hedged requests (config.llm_hedge_model)
+        self.hedge_provider = config.llm_hedge_provider or self.provider
+        self.hedge_model = config.llm_hedge_model
+        self.hedge_llm = (
+            LLMFactory.create_llm(
+                provider=self.hedge_provider,
+                model_name=self.hedge_model,
+                temperature=self.temperature,
+            )
+            if self.hedge_model
+            else None
+        )
         
         self.agent_name = self.__class__.__name__
 
@@ -60,14 +102,291 @@ class BaseAgent(ABC):
             HumanMessage(content=user_msg),
         ]
 
+    def _fit_text(
+        self,
+        text: str,
+        budget: str,
+        prompt: str = "",
+        keywords: Iterable[str] = (),
+    ) -> str:
+        """
+        Compress document text and pack it into the agent's token budget.
+
+        Args:
+            text: Raw document text
+            budget: Key in config.prompt_token_budgets (planner, critic, ...)
+            prompt: Rest of the prompt, which shares the context window
+            keywords: Terms that make a section worth keeping
+
+        Returns:
+            Text to put in the prompt
+        """
+        counter = token_counter(self.provider, self.model_name)
+        limit = prompt_budget(budget, self.provider, self.model_name, counter.count(prompt))
+        return pack_text(compress_text(text), limit, counter, keywords)
+
     async def _invoke_llm(self, messages: list) -> str:
         """Invoke the LLM and return the response."""
         try:
-            response = await self.llm.ainvoke(messages)
+            response = await self._timed_invoke(messages)
             return response.content
         except Exception as e:
             raise RuntimeError(f"LLM invocation failed: {str(e)}") from e
 
+    async def _invoke_structured(
+        self,
+        messages: list,
+        schema: type[BaseModel],
+        parse: Callable[[str], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Invoke the LLM for an answer matching a response model.
+
+        The provider's structured-output mode returns the answer already
+        validated. Models without one, or answers that fail validation, are
+        parsed from their text as before.
+
+        Args:
+            messages: Prompt messages
+            schema: Pydantic response model
+            parse: Text parser used as the fallback
+
+        Returns:
+            Answer as a dictionary
+        """
+        try:
+            response = await self._timed_invoke(messages, schema)
+        except Exception as e:
+            raise RuntimeError(f"LLM invocation failed: {str(e)}") from e
+
+        parsed = getattr(response, "parsed", None)
+        if parsed is not None:
+            LLM_STRUCTURED_OUTPUT.inc(agent=self.agent_name, mode="native")
+            return parsed.model_dump(exclude_none=True)
+        LLM_STRUCTURED_OUTPUT.inc(agent=self.agent_name, mode="text")
+        return parse(response.content)
+
+    async def _invoke_streaming(
+        self,
+        messages: list,
+        schema: type[BaseModel],
+        parse: Callable[[str], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Stream the answer and stop generation once the schema's required fields are complete.
+
+        Suits agents whose decision is a field or two at the start of the
+        answer (routing): the rest of the answer is never generated. If the
+        stream ends without them, the whole text is parsed as usual.
+
+        Args:
+            messages: Prompt messages
+            schema: Pydantic response model
+            parse: Text parser used as the fallback
+
+        Returns:
+            Answer as a dictionary (only the required fields when stopped early)
+        """
+        if not config.llm_stream_early_stop:
+            return await self._invoke_structured(messages, schema, parse)
+
+        try:
+            response = await self._timed_invoke(
+                messages, until=lambda text: completed_fields(text, schema) is not None
+            )
+        except Exception as e:
+            raise RuntimeError(f"LLM invocation failed: {str(e)}") from e
+
+        fields = completed_fields(response.content, schema)
+        if fields is not None:
+            try:
+                answer = schema.model_validate(fields)
+            except ValueError:
+                pass
+            else:
+                LLM_STRUCTURED_OUTPUT.inc(agent=self.agent_name, mode="streamed")
+                return answer.model_dump(include=set(fields))
+        LLM_STRUCTURED_OUTPUT.inc(agent=self.agent_name, mode="text")
+        return parse(response.content)
+
+    async def _timed_invoke(
+        self,
+        messages: list,
+        schema: Optional[type[BaseModel]] = None,
+        until: Optional[Callable[[str], bool]] = None,
+    ):
+        """
+        Call the LLM inside an "llm" span, recording latency, tokens and cost.
+
+        Cloud models are called through their shared rate limiter and every
+        request is bounded by config.llm_timeout_seconds. The call is added
+        to the document's usage ledger and the metrics. With a response
+        schema, models that support it answer in structured-output mode;
+        with an until condition, the answer is streamed and cut off once
+        the condition holds for the text so far.
+        """
+        labels = {"provider": self.provider, "model": self.model_name}
+        prompt_chars = sum(len(str(message.content)) for message in messages)
+        started = time.perf_counter()
+        status = "failed"
+        try:
+            with span(
+                f"llm.{self.agent_name}",
+                "llm",
+                agent=self.agent_name,
+                prompt_chars=prompt_chars,
+                **labels,
+            ):
+                response, provider, model = await self._request(
+                    messages, prompt_chars, schema, until
+                )
+                call = make_call(
+                    self.agent_name,
+                    provider,
+                    model,
+                    getattr(response, "usage_metadata", None),
+                    prompt_chars=prompt_chars,
+                    response_chars=len(str(response.content)),
+                    latency=time.perf_counter() - started,
+                )
+                annotate(
+                    input_tokens=call.input_tokens,
+                    output_tokens=call.output_tokens,
+                    estimated_tokens=call.estimated_tokens,
+                    cost=call.cost,
+                    response_chars=len(str(response.content)),
+                )
+                if model != self.model_name or provider != self.provider:
+                    annotate(hedged_to=f"{provider}/{model}")
+            status = "success"
+        except TimeoutError:
+            status = "timeout"
+            DEADLINES_EXCEEDED.inc(scope="llm")
+            raise
+        finally:
+            LLM_CALLS.inc(agent=self.agent_name, status=status, **labels)
+            LLM_SECONDS.observe(time.perf_counter() - started, **labels)
+
+        record_call(call)
+        labels = {"provider": call.provider, "model": call.model}
+        if not call.estimated_tokens:
+            LLM_TOKENS.inc(call.input_tokens, direction="input", **labels)
+            LLM_TOKENS.inc(call.output_tokens, direction="output", **labels)
+        if call.cost:
+            LLM_COST.inc(call.cost, **labels)
+        return response
+
+    async def _request(
+        self,
+        messages: list,
+        prompt_chars: int,
+        schema: Optional[type[BaseModel]] = None,
+        until: Optional[Callable[[str], bool]] = None,
+    ):
+        """
+        Send a request, hedged to the secondary model when the primary is slow.
+
+        A duplicate goes to config.llm_hedge_model once the primary has run
+        longer than its recent latency percentile; the first answer wins.
+
+        Returns:
+            (response, provider, model) of the answer used
+        """
+
+        async def primary():
+            started = time.perf_counter()
+            try:
+                response = await self._send(
+                    self.llm, self.provider, self.model_name, messages, prompt_chars, schema, until
+                )
+            except asyncio.CancelledError:
+                # A call given up for the hedge still shows how slow the model was
+                latencies.record(self.provider, self.model_name, time.perf_counter() - started)
+                raise
+            latencies.record(self.provider, self.model_name, time.perf_counter() - started)
+            return response
+
+        delay = hedge_delay(self.provider, self.model_name) if self.hedge_llm is not None else None
+        if delay is None:
+            return await primary(), self.provider, self.model_name
+
+        response, hedge_won = await hedged(
+            primary,
+            lambda: self._send(
+                self.hedge_llm,
+                self.hedge_provider,
+                self.hedge_model,
+                messages,
+                prompt_chars,
+                schema,
+                until,
+            ),
+            delay,
+        )
+        if hedge_won:
+            return response, self.hedge_provider, self.hedge_model
+        return response, self.provider, self.model_name
+
+    async def _send(
+        self,
+        llm,
+        provider: str,
+        model: str,
+        messages: list,
+        prompt_chars: int,
+        schema: Optional[type[BaseModel]] = None,
+        until: Optional[Callable[[str], bool]] = None,
+    ):
+        """One request through the model's rate limiter, bounded by the LLM timeout."""
+        structured = LLMFactory.structured(llm, provider, schema) if schema else None
+
+        async def ask():
+            if until is not None:
+                return await self._stream(llm, messages, until)
+            if structured is None:
+                return await llm.ainvoke(messages)
+            answer = await structured.ainvoke(messages)
+            return StructuredResponse(answer["raw"], answer["parsed"])
+
+        def call():
+            return asyncio.wait_for(ask(), config.llm_timeout_seconds)
+
+        limiter = limiter_for(provider, model)
+        if limiter is None:
+            return await call()
+        return await limiter.run(
+            call,
+            estimated_tokens=-(-prompt_chars // CHARS_PER_TOKEN) + OUTPUT_TOKEN_ALLOWANCE,
+            count_tokens=_reported_tokens,
+        )
+
+    @staticmethod
+    async def _stream(llm, messages: list, until: Callable[[str], bool]) -> AIMessage:
+        """
+        Stream an answer, closing the stream (and so the generation) once
+        until() holds for the text received.
+
+        Returns:
+            The answer so far; usage is only known if the provider sent it
+            before the stream was closed
+        """
+        text, usage = "", None
+        stopped = False
+        stream = llm.astream(messages)
+        try:
+            async for chunk in stream:
+                if isinstance(chunk.content, str):
+                    text += chunk.content
+                if chunk.usage_metadata:
+                    usage = add_usage(usage, chunk.usage_metadata)
+                if until(text):
+                    stopped = True
+                    break
+        finally:
+            await stream.aclose()
+        annotate(stopped_early=stopped)
+        return AIMessage(content=text, usage_metadata=usage)
+
     def _update_state(
         self,
         state: AgentState,
@@ -130,6 +449,8 @@ class VisionAgent(BaseAgent):
             temperature=self.temperature,
             is_vision=True,
         )
+        # Vision calls are not hedged: the secondary model may not take images
+        self.hedge_llm = None
         
         self.agent_name = self.__class__.__name__
 
@@ -154,7 +475,7 @@ class VisionAgent(BaseAgent):
                 system_msg="You are a document analysis expert. Analyze images and extract information.",
                 user_msg=f"{prompt}\n\nImage path: {image_path}",
             )
-            response = await self.llm.ainvoke(messages)
+            response = await self._timed_invoke(messages)
             return response.content
         except Exception as e:
             raise RuntimeError(f"Vision LLM invocation failed: {str(e)}") from e
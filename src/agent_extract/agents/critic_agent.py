@@ -4,7 +4,9 @@ import json
 from typing import Dict, Any, List
 
 from agent_extract.agents.base_agent import BaseAgent
+from agent_extract.agents.responses import Critique
 from agent_extract.agents.state import AgentState
+from agent_extract.processors.prompt_budget import field_terms
 
 
 class CriticAgent(BaseAgent):
@@ -28,7 +30,7 @@ class CriticAgent(BaseAgent):
         Returns:
             Updated state with critique and improvements
         """
-        raw_text = state.get("raw_text", "")[:1500]
+        raw_text = state.get("raw_text", "")
         structured_data = state.get("structured_data", {})
         entities = state.get("entities", [])
         tables = state.get("tables", [])
@@ -57,13 +59,23 @@ Respond in JSON:
   "final_verdict": "approve/request_reextraction/needs_review"
 }"""
 
+        extracted = {k: v for k, v in structured_data.items() if k != "ai_processing"}
+        extracted_json = json.dumps(extracted, indent=2)
+        # Keep the passages the extracted values were taken from
+        excerpt = self._fit_text(
+            raw_text,
+            "critic",
+            system_prompt + extracted_json,
+            keywords=[*field_terms(extracted), *extraction_plan.get("key_fields_to_extract", [])],
+        )
+
         user_prompt = f"""Critique this document extraction:
 
 ORIGINAL TEXT (excerpt):
-{raw_text}
+{excerpt}
 
 EXTRACTED DATA:
-{json.dumps({k: v for k, v in structured_data.items() if k != "ai_processing"}, indent=2)}
+{extracted_json}
 
 ENTITIES FOUND: {len(entities)}
 TABLES FOUND: {len(tables)}
@@ -74,9 +86,9 @@ Evaluate the quality and suggest improvements."""
 
         try:
             messages = self._create_prompt(system_prompt, user_prompt)
-            response = await self._invoke_llm(messages)
-            
-            critique = self._parse_critique_response(response)
+            critique = await self._invoke_structured(
+                messages, Critique, self._parse_critique_response
+            )
             
             # Apply corrections if high confidence
             if critique.get("corrections") and critique.get("confidence_score", 0) > 0.8:
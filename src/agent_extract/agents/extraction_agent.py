@@ -4,16 +4,31 @@ import json
 from typing import Dict, Any, List
 
 from agent_extract.agents.base_agent import BaseAgent
+from agent_extract.agents.responses import ExtractedFields
 from agent_extract.agents.state import AgentState
-from agent_extract.core.types import ExtractedEntity
+from agent_extract.core.config import config
+from agent_extract.core.types import ExtractedEntity, TextChunk
+from agent_extract.processors.chunker import (
+    PAGE_MARKER,
+    DocumentChunker,
+    map_chunks,
+    merge_structured_results,
+)
+from agent_extract.processors.prompt_budget import compress_text
 
 
 class ContentExtractionAgent(BaseAgent):
-    """Agent that extracts structured content using LLM understanding."""
+    """
+    Agent that extracts structured content using LLM understanding.
+
+    Long documents are split into page/section chunks, extracted
+    concurrently and merged (map-reduce) instead of being truncated.
+    """
 
     def __init__(self):
         """Initialize content extraction agent with qwen3."""
         super().__init__()
+        self.chunker = DocumentChunker(max_chars=config.chunk_max_chars)
 
     async def process(self, state: AgentState) -> AgentState:
         """
@@ -38,42 +53,60 @@ class ContentExtractionAgent(BaseAgent):
             )
         
         raw_text = state.get("raw_text", "")
-        detected_schema = state.get("detected_schema", {})
+        detected_schema = state.get("detected_schema") or {}
         document_type = detected_schema.get("document_type", "unknown")
         key_fields = detected_schema.get("key_fields", [])
 
         # Create extraction prompt based on document type
         system_prompt = self._create_extraction_prompt(document_type)
-        
-        user_prompt = f"""Extract structured information from this {document_type} document.
-
-Focus on extracting these key fields if present: {', '.join(key_fields) if key_fields else 'all relevant fields'}
-
-Document text:
-{raw_text[:3000]}  
-
-Respond in JSON format with extracted data."""
+        # Markers are kept so chunks still know their pages
+        raw_text = compress_text(raw_text, keep_page_markers=True)
+        chunks = self.chunker.split(raw_text) or [
+            TextChunk(index=0, text=raw_text, start=0, end=len(raw_text))
+        ]
 
         try:
-            # Invoke LLM for extraction
-            messages = self._create_prompt(system_prompt, user_prompt)
-            response = await self._invoke_llm(messages)
+            # Map: extract each chunk concurrently
+            results = await map_chunks(
+                chunks,
+                lambda chunk: self._extract_chunk(
+                    system_prompt, document_type, key_fields, chunk, len(chunks)
+                ),
+                concurrency=config.chunk_concurrency,
+            )
+            partials = [r for r in results if isinstance(r, dict)]
+            failures = [r for r in results if isinstance(r, BaseException)]
 
-            # Parse extracted data
-            extracted_data = self._parse_extraction_response(response)
+            if not partials:
+                raise failures[0]
+
+            # Reduce: merge partial results with conflict resolution
+            extracted_data, conflicts = merge_structured_results(partials)
             
             # Extract entities
             entities = self._extract_entities(extracted_data)
 
+            updates = {**extracted_data}
+            if conflicts:
+                updates["extraction_conflicts"] = conflicts
+            if failures:
+                if "errors" not in state:
+                    state["errors"] = []
+                state["errors"].extend(
+                    f"Content extraction failed for chunk: {str(e)}" for e in failures
+                )
+
+            chunk_note = f" from {len(chunks)} chunks" if len(chunks) > 1 else ""
+
             # Update state
             return self._update_state(
                 state,
                 {
-                    "structured_data": {**state.get("structured_data", {}), **extracted_data},
+                    "structured_data": {**state.get("structured_data", {}), **updates},
                     "entities": entities,
                     "next_action": "parse_tables" if detected_schema.get("has_tables") else "validate",
                 },
-                f"Extracted {len(extracted_data)} fields and {len(entities)} entities",
+                f"Extracted {len(extracted_data)} fields and {len(entities)} entities{chunk_note}",
             )
 
         except Exception as e:
@@ -89,6 +122,34 @@ Respond in JSON format with extracted data."""
                 "Content extraction failed, proceeding to validation",
             )
 
+    async def _extract_chunk(
+        self,
+        system_prompt: str,
+        document_type: str,
+        key_fields: List[str],
+        chunk: TextChunk,
+        total_chunks: int,
+    ) -> Dict[str, Any]:
+        """Extract structured data from a single chunk."""
+        part = ""
+        if total_chunks > 1:
+            pages = f", pages {chunk.pages[0]}-{chunk.pages[-1]}" if chunk.pages else ""
+            part = f"\n\nThis is part {chunk.index + 1} of {total_chunks}{pages}. Only extract fields present in this part."
+
+        user_prompt = f"""Extract structured information from this {document_type} document.
+
+Focus on extracting these key fields if present: {', '.join(key_fields) if key_fields else 'all relevant fields'}{part}
+
+Document text:
+{PAGE_MARKER.sub("", chunk.text).strip()}
+
+Respond in JSON format with extracted data."""
+
+        messages = self._create_prompt(system_prompt, user_prompt)
+        return await self._invoke_structured(
+            messages, ExtractedFields, self._parse_extraction_response
+        )
+
     def _create_extraction_prompt(self, document_type: str) -> str:
         """Create extraction prompt based on document type."""
         base_prompt = "You are an expert at extracting structured data from documents. "
@@ -0,0 +1,179 @@
+"""Fused extraction agent - plan, classify, extract and self-assess in one LLM call."""
+
+from typing import Dict, Any, List, Optional
+
+from agent_extract.agents.schema_agent import SchemaDetectionAgent
+from agent_extract.agents.extraction_agent import ContentExtractionAgent
+from agent_extract.agents.responses import FusedExtraction, parse_json_object
+from agent_extract.agents.state import AgentState
+from agent_extract.core.config import config
+from agent_extract.core.types import ExtractedEntity
+
+
+class FusedExtractionAgent(SchemaDetectionAgent, ContentExtractionAgent):
+    """
+    Single-call agent used by the fast graph variant.
+
+    Replaces the planner, schema, extraction and critic round-trips with one
+    structured prompt. Reuses the document type mapping from
+    SchemaDetectionAgent and the response/entity helpers from
+    ContentExtractionAgent. If the self-assessed confidence is below the
+    threshold, routes to the planner so the multi-agent loop takes over.
+    An accepted result is marked "self_assessed" rather than approved,
+    since no critic reviewed it.
+    """
+
+    def __init__(self, confidence_threshold: Optional[float] = None):
+        """
+        Initialize fused extraction agent.
+
+        Args:
+            confidence_threshold: Minimum self-assessed confidence to accept the
+                result (defaults to config.fast_mode_confidence_threshold)
+        """
+        super().__init__()
+        self.confidence_threshold = (
+            confidence_threshold
+            if confidence_threshold is not None
+            else config.fast_mode_confidence_threshold
+        )
+
+    async def process(self, state: AgentState) -> AgentState:
+        """
+        Plan, classify, extract and self-assess in a single LLM call.
+
+        Args:
+            state: Current agent state
+
+        Returns:
+            Updated state; next_action is "complete" when the result is
+            accepted, "planner" when the multi-agent loop should take over
+        """
+        raw_text = state.get("raw_text", "")
+        file_path = state.get("file_path", "")
+
+        system_prompt = """You are a document extraction expert. In ONE pass:
+1. Plan the extraction (category, approach, key fields)
+2. Classify the document type
+3. Extract all key fields as key-value pairs
+4. List named entities (person, date, location, organization, number, money)
+5. Critically assess your own extraction and give an honest confidence
+
+Respond in JSON:
+{
+  "plan": {
+    "document_category": "invoice/form/letter/report/ticket/etc",
+    "extraction_approach": "basic/advanced/vision",
+    "key_fields_to_extract": ["field1", "field2"],
+    "complexity": "simple/medium/complex"
+  },
+  "document_type": "type here",
+  "key_fields": ["field1", "field2"],
+  "has_tables": true/false,
+  "has_forms": true/false,
+  "language": "en/other",
+  "fields": {"field1": "value1"},
+  "entities": [{"text": "value", "entity_type": "person"}],
+  "confidence": 0.0-1.0,
+  "missing_fields": ["field"]
+}"""
+
+        user_prompt = f"""Extract structured information from this document:
+
+File: {file_path}
+
+Document text:
+{self._fit_text(raw_text, "fused", system_prompt)}
+
+Respond in JSON format."""
+
+        try:
+            messages = self._create_prompt(system_prompt, user_prompt)
+            fused = await self._invoke_structured(
+                messages, FusedExtraction, self._parse_fused_response
+            )
+            confidence = float(fused.get("confidence", 0.0) or 0.0)
+        except Exception as e:
+            if "errors" not in state:
+                state["errors"] = []
+            state["errors"].append(f"Fused extraction failed: {str(e)}")
+
+            return self._update_state(
+                state,
+                {"next_action": "planner"},
+                "Fused extraction failed, falling back to multi-agent workflow",
+            )
+
+        if confidence < self.confidence_threshold:
+            # Discard the single-call answer so it cannot leak into the result
+            # or the later agents' prompts; the step records what was rejected
+            fields = fused.get("fields")
+            return self._update_state(
+                state,
+                {"next_action": "planner"},
+                f"Fused extraction ({fused.get('document_type', 'unknown')}, "
+                f"{len(fields) if isinstance(fields, dict) else 0} fields) confidence "
+                f"{confidence:.2%} below {self.confidence_threshold:.2%}, "
+                f"escalating to multi-agent workflow",
+            )
+
+        fields = fused.get("fields") or {}
+        if not isinstance(fields, dict):
+            fields = {}
+        schema = {
+            "document_type": fused.get("document_type", "unknown"),
+            "confidence": confidence,
+            "key_fields": fused.get("key_fields", []),
+            "has_tables": fused.get("has_tables", False),
+            "has_forms": fused.get("has_forms", False),
+            "language": fused.get("language", "en"),
+        }
+        entities = self._parse_fused_entities(fused.get("entities")) or self._extract_entities(fields)
+
+        return self._update_state(
+            state,
+            {
+                "document_type": self._map_to_document_type(schema["document_type"]),
+                "detected_schema": schema,
+                "confidence_score": confidence,
+                "structured_data": {
+                    **state.get("structured_data", {}),
+                    "extraction_plan": fused.get("plan") or {},
+                    **fields,
+                    "quality_critique": {
+                        "confidence_score": confidence,
+                        "missing_fields": fused.get("missing_fields", []),
+                        # Not reviewed: only the model that produced it rated it
+                        "final_verdict": "self_assessed",
+                    },
+                },
+                "entities": entities,
+                "next_action": "complete",
+            },
+            f"Fused extraction: {schema['document_type']} with {len(fields)} fields "
+            f"and {len(entities)} entities (confidence: {confidence:.2%})",
+        )
+
+    def _parse_fused_response(self, response: str) -> Dict[str, Any]:
+        """Text fallback for the single-call response; missing JSON yields zero confidence."""
+        return parse_json_object(response) or {"confidence": 0.0}
+
+    def _parse_fused_entities(self, raw_entities: Any) -> List[ExtractedEntity]:
+        """Convert entity dicts from the response into ExtractedEntity objects."""
+        entities = []
+
+        if not isinstance(raw_entities, list):
+            return entities
+
+        for item in raw_entities:
+            if not isinstance(item, dict) or not item.get("text"):
+                continue
+            entities.append(
+                ExtractedEntity(
+                    text=str(item["text"]),
+                    entity_type=str(item.get("entity_type", "other")),
+                    confidence=0.8,
+                )
+            )
+
+        return entities
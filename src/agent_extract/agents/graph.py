@@ -1,10 +1,15 @@
 """LangGraph workflow with Supervisor-Planner-Critic architecture."""
 
-from typing import Literal
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Literal, Tuple
 from langgraph.graph import StateGraph, END
 from langchain_core.runnables import RunnableConfig
 
+from agent_extract.agents.base_agent import BaseAgent
 from agent_extract.agents.state import AgentState
+from agent_extract.core.config import config as settings
+from agent_extract.core.metrics import DEADLINES_EXCEEDED, WORKFLOW_EARLY_EXITS
+from agent_extract.core.tracing import annotate, span
 from agent_extract.agents.supervisor_agent import SupervisorAgent
 from agent_extract.agents.planner_agent import PlannerAgent
 from agent_extract.agents.critic_agent import CriticAgent
@@ -12,23 +17,61 @@ from agent_extract.agents.schema_agent import SchemaDetectionAgent
 from agent_extract.agents.extraction_agent import ContentExtractionAgent
 from agent_extract.agents.table_agent import TableParserAgent
 from agent_extract.agents.vision_agent import DocumentVisionAgent
+from agent_extract.agents.fused_agent import FusedExtractionAgent
+
+# State keys merged by the Annotated[..., add] reducers in AgentState
+REDUCED_STATE_KEYS = ("tables", "entities", "processing_steps", "errors")
+
+# Loop limits, counted in agent runs: supervisor decisions before the critic
+# is forced, and critic reviews (the first one plus re-extractions) before
+# the result is accepted as is
+MAX_SUPERVISOR_ROUNDS = 6
+MAX_CRITIC_REVIEWS = 2
+
+
+def _runs(state: AgentState, agent_name: str) -> int:
+    """Number of times an agent has run, from the processing steps."""
+    prefix = f"[{agent_name}]"
+    return sum(1 for step in state.get("processing_steps", []) if step.startswith(prefix))
 
 
 class DocumentExtractionGraph:
     """
     LangGraph-based multi-agent extraction workflow.
     
-    Architecture: Supervisor-Planner-Critic with specialized sub-agents
+    Architecture: Supervisor-Planner-Critic with specialized sub-agents.
+    In fast mode a single fused LLM call runs first, and the multi-agent
+    loop only runs when its self-assessed confidence is too low. With
+    config.early_exit, the workflow finishes right after extraction when
+    the result meets the exit criteria (see _meets_exit_criteria),
+    skipping the critic and further supervisor rounds.
+
+    Topologies:
+        supervised: Supervisor picks one sub-agent at a time (default)
+        parallel: Planner fans out to schema, table and vision concurrently,
+            then extraction and critic run on the merged state
     """
 
-    def __init__(self, use_vision: bool = True):
+    def __init__(
+        self,
+        use_vision: bool = True,
+        fast_mode: bool = False,
+        topology: Literal["supervised", "parallel"] = "supervised",
+    ):
         """
         Initialize the extraction graph.
 
         Args:
             use_vision: Whether to use vision model for image analysis
+            fast_mode: Try a single fused LLM call before the multi-agent loop
+            topology: "supervised" (serial supervisor loop) or "parallel" (fan-out)
         """
+        if topology not in ("supervised", "parallel"):
+            raise ValueError(f"Unknown graph topology: {topology}")
+
         self.use_vision = use_vision
+        self.fast_mode = fast_mode
+        self.topology = topology
         
         # Initialize all agents
         self.supervisor_agent = SupervisorAgent()
@@ -38,14 +81,40 @@ class DocumentExtractionGraph:
         self.extraction_agent = ContentExtractionAgent()
         self.table_agent = TableParserAgent()
         self.vision_agent = DocumentVisionAgent() if use_vision else None
+        self.fused_agent = FusedExtractionAgent() if fast_mode else None
         
         # Build graph
         self.graph = self._build_graph()
 
     def _build_graph(self) -> StateGraph:
-        """Build the Supervisor-Planner-Critic workflow."""
+        """Build the workflow for the configured topology."""
         workflow = StateGraph(AgentState)
 
+        if self.topology == "parallel":
+            self._add_parallel_workflow(workflow)
+        else:
+            self._add_supervised_workflow(workflow)
+
+        if self.fast_mode and self.fused_agent:
+            # Fast mode: single fused call, escalate to Planner if not confident
+            workflow.add_node("fused", self._fused_node)
+            workflow.set_entry_point("fused")
+            workflow.add_conditional_edges(
+                "fused",
+                self._route_from_fused,
+                {
+                    "planner": "planner",
+                    "complete": END,
+                },
+            )
+        else:
+            # Start with Planner
+            workflow.set_entry_point("planner")
+
+        return workflow.compile()
+
+    def _add_supervised_workflow(self, workflow: StateGraph) -> None:
+        """Add the Supervisor-Planner-Critic nodes and edges."""
         # Add all agent nodes
         workflow.add_node("planner", self._planner_node)
         workflow.add_node("supervisor", self._supervisor_node)
@@ -58,9 +127,6 @@ class DocumentExtractionGraph:
             workflow.add_node("vision", self._vision_node)
 
         # Define workflow edges
-        # Start with Planner
-        workflow.set_entry_point("planner")
-        
         # Planner -> Supervisor
         workflow.add_edge("planner", "supervisor")
         
@@ -84,7 +150,14 @@ class DocumentExtractionGraph:
         
         # All sub-agents return to Supervisor for next decision
         workflow.add_edge("schema", "supervisor")
-        workflow.add_edge("extraction", "supervisor")
+        workflow.add_conditional_edges(
+            "extraction",
+            self._route_from_extraction,
+            {
+                "continue": "supervisor",
+                "complete": END,
+            },
+        )
         workflow.add_edge("table_parser", "supervisor")
         
         if self.use_vision and self.vision_agent:
@@ -100,53 +173,234 @@ class DocumentExtractionGraph:
             },
         )
 
-        return workflow.compile()
+    def _add_parallel_workflow(self, workflow: StateGraph) -> None:
+        """
+        Add the fan-out/fan-in nodes and edges.
+
+        Schema detection, table analysis and vision layout analysis do not
+        depend on one another, so they run in the same LangGraph step. Each
+        branch returns only the keys it changed (see _run_branch); list keys
+        are merged by the reducers in AgentState and the remaining keys are
+        disjoint between branches.
+        """
+        branches = {
+            "schema": self.schema_agent,
+            "table_parser": self.table_agent,
+        }
+        if self.use_vision and self.vision_agent:
+            branches["vision"] = self.vision_agent
 
-    async def _planner_node(self, state: AgentState) -> AgentState:
+        workflow.add_node("planner", self._branch_node(self.planner_agent))
+        for name, agent in branches.items():
+            workflow.add_node(name, self._branch_node(agent))
+        workflow.add_node("extraction", self._branch_node(self.extraction_agent))
+        workflow.add_node("critic", self._branch_node(self.critic_agent))
+
+        # Planner -> all independent branches at once
+        for name in branches:
+            workflow.add_edge("planner", name)
+
+        # Fan-in: extraction waits for every branch
+        workflow.add_edge(list(branches), "extraction")
+        workflow.add_conditional_edges(
+            "extraction",
+            self._route_from_extraction,
+            {
+                "continue": "critic",
+                "complete": END,
+            },
+        )
+
+        # Critic can request one more extraction pass or end
+        workflow.add_conditional_edges(
+            "critic",
+            self._route_from_critic_parallel,
+            {
+                "extraction": "extraction",
+                "complete": END,
+            },
+        )
+
+    def _branch_node(self, agent: BaseAgent):
+        """Wrap an agent as a node that returns only its state changes."""
+
+        async def node(state: AgentState) -> Dict[str, Any]:
+            return await self._run_branch(agent, state)
+
+        return node
+
+    async def _run_branch(
+        self, agent: BaseAgent, state: AgentState, routing: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Run an agent on a private copy of the state and return the delta.
+
+        Agents return the whole state, which would double the reducer lists
+        and make concurrent branches collide on shared keys. The delta holds
+        only new list items and changed keys; routing keys (current_agent,
+        next_action) are kept only with routing=True, since in the parallel
+        topology the graph edges own them.
+        """
+        working = {
+            **state,
+            **{key: list(state.get(key) or []) for key in REDUCED_STATE_KEYS},
+        }
+        result = await self._run_agent(agent, working)
+
+        update: Dict[str, Any] = {}
+        for key, value in result.items():
+            if key in ("current_agent", "next_action") and not routing:
+                continue
+
+            if key in REDUCED_STATE_KEYS:
+                # Agents only append to the copied lists, so the tail is new
+                new_items = list(value or [])[len(state.get(key) or []):]
+                if new_items:
+                    update[key] = new_items
+            elif key not in state or value is not state[key] and value != state[key]:
+                update[key] = value
+
+        return update
+
+    async def _run_agent(self, agent: BaseAgent, state: AgentState) -> AgentState:
+        """
+        Run an agent inside an "agent" span, bounded by its deadline.
+
+        An agent that runs out of time is treated like one whose LLM call
+        failed: the error is recorded and the workflow moves on.
+        """
+        timeout = settings.agent_timeouts.get(agent.agent_name, settings.agent_timeout_seconds)
+        with span(agent.agent_name, "agent"):
+            try:
+                async with asyncio.timeout(timeout):
+                    return await agent.process(state)
+            except TimeoutError:
+                DEADLINES_EXCEEDED.inc(scope="agent")
+                annotate(timed_out=True)
+                return self._timed_out(agent, state, timeout)
+
+    def _timed_out(self, agent: BaseAgent, state: AgentState, timeout: float) -> AgentState:
+        """State after an agent missed its deadline."""
+        message = f"{agent.agent_name} timed out after {timeout:g}s"
+        # The fused agent escalates to the full loop; elsewhere stop routing
+        next_action = "planner" if agent is self.fused_agent else "complete"
+        return {
+            **state,
+            "errors": [*(state.get("errors") or []), message],
+            "processing_steps": [
+                *(state.get("processing_steps") or []),
+                f"[{agent.agent_name}] {message}",
+            ],
+            "current_agent": agent.agent_name,
+            "next_action": next_action,
+        }
+
+    async def _fused_node(self, state: AgentState) -> Dict[str, Any]:
+        """Fused single-call extraction (fast mode)."""
+        return await self._run_branch(self.fused_agent, state, routing=True)
+
+    async def _planner_node(self, state: AgentState) -> Dict[str, Any]:
         """Planner creates extraction strategy."""
-        return await self.planner_agent.process(state)
+        return await self._run_branch(self.planner_agent, state, routing=True)
 
-    async def _supervisor_node(self, state: AgentState) -> AgentState:
+    async def _supervisor_node(self, state: AgentState) -> Dict[str, Any]:
         """Supervisor decides next agent to run."""
-        return await self.supervisor_agent.process(state)
+        return await self._run_branch(self.supervisor_agent, state, routing=True)
 
-    async def _schema_node(self, state: AgentState) -> AgentState:
+    async def _schema_node(self, state: AgentState) -> Dict[str, Any]:
         """Schema detection sub-agent."""
-        return await self.schema_agent.process(state)
+        return await self._run_branch(self.schema_agent, state, routing=True)
 
-    async def _extraction_node(self, state: AgentState) -> AgentState:
+    async def _extraction_node(self, state: AgentState) -> Dict[str, Any]:
         """Content extraction sub-agent."""
-        return await self.extraction_agent.process(state)
+        return await self._run_branch(self.extraction_agent, state, routing=True)
 
-    async def _table_node(self, state: AgentState) -> AgentState:
+    async def _table_node(self, state: AgentState) -> Dict[str, Any]:
         """Table parsing sub-agent."""
-        return await self.table_agent.process(state)
+        return await self._run_branch(self.table_agent, state, routing=True)
 
-    async def _vision_node(self, state: AgentState) -> AgentState:
+    async def _vision_node(self, state: AgentState) -> Dict[str, Any]:
         """Vision analysis sub-agent."""
-        return await self.vision_agent.process(state)
+        return await self._run_branch(self.vision_agent, state, routing=True)
 
-    async def _critic_node(self, state: AgentState) -> AgentState:
+    async def _critic_node(self, state: AgentState) -> Dict[str, Any]:
         """Critic evaluates extraction quality."""
-        return await self.critic_agent.process(state)
+        return await self._run_branch(self.critic_agent, state, routing=True)
+
+    def _route_from_fused(self, state: AgentState) -> str:
+        """Route from fused agent - accept the result or run the full loop."""
+        if state.get("next_action") == "complete":
+            return "complete"
+
+        return "planner"
 
     def _route_from_supervisor(self, state: AgentState) -> str:
         """Route from supervisor to next agent."""
         next_action = state.get("next_action", "complete")
         
         # Safety: prevent infinite loops
-        max_steps = 10
-        if len(state.get("processing_steps", [])) > max_steps:
+        rounds = _runs(state, self.supervisor_agent.agent_name)
+        if rounds >= MAX_SUPERVISOR_ROUNDS and next_action != "complete":
             return "critic"  # Force completion via critic
         
         return next_action
 
+    def _route_from_extraction(self, state: AgentState) -> str:
+        """Route from extraction - finish early or continue the workflow."""
+        if settings.early_exit and self._meets_exit_criteria(state):
+            WORKFLOW_EARLY_EXITS.inc(topology=self.topology)
+            return "complete"
+
+        return "continue"
+
+    def _meets_exit_criteria(self, state: AgentState) -> bool:
+        """
+        Whether the extraction is good enough to skip review.
+
+        Needs schema detection confidence of at least
+        config.early_exit_min_confidence and a non-empty value for every
+        required field. With config.early_exit_require_validation, the run
+        must also be clean: no errors, no conflicting values across chunks,
+        and every required value present in the document text.
+        """
+        detected_schema = state.get("detected_schema") or {}
+        confidence = detected_schema.get("confidence", state.get("confidence_score", 0.0))
+        if (confidence or 0.0) < settings.early_exit_min_confidence:
+            return False
+
+        data = state.get("structured_data") or {}
+        required = self._required_fields(state)
+        values = [data.get(field) for field in required]
+        if not required or any(value in (None, "", [], {}) for value in values):
+            return False
+
+        if not settings.early_exit_require_validation:
+            return True
+        if state.get("errors") or data.get("extraction_conflicts"):
+            return False
+        text = " ".join(str(state.get("raw_text") or state.get("ocr_text") or "").lower().split())
+        return all(
+            " ".join(str(value).lower().split()) in text
+            for value in values
+            if isinstance(value, (str, int, float))
+        )
+
+    @staticmethod
+    def _required_fields(state: AgentState) -> List[str]:
+        """Fields an early exit needs: configured, detected or planned key fields."""
+        if settings.early_exit_required_fields:
+            return settings.early_exit_required_fields
+        detected_schema = state.get("detected_schema") or {}
+        plan = (state.get("structured_data") or {}).get("extraction_plan") or {}
+        return detected_schema.get("key_fields") or plan.get("key_fields_to_extract") or []
+
     def _route_from_critic(self, state: AgentState) -> str:
         """Route from critic - either complete or re-extract."""
         next_action = state.get("next_action", "complete")
         
         # Safety: prevent re-extraction loops
-        if next_action == "extraction" and len(state.get("processing_steps", [])) > 8:
+        reviews = _runs(state, self.critic_agent.agent_name)
+        if next_action == "extraction" and reviews >= MAX_CRITIC_REVIEWS:
             return "complete"  # Force completion
         
         if next_action == "complete":
@@ -154,6 +408,17 @@ class DocumentExtractionGraph:
         
         return "supervisor"
 
+    def _route_from_critic_parallel(self, state: AgentState) -> str:
+        """Route from critic in the parallel topology."""
+        critique = state.get("structured_data", {}).get("quality_critique", {})
+
+        # Safety: allow a single re-extraction pass
+        reviews = _runs(state, self.critic_agent.agent_name)
+        if critique.get("final_verdict") == "request_reextraction" and reviews < MAX_CRITIC_REVIEWS:
+            return "extraction"
+
+        return "complete"
+
     async def extract(self, initial_state: AgentState) -> AgentState:
         """
         Run the extraction workflow.
@@ -164,6 +429,26 @@ class DocumentExtractionGraph:
         Returns:
             Final state with all extractions
         """
+        final_state = initial_state
+        async for node, payload in self.stream(initial_state):
+            if node == END:
+                final_state = payload
+        return final_state
+
+    async def stream(self, initial_state: AgentState) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run the extraction workflow, yielding as each agent finishes.
+
+        Yields (node_name, update) with the state keys that agent returned,
+        then (END, final_state) once the workflow stops. Workflow errors are
+        recorded in the final state rather than raised.
+
+        Args:
+            initial_state: Initial state with document data
+
+        Yields:
+            (node_name, update) tuples, then (END, final_state)
+        """
         # Set initial values (use setdefault to avoid duplication)
         initial_state.setdefault("processing_steps", [])
         initial_state.setdefault("errors", [])
@@ -171,19 +456,51 @@ class DocumentExtractionGraph:
         initial_state.setdefault("tables", [])
         initial_state.setdefault("entities", [])
         initial_state.setdefault("confidence_score", 0.0)
-        initial_state.setdefault("extraction_method", "ai_agents_supervised")
+        initial_state.setdefault(
+            "extraction_method", "ai_agents_fast" if self.fast_mode else "ai_agents_supervised"
+        )
 
-        # Run the graph with proper config
+        # Run the graph with proper config; only the parallel topology
+        # needs more than one node running at a time
         config = RunnableConfig(
             recursion_limit=20,  # Allow more steps for supervisor pattern
-            max_concurrency=1
+            max_concurrency=None if self.topology == "parallel" else 1,
         )
-        
+
+        final_state = initial_state
+        timeout = settings.document_timeout_seconds
         try:
-            final_state = await self.graph.ainvoke(initial_state, config)
-            return final_state
+            # "updates" reports each node as it finishes; "values" carries the
+            # reduced state after every step
+            updates = self.graph.astream(initial_state, config, stream_mode=["updates", "values"])
+            deadline = None if timeout is None else asyncio.get_running_loop().time() + timeout
+            while True:
+                try:
+                    # The deadline covers the workflow, not the consumer of this stream
+                    async with asyncio.timeout_at(deadline):
+                        mode, chunk = await anext(updates)
+                except StopAsyncIteration:
+                    break
+                if mode == "values":
+                    final_state = chunk
+                    continue
+                for node, update in chunk.items():
+                    if update:
+                        yield node, update
+        except TimeoutError:
+            # Keep what the agents finished; report the rest as missing
+            await updates.aclose()
+            DEADLINES_EXCEEDED.inc(scope="document")
+            message = f"Document deadline of {timeout:g}s exceeded"
+            final_state = {
+                **final_state,
+                "errors": [*(final_state.get("errors") or []), message],
+                "processing_steps": [*(final_state.get("processing_steps") or []), message],
+            }
         except Exception as e:
             # Add error to state and return
-            initial_state["errors"].append(f"Workflow error: {str(e)}")
-            initial_state["processing_steps"].append(f"Workflow failed: {str(e)}")
-            return initial_state
+            final_state = initial_state
+            final_state["errors"].append(f"Workflow error: {str(e)}")
+            final_state["processing_steps"].append(f"Workflow failed: {str(e)}")
+
+        yield END, final_state
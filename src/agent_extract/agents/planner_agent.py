@@ -4,6 +4,7 @@ import json
 from typing import Dict, Any, List
 
 from agent_extract.agents.base_agent import BaseAgent
+from agent_extract.agents.responses import ExtractionPlan
 from agent_extract.agents.state import AgentState
 
 
@@ -54,20 +55,21 @@ Respond in JSON:
   "notes": "any special considerations"
 }"""
 
+        preview = self._fit_text(raw_text, "planner", system_prompt)
         user_prompt = f"""Create an extraction plan for this document:
 
 File: {file_path}
 
-Document preview (first 800 chars):
-{raw_text[:800]}
+Document preview:
+{preview}
 
 What's the best strategy to extract all relevant data?"""
 
         try:
             messages = self._create_prompt(system_prompt, user_prompt)
-            response = await self._invoke_llm(messages)
-            
-            plan = self._parse_plan_response(response)
+            plan = await self._invoke_structured(
+                messages, ExtractionPlan, self._parse_plan_response
+            )
             
             # Store plan in state
             return self._update_state(
@@ -0,0 +1,183 @@
+"""Response models agents request through the providers' structured-output modes."""
+
+import json
+import re
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+# A complete JSON scalar after a key. Numbers need a delimiter after them,
+# since more digits may still be streaming in.
+_SCALAR = r'("(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?(?=\s*[,}\]])|true|false|null)'
+
+
+class ExtractionPlan(BaseModel):
+    """Planner answer."""
+
+    document_category: str = Field(
+        default="unknown", description="invoice/form/letter/report/ticket/etc"
+    )
+    extraction_approach: Literal["basic", "advanced", "vision"] = "advanced"
+    key_fields_to_extract: List[str] = Field(default_factory=list)
+    has_tabular_data: bool = False
+    has_form_fields: bool = False
+    complexity: Literal["simple", "medium", "complex"] = "medium"
+    recommended_agents: List[str] = Field(default_factory=list)
+    estimated_accuracy: float = Field(default=0.8, description="0.0-1.0")
+    notes: str = ""
+
+
+class RoutingDecision(BaseModel):
+    """Supervisor answer."""
+
+    next_agent: Literal[
+        "planner", "vision", "schema", "extraction", "table_parser", "critic", "complete"
+    ]
+    reason: str = ""
+    priority: Literal["high", "medium", "low"] = "medium"
+
+
+class DocumentSchema(BaseModel):
+    """Schema detection answer."""
+
+    document_type: str = "unknown"
+    confidence: float = Field(default=0.7, description="0.0-1.0")
+    key_fields: List[str] = Field(default_factory=list)
+    has_tables: bool = False
+    has_forms: bool = False
+    language: str = "en"
+
+
+class ExtractedFields(BaseModel):
+    """Extraction answer: any key-value pairs found in the document."""
+
+    model_config = ConfigDict(extra="allow")
+
+
+class Critique(BaseModel):
+    """Critic answer."""
+
+    overall_quality: Literal["excellent", "good", "fair", "poor"] = "good"
+    confidence_score: float = Field(default=0.8, description="0.0-1.0")
+    completeness: Optional[float] = None
+    accuracy: Optional[float] = None
+    issues_found: List[str] = Field(default_factory=list)
+    missing_fields: List[str] = Field(default_factory=list)
+    corrections: Dict[str, Any] = Field(
+        default_factory=dict, description="field -> corrected value"
+    )
+    recommendations: List[str] = Field(default_factory=list)
+    final_verdict: Literal["approve", "request_reextraction", "needs_review"] = "approve"
+
+
+class ValidationReport(BaseModel):
+    """Validation answer."""
+
+    is_valid: bool = True
+    confidence: Optional[float] = Field(default=None, description="0.0-1.0")
+    issues: List[str] = Field(default_factory=list)
+    corrections: Dict[str, Any] = Field(
+        default_factory=dict, description="field -> corrected value"
+    )
+    completeness_score: Optional[float] = None
+
+
+class FusedPlan(BaseModel):
+    """Plan part of the fused answer."""
+
+    document_category: str = "unknown"
+    extraction_approach: Literal["basic", "advanced", "vision"] = "advanced"
+    key_fields_to_extract: List[str] = Field(default_factory=list)
+    complexity: Literal["simple", "medium", "complex"] = "medium"
+
+
+class FusedEntity(BaseModel):
+    """Named entity in the fused answer."""
+
+    text: str
+    entity_type: Literal["person", "date", "location", "organization", "number", "money", "other"]
+
+
+class FusedExtraction(BaseModel):
+    """Fused single-call answer."""
+
+    plan: FusedPlan = Field(default_factory=FusedPlan)
+    document_type: str = "unknown"
+    key_fields: List[str] = Field(default_factory=list)
+    has_tables: bool = False
+    has_forms: bool = False
+    language: str = "en"
+    fields: Dict[str, Any] = Field(default_factory=dict, description="field -> value")
+    entities: List[FusedEntity] = Field(default_factory=list)
+    confidence: float = Field(default=0.0, description="Honest self-assessment, 0.0-1.0")
+    missing_fields: List[str] = Field(default_factory=list)
+
+
+class DetectedTable(BaseModel):
+    """A table found in text."""
+
+    headers: List[str] = Field(default_factory=list)
+    rows: List[List[str]] = Field(default_factory=list)
+
+
+class TableDetection(BaseModel):
+    """Table detection answer."""
+
+    tables: List[DetectedTable] = Field(default_factory=list)
+
+
+class TableAnalysis(BaseModel):
+    """Table analysis answer."""
+
+    headers: Optional[List[str]] = Field(default=None, description="Better headers, if needed")
+    data_types: List[str] = Field(default_factory=list)
+    issues: List[str] = Field(default_factory=list)
+
+
+def parse_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """
+    JSON object in a text answer, in a ```json fence or between the outer braces.
+
+    Args:
+        text: Model answer
+
+    Returns:
+        Parsed object, or None if the answer holds no valid JSON object
+    """
+    if "```json" in text:
+        candidate = text.split("```json")[1].split("```")[0].strip()
+    elif "{" in text and "}" in text:
+        candidate = text[text.index("{"):text.rindex("}") + 1]
+    else:
+        return None
+
+    try:
+        value = json.loads(candidate)
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def completed_fields(text: str, schema: type[BaseModel]) -> Optional[Dict[str, Any]]:
+    """
+    Required fields of a response model, once a partial answer has them all.
+
+    Args:
+        text: Answer streamed so far
+        schema: Response model
+
+    Returns:
+        Values of the required fields, or None while any is incomplete (and
+        for models without required fields)
+    """
+    required = [name for name, field in schema.model_fields.items() if field.is_required()]
+    if not required:
+        return None
+
+    values = {}
+    for name in required:
+        match = re.search(rf'"{re.escape(name)}"\s*:\s*{_SCALAR}', text)
+        if match is None:
+            return None
+        values[name] = json.loads(match.group(1))
+    return values
@@ -4,6 +4,7 @@ import json
 from typing import Dict, Any
 
 from agent_extract.agents.base_agent import BaseAgent
+from agent_extract.agents.responses import DocumentSchema
 from agent_extract.agents.state import AgentState
 from agent_extract.core.types import DocumentType
 
@@ -52,22 +53,22 @@ Respond in JSON format with:
   "language": "en/other"
 }"""
 
+        preview = self._fit_text(raw_text, "schema", system_prompt)
         user_prompt = f"""Analyze this document and classify it:
 
 Filename: {file_name}
 
-Text preview (first 1000 characters):
-{raw_text[:1000]}
+Text preview:
+{preview}
 
 Identify the document type and key fields to extract."""
 
         try:
             # Invoke LLM for classification
             messages = self._create_prompt(system_prompt, user_prompt)
-            response = await self._invoke_llm(messages)
-
-            # Parse response
-            schema = self._parse_schema_response(response)
+            schema = await self._invoke_structured(
+                messages, DocumentSchema, self._parse_schema_response
+            )
 
             # Determine document type enum
             doc_type = self._map_to_document_type(schema.get("document_type", "unknown"))
@@ -4,6 +4,7 @@ import json
 from typing import Dict, Any, List, Literal
 
 from agent_extract.agents.base_agent import BaseAgent
+from agent_extract.agents.responses import RoutingDecision
 from agent_extract.agents.state import AgentState
 
 
@@ -63,9 +64,9 @@ Which agent should execute next to best extract data from this document?"""
 
         try:
             messages = self._create_prompt(system_prompt, user_prompt)
-            response = await self._invoke_llm(messages)
-            
-            decision = self._parse_supervisor_decision(response)
+            decision = await self._invoke_streaming(
+                messages, RoutingDecision, self._parse_supervisor_decision
+            )
             next_agent = decision.get("next_agent", "complete")
             
             return self._update_state(
@@ -4,8 +4,11 @@ import json
 from typing import List, Dict, Any
 
 from agent_extract.agents.base_agent import BaseAgent
+from agent_extract.agents.responses import TableAnalysis, TableDetection
 from agent_extract.agents.state import AgentState
-from agent_extract.core.types import ExtractedTable
+from agent_extract.core.config import config
+from agent_extract.core.types import ExtractedTable, TextChunk
+from agent_extract.processors.chunker import DocumentChunker, map_chunks
 
 
 class TableParserAgent(BaseAgent):
@@ -14,6 +17,7 @@ class TableParserAgent(BaseAgent):
     def __init__(self):
         """Initialize table parser agent with qwen3."""
         super().__init__()
+        self.chunker = DocumentChunker(max_chars=config.chunk_max_chars)
 
     async def process(self, state: AgentState) -> AgentState:
         """
@@ -74,10 +78,9 @@ Respond in JSON: {"headers": [...], "data_types": [...], "issues": [...]}"""
                 user_prompt = f"Analyze this table:\n\n{table_text}"
 
                 messages = self._create_prompt(system_prompt, user_prompt)
-                response = await self._invoke_llm(messages)
-                
-                # Parse and apply enhancements
-                analysis = self._parse_table_analysis(response)
+                analysis = await self._invoke_structured(
+                    messages, TableAnalysis, self._parse_table_analysis
+                )
                 
                 # Use improved headers if suggested
                 if analysis.get("headers"):
@@ -92,7 +95,23 @@ Respond in JSON: {"headers": [...], "data_types": [...], "issues": [...]}"""
         return enhanced
 
     async def _detect_tables_from_text(self, text: str) -> List[ExtractedTable]:
-        """Detect tables from plain text using LLM."""
+        """Detect tables from plain text using LLM, one chunk at a time."""
+        chunks = self.chunker.split(text)
+        results = await map_chunks(
+            chunks,
+            self._detect_tables_in_chunk,
+            concurrency=config.chunk_concurrency,
+        )
+
+        tables = []
+        for result in results:
+            if isinstance(result, list):
+                tables.extend(result)
+
+        return tables
+
+    async def _detect_tables_in_chunk(self, chunk: TextChunk) -> List[ExtractedTable]:
+        """Detect tables in a single chunk of text."""
         system_prompt = """You are a table detection expert. Identify tabular data in the text.
 For each table found, respond with JSON:
 {
@@ -106,22 +125,24 @@ For each table found, respond with JSON:
 
         user_prompt = f"""Find any tabular data in this text:
 
-{text[:2000]}
+{chunk.text}
 
 Extract tables with their headers and data."""
 
         try:
             messages = self._create_prompt(system_prompt, user_prompt)
-            response = await self._invoke_llm(messages)
-            
-            data = self._parse_table_detection(response)
+            data = await self._invoke_structured(
+                messages, TableDetection, self._parse_table_detection
+            )
             tables = []
+            page = chunk.pages[0] if len(chunk.pages) == 1 else None
             
             for table_data in data.get("tables", []):
                 tables.append(
                     ExtractedTable(
                         headers=table_data.get("headers", []),
                         rows=table_data.get("rows", []),
+                        page=page,
                     )
                 )
             
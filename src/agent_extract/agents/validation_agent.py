@@ -4,7 +4,9 @@ import json
 from typing import Dict, Any, List
 
 from agent_extract.agents.base_agent import BaseAgent
+from agent_extract.agents.responses import ValidationReport
 from agent_extract.agents.state import AgentState
+from agent_extract.processors.prompt_budget import field_terms
 
 
 class ValidationAgent(BaseAgent):
@@ -25,7 +27,7 @@ class ValidationAgent(BaseAgent):
             Updated state with validated data
         """
         structured_data = state.get("structured_data", {})
-        raw_text = state.get("raw_text", "")[:1000]  # Context
+        raw_text = state.get("raw_text", "")
         
         if not structured_data:
             # Nothing to validate
@@ -51,22 +53,29 @@ Respond in JSON:
   "completeness_score": 0.0-1.0
 }"""
 
+        extracted_json = json.dumps(structured_data, indent=2)
+        context = self._fit_text(
+            raw_text,
+            "validation",
+            system_prompt + extracted_json,
+            keywords=field_terms(structured_data),
+        )
+
         user_prompt = f"""Validate this extracted data:
 
 Extracted Data:
-{json.dumps(structured_data, indent=2)}
+{extracted_json}
 
 Original Text Context:
-{raw_text}
+{context}
 
 Check for accuracy and completeness."""
 
         try:
             messages = self._create_prompt(system_prompt, user_prompt)
-            response = await self._invoke_llm(messages)
-
-            # Parse validation result
-            validation = self._parse_validation_response(response)
+            validation = await self._invoke_structured(
+                messages, ValidationReport, self._parse_validation_response
+            )
 
             # Apply corrections if any
             if validation.get("corrections"):
@@ -1,12 +1,23 @@
 """AI-powered document extractor using LangGraph agents."""
 
 import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
 import time
 
-from agent_extract.core.types import ExtractionResult, DocumentMetadata, DocumentType
+from langgraph.graph import END
+
+from agent_extract.core.types import (
+    ExtractionResult,
+    ExtractionEvent,
+    DocumentMetadata,
+    DocumentType,
+    LLMCall,
+)
 from agent_extract.core.config import config
+from agent_extract.core.tracing import trace, traced
+from agent_extract.core.usage import summarize_usage, track_usage
 from agent_extract.readers.factory import ReaderFactory
 from agent_extract.ocr.ocr_manager import OCRManager
 from agent_extract.agents.graph import DocumentExtractionGraph
@@ -24,6 +35,9 @@ class AIDocumentExtractor:
         self,
         use_vision: bool = True,
         use_basic_extraction: bool = True,
+        fast_mode: bool = False,
+        topology: str = "supervised",
+        executor: Optional[Executor] = None,
     ):
         """
         Initialize AI document extractor.
@@ -31,16 +45,29 @@ class AIDocumentExtractor:
         Args:
             use_vision: Use vision model (gemma3:4b) for images
             use_basic_extraction: Use basic readers first, then enhance with AI
+            fast_mode: Use a single fused LLM call, falling back to the
+                multi-agent loop when its confidence is low
+            topology: Agent graph topology ("supervised" or "parallel")
+            executor: Executor for blocking reader/OCR work (defaults to the
+                event loop's thread pool). With a ProcessPoolExecutor each
+                worker process reads with its own warm reader factory.
         """
         self.use_vision = use_vision and config.enable_vision_model
         self.use_basic_extraction = use_basic_extraction
+        self.fast_mode = fast_mode
+        self.executor = executor
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         
         # Initialize basic components
         self.ocr_manager = OCRManager.from_config()
         self.reader_factory = ReaderFactory(ocr_engine=self.ocr_manager)
         
         # Initialize AI agent graph
-        self.agent_graph = DocumentExtractionGraph(use_vision=self.use_vision)
+        self.agent_graph = DocumentExtractionGraph(
+            use_vision=self.use_vision,
+            fast_mode=self.fast_mode,
+            topology=topology,
+        )
 
     async def extract(self, file_path: Path) -> ExtractionResult:
         """
@@ -52,50 +79,260 @@ class AIDocumentExtractor:
         Returns:
             ExtractionResult with AI-enhanced data
         """
-        start_time = time.time()
+        return await self._extract(file_path)
 
-        # Step 1: Basic extraction (OCR, text, tables)
-        if self.use_basic_extraction:
-            basic_result = await self._basic_extraction(file_path)
-        else:
-            basic_result = None
+    async def stream(self, file_path: Path) -> AsyncIterator[ExtractionEvent]:
+        """
+        Extract a document, yielding progress and partial results.
 
-        # Step 2: Prepare state for agents
-        initial_state = self._prepare_agent_state(file_path, basic_result)
+        Emits a "started" event, a "basic_extraction" event once text is
+        available, one "agent" event per finished agent carrying what that
+        agent added (schema, fields, tables, critique, ...), and finally a
+        "result" event with the complete ExtractionResult.
 
-        # Step 3: Run AI agent workflow
-        final_state = await self.agent_graph.extract(initial_state)
+        Args:
+            file_path: Path to the document
 
-        # Step 4: Build final extraction result
-        processing_time = time.time() - start_time
-        result = self._build_extraction_result(
-            file_path,
-            basic_result,
-            final_state,
-            processing_time,
-        )
+        Yields:
+            ExtractionEvent objects in order
+        """
+        async for event in self._stream(file_path):
+            yield event
+
+    async def extract_many(
+        self,
+        file_paths: Iterable[Path],
+        concurrency: int = 4,
+        prefetch: Optional[int] = None,
+    ) -> AsyncIterator[Tuple[Path, Union[ExtractionResult, Exception]]]:
+        """
+        Extract many documents, yielding results in completion order.
+
+        Basic extraction for upcoming documents runs in the executor while
+        earlier documents are in the agent workflow; at most `concurrency`
+        documents are in the LLM stage at any time. Paths are consumed
+        lazily, so a generator of paths is never materialised.
+
+        Args:
+            file_paths: Documents to process
+            concurrency: Maximum documents in the LLM stage at once
+            prefetch: Extra documents read ahead of the LLM stage
+                (defaults to `concurrency`)
 
+        Yields:
+            (file_path, result) tuples; result is the exception if the
+            document failed
+        """
+        llm_slots = asyncio.Semaphore(max(1, concurrency))
+        window = max(1, concurrency) + (concurrency if prefetch is None else max(0, prefetch))
+        paths = iter(file_paths)
+        pending = set()
+
+        async def run(path: Path) -> Tuple[Path, Union[ExtractionResult, Exception]]:
+            try:
+                return path, await self._extract(path, llm_slots)
+            except Exception as e:
+                return path, e
+
+        def fill():
+            while len(pending) < window:
+                path = next(paths, None)
+                if path is None:
+                    return
+                pending.add(asyncio.create_task(run(Path(path))))
+
+        try:
+            fill()
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending.discard(task)
+                    yield task.result()
+                fill()
+        finally:
+            for task in pending:
+                task.cancel()
+            # Let cancelled documents unwind (LLM calls, reader work) before returning
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _extract(
+        self,
+        file_path: Path,
+        llm_slots: Optional[asyncio.Semaphore] = None,
+    ) -> ExtractionResult:
+        """Run the extraction and return only the final result."""
+        result = None
+        async for event in self._stream(file_path, llm_slots):
+            if event.event == "result":
+                result = event.result
         return result
 
+    async def _stream(
+        self,
+        file_path: Path,
+        llm_slots: Optional[asyncio.Semaphore] = None,
+    ) -> AsyncIterator[ExtractionEvent]:
+        """Run basic extraction, then the agent workflow inside an LLM slot."""
+        start_time = time.time()
+        with trace() as spans, track_usage() as llm_calls:
+            yield ExtractionEvent(event="started", message=f"Extracting {file_path.name}")
+
+            # Step 1: Basic extraction (OCR, text, tables)
+            if self.use_basic_extraction:
+                basic_result = await self._basic_extraction(file_path)
+                yield ExtractionEvent(
+                    event="basic_extraction",
+                    message=f"Text extracted: {len(basic_result.raw_text)} chars",
+                    document_type=basic_result.metadata.document_type.value,
+                    data={
+                        "text_length": len(basic_result.raw_text),
+                        "page_count": basic_result.metadata.page_count,
+                        "tables": len(basic_result.tables),
+                    },
+                    elapsed=time.time() - start_time,
+                )
+                spans.add(basic_result.spans)
+            else:
+                basic_result = None
+
+            # Step 2: Prepare state for agents
+            initial_state = self._prepare_agent_state(file_path, basic_result)
+            seen = {
+                "detected_schema": None,
+                "structured_data": dict(initial_state.get("structured_data") or {}),
+                "tables": list(initial_state.get("tables") or []),
+                "entities": list(initial_state.get("entities") or []),
+            }
+
+            # Step 3: Run AI agent workflow
+            final_state = initial_state
+            if llm_slots is not None:
+                await llm_slots.acquire()
+            try:
+                async for node, payload in self.agent_graph.stream(initial_state):
+                    if node == END:
+                        final_state = payload
+                    else:
+                        yield self._agent_event(node, payload, seen, time.time() - start_time)
+            finally:
+                if llm_slots is not None:
+                    llm_slots.release()
+
+            # Step 4: Build final extraction result
+            processing_time = time.time() - start_time
+            result = self._build_extraction_result(
+                file_path,
+                basic_result,
+                final_state,
+                processing_time,
+                llm_calls,
+            )
+            result.spans = list(spans.spans)
+
+            yield ExtractionEvent(
+                event="result",
+                message="Extraction complete",
+                document_type=result.metadata.document_type.value,
+                confidence_score=result.confidence_score,
+                result=result,
+                elapsed=processing_time,
+            )
+
+    def _agent_event(
+        self,
+        node: str,
+        update: Dict[str, Any],
+        seen: Dict[str, Any],
+        elapsed: float,
+    ) -> ExtractionEvent:
+        """
+        Build an event with only what an agent added to the state.
+
+        Args:
+            node: Graph node that finished
+            update: State keys returned by the node
+            seen: Data already reported (updated in place)
+            elapsed: Seconds since extraction started
+
+        Returns:
+            ExtractionEvent for the agent
+        """
+        data: Dict[str, Any] = {}
+
+        schema = update.get("detected_schema")
+        if schema and schema != seen["detected_schema"]:
+            data["detected_schema"] = schema
+            seen["detected_schema"] = schema
+
+        structured = update.get("structured_data") or {}
+        changed = {
+            key: value
+            for key, value in structured.items()
+            if seen["structured_data"].get(key) != value
+        }
+        if changed:
+            data["structured_data"] = changed
+            seen["structured_data"].update(changed)
+
+        # Agents may return whole lists; report only items not sent before
+        for key in ("tables", "entities"):
+            new_items = [item for item in update.get(key) or [] if item not in seen[key]]
+            if new_items:
+                data[key] = [item.model_dump(mode="json") for item in new_items]
+                seen[key].extend(new_items)
+
+        steps = update.get("processing_steps") or []
+        document_type = update.get("document_type")
+
+        return ExtractionEvent(
+            event="agent",
+            agent=node,
+            message=steps[-1] if steps else None,
+            document_type=getattr(document_type, "value", document_type),
+            confidence_score=update.get("confidence_score"),
+            data=data,
+            elapsed=elapsed,
+        )
+
     def extract_sync(self, file_path: Path) -> ExtractionResult:
         """
         Synchronous wrapper for extract method.
 
+        Reuses one event loop across calls so LLM clients bound to the loop
+        keep their connections.
+
         Args:
             file_path: Path to the document
 
         Returns:
             ExtractionResult
         """
-        return asyncio.run(self.extract(file_path))
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self.extract(file_path))
+
+    def close(self) -> None:
+        """Close the event loop used by extract_sync."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.close()
+        self._loop = None
 
     async def _basic_extraction(self, file_path: Path) -> ExtractionResult:
         """Run basic extraction (Phase 1 readers)."""
+        loop = asyncio.get_running_loop()
+
+        if isinstance(self.executor, ProcessPoolExecutor):
+            # Readers hold OCR engines that can't be pickled; workers have their own
+            from agent_extract.batch.workers import merge_worker_metrics, read_document_in_pool
+
+            return merge_worker_metrics(
+                await loop.run_in_executor(self.executor, read_document_in_pool, file_path)
+            )
+
         reader = self.reader_factory.get_reader(file_path)
         
-        # Run in executor to avoid blocking
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, reader.read, file_path)
+        # Run in executor to avoid blocking; the thread records its own spans
+        result = await loop.run_in_executor(self.executor, traced, reader.read, file_path)
         
         return result
 
@@ -154,8 +391,9 @@ class AIDocumentExtractor:
         basic_result: Optional[ExtractionResult],
         final_state: AgentState,
         processing_time: float,
+        llm_calls: Optional[List[LLMCall]] = None,
     ) -> ExtractionResult:
-        """Build final extraction result from agent state."""
+        """Build final extraction result from agent state and the LLM calls it took."""
         # Use basic metadata if available, otherwise create new
         if basic_result:
             metadata = basic_result.metadata
@@ -183,9 +421,11 @@ class AIDocumentExtractor:
         # Add processing metadata
         result.structured_data["ai_processing"] = {
             "agents_used": final_state.get("processing_steps", []),
-            "detected_document_type": final_state.get("detected_schema", {}).get("document_type"),
+            "detected_document_type": (final_state.get("detected_schema") or {}).get("document_type"),
             "errors": final_state.get("errors", []),
         }
+        if llm_calls:
+            result.structured_data["ai_processing"]["usage"] = summarize_usage(llm_calls)
 
         return result
 
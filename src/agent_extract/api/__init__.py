@@ -1,5 +1,16 @@
-"""FastAPI application (Phase 3)."""
+"""HTTP extraction service.
 
-# API will be implemented in Phase 3
+The FastAPI application lives in agent_extract.api.app (requires the
+``api`` extra) and is served with ``agent-extract serve``.
+"""
 
+from agent_extract.api.schemas import ExtractionOptions, HealthResponse, JobInfo, JobStatus
+from agent_extract.api.service import ExtractionService
 
+__all__ = [
+    "ExtractionService",
+    "ExtractionOptions",
+    "HealthResponse",
+    "JobInfo",
+    "JobStatus",
+]
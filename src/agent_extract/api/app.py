@@ -0,0 +1,305 @@
+"""FastAPI application exposing document extraction over HTTP."""
+
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from agent_extract.core.exceptions import ConfigurationError, JobFailedError, ServiceBusyError
+
+try:
+    from fastapi import (
+        Depends,
+        FastAPI,
+        File,
+        Header,
+        HTTPException,
+        Query,
+        Request,
+        UploadFile,
+        WebSocket,
+    )
+    from fastapi.responses import Response, StreamingResponse
+except ImportError as e:
+    raise ConfigurationError(
+        "FastAPI not installed. Install with: pip install agent-extract[api]"
+    ) from e
+
+from agent_extract import __version__
+from agent_extract.api.schemas import (
+    ExtractionOptions,
+    HealthResponse,
+    JobInfo,
+    JobStatus,
+    Priority,
+)
+from agent_extract.api.service import ExtractionService
+from agent_extract.core.config import config
+from agent_extract.core.metrics import API_JOBS, registry
+from agent_extract.core.types import ExtractionEvent, ExtractionResult
+from agent_extract.outputs.json_formatter import JSONFormatter
+from agent_extract.outputs.markdown_formatter import MarkdownFormatter
+
+# Uploads are copied to disk in blocks of this size
+SPOOL_BLOCK_SIZE = 1024 * 1024
+
+# Seconds clients are asked to wait after a 429
+RETRY_AFTER_SECONDS = 5
+
+# Status for a failed job by the class name of its error: bad input is the
+# client's fault, a missed deadline is a gateway timeout, anything else is ours
+_FAILURE_STATUS = {
+    "UnsupportedFormatError": 415,
+    "DocumentReadError": 422,
+    "TimeoutError": 504,
+}
+
+# Prometheus text exposition format
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_formatters = {
+    "json": (JSONFormatter(), "application/json"),
+    "markdown": (MarkdownFormatter(), "text/markdown; charset=utf-8"),
+}
+
+
+def create_app(service: Optional[ExtractionService] = None) -> FastAPI:
+    """
+    Create the API application.
+
+    Args:
+        service: Extraction service to use (defaults to one built from config)
+
+    Returns:
+        FastAPI application; the service starts and stops with it
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.service = service or ExtractionService()
+        app.state.service.start()
+        try:
+            yield
+        finally:
+            await app.state.service.close()
+
+    app = FastAPI(
+        title="Agent-Extract",
+        description="Document extraction with warm readers, OCR and AI agents",
+        version=__version__,
+        lifespan=lifespan,
+    )
+
+    def get_service(request: Request) -> ExtractionService:
+        return request.app.state.service
+
+    def get_options(
+        ai: bool = Query(False, description="Use AI-powered extraction"),
+        vision: bool = Query(True, description="Use vision model for AI extraction"),
+        fast: bool = Query(False, description="Single-call AI extraction"),
+    ) -> ExtractionOptions:
+        return ExtractionOptions(use_ai=ai, use_vision=vision, fast_mode=fast)
+
+    def get_tenant(
+        x_tenant_id: str = Header("default", description="Tenant for per-tenant limits"),
+    ) -> str:
+        return x_tenant_id
+
+    @app.get("/health", response_model=HealthResponse)
+    async def health(service: ExtractionService = Depends(get_service)) -> HealthResponse:
+        """Report service status and current load."""
+        return HealthResponse(
+            status="ok",
+            version=__version__,
+            running=service.queue.running,
+            queued=service.queue.queued,
+            max_concurrency=service.max_concurrency,
+            max_queue_depth=service.max_pending,
+            reader_workers=service.reader_workers,
+        )
+
+    @app.get("/metrics")
+    async def metrics(service: ExtractionService = Depends(get_service)) -> Response:
+        """Expose metrics in the Prometheus text format."""
+        API_JOBS.set(service.queue.running, state="running")
+        API_JOBS.set(service.queue.queued, state="queued")
+        return Response(content=registry.render(), media_type=METRICS_MEDIA_TYPE)
+
+    @app.post("/extract")
+    async def extract(
+        file: UploadFile = File(..., description="Document to extract"),
+        output_format: str = Query("json", alias="format", pattern="^(json|markdown)$"),
+        options: ExtractionOptions = Depends(get_options),
+        tenant: str = Depends(get_tenant),
+        service: ExtractionService = Depends(get_service),
+    ) -> Response:
+        """Extract a document as an interactive job and return the result."""
+        file_path = await _spool_upload(service, file)
+        try:
+            result = await service.extract(
+                file_path, options, tenant=tenant, priority=Priority.INTERACTIVE
+            )
+        except ServiceBusyError as e:
+            service.discard_spool(file_path)
+            raise _queue_full(e) from e
+        except JobFailedError as e:
+            raise _job_failed(str(e), e.error_type) from e
+        return _render(result, output_format)
+
+    @app.post("/extract/stream")
+    async def extract_stream(
+        file: UploadFile = File(..., description="Document to extract"),
+        options: ExtractionOptions = Depends(get_options),
+        tenant: str = Depends(get_tenant),
+        service: ExtractionService = Depends(get_service),
+    ) -> StreamingResponse:
+        """Extract a document as an interactive job, streaming progress as server-sent events."""
+        file_path = await _spool_upload(service, file)
+        try:
+            job = service.submit(file_path, options, tenant=tenant, priority=Priority.INTERACTIVE)
+        except ServiceBusyError as e:
+            service.discard_spool(file_path)
+            raise _queue_full(e) from e
+        return _sse(service.events(job.job_id), job.job_id)
+
+    @app.post("/jobs", response_model=JobInfo, status_code=202)
+    async def submit_job(
+        file: UploadFile = File(..., description="Document to extract"),
+        priority: Priority = Query(Priority.BULK, description="Scheduling class"),
+        options: ExtractionOptions = Depends(get_options),
+        tenant: str = Depends(get_tenant),
+        service: ExtractionService = Depends(get_service),
+    ) -> JobInfo:
+        """Queue a document for extraction and return its job id."""
+        file_path = await _spool_upload(service, file)
+        try:
+            return service.submit(file_path, options, tenant=tenant, priority=priority)
+        except ServiceBusyError as e:
+            service.discard_spool(file_path)
+            raise _queue_full(e) from e
+
+    @app.get("/jobs/{job_id}", response_model=JobInfo)
+    async def get_job(job_id: str, service: ExtractionService = Depends(get_service)) -> JobInfo:
+        """Return the status of a job."""
+        job = service.queue.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+        return job
+
+    @app.get("/jobs/{job_id}/events")
+    async def job_events(
+        job_id: str, service: ExtractionService = Depends(get_service)
+    ) -> StreamingResponse:
+        """Stream a job's progress and partial results as server-sent events."""
+        if service.queue.get(job_id) is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+        return _sse(service.events(job_id), job_id)
+
+    @app.websocket("/jobs/{job_id}/ws")
+    async def job_events_ws(websocket: WebSocket, job_id: str) -> None:
+        """Send a job's progress and partial results as JSON WebSocket messages."""
+        service: ExtractionService = websocket.app.state.service
+        if service.queue.get(job_id) is None:
+            await websocket.close(code=4404, reason=f"Unknown job: {job_id}")
+            return
+
+        await websocket.accept()
+        async for event in service.events(job_id):
+            await websocket.send_text(event.model_dump_json())
+        await websocket.close()
+
+    @app.get("/jobs/{job_id}/result")
+    async def get_job_result(
+        job_id: str,
+        output_format: str = Query("json", alias="format", pattern="^(json|markdown)$"),
+        service: ExtractionService = Depends(get_service),
+    ) -> Response:
+        """Return the result of a finished job."""
+        job = service.queue.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+        if job.status == JobStatus.FAILED:
+            raise _job_failed(job.error, job.error_type)
+        result = service.queue.get_result(job_id)
+        if result is None:
+            raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+        return _render(result, output_format)
+
+    return app
+
+
+def _job_failed(error: Optional[str], error_type: Optional[str]) -> HTTPException:
+    """HTTP error for a failed job: 415/422 for bad input, 504 for a deadline, else 500."""
+    return HTTPException(
+        status_code=_FAILURE_STATUS.get(error_type, 500), detail=f"Extraction failed: {error}"
+    )
+
+
+async def _spool_upload(service: ExtractionService, upload: UploadFile) -> Path:
+    """
+    Check queue capacity and spool an upload to disk.
+
+    Capacity is checked before the body is copied, so a full queue rejects
+    requests without spooling them; submit() checks again afterwards.
+    """
+    try:
+        service.queue.check_capacity()
+    except ServiceBusyError as e:
+        raise _queue_full(e) from e
+    return await _spool(service, upload)
+
+
+def _queue_full(error: ServiceBusyError) -> HTTPException:
+    """429 response asking the client to retry later."""
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
+
+async def _spool(service: ExtractionService, upload: UploadFile) -> Path:
+    """Copy an upload to the spool directory, enforcing the size limit."""
+    file_path = service.new_spool_path(upload.filename)
+    limit = config.max_file_size_bytes
+    size = 0
+
+    try:
+        with open(file_path, "wb") as f:
+            while block := await upload.read(SPOOL_BLOCK_SIZE):
+                size += len(block)
+                if size > limit:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File exceeds {config.max_file_size_mb} MB limit",
+                    )
+                f.write(block)
+    except BaseException:
+        service.discard_spool(file_path)
+        raise
+    finally:
+        await upload.close()
+
+    return file_path
+
+
+def _sse(events: AsyncIterator[ExtractionEvent], job_id: str) -> StreamingResponse:
+    """Encode events as a text/event-stream response."""
+
+    async def encode():
+        async for event in events:
+            yield f"event: {event.event}\ndata: {event.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        encode(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Job-ID": job_id},
+    )
+
+
+def _render(result: ExtractionResult, output_format: str) -> Response:
+    """Format a result the same way the CLI writes it."""
+    formatter, media_type = _formatters[output_format]
+    return Response(content=formatter.format(result), media_type=media_type)
+
+
+app = create_app()
@@ -0,0 +1,436 @@
+"""Persistent job store and priority scheduler for the extraction API."""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set
+
+from agent_extract.api.schemas import ExtractionOptions, JobInfo, JobStatus, Priority
+from agent_extract.core.exceptions import ServiceBusyError
+from agent_extract.core.types import ExtractionResult
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    info TEXT NOT NULL,
+    status TEXT NOT NULL,
+    spool_path TEXT,
+    result TEXT,
+    created_at TEXT NOT NULL
+)
+"""
+
+
+class JobStore:
+    """
+    SQLite store for job status and results, surviving restarts.
+
+    Safe to share between threads: JobQueue writes from a background
+    thread while the API reads on the event loop.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) a job store.
+
+        Args:
+            path: Path to the SQLite file
+        """
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def save(
+        self,
+        job: JobInfo,
+        spool_path: Optional[Path] = None,
+        result: Optional[ExtractionResult] = None,
+    ) -> None:
+        """
+        Insert or update a job.
+
+        Args:
+            job: Job status
+            spool_path: Spooled input, kept while the job is unfinished
+            result: Extraction result of a succeeded job
+        """
+        row = (
+            job.job_id,
+            job.model_dump_json(),
+            job.status.value,
+            str(spool_path) if spool_path else None,
+            result.model_dump_json() if result is not None else None,
+            job.created_at.isoformat(),
+        )
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO jobs (job_id, info, status, spool_path, result, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(job_id) DO UPDATE SET
+                    info = excluded.info,
+                    status = excluded.status,
+                    spool_path = excluded.spool_path,
+                    result = COALESCE(excluded.result, jobs.result)
+                """,
+                row,
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[JobInfo]:
+        """Load a job's status."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT info FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return JobInfo.model_validate_json(row[0]) if row else None
+
+    def get_result(self, job_id: str) -> Optional[ExtractionResult]:
+        """Load the result of a succeeded job."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM jobs WHERE job_id = ? AND result IS NOT NULL", (job_id,)
+            ).fetchone()
+        return ExtractionResult.model_validate_json(row[0]) if row else None
+
+    def unfinished(self) -> list:
+        """Return (job, spool_path) for jobs that were queued or running, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT info, spool_path FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value),
+            ).fetchall()
+        return [
+            (JobInfo.model_validate_json(info), Path(spool) if spool else None)
+            for info, spool in rows
+        ]
+
+    def purge(self, max_age: Optional[timedelta] = None, max_rows: Optional[int] = None) -> int:
+        """
+        Delete finished jobs and their results.
+
+        Queued and running jobs are never deleted.
+
+        Args:
+            max_age: Delete finished jobs created longer ago than this
+            max_rows: Keep at most this many finished jobs, newest first
+
+        Returns:
+            Number of jobs deleted
+        """
+        finished = (JobStatus.SUCCEEDED.value, JobStatus.FAILED.value)
+        deleted = 0
+        with self._lock:
+            if max_age is not None:
+                cutoff = (datetime.now() - max_age).isoformat()
+                deleted += self._conn.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?) AND created_at < ?",
+                    (*finished, cutoff),
+                ).rowcount
+            if max_rows is not None:
+                deleted += self._conn.execute(
+                    """
+                    DELETE FROM jobs WHERE status IN (?, ?) AND job_id NOT IN (
+                        SELECT job_id FROM jobs WHERE status IN (?, ?)
+                        ORDER BY created_at DESC LIMIT ?
+                    )
+                    """,
+                    (*finished, *finished, max(0, max_rows)),
+                ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class JobQueue:
+    """
+    In-process admission control and scheduling for extraction jobs.
+
+    - Interactive jobs start before bulk ones; FIFO within a class. Bulk
+      jobs may not take the last reserved_interactive slots, so a backlog
+      of large documents never blocks small interactive requests.
+    - Each tenant runs at most tenant_limit jobs at once; its other jobs
+      wait without holding up other tenants.
+    - Once max_depth jobs are queued, new submissions are rejected.
+    - Jobs are persisted, so status and results survive restarts and
+      unfinished jobs are re-queued on start().
+    - Finished jobs older than retention, or beyond the newest max_finished,
+      are purged on start() and at most every purge_interval seconds as
+      jobs finish.
+    - Store writes run in order on a background thread, so serialising a
+      large result never stalls the event loop.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        run_job: Callable[[JobInfo, Path], Awaitable[ExtractionResult]],
+        max_concurrency: int = 4,
+        max_depth: int = 32,
+        tenant_limit: int = 2,
+        reserved_interactive: int = 1,
+        on_finished: Optional[Callable[[JobInfo, Path], None]] = None,
+        retention: Optional[timedelta] = None,
+        max_finished: Optional[int] = None,
+        purge_interval: float = 3600.0,
+    ):
+        """
+        Initialize job queue.
+
+        Args:
+            store: Persistent job store
+            run_job: Coroutine function that extracts a job's spooled input
+            max_concurrency: Jobs running at once
+            max_depth: Queued (not yet running) jobs before rejecting
+            tenant_limit: Jobs running at once per tenant
+            reserved_interactive: Slots bulk jobs may not use
+            on_finished: Called with the job and its spool path when it ends
+            retention: How long finished jobs are kept (None keeps them)
+            max_finished: Finished jobs kept, newest first (None keeps all)
+            purge_interval: Minimum seconds between purges of finished jobs
+        """
+        self.store = store
+        self.run_job = run_job
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_depth = max(1, max_depth)
+        self.tenant_limit = max(1, tenant_limit)
+        self.reserved_interactive = min(max(0, reserved_interactive), self.max_concurrency - 1)
+        self.on_finished = on_finished
+        self.retention = retention
+        self.max_finished = max_finished
+        self.purge_interval = purge_interval
+        self._last_purge: Optional[float] = None
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+
+        self._queues: Dict[Priority, Deque[str]] = {p: deque() for p in Priority}
+        self._jobs: Dict[str, JobInfo] = {}
+        self._spool: Dict[str, Path] = {}
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._running: Counter = Counter()
+        self._running_tenants: Counter = Counter()
+
+    @property
+    def queued(self) -> int:
+        """Number of jobs waiting to start."""
+        return sum(len(q) for q in self._queues.values())
+
+    @property
+    def running(self) -> int:
+        """Number of jobs running."""
+        return sum(self._running.values())
+
+    def start(self) -> None:
+        """Purge expired jobs and re-queue those left unfinished by a previous process."""
+        # Nothing is running yet, so wait for it
+        self.purge().result()
+        for job, spool_path in self.store.unfinished():
+            if spool_path is None or not spool_path.exists():
+                job.status = JobStatus.FAILED
+                job.error = "Input was lost when the service restarted"
+                job.finished_at = datetime.now()
+                self._write(self.store.save, job)
+                continue
+            job.status = JobStatus.QUEUED
+            job.started_at = None
+            self._enqueue(job, spool_path)
+        self._dispatch()
+
+    async def close(self) -> None:
+        """Cancel running jobs; they stay queued in the store for the next start."""
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        for waiter in self._waiters.values():
+            waiter.cancel()
+        self._waiters.clear()
+        # Runs after every write already queued
+        await asyncio.wrap_future(self._write(self.store.close))
+        self._writer.shutdown(wait=False)
+
+    def check_capacity(self) -> None:
+        """
+        Check that a new job would be admitted.
+
+        Raises:
+            ServiceBusyError: If the queue is full
+        """
+        if self.queued >= self.max_depth:
+            raise ServiceBusyError(
+                f"Queue full: {self.queued} jobs waiting (limit {self.max_depth})"
+            )
+
+    def submit(
+        self,
+        spool_path: Path,
+        options: ExtractionOptions,
+        tenant: str = "default",
+        priority: Priority = Priority.BULK,
+    ) -> JobInfo:
+        """
+        Admit a job.
+
+        Args:
+            spool_path: Spooled input document
+            options: Extraction options
+            tenant: Tenant the job is accounted to
+            priority: Scheduling class
+
+        Returns:
+            JobInfo for the new job
+
+        Raises:
+            ServiceBusyError: If the queue is full
+        """
+        self.check_capacity()
+        job = JobInfo(
+            job_id=uuid.uuid4().hex,
+            status=JobStatus.QUEUED,
+            file_name=spool_path.name,
+            options=options,
+            tenant=tenant,
+            priority=priority,
+        )
+        self._enqueue(job, spool_path)
+        self._dispatch()
+        return job
+
+    async def wait(self, job_id: str) -> JobInfo:
+        """
+        Wait for a job to finish.
+
+        Args:
+            job_id: Job to wait for
+
+        Returns:
+            Final JobInfo
+        """
+        job = self.get(job_id)
+        if job is None or job.status in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+            return job
+        if job_id not in self._waiters:
+            self._waiters[job_id] = asyncio.get_running_loop().create_future()
+        return await asyncio.shield(self._waiters[job_id])
+
+    def purge(self) -> Future:
+        """Queue deletion of finished jobs past the retention limits."""
+        self._last_purge = time.monotonic()
+        return self._write(self.store.purge, self.retention, self.max_finished)
+
+    def get(self, job_id: str) -> Optional[JobInfo]:
+        """Return a job's current status."""
+        return self._jobs.get(job_id) or self.store.get(job_id)
+
+    def get_result(self, job_id: str) -> Optional[ExtractionResult]:
+        """Return the result of a succeeded job."""
+        return self.store.get_result(job_id)
+
+    def _enqueue(self, job: JobInfo, spool_path: Path) -> None:
+        """Persist a job and add it to its priority queue."""
+        self._jobs[job.job_id] = job
+        self._spool[job.job_id] = spool_path
+        self._queues[job.priority].append(job.job_id)
+        # A copy, since the job changes before the write runs
+        self._write(self.store.save, job.model_copy(), spool_path)
+
+    def _write(self, fn: Callable, *args, **kwargs) -> Future:
+        """Queue a store call on the writer thread; calls run in submission order."""
+        future = self._writer.submit(fn, *args, **kwargs)
+        future.add_done_callback(_log_write_error)
+        return future
+
+    def _dispatch(self) -> None:
+        """Start queued jobs while slots are free."""
+        while self.running < self.max_concurrency:
+            job_id = self._next_job()
+            if job_id is None:
+                return
+            job = self._jobs[job_id]
+            self._running[job.priority] += 1
+            self._running_tenants[job.tenant] += 1
+            task = asyncio.create_task(self._execute(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _next_job(self) -> Optional[str]:
+        """Pick the next runnable job: priority order, FIFO, tenant limits."""
+        bulk_slots = self.max_concurrency - self.reserved_interactive
+
+        for priority in Priority:
+            if priority == Priority.BULK and self._running[Priority.BULK] >= bulk_slots:
+                continue
+            queue = self._queues[priority]
+            for job_id in queue:
+                if self._running_tenants[self._jobs[job_id].tenant] < self.tenant_limit:
+                    queue.remove(job_id)
+                    return job_id
+        return None
+
+    async def _execute(self, job: JobInfo) -> None:
+        """Run one job and record its outcome."""
+        spool_path = self._spool[job.job_id]
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.now()
+        self._write(self.store.save, job.model_copy(), spool_path)
+
+        result = None
+        error = None
+        try:
+            result = await self.run_job(job, spool_path)
+        except asyncio.CancelledError:
+            # Shutdown: leave the job (and its input) for the next start
+            raise
+        except Exception as e:
+            error = e
+        finally:
+            self._running[job.priority] -= 1
+            self._running_tenants[job.tenant] -= 1
+
+        # Publish the outcome only once it is stored, so a succeeded job
+        # always has its result
+        finished = job.model_copy(
+            update={
+                "status": JobStatus.FAILED if error else JobStatus.SUCCEEDED,
+                "error": str(error) if error else None,
+                "error_type": type(error).__name__ if error else None,
+                "finished_at": datetime.now(),
+            }
+        )
+        await asyncio.wrap_future(self._write(self.store.save, finished, result=result))
+        del self._jobs[job.job_id]
+        del self._spool[job.job_id]
+
+        if self.on_finished:
+            self.on_finished(finished, spool_path)
+        waiter = self._waiters.pop(job.job_id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(finished)
+
+        if self._last_purge is None or time.monotonic() - self._last_purge >= self.purge_interval:
+            self.purge()
+        self._dispatch()
+
+
+def _log_write_error(future: Future) -> None:
+    """Report a failed background store write."""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Job store write failed: %s", future.exception())
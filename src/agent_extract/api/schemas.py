@@ -0,0 +1,59 @@
+"""Request and response models for the extraction API."""
+
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of an asynchronous extraction job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Priority(str, Enum):
+    """Scheduling class of a job; interactive jobs are started before bulk ones."""
+
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+
+class ExtractionOptions(BaseModel):
+    """Options for a single extraction request."""
+
+    use_ai: bool = Field(default=False, description="Use AI-powered extraction")
+    use_vision: bool = Field(default=True, description="Use vision model for AI extraction")
+    fast_mode: bool = Field(default=False, description="Single-call AI extraction")
+
+
+class JobInfo(BaseModel):
+    """Status of an asynchronous extraction job."""
+
+    job_id: str
+    status: JobStatus
+    file_name: str
+    options: ExtractionOptions
+    tenant: str = "default"
+    priority: Priority = Priority.BULK
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+
+
+class HealthResponse(BaseModel):
+    """Service health and load."""
+
+    status: str
+    version: str
+    running: int
+    queued: int
+    max_concurrency: int
+    max_queue_depth: int
+    reader_workers: int
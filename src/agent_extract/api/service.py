@@ -0,0 +1,312 @@
+"""Long-lived extraction service behind the HTTP API."""
+
+import asyncio
+import shutil
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from agent_extract.api.queue import JobQueue, JobStore
+from agent_extract.api.schemas import ExtractionOptions, JobInfo, JobStatus, Priority
+from agent_extract.batch.workers import (
+    create_reader_pool,
+    merge_worker_metrics,
+    read_document_in_pool,
+)
+from agent_extract.core.config import config
+from agent_extract.core.exceptions import JobFailedError
+from agent_extract.core.metrics import DOCUMENTS, observe_document
+from agent_extract.core.types import ExtractionEvent, ExtractionResult
+
+# Events after which a job produces nothing more
+TERMINAL_EVENTS = ("result", "error")
+
+
+class ExtractionService:
+    """
+    Keep extraction components warm and run jobs against them.
+
+    Reading and OCR run in a process pool whose workers each hold a loaded
+    ReaderFactory and OCRManager. AI extractors (with their agent graph and
+    LLM clients) are created on first use per option set and reused.
+    All work, synchronous or not, is admitted and scheduled by a JobQueue
+    backed by a SQLite job store. Progress events of running jobs are
+    kept and fanned out to subscribers (SSE / WebSocket clients).
+    """
+
+    def __init__(
+        self,
+        reader_workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        tenant_limit: Optional[int] = None,
+        reserved_interactive: Optional[int] = None,
+        spool_dir: Optional[Path] = None,
+        job_db: Optional[Path] = None,
+        use_ocr: bool = True,
+    ):
+        """
+        Initialize extraction service.
+
+        Args:
+            reader_workers: Reader processes (defaults to config.api_workers)
+            max_concurrency: Jobs run at once (defaults to config.api_max_concurrency)
+            max_pending: Queued jobs before rejecting (defaults to config.api_max_pending)
+            tenant_limit: Jobs run at once per tenant (defaults to config.api_tenant_concurrency)
+            reserved_interactive: Slots bulk jobs may not use
+                (defaults to config.api_reserved_interactive)
+            spool_dir: Directory for uploaded files (defaults to config.api_spool_dir)
+            job_db: Job store path (defaults to config.api_job_db)
+            use_ocr: Initialize OCR engines in reader processes
+        """
+        self.reader_workers = max(1, reader_workers or config.api_workers)
+        self.max_concurrency = max(1, max_concurrency or config.api_max_concurrency)
+        self.max_pending = max_pending or config.api_max_pending
+        self.tenant_limit = tenant_limit or config.api_tenant_concurrency
+        self.reserved_interactive = (
+            config.api_reserved_interactive if reserved_interactive is None else reserved_interactive
+        )
+        self.spool_dir = spool_dir or config.api_spool_dir or config.data_dir / "uploads"
+        self.job_db = job_db or config.api_job_db or config.data_dir / "jobs.sqlite"
+        self.use_ocr = use_ocr
+
+        self.queue: Optional[JobQueue] = None
+        self._extractors: Dict[Tuple[bool, bool], object] = {}
+        self._pool = None
+        # Events of active jobs, replayed to late subscribers
+        self._history: Dict[str, List[ExtractionEvent]] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    def start(self) -> None:
+        """Start the reader pool and job queue, resuming unfinished jobs."""
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        if self._pool is None:
+            # The server already runs threads, so do not fork it
+            self._pool = create_reader_pool(
+                self.reader_workers, use_ocr=self.use_ocr, start_method="spawn"
+            )
+        self.queue = JobQueue(
+            JobStore(self.job_db),
+            self._run,
+            max_concurrency=self.max_concurrency,
+            max_depth=self.max_pending,
+            tenant_limit=self.tenant_limit,
+            reserved_interactive=self.reserved_interactive,
+            on_finished=lambda job, spool_path: self.discard_spool(spool_path),
+            retention=(
+                timedelta(hours=config.api_job_retention_hours)
+                if config.api_job_retention_hours is not None
+                else None
+            ),
+            max_finished=config.api_job_max_rows,
+        )
+        self.queue.start()
+
+    async def close(self) -> None:
+        """Stop running jobs and shut down workers."""
+        if self.queue is not None:
+            await self.queue.close()
+            self.queue = None
+        for extractor in self._extractors.values():
+            extractor.close()
+        self._extractors.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def new_spool_path(self, file_name: str) -> Path:
+        """
+        Reserve a unique spool location that keeps the upload's file name.
+
+        Readers select by extension and report the file name, so the
+        original name is kept inside a per-request directory.
+
+        Args:
+            file_name: Client-supplied file name
+
+        Returns:
+            Path to write the upload to
+        """
+        safe_name = Path(file_name or "upload").name or "upload"
+        request_dir = self.spool_dir / uuid.uuid4().hex
+        request_dir.mkdir(parents=True)
+        return request_dir / safe_name
+
+    def discard_spool(self, file_path: Path) -> None:
+        """Delete a spooled upload and its request directory."""
+        shutil.rmtree(file_path.parent, ignore_errors=True)
+
+    def submit(
+        self,
+        file_path: Path,
+        options: ExtractionOptions,
+        tenant: str = "default",
+        priority: Priority = Priority.BULK,
+    ) -> JobInfo:
+        """
+        Queue a spooled document for extraction.
+
+        The spooled file is deleted when the job finishes.
+
+        Args:
+            file_path: Path to the spooled document
+            options: Extraction options
+            tenant: Tenant the job is accounted to
+            priority: Scheduling class
+
+        Returns:
+            JobInfo for the new job
+
+        Raises:
+            ServiceBusyError: If the queue is full
+        """
+        return self.queue.submit(file_path, options, tenant=tenant, priority=priority)
+
+    async def extract(
+        self,
+        file_path: Path,
+        options: ExtractionOptions,
+        tenant: str = "default",
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> ExtractionResult:
+        """
+        Queue a spooled document and wait for its result.
+
+        Args:
+            file_path: Path to the spooled document
+            options: Extraction options
+            tenant: Tenant the job is accounted to
+            priority: Scheduling class
+
+        Returns:
+            ExtractionResult for the document
+
+        Raises:
+            ServiceBusyError: If the queue is full
+            JobFailedError: If extraction failed
+        """
+        job = self.submit(file_path, options, tenant=tenant, priority=priority)
+        job = await self.queue.wait(job.job_id)
+        if job.status != JobStatus.SUCCEEDED:
+            raise JobFailedError(job.error or "Extraction failed", job.error_type)
+        return self.queue.get_result(job.job_id)
+
+    async def events(self, job_id: str) -> AsyncIterator[ExtractionEvent]:
+        """
+        Stream a job's progress events until it finishes.
+
+        Events already emitted by a running job are replayed first. For a
+        finished job only its final event is produced.
+
+        Args:
+            job_id: Job to follow
+
+        Yields:
+            ExtractionEvent objects, ending with a "result" or "error" event
+
+        Raises:
+            KeyError: If the job does not exist
+        """
+        job = self.queue.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+
+        if job.status == JobStatus.SUCCEEDED:
+            result = self.queue.get_result(job_id)
+            yield ExtractionEvent(
+                event="result",
+                message="Extraction complete",
+                confidence_score=result.confidence_score if result else None,
+                result=result,
+            )
+            return
+        if job.status == JobStatus.FAILED:
+            yield ExtractionEvent(event="error", message=job.error)
+            return
+
+        if job.status == JobStatus.QUEUED:
+            yield ExtractionEvent(event="queued", message=f"Waiting ({job.priority.value})")
+
+        events: asyncio.Queue = asyncio.Queue()
+        for event in self._history.get(job_id, []):
+            events.put_nowait(event)
+        self._subscribers.setdefault(job_id, []).append(events)
+        try:
+            while True:
+                event = await events.get()
+                yield event
+                if event.event in TERMINAL_EVENTS:
+                    return
+        finally:
+            subscribers = self._subscribers.get(job_id, [])
+            if events in subscribers:
+                subscribers.remove(events)
+
+    def _publish(self, job_id: str, event: ExtractionEvent) -> None:
+        """Record an event for a job and pass it to its subscribers."""
+        self._history.setdefault(job_id, []).append(event)
+        for events in self._subscribers.get(job_id, []):
+            events.put_nowait(event)
+
+    async def _run(self, job: JobInfo, file_path: Path) -> ExtractionResult:
+        """Extract with the reader pool or a warm AI extractor, publishing events."""
+        try:
+            result = await self._extract(job, file_path)
+        except Exception:
+            DOCUMENTS.inc(source="api", status="failed")
+            raise
+        DOCUMENTS.inc(source="api", status="success")
+        observe_document(result)
+        return result
+
+    async def _extract(self, job: JobInfo, file_path: Path) -> ExtractionResult:
+        """Run one job's extraction, publishing its events."""
+        try:
+            if job.options.use_ai:
+                extractor = self._get_extractor(job.options.use_vision, job.options.fast_mode)
+                result = None
+                async for event in extractor.stream(file_path):
+                    self._publish(job.job_id, event)
+                    if event.event == "result":
+                        result = event.result
+                return result
+
+            self._publish(
+                job.job_id, ExtractionEvent(event="started", message=f"Extracting {file_path.name}")
+            )
+            loop = asyncio.get_running_loop()
+            result = merge_worker_metrics(
+                await loop.run_in_executor(self._pool, read_document_in_pool, file_path)
+            )
+            self._publish(
+                job.job_id,
+                ExtractionEvent(
+                    event="result",
+                    message="Extraction complete",
+                    document_type=result.metadata.document_type.value,
+                    result=result,
+                    elapsed=result.processing_time or 0.0,
+                ),
+            )
+            return result
+        except Exception as e:
+            self._publish(job.job_id, ExtractionEvent(event="error", message=str(e)))
+            raise
+        finally:
+            self._history.pop(job.job_id, None)
+            self._subscribers.pop(job.job_id, None)
+
+    def _get_extractor(self, use_vision: bool, fast_mode: bool):
+        """Create the AI extractor for an option set on first use."""
+        key = (use_vision, fast_mode)
+        if key not in self._extractors:
+            from agent_extract.ai_extractor import AIDocumentExtractor
+
+            self._extractors[key] = AIDocumentExtractor(
+                use_vision=use_vision,
+                use_basic_extraction=True,
+                fast_mode=fast_mode,
+                executor=self._pool,
+            )
+        return self._extractors[key]
@@ -0,0 +1,37 @@
+"""Batch processing of many documents."""
+
+from agent_extract.batch.broker import (
+    BatchSpec,
+    RedisBroker,
+    SQLiteBroker,
+    Task,
+    TaskBroker,
+    open_broker,
+)
+from agent_extract.batch.discovery import discover_files, prefetch
+from agent_extract.batch.distributed import BatchCoordinator, DistributedWorker
+from agent_extract.batch.manifest import BatchManifest, ManifestEntry
+from agent_extract.batch.runner import BatchRunner, BatchItemResult, BatchSummary
+from agent_extract.batch.watcher import FolderWatcher
+from agent_extract.batch.workers import create_reader_pool, read_document
+
+__all__ = [
+    "BatchManifest",
+    "ManifestEntry",
+    "BatchRunner",
+    "BatchItemResult",
+    "BatchSummary",
+    "FolderWatcher",
+    "BatchCoordinator",
+    "DistributedWorker",
+    "BatchSpec",
+    "Task",
+    "TaskBroker",
+    "SQLiteBroker",
+    "RedisBroker",
+    "open_broker",
+    "discover_files",
+    "prefetch",
+    "create_reader_pool",
+    "read_document",
+]
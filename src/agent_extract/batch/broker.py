@@ -0,0 +1,696 @@
+"""Shared task queues for distributed batch extraction."""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from pydantic import BaseModel
+
+from agent_extract.core.exceptions import ConfigurationError
+
+PENDING = "pending"
+LEASED = "leased"
+
+# Final statuses; they match BatchItemResult.status
+FINISHED_STATUSES = ("success", "skipped", "duplicate", "failed")
+
+# Statuses whose output is a valid result for the input
+COMPLETE_STATUSES = ("success", "skipped", "duplicate")
+
+
+class BatchSpec(BaseModel):
+    """Settings every worker of a distributed batch uses."""
+
+    output_dir: Path
+    output_format: str = "json"
+    use_ai: bool = False
+    use_vision: bool = True
+    fast_mode: bool = False
+    dedupe: bool = True
+
+
+class Task(BaseModel):
+    """One input document in a distributed batch."""
+
+    task_id: str
+    file_path: Path
+    output_stem: str
+    status: str = PENDING
+    attempts: int = 0
+    worker_id: Optional[str] = None
+    output_path: Optional[Path] = None
+    error: Optional[str] = None
+    duration: Optional[float] = None
+    size: int = 0
+    mtime_ns: int = 0
+
+
+def task_id_for(file_path: Path) -> str:
+    """Stable task id for an input path."""
+    return hashlib.sha1(str(file_path.resolve()).encode("utf-8")).hexdigest()
+
+
+class TaskBroker(ABC):
+    """
+    Queue of documents shared by a coordinator and any number of workers.
+
+    Workers claim tasks under a lease and renew it while they work. A task
+    whose lease expires (the worker died or lost its connection) goes back
+    to the queue, as does a failed one, until max_attempts claims were made.
+    Completing or failing a task is only accepted from the current lease
+    holder, so a worker that lost its lease cannot overwrite the outcome.
+    """
+
+    def __init__(self, max_attempts: int = 3):
+        """
+        Initialize broker.
+
+        Args:
+            max_attempts: Claims per task before it is marked failed
+        """
+        self.max_attempts = max(1, max_attempts)
+
+    @abstractmethod
+    def set_spec(self, spec: BatchSpec) -> None:
+        """Publish the batch settings for workers."""
+
+    @abstractmethod
+    def get_spec(self) -> Optional[BatchSpec]:
+        """Return the published batch settings, if any."""
+
+    @abstractmethod
+    def enqueue(
+        self, items: Iterable[Tuple[Path, str]], force: bool = False
+    ) -> Dict[str, bool]:
+        """
+        Add documents to the queue.
+
+        A document that already completed is not queued again unless its
+        size or modification time changed or force is set. Documents that
+        no longer exist are skipped.
+
+        Args:
+            items: (file_path, output_stem) pairs
+            force: Queue completed documents again
+
+        Returns:
+            Mapping of task id to whether the task was queued; skipped
+            documents are left out
+        """
+
+    @staticmethod
+    def _stat_items(
+        items: Iterable[Tuple[Path, str]],
+    ) -> List[Tuple[str, str, str, os.stat_result]]:
+        """
+        Stat documents ahead of enqueueing, dropping those deleted since discovery.
+
+        Returns:
+            (task_id, resolved path, output_stem, stat) for each remaining document
+        """
+        stated = []
+        for file_path, output_stem in items:
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            stated.append((task_id_for(file_path), str(file_path.resolve()), output_stem, stat))
+        return stated
+
+    @abstractmethod
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Task]:
+        """
+        Lease the next pending task, first re-queuing tasks whose lease expired.
+
+        Args:
+            worker_id: Claiming worker
+            lease_seconds: Lease duration
+
+        Returns:
+            The leased task, or None if nothing is pending
+        """
+
+    @abstractmethod
+    def renew(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Extend a lease.
+
+        Returns:
+            False if the worker no longer holds the lease
+        """
+
+    @abstractmethod
+    def complete(
+        self,
+        task_id: str,
+        worker_id: str,
+        status: str,
+        output_path: Optional[Path] = None,
+        duration: Optional[float] = None,
+    ) -> bool:
+        """
+        Record a finished task.
+
+        Args:
+            task_id: Task to finish
+            worker_id: Worker holding the lease
+            status: One of COMPLETE_STATUSES
+            output_path: Written output
+            duration: Extraction time in seconds
+
+        Returns:
+            False if the worker no longer holds the lease
+        """
+
+    @abstractmethod
+    def fail(self, task_id: str, worker_id: str, error: str) -> bool:
+        """
+        Record a failed attempt; the task is retried until max_attempts.
+
+        Returns:
+            False if the worker no longer holds the lease
+        """
+
+    @abstractmethod
+    def tasks(self, task_ids: Optional[Iterable[str]] = None) -> List[Task]:
+        """Return tasks (all of them when task_ids is None)."""
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Return the number of tasks per status."""
+
+    def close(self) -> None:
+        """Release the connection."""
+
+    def __enter__(self) -> "TaskBroker":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    file_path TEXT NOT NULL,
+    output_stem TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    lease_expires REAL,
+    output_path TEXT,
+    error TEXT,
+    duration REAL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    queued_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, queued_at);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+_TASK_COLUMNS = (
+    "task_id, file_path, output_stem, status, attempts, worker_id,"
+    " output_path, error, duration, size, mtime_ns"
+)
+
+
+class SQLiteBroker(TaskBroker):
+    """
+    Broker backed by a SQLite file.
+
+    Suitable for worker processes on one host and for tests; WAL mode does
+    not work over network filesystems, so use RedisBroker across hosts.
+    Claims run in an immediate transaction, so two workers never lease the
+    same task.
+    """
+
+    def __init__(self, path: Path, max_attempts: int = 3):
+        """
+        Open (or create) a SQLite broker.
+
+        Args:
+            path: Path to the SQLite file
+            max_attempts: Claims per task before it is marked failed
+        """
+        super().__init__(max_attempts)
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Leases are renewed from a heartbeat thread
+        self._conn = sqlite3.connect(
+            str(path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def set_spec(self, spec: BatchSpec) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('spec', ?)",
+                (spec.model_dump_json(),),
+            )
+
+    def get_spec(self) -> Optional[BatchSpec]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'spec'").fetchone()
+        return BatchSpec.model_validate_json(row[0]) if row else None
+
+    def enqueue(
+        self, items: Iterable[Tuple[Path, str]], force: bool = False
+    ) -> Dict[str, bool]:
+        queued: Dict[str, bool] = {}
+        # Filesystem work stays outside the write transaction
+        stated = self._stat_items(items)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for task_id, file_path, output_stem, stat in stated:
+                    row = self._conn.execute(
+                        "SELECT status, size, mtime_ns FROM tasks WHERE task_id = ?", (task_id,)
+                    ).fetchone()
+                    unchanged = row is not None and (row[1], row[2]) == (
+                        stat.st_size,
+                        stat.st_mtime_ns,
+                    )
+                    if row is not None and row[0] in (PENDING, LEASED) and unchanged:
+                        queued[task_id] = True
+                        continue
+                    if row is not None and row[0] in COMPLETE_STATUSES and unchanged and not force:
+                        queued[task_id] = False
+                        continue
+
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO tasks (task_id, file_path, output_stem, status,"
+                        " attempts, size, mtime_ns, queued_at) VALUES (?, ?, ?, ?, 0, ?, ?, ?)",
+                        (
+                            task_id,
+                            file_path,
+                            output_stem,
+                            PENDING,
+                            stat.st_size,
+                            stat.st_mtime_ns,
+                            time.time(),
+                        ),
+                    )
+                    queued[task_id] = True
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return queued
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Task]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                # Tasks of dead workers go back to the queue (or fail for good)
+                self._conn.execute(
+                    "UPDATE tasks SET"
+                    " status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,"
+                    " error = 'Worker lease expired', worker_id = NULL, lease_expires = NULL"
+                    " WHERE status = ? AND lease_expires < ?",
+                    (self.max_attempts, LEASED, now),
+                )
+                row = self._conn.execute(
+                    "SELECT task_id FROM tasks WHERE status = ? ORDER BY queued_at LIMIT 1",
+                    (PENDING,),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE tasks SET status = ?, worker_id = ?, lease_expires = ?,"
+                        " attempts = attempts + 1 WHERE task_id = ?",
+                        (LEASED, worker_id, now + lease_seconds, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.tasks([row[0]])[0] if row else None
+
+    def renew(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET lease_expires = ?"
+                " WHERE task_id = ? AND worker_id = ? AND status = ?",
+                (time.time() + lease_seconds, task_id, worker_id, LEASED),
+            )
+        return cursor.rowcount == 1
+
+    def complete(
+        self,
+        task_id: str,
+        worker_id: str,
+        status: str,
+        output_path: Optional[Path] = None,
+        duration: Optional[float] = None,
+    ) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET status = ?, output_path = ?, duration = ?, error = NULL,"
+                " lease_expires = NULL WHERE task_id = ? AND worker_id = ? AND status = ?",
+                (
+                    status,
+                    str(output_path.resolve()) if output_path else None,
+                    duration,
+                    task_id,
+                    worker_id,
+                    LEASED,
+                ),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, task_id: str, worker_id: str, error: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET"
+                " status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,"
+                " error = ?, worker_id = NULL, lease_expires = NULL"
+                " WHERE task_id = ? AND worker_id = ? AND status = ?",
+                (self.max_attempts, error, task_id, worker_id, LEASED),
+            )
+        return cursor.rowcount == 1
+
+    def tasks(self, task_ids: Optional[Iterable[str]] = None) -> List[Task]:
+        with self._lock:
+            if task_ids is None:
+                rows = self._conn.execute(
+                    f"SELECT {_TASK_COLUMNS} FROM tasks ORDER BY queued_at"
+                ).fetchall()
+            else:
+                rows = [
+                    row
+                    for task_id in task_ids
+                    for row in self._conn.execute(
+                        f"SELECT {_TASK_COLUMNS} FROM tasks WHERE task_id = ?", (task_id,)
+                    )
+                ]
+        return [
+            Task(
+                task_id=row[0],
+                file_path=Path(row[1]),
+                output_stem=row[2],
+                status=row[3],
+                attempts=row[4],
+                worker_id=row[5],
+                output_path=Path(row[6]) if row[6] else None,
+                error=row[7],
+                duration=row[8],
+                size=row[9],
+                mtime_ns=row[10],
+            )
+            for row in rows
+        ]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status")
+            return dict(rows.fetchall())
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+# Lua scripts keep each queue transition atomic on the server. Lease times
+# use the server clock, so hosts with skewed clocks agree on expiry.
+_REDIS_NOW = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+"""
+
+_REDIS_ENQUEUE = """
+local key = ARGV[1] .. ':task:' .. ARGV[2]
+local status = redis.call('HGET', key, 'status')
+local unchanged = redis.call('HGET', key, 'size') == ARGV[5]
+    and redis.call('HGET', key, 'mtime_ns') == ARGV[6]
+if status and unchanged then
+    if status == 'pending' or status == 'leased' then return 1 end
+    if status ~= 'failed' and ARGV[7] == '0' then return 0 end
+end
+if status == 'leased' then redis.call('ZREM', KEYS[2], ARGV[2]) end
+redis.call('DEL', key)
+redis.call('HSET', key, 'file_path', ARGV[3], 'output_stem', ARGV[4], 'status', 'pending',
+    'attempts', 0, 'size', ARGV[5], 'mtime_ns', ARGV[6])
+redis.call('SADD', KEYS[3], ARGV[2])
+redis.call('LREM', KEYS[1], 0, ARGV[2])
+redis.call('LPUSH', KEYS[1], ARGV[2])
+return 1
+"""
+
+_REDIS_CLAIM = _REDIS_NOW + """
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)) do
+    redis.call('ZREM', KEYS[2], id)
+    local key = ARGV[1] .. ':task:' .. id
+    redis.call('HDEL', key, 'worker_id')
+    redis.call('HSET', key, 'error', 'Worker lease expired')
+    if tonumber(redis.call('HGET', key, 'attempts')) >= tonumber(ARGV[4]) then
+        redis.call('HSET', key, 'status', 'failed')
+    else
+        redis.call('HSET', key, 'status', 'pending')
+        redis.call('LPUSH', KEYS[1], id)
+    end
+end
+local id = redis.call('RPOP', KEYS[1])
+if not id then return false end
+local key = ARGV[1] .. ':task:' .. id
+redis.call('HSET', key, 'status', 'leased', 'worker_id', ARGV[2])
+redis.call('HINCRBY', key, 'attempts', 1)
+redis.call('ZADD', KEYS[2], now + tonumber(ARGV[3]), id)
+return id
+"""
+
+_REDIS_RENEW = _REDIS_NOW + """
+local key = ARGV[1] .. ':task:' .. ARGV[2]
+if redis.call('HGET', key, 'status') ~= 'leased'
+    or redis.call('HGET', key, 'worker_id') ~= ARGV[3] then return 0 end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[4]), ARGV[2])
+return 1
+"""
+
+_REDIS_COMPLETE = """
+local key = ARGV[1] .. ':task:' .. ARGV[2]
+if redis.call('HGET', key, 'status') ~= 'leased'
+    or redis.call('HGET', key, 'worker_id') ~= ARGV[3] then return 0 end
+redis.call('ZREM', KEYS[1], ARGV[2])
+redis.call('HDEL', key, 'error')
+redis.call('HSET', key, 'status', ARGV[4], 'output_path', ARGV[5], 'duration', ARGV[6])
+return 1
+"""
+
+_REDIS_FAIL = """
+local key = ARGV[1] .. ':task:' .. ARGV[2]
+if redis.call('HGET', key, 'status') ~= 'leased'
+    or redis.call('HGET', key, 'worker_id') ~= ARGV[3] then return 0 end
+redis.call('ZREM', KEYS[2], ARGV[2])
+redis.call('HDEL', key, 'worker_id')
+redis.call('HSET', key, 'error', ARGV[4])
+if tonumber(redis.call('HGET', key, 'attempts')) >= tonumber(ARGV[5]) then
+    redis.call('HSET', key, 'status', 'failed')
+else
+    redis.call('HSET', key, 'status', 'pending')
+    redis.call('LPUSH', KEYS[1], ARGV[2])
+end
+return 1
+"""
+
+
+class RedisBroker(TaskBroker):
+    """
+    Broker backed by Redis (or a compatible server such as Valkey or KeyDB).
+
+    Keys live under a namespace: a pending list, a sorted set of lease
+    expiries, a set of all task ids and one hash per task. Task keys are
+    derived inside the scripts, so a single (non-cluster) server is assumed.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        namespace: str = "agent-extract",
+        max_attempts: int = 3,
+        client=None,
+    ):
+        """
+        Connect to a Redis broker.
+
+        Args:
+            url: Server URL, e.g. redis://host:6379/0
+            namespace: Key prefix, so several batches can share a server
+            max_attempts: Claims per task before it is marked failed
+            client: Existing redis client to use instead of connecting to url
+        """
+        super().__init__(max_attempts)
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ConfigurationError(
+                    "redis not installed. Install with: pip install agent-extract[distributed]"
+                ) from e
+            client = redis.Redis.from_url(url)
+
+        self.namespace = namespace
+        self._redis = client
+        self._pending = f"{namespace}:pending"
+        self._leases = f"{namespace}:leases"
+        self._ids = f"{namespace}:ids"
+        self._spec = f"{namespace}:spec"
+        self._enqueue = client.register_script(_REDIS_ENQUEUE)
+        self._claim = client.register_script(_REDIS_CLAIM)
+        self._renew = client.register_script(_REDIS_RENEW)
+        self._complete = client.register_script(_REDIS_COMPLETE)
+        self._fail = client.register_script(_REDIS_FAIL)
+
+    def set_spec(self, spec: BatchSpec) -> None:
+        self._redis.set(self._spec, spec.model_dump_json())
+
+    def get_spec(self) -> Optional[BatchSpec]:
+        value = self._redis.get(self._spec)
+        return BatchSpec.model_validate_json(value) if value else None
+
+    def enqueue(
+        self, items: Iterable[Tuple[Path, str]], force: bool = False
+    ) -> Dict[str, bool]:
+        keys = [self._pending, self._leases, self._ids]
+        task_ids = []
+        pipe = self._redis.pipeline(transaction=False)
+        for task_id, file_path, output_stem, stat in self._stat_items(items):
+            self._enqueue(
+                keys=keys,
+                args=[
+                    self.namespace,
+                    task_id,
+                    file_path,
+                    output_stem,
+                    str(stat.st_size),
+                    str(stat.st_mtime_ns),
+                    "1" if force else "0",
+                ],
+                client=pipe,
+            )
+            task_ids.append(task_id)
+        return {task_id: bool(queued) for task_id, queued in zip(task_ids, pipe.execute())}
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Task]:
+        task_id = self._claim(
+            keys=[self._pending, self._leases],
+            args=[self.namespace, worker_id, lease_seconds, self.max_attempts],
+        )
+        if not task_id:
+            return None
+        return self.tasks([_text(task_id)])[0]
+
+    def renew(self, task_id: str, worker_id: str, lease_seconds: float) -> bool:
+        return bool(
+            self._renew(keys=[self._leases], args=[self.namespace, task_id, worker_id, lease_seconds])
+        )
+
+    def complete(
+        self,
+        task_id: str,
+        worker_id: str,
+        status: str,
+        output_path: Optional[Path] = None,
+        duration: Optional[float] = None,
+    ) -> bool:
+        return bool(
+            self._complete(
+                keys=[self._leases],
+                args=[
+                    self.namespace,
+                    task_id,
+                    worker_id,
+                    status,
+                    str(output_path.resolve()) if output_path else "",
+                    "" if duration is None else repr(duration),
+                ],
+            )
+        )
+
+    def fail(self, task_id: str, worker_id: str, error: str) -> bool:
+        return bool(
+            self._fail(
+                keys=[self._pending, self._leases],
+                args=[self.namespace, task_id, worker_id, error, self.max_attempts],
+            )
+        )
+
+    def tasks(self, task_ids: Optional[Iterable[str]] = None) -> List[Task]:
+        if task_ids is None:
+            task_ids = sorted(_text(t) for t in self._redis.smembers(self._ids))
+        task_ids = list(task_ids)
+        pipe = self._redis.pipeline(transaction=False)
+        for task_id in task_ids:
+            pipe.hgetall(f"{self.namespace}:task:{task_id}")
+
+        tasks = []
+        for task_id, fields in zip(task_ids, pipe.execute()):
+            if not fields:
+                continue
+            fields = {_text(k): _text(v) for k, v in fields.items()}
+            tasks.append(
+                Task(
+                    task_id=task_id,
+                    file_path=Path(fields["file_path"]),
+                    output_stem=fields["output_stem"],
+                    status=fields["status"],
+                    attempts=int(fields.get("attempts", 0)),
+                    worker_id=fields.get("worker_id") or None,
+                    output_path=Path(fields["output_path"]) if fields.get("output_path") else None,
+                    error=fields.get("error") or None,
+                    duration=float(fields["duration"]) if fields.get("duration") else None,
+                    size=int(fields.get("size", 0)),
+                    mtime_ns=int(fields.get("mtime_ns", 0)),
+                )
+            )
+        return tasks
+
+    def counts(self) -> Dict[str, int]:
+        task_ids = [_text(t) for t in self._redis.smembers(self._ids)]
+        pipe = self._redis.pipeline(transaction=False)
+        for task_id in task_ids:
+            pipe.hget(f"{self.namespace}:task:{task_id}", "status")
+        counts: Dict[str, int] = {}
+        for status in pipe.execute():
+            if status is not None:
+                counts[_text(status)] = counts.get(_text(status), 0) + 1
+        return counts
+
+    def close(self) -> None:
+        self._redis.close()
+
+
+def _text(value) -> str:
+    """Decode a Redis reply."""
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+def open_broker(url: str, namespace: str = "agent-extract", max_attempts: int = 3) -> TaskBroker:
+    """
+    Open a broker from a URL.
+
+    Args:
+        url: redis://, rediss:// or unix:// for Redis; sqlite:///path or a
+            plain file path for SQLite
+        namespace: Key prefix for Redis brokers
+        max_attempts: Claims per task before it is marked failed
+
+    Returns:
+        TaskBroker for the URL
+    """
+    scheme = urlparse(url).scheme
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisBroker(url, namespace=namespace, max_attempts=max_attempts)
+    if scheme == "sqlite":
+        return SQLiteBroker(Path(url[len("sqlite://"):]), max_attempts=max_attempts)
+    if scheme in ("", "file") or len(scheme) == 1:  # plain paths, incl. Windows drives
+        return SQLiteBroker(Path(url.removeprefix("file://")), max_attempts=max_attempts)
+    raise ConfigurationError(f"Unsupported broker URL: {url}")
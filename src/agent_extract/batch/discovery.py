@@ -0,0 +1,147 @@
+"""Streaming file discovery for batch runs."""
+
+import os
+import queue
+import threading
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+def _matches(rel_path: str, name: str, patterns: Sequence[str]) -> bool:
+    """Match a pattern against the name, or the relative path if it contains '/'."""
+    return any(fnmatch(rel_path if "/" in p else name, p) for p in patterns)
+
+
+def discover_files(
+    root: Path,
+    include: Sequence[str] = ("*.*",),
+    exclude: Sequence[str] = (),
+    recursive: bool = False,
+    min_size: Optional[int] = None,
+    max_size: Optional[int] = None,
+    skip_dirs: Iterable[Path] = (),
+) -> Iterator[Path]:
+    """
+    Yield matching files under a directory as they are found.
+
+    Uses os.scandir so file type and size come from the directory listing
+    where the OS provides them, and nothing is materialised up front: the
+    first file is yielded as soon as it is seen.
+
+    Patterns without '/' match the file name; patterns with '/' match the
+    path relative to root (e.g. "archive/*"). Directories matching an
+    exclude pattern are not descended into. Symlinked directories are not
+    followed.
+
+    Args:
+        root: Directory to scan
+        include: Glob patterns a file must match (any)
+        exclude: Glob patterns that reject a file or directory (any)
+        recursive: Descend into subdirectories
+        min_size: Minimum file size in bytes
+        max_size: Maximum file size in bytes
+        skip_dirs: Directories never to descend into (e.g. the output directory)
+
+    Yields:
+        Paths of matching files
+    """
+    skip = {os.path.realpath(d) for d in skip_dirs}
+    stack = [(str(root), "")]
+
+    while stack:
+        directory, rel_dir = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                subdirs = []
+                for entry in entries:
+                    rel_path = f"{rel_dir}{entry.name}"
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if (
+                                recursive
+                                and not _matches(rel_path, entry.name, exclude)
+                                and os.path.realpath(entry.path) not in skip
+                            ):
+                                subdirs.append((entry.path, f"{rel_path}/"))
+                            continue
+
+                        if not entry.is_file():
+                            continue
+                        if not _matches(rel_path, entry.name, include):
+                            continue
+                        if _matches(rel_path, entry.name, exclude):
+                            continue
+
+                        if min_size is not None or max_size is not None:
+                            size = entry.stat().st_size
+                            if min_size is not None and size < min_size:
+                                continue
+                            if max_size is not None and size > max_size:
+                                continue
+                    except OSError:
+                        # Entry vanished or is unreadable; skip it
+                        continue
+
+                    yield Path(entry.path)
+        except OSError:
+            continue
+
+        # Reverse so subdirectories are visited in listing order
+        stack.extend(reversed(subdirs))
+
+
+def prefetch(items: Iterable[T], maxsize: int = 1000) -> Iterator[T]:
+    """
+    Produce items from a background thread through a bounded queue.
+
+    Lets slow discovery (e.g. network shares) run ahead of processing
+    without holding more than maxsize paths in memory.
+
+    Args:
+        items: Iterable to consume in the background
+        maxsize: Maximum number of items buffered ahead of the consumer
+
+    Yields:
+        Items in their original order
+    """
+    buffer: "queue.Queue" = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+
+    def put(message) -> bool:
+        """Enqueue a message unless the consumer has stopped."""
+        while not stop.is_set():
+            try:
+                buffer.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+        except Exception as e:
+            put((_DONE, e))
+            return
+        put((_DONE, None))
+
+    thread = threading.Thread(target=produce, name="batch-discovery", daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item, error = buffer.get()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        stop.set()
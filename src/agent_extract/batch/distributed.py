@@ -0,0 +1,360 @@
+"""Coordinator and worker for batch extraction across several hosts."""
+
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from agent_extract.batch.broker import (
+    COMPLETE_STATUSES,
+    FINISHED_STATUSES,
+    LEASED,
+    PENDING,
+    BatchSpec,
+    Task,
+    TaskBroker,
+    task_id_for,
+)
+from agent_extract.batch.runner import BatchItemResult, BatchRunner, BatchSummary, output_stem
+from agent_extract.core.config import config
+
+
+class BatchCoordinator:
+    """
+    Queue a batch on a broker and aggregate the results workers report.
+
+    The coordinator only lists files and watches the broker; extraction
+    happens in DistributedWorker processes on any host that can see the
+    input and output paths. Output names are assigned here, the same way
+    a local batch names them (see output_stem), so inputs sharing a name
+    never overwrite each other even when different hosts extract them.
+    """
+
+    def __init__(
+        self,
+        broker: TaskBroker,
+        spec: BatchSpec,
+        poll_interval: float = 2.0,
+        on_result: Optional[Callable[[BatchItemResult], None]] = None,
+        input_dir: Optional[Path] = None,
+    ):
+        """
+        Initialize coordinator.
+
+        Args:
+            broker: Shared task broker
+            spec: Output settings workers apply to every document
+            poll_interval: Seconds between broker polls in wait()
+            on_result: Callback invoked for every finished document
+            input_dir: Root the inputs were discovered under; outputs mirror
+                their subdirectories
+        """
+        self.broker = broker
+        self.spec = spec
+        self.poll_interval = poll_interval
+        self.on_result = on_result
+        self.input_dir = input_dir
+
+        self._stems: Dict[str, Path] = {}
+        self._unfinished: Set[str] = set()
+        self._already_done: Set[str] = set()
+        self._results: Dict[str, BatchItemResult] = {}
+        self._summary = BatchSummary()
+
+    def submit(self, files: Iterable[Path], force: bool = False, chunk_size: int = 500) -> int:
+        """
+        Publish the batch settings and queue documents.
+
+        Documents deleted before they could be queued are reported as failed.
+
+        Args:
+            files: Documents to queue (consumed lazily, in chunks)
+            force: Re-extract documents the broker already completed
+            chunk_size: Documents enqueued per broker round trip
+
+        Returns:
+            Number of documents queued for extraction
+        """
+        self.broker.set_spec(self.spec)
+        queued = 0
+        chunk = []
+
+        def flush():
+            nonlocal queued
+            accepted = self.broker.enqueue(chunk, force=force)
+            for task_id, is_queued in accepted.items():
+                self._unfinished.add(task_id)
+                if is_queued:
+                    queued += 1
+                else:
+                    self._already_done.add(task_id)
+            for file_path, _ in chunk:
+                task_id = task_id_for(file_path)
+                if task_id not in accepted:
+                    item = BatchItemResult(
+                        file_path=file_path, status="failed", error=f"File not found: {file_path}"
+                    )
+                    self._results[task_id] = item
+                    self._report(item)
+            chunk.clear()
+
+        for file_path in files:
+            chunk.append((file_path, self._output_stem(file_path)))
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+        return queued
+
+    def wait(self, timeout: Optional[float] = None) -> BatchSummary:
+        """
+        Wait until every submitted document is finished.
+
+        Args:
+            timeout: Seconds to wait (None waits indefinitely)
+
+        Returns:
+            BatchSummary over all submitted documents
+
+        Raises:
+            TimeoutError: If documents are still unfinished after timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self.poll()
+            if not self._unfinished:
+                return self._summary
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"{len(self._unfinished)} documents still unfinished")
+            time.sleep(self.poll_interval)
+
+    def poll(self) -> List[BatchItemResult]:
+        """
+        Collect documents that finished since the last poll.
+
+        Returns:
+            Newly finished documents
+        """
+        finished = []
+        for task in self.broker.tasks(list(self._unfinished)):
+            if task.status not in FINISHED_STATUSES:
+                continue
+            self._unfinished.discard(task.task_id)
+            item = self._item(task)
+            self._results[task.task_id] = item
+            self._report(item)
+            finished.append(item)
+        return finished
+
+    def results(self) -> List[BatchItemResult]:
+        """Return the outcome of every document finished so far."""
+        return list(self._results.values())
+
+    def _output_stem(self, file_path: Path) -> str:
+        """Output name of an input, claimed for it among this batch's inputs."""
+        stem = output_stem(file_path, self.input_dir, self._stems.get)
+        self._stems[stem] = file_path.resolve()
+        return stem
+
+    def _item(self, task: Task) -> BatchItemResult:
+        """Convert a finished task into a batch result."""
+        status = task.status
+        if task.task_id in self._already_done and status in COMPLETE_STATUSES:
+            status = "skipped"
+        return BatchItemResult(
+            file_path=task.file_path,
+            status=status,
+            output_path=task.output_path,
+            error=task.error if status == "failed" else None,
+            duration=task.duration,
+        )
+
+    def _report(self, item: BatchItemResult) -> None:
+        """Count a finished document and pass it to the callback."""
+        if item.status == "success":
+            self._summary.success += 1
+        elif item.status == "skipped":
+            self._summary.skipped += 1
+        elif item.status == "duplicate":
+            self._summary.duplicates += 1
+        else:
+            self._summary.failed += 1
+
+        if self.on_result:
+            self.on_result(item)
+
+
+class _TaskRunner(BatchRunner):
+    """BatchRunner that writes each output under the name the coordinator assigned."""
+
+    def __init__(self, leases: Dict[Path, Task], **kwargs):
+        super().__init__(**kwargs)
+        self.leases = leases
+
+    def _output_path(self, file_path: Path) -> Path:
+        task = self.leases.get(file_path)
+        if task is None:
+            return super()._output_path(file_path)
+        output_path = self.output_dir / f"{task.output_stem}{self.extension}"
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        return output_path
+
+
+class DistributedWorker:
+    """
+    Pull documents from a broker and extract them with a BatchRunner.
+
+    Reading, OCR and the AI extractor are the same warm components a local
+    batch uses. Claimed documents are leased; a heartbeat thread renews the
+    leases while they are processed, so a long extraction is not handed to
+    another worker, while a crashed worker's documents are retried once
+    their lease runs out.
+    """
+
+    def __init__(
+        self,
+        broker: TaskBroker,
+        worker_id: Optional[str] = None,
+        workers: int = 1,
+        llm_concurrency: int = 4,
+        use_ocr: bool = True,
+        lease_seconds: float = 60.0,
+        poll_interval: float = 2.0,
+        manifest_dir: Optional[Path] = None,
+        on_result: Optional[Callable[[BatchItemResult], None]] = None,
+    ):
+        """
+        Initialize distributed worker.
+
+        Args:
+            broker: Shared task broker
+            worker_id: Name reported to the broker (defaults to host-pid)
+            workers: Reader processes (1 = read in-process)
+            llm_concurrency: Maximum documents in the agent workflow at once
+            use_ocr: Initialize OCR engines for image reading
+            lease_seconds: Lease length; renewed every third of it
+            poll_interval: Seconds to wait when the queue is empty
+            manifest_dir: Where this worker keeps its local manifest
+                (defaults to <data_dir>/worker-manifests)
+            on_result: Callback invoked for every document this worker finishes
+        """
+        self.broker = broker
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.workers = workers
+        self.llm_concurrency = llm_concurrency
+        self.use_ocr = use_ocr
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.manifest_dir = manifest_dir or config.data_dir / "worker-manifests"
+        self.on_result = on_result
+
+        self._leases: Dict[Path, Task] = {}
+        self._stop = threading.Event()
+
+    def run(self, exit_when_idle: bool = True) -> BatchSummary:
+        """
+        Process documents until the queue is drained or stop() is called.
+
+        Args:
+            exit_when_idle: Return once no documents are pending or leased
+                (otherwise keep waiting for new ones)
+
+        Returns:
+            BatchSummary for the documents this worker processed
+        """
+        spec = self._wait_for_spec(exit_when_idle)
+        summary = BatchSummary()
+        if spec is None:
+            return summary
+
+        heartbeat = threading.Thread(target=self._heartbeat, name="lease-heartbeat", daemon=True)
+        heartbeat.start()
+        # The manifest is host-local: SQLite must not be shared over the network
+        runner = _TaskRunner(
+            self._leases,
+            output_dir=spec.output_dir,
+            output_format=spec.output_format,
+            workers=self.workers,
+            use_ai=spec.use_ai,
+            llm_concurrency=self.llm_concurrency,
+            use_vision=spec.use_vision,
+            fast_mode=spec.fast_mode,
+            use_ocr=self.use_ocr,
+            resume=False,
+            dedupe=spec.dedupe,
+            on_result=self._on_result,
+            manifest_path=self.manifest_dir / f"{self.worker_id}.sqlite",
+        )
+        try:
+            while not self._stop.is_set():
+                batch = runner.run(self._claims())
+                summary.success += batch.success
+                summary.failed += batch.failed
+                summary.duplicates += batch.duplicates
+                summary.usage.add(batch.usage)
+                if self._stop.is_set():
+                    break
+                counts = self.broker.counts()
+                if exit_when_idle and not counts.get(PENDING) and not counts.get(LEASED):
+                    break
+                self._stop.wait(self.poll_interval)
+        finally:
+            self._stop.set()
+            heartbeat.join()
+            runner.close()
+            # Hand back documents that were claimed but not finished
+            for task in list(self._leases.values()):
+                self.broker.fail(task.task_id, self.worker_id, "Worker stopped")
+            self._leases.clear()
+        return summary
+
+    def stop(self) -> None:
+        """Stop claiming documents; run() returns after the ones in flight."""
+        self._stop.set()
+
+    def _wait_for_spec(self, exit_when_idle: bool) -> Optional[BatchSpec]:
+        """Wait for a coordinator to publish the batch settings."""
+        while not self._stop.is_set():
+            spec = self.broker.get_spec()
+            if spec is not None or exit_when_idle:
+                return spec
+            self._stop.wait(self.poll_interval)
+        return None
+
+    def _claims(self) -> Iterator[Path]:
+        """Lease documents one at a time as the runner asks for them."""
+        while not self._stop.is_set():
+            task = self.broker.claim(self.worker_id, self.lease_seconds)
+            if task is None:
+                return
+            self._leases[task.file_path] = task
+            yield task.file_path
+
+    def _on_result(self, item: BatchItemResult) -> None:
+        """Report a finished document to the broker."""
+        task = self._leases.pop(item.file_path, None)
+        if task is None:
+            return
+        if item.status == "failed":
+            accepted = self.broker.fail(task.task_id, self.worker_id, item.error or "failed")
+        else:
+            accepted = self.broker.complete(
+                task.task_id,
+                self.worker_id,
+                item.status,
+                output_path=item.output_path,
+                duration=item.duration,
+            )
+        # A worker that lost its lease does not report the outcome
+        if accepted and self.on_result:
+            self.on_result(item)
+
+    def _heartbeat(self) -> None:
+        """Renew the leases of documents in flight."""
+        interval = self.lease_seconds / 3
+        while not self._stop.wait(interval):
+            # A lost lease is not renewed; the broker then rejects its outcome
+            for task in list(self._leases.values()):
+                self.broker.renew(task.task_id, self.worker_id, self.lease_seconds)
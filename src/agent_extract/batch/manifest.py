@@ -0,0 +1,270 @@
+"""Checkpoint manifest for resumable batch runs."""
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+from pydantic import BaseModel
+
+# Stored in the output directory next to the results
+MANIFEST_FILENAME = ".agent-extract-manifest.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    file_path TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    output_path TEXT,
+    error TEXT,
+    duration REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+)
+"""
+
+_INDEX = "CREATE INDEX IF NOT EXISTS entries_content_hash ON entries (content_hash)"
+
+# Statuses whose output file is a valid result for the input
+COMPLETE_STATUSES = ("success", "duplicate")
+
+
+class ManifestEntry(BaseModel):
+    """Checkpoint record for one input document."""
+
+    file_path: Path
+    content_hash: str
+    size: int
+    mtime_ns: int
+    status: str
+    output_path: Optional[Path] = None
+    error: Optional[str] = None
+    duration: Optional[float] = None
+    attempts: int = 0
+
+
+def hash_file(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 of a file without loading it into memory.
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Bytes read per iteration
+
+    Returns:
+        Hex digest of the file content
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BatchManifest:
+    """
+    SQLite manifest recording the outcome of every input in a batch.
+
+    Each row is committed as soon as a document finishes, so an interrupted
+    run loses at most the documents that were in flight.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) a manifest.
+
+        Args:
+            path: Path to the SQLite file
+        """
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Results are recorded from whichever thread runs the event loop
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute(_INDEX)
+        self._conn.commit()
+
+    @classmethod
+    def for_output_dir(cls, output_dir: Path) -> "BatchManifest":
+        """Open the manifest stored in a batch output directory."""
+        return cls(output_dir / MANIFEST_FILENAME)
+
+    def get(self, file_path: Path) -> Optional[ManifestEntry]:
+        """
+        Look up the entry for an input document.
+
+        Args:
+            file_path: Input document path
+
+        Returns:
+            ManifestEntry, or None if the document was never seen
+        """
+        row = self._conn.execute(
+            "SELECT file_path, content_hash, size, mtime_ns, status, output_path,"
+            " error, duration, attempts FROM entries WHERE file_path = ?",
+            (self._key(file_path),),
+        ).fetchone()
+        if row is None:
+            return None
+
+        return ManifestEntry(
+            file_path=Path(row[0]),
+            content_hash=row[1],
+            size=row[2],
+            mtime_ns=row[3],
+            status=row[4],
+            output_path=Path(row[5]) if row[5] else None,
+            error=row[6],
+            duration=row[7],
+            attempts=row[8],
+        )
+
+    def content_hash(self, file_path: Path) -> str:
+        """
+        Return the content hash of a document.
+
+        The stored hash is reused when size and modification time are
+        unchanged, so re-runs over large directories do not re-read every file.
+
+        Args:
+            file_path: Input document path
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        stat = file_path.stat()
+        entry = self.get(file_path)
+        if entry and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+            return entry.content_hash
+        return hash_file(file_path)
+
+    def is_complete(self, file_path: Path, content_hash: str) -> bool:
+        """
+        Check whether a document was already extracted successfully.
+
+        Args:
+            file_path: Input document path
+            content_hash: Current content hash of the document
+
+        Returns:
+            True if the stored result is current and its output still exists
+        """
+        entry = self.get(file_path)
+        return (
+            entry is not None
+            and entry.status in COMPLETE_STATUSES
+            and entry.content_hash == content_hash
+            and entry.output_path is not None
+            and entry.output_path.exists()
+        )
+
+    def output_owner(self, output_path: Path) -> Optional[Path]:
+        """
+        Find the input whose successful result was written to output_path.
+
+        Args:
+            output_path: Output file path
+
+        Returns:
+            Input document path, or None if no input claims the file
+        """
+        row = self._conn.execute(
+            "SELECT file_path FROM entries WHERE output_path = ? AND status IN (?, ?)",
+            (str(Path(output_path).resolve()), *COMPLETE_STATUSES),
+        ).fetchone()
+        return Path(row[0]) if row else None
+
+    def find_output(self, content_hash: str) -> Optional[Path]:
+        """
+        Find an existing extraction output for identical content.
+
+        Args:
+            content_hash: Content hash to look up
+
+        Returns:
+            Output path of a successful extraction of the same content, or None
+        """
+        rows = self._conn.execute(
+            "SELECT output_path FROM entries"
+            " WHERE content_hash = ? AND status = 'success' AND output_path IS NOT NULL",
+            (content_hash,),
+        )
+        for (output_path,) in rows:
+            if Path(output_path).exists():
+                return Path(output_path)
+        return None
+
+    def record(
+        self,
+        file_path: Path,
+        content_hash: str,
+        status: str,
+        output_path: Optional[Path] = None,
+        error: Optional[str] = None,
+        duration: Optional[float] = None,
+    ) -> None:
+        """
+        Record the outcome of a document and commit it.
+
+        Args:
+            file_path: Input document path
+            content_hash: Content hash the outcome applies to
+            status: "success", "duplicate" or "failed"
+            output_path: Where the result was written
+            error: Error message for failures
+            duration: Processing time in seconds
+        """
+        try:
+            stat = file_path.stat()
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        except OSError:
+            size, mtime_ns = -1, -1
+
+        self._conn.execute(
+            """
+            INSERT INTO entries (file_path, content_hash, size, mtime_ns, status,
+                                 output_path, error, duration, attempts, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, ?)
+            ON CONFLICT(file_path) DO UPDATE SET
+                content_hash = excluded.content_hash,
+                size = excluded.size,
+                mtime_ns = excluded.mtime_ns,
+                status = excluded.status,
+                output_path = excluded.output_path,
+                error = excluded.error,
+                duration = excluded.duration,
+                attempts = entries.attempts + 1,
+                updated_at = excluded.updated_at
+            """,
+            (
+                self._key(file_path),
+                content_hash,
+                size,
+                mtime_ns,
+                status,
+                str(Path(output_path).resolve()) if output_path else None,
+                error,
+                duration,
+                time.time(),
+            ),
+        )
+        self._conn.commit()
+
+    def counts(self) -> dict:
+        """Return the number of entries per status."""
+        rows = self._conn.execute("SELECT status, COUNT(*) FROM entries GROUP BY status")
+        return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    @staticmethod
+    def _key(file_path: Path) -> str:
+        """Normalize an input path for use as the primary key."""
+        return str(Path(file_path).resolve())
@@ -0,0 +1,515 @@
+"""Batch runner that extracts many documents with shared, warm components."""
+
+import asyncio
+import hashlib
+import os
+import shutil
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from pydantic import BaseModel, Field
+
+from agent_extract.batch.manifest import BatchManifest
+from agent_extract.batch.workers import (
+    create_reader_pool,
+    init_reader_worker,
+    merge_worker_metrics,
+    read_document,
+    read_document_in_pool,
+)
+from agent_extract.core.metrics import CACHE_LOOKUPS, DOCUMENTS, observe_document
+from agent_extract.core.types import ExtractionResult, TokenUsage
+from agent_extract.core.usage import document_usage
+from agent_extract.outputs.json_formatter import JSONFormatter
+from agent_extract.outputs.markdown_formatter import MarkdownFormatter
+
+
+def output_stem(
+    file_path: Path,
+    input_dir: Optional[Path] = None,
+    owner: Callable[[str], Optional[Path]] = lambda stem: None,
+) -> str:
+    """
+    Choose the output name (without extension) for an input document.
+
+    Inputs under input_dir keep their subdirectory (a/report.pdf becomes
+    a/report), so same-named files in different folders never share an
+    output. If another input already owns <stem> (report.pdf and
+    report.docx), <name> is used, then <stem>-<hash of the input path>.
+
+    Args:
+        file_path: Input document
+        input_dir: Root the input was discovered under
+        owner: Input that already owns an output name, if any
+
+    Returns:
+        Output name relative to the output directory, with "/" separators
+    """
+    resolved = file_path.resolve()
+    folder = Path()
+    if input_dir is not None:
+        try:
+            folder = resolved.parent.relative_to(input_dir.resolve())
+        except ValueError:
+            pass
+
+    digest = hashlib.sha1(str(resolved).encode("utf-8")).hexdigest()[:8]
+    candidates = [file_path.stem, file_path.name, f"{file_path.stem}-{digest}"]
+    for candidate in candidates:
+        stem = (folder / candidate).as_posix()
+        claimed = owner(stem)
+        if claimed is None or claimed == resolved:
+            return stem
+    return stem
+
+
+class BatchItemResult(BaseModel):
+    """Outcome for a single document in a batch."""
+
+    file_path: Path
+    status: str
+    output_path: Optional[Path] = None
+    error: Optional[str] = None
+    duration: Optional[float] = None
+    duplicate_of: Optional[Path] = None
+
+
+class BatchSummary(BaseModel):
+    """Totals for a batch run."""
+
+    success: int = 0
+    failed: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+    usage: TokenUsage = Field(default_factory=TokenUsage, description="LLM usage of the batch")
+
+    @property
+    def total(self) -> int:
+        """Total number of documents seen, including skipped and duplicate ones."""
+        return self.success + self.failed + self.skipped + self.duplicates
+
+
+class BatchRunner:
+    """
+    Extract many documents into an output directory.
+
+    Reading/OCR runs in a process pool when workers > 1. In AI mode one
+    AIDocumentExtractor is shared by all documents and agent calls run
+    concurrently up to llm_concurrency. Formatters, the pool and the
+    extractor are created once and reused across run() calls until close().
+
+    Outputs mirror the inputs' subdirectories under input_dir (see
+    output_stem). Every outcome is checkpointed in a manifest in the output
+    directory.
+    With resume enabled, documents whose content is unchanged since a
+    successful run are skipped, so an interrupted batch picks up where it
+    stopped and a re-run only retries failures.
+
+    With dedupe enabled, each unique content is extracted once; inputs with
+    the same content hash get a hard link (or copy) of the canonical output.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        output_format: str = "json",
+        workers: int = 1,
+        use_ai: bool = False,
+        llm_concurrency: int = 4,
+        use_vision: bool = True,
+        fast_mode: bool = False,
+        use_ocr: bool = True,
+        resume: bool = True,
+        dedupe: bool = True,
+        on_result: Optional[Callable[[BatchItemResult], None]] = None,
+        manifest_path: Optional[Path] = None,
+        input_dir: Optional[Path] = None,
+    ):
+        """
+        Initialize batch runner.
+
+        Args:
+            output_dir: Directory to save extraction results
+            output_format: Output format: json or markdown
+            workers: Number of reader processes (1 = read in-process)
+            use_ai: Use AI-powered extraction
+            llm_concurrency: Maximum documents in the agent workflow at once
+            use_vision: Use vision model for AI extraction
+            fast_mode: Use single-call AI extraction with fallback
+            use_ocr: Initialize OCR engines for image reading
+            resume: Skip documents already completed according to the manifest
+            dedupe: Extract identical content once and link/copy its output
+            on_result: Callback invoked for every finished document
+            manifest_path: Manifest location (defaults to the output directory)
+            input_dir: Root the inputs were discovered under; outputs mirror
+                their subdirectories
+        """
+        self.output_dir = output_dir
+        self.input_dir = input_dir
+        self.workers = max(1, workers)
+        self.use_ai = use_ai
+        self.llm_concurrency = max(1, llm_concurrency)
+        self.use_vision = use_vision
+        self.fast_mode = fast_mode
+        self.use_ocr = use_ocr
+        self.resume = resume
+        self.dedupe = dedupe
+        self.on_result = on_result
+        self.manifest_path = manifest_path
+
+        if output_format.lower() == "json":
+            self.formatter = JSONFormatter()
+            self.extension = ".json"
+        else:
+            self.formatter = MarkdownFormatter()
+            self.extension = ".md"
+
+        self._pool = None
+        self._extractor = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._local_reader_ready = False
+        self._manifest: Optional[BatchManifest] = None
+        # Content hash of each document in flight, keyed by path
+        self._hashes: Dict[Path, str] = {}
+        # Dedupe state keyed by content hash: canonical inputs being extracted,
+        # outputs available for linking and duplicates waiting on a canonical
+        self._in_flight: Dict[str, Path] = {}
+        self._outputs: Dict[str, Path] = {}
+        self._waiting: Dict[str, List[Path]] = {}
+
+    def run(self, files: Iterable[Path]) -> BatchSummary:
+        """
+        Process documents and write one output file per input.
+
+        Args:
+            files: Documents to process (consumed lazily)
+
+        Returns:
+            BatchSummary with success/failure counts
+        """
+        if self.use_ai:
+            # One loop for the runner's lifetime keeps loop-bound LLM clients warm
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+            return self._loop.run_until_complete(self.run_async(files))
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        summary = BatchSummary()
+        pending = self._pending(files, summary)
+        if self.workers > 1:
+            self._run_pool(pending, summary)
+        else:
+            self._run_local(pending, summary)
+        return summary
+
+    async def run_async(self, files: Iterable[Path]) -> BatchSummary:
+        """
+        Process documents with the shared AI extractor.
+
+        Args:
+            files: Documents to process (consumed lazily)
+
+        Returns:
+            BatchSummary with success/failure counts
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        summary = BatchSummary()
+        extractor = self._get_extractor()
+
+        async for file_path, result in extractor.extract_many(
+            self._pending(files, summary), concurrency=self.llm_concurrency
+        ):
+            self._record(file_path, result, summary)
+
+        return summary
+
+    def close(self) -> None:
+        """Shut down the reader pool, release the AI extractor and close the manifest."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self._extractor is not None:
+            self._extractor.close()
+            self._extractor = None
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.close()
+        self._loop = None
+        if self._manifest is not None:
+            self._manifest.close()
+            self._manifest = None
+
+    def __enter__(self) -> "BatchRunner":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _get_manifest(self) -> BatchManifest:
+        """Open the manifest in the output directory on first use."""
+        if self._manifest is None:
+            if self.manifest_path is not None:
+                self._manifest = BatchManifest(self.manifest_path)
+            else:
+                self._manifest = BatchManifest.for_output_dir(self.output_dir)
+        return self._manifest
+
+    def _pending(self, files: Iterable[Path], summary: BatchSummary) -> Iterator[Path]:
+        """
+        Yield documents that still need processing.
+
+        Hashes each document, reports completed ones as skipped and
+        remembers the hash of the rest for the manifest.
+        """
+        manifest = self._get_manifest()
+
+        for file_path in files:
+            try:
+                content_hash = manifest.content_hash(file_path)
+            except OSError as e:
+                self._report(
+                    BatchItemResult(file_path=file_path, status="failed", error=str(e)),
+                    summary,
+                )
+                continue
+
+            if self.resume:
+                is_complete = manifest.is_complete(file_path, content_hash)
+                CACHE_LOOKUPS.inc(cache="manifest", result="hit" if is_complete else "miss")
+            if self.resume and is_complete:
+                entry = manifest.get(file_path)
+                self._report(
+                    BatchItemResult(
+                        file_path=file_path,
+                        status="skipped",
+                        output_path=entry.output_path,
+                        duration=entry.duration,
+                    ),
+                    summary,
+                )
+                continue
+
+            if self.dedupe:
+                canonical_output = self._outputs.get(content_hash)
+                if canonical_output is None and self.resume:
+                    canonical_output = manifest.find_output(content_hash)
+                is_duplicate = canonical_output is not None or content_hash in self._in_flight
+                CACHE_LOOKUPS.inc(cache="dedupe", result="hit" if is_duplicate else "miss")
+                if canonical_output is not None:
+                    self._write_duplicate(file_path, content_hash, canonical_output, summary)
+                    continue
+                if content_hash in self._in_flight:
+                    self._waiting.setdefault(content_hash, []).append(file_path)
+                    continue
+                self._in_flight[content_hash] = file_path
+
+            self._hashes[file_path] = content_hash
+            yield file_path
+
+    def _get_pool(self):
+        """Create the reader process pool on first use."""
+        if self._pool is None and self.workers > 1:
+            self._pool = create_reader_pool(self.workers, use_ocr=self.use_ocr)
+        return self._pool
+
+    def _get_extractor(self):
+        """Create the shared AI extractor on first use."""
+        if self._extractor is None:
+            from agent_extract.ai_extractor import AIDocumentExtractor
+
+            self._extractor = AIDocumentExtractor(
+                use_vision=self.use_vision,
+                use_basic_extraction=True,
+                fast_mode=self.fast_mode,
+                executor=self._get_pool(),
+            )
+        return self._extractor
+
+    def _run_local(self, files: Iterable[Path], summary: BatchSummary) -> None:
+        """Read documents one at a time in this process."""
+        if not self._local_reader_ready:
+            init_reader_worker(self.use_ocr)
+            self._local_reader_ready = True
+
+        for file_path in files:
+            try:
+                result: Union[ExtractionResult, Exception] = read_document(file_path)
+            except Exception as e:
+                result = e
+            self._record(file_path, result, summary)
+
+    def _run_pool(self, files: Iterable[Path], summary: BatchSummary) -> None:
+        """Read documents in the process pool, keeping a bounded window in flight."""
+        pool = self._get_pool()
+        window = self.workers * 2
+        paths = iter(files)
+        pending: Dict[Future, Path] = {}
+
+        def fill():
+            while len(pending) < window:
+                file_path = next(paths, None)
+                if file_path is None:
+                    return
+                pending[pool.submit(read_document_in_pool, file_path)] = file_path
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_path = pending.pop(future)
+                try:
+                    result: Union[ExtractionResult, Exception] = merge_worker_metrics(
+                        future.result()
+                    )
+                except Exception as e:
+                    result = e
+                self._record(file_path, result, summary)
+            fill()
+
+    def _record(
+        self,
+        file_path: Path,
+        result: Union[ExtractionResult, Exception],
+        summary: BatchSummary,
+    ) -> BatchItemResult:
+        """Write the output for a finished document and report it."""
+        if isinstance(result, Exception):
+            item = BatchItemResult(file_path=file_path, status="failed", error=str(result))
+        else:
+            try:
+                output_path = self._write_output(file_path, result)
+                observe_document(result)
+                usage = document_usage(result.structured_data)
+                if usage:
+                    summary.usage.add(usage)
+                item = BatchItemResult(
+                    file_path=file_path,
+                    status="success",
+                    output_path=output_path,
+                    duration=result.processing_time,
+                )
+            except Exception as e:
+                item = BatchItemResult(file_path=file_path, status="failed", error=str(e))
+
+        content_hash = self._hashes.pop(file_path, None)
+        if content_hash is not None:
+            self._get_manifest().record(
+                file_path,
+                content_hash,
+                item.status,
+                output_path=item.output_path,
+                error=item.error,
+                duration=item.duration,
+            )
+
+        self._report(item, summary)
+
+        if content_hash is not None and self.dedupe:
+            self._release_duplicates(content_hash, item, summary)
+        return item
+
+    def _release_duplicates(
+        self, content_hash: str, item: BatchItemResult, summary: BatchSummary
+    ) -> None:
+        """Resolve duplicates that were waiting on a canonical document."""
+        self._in_flight.pop(content_hash, None)
+        waiting = self._waiting.pop(content_hash, [])
+
+        if item.status == "success":
+            self._outputs[content_hash] = item.output_path
+            for duplicate in waiting:
+                self._write_duplicate(duplicate, content_hash, item.output_path, summary)
+            return
+
+        # Identical content would fail the same way
+        for duplicate in waiting:
+            error = f"Duplicate of {item.file_path.name}, which failed: {item.error}"
+            self._get_manifest().record(duplicate, content_hash, "failed", error=error)
+            self._report(
+                BatchItemResult(
+                    file_path=duplicate,
+                    status="failed",
+                    error=error,
+                    duplicate_of=item.file_path,
+                ),
+                summary,
+            )
+
+    def _write_duplicate(
+        self,
+        file_path: Path,
+        content_hash: str,
+        canonical_output: Path,
+        summary: BatchSummary,
+    ) -> None:
+        """Link or copy the canonical output for a duplicate input."""
+        manifest = self._get_manifest()
+        try:
+            output_path = self._output_path(file_path)
+            if output_path.resolve() != canonical_output.resolve():
+                tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+                tmp_path.unlink(missing_ok=True)
+                try:
+                    os.link(canonical_output, tmp_path)
+                except OSError:
+                    # Hard links unsupported (e.g. across filesystems)
+                    shutil.copyfile(canonical_output, tmp_path)
+                os.replace(tmp_path, output_path)
+            canonical = manifest.output_owner(canonical_output)
+            item = BatchItemResult(
+                file_path=file_path,
+                status="duplicate",
+                output_path=output_path,
+                duplicate_of=canonical,
+            )
+        except OSError as e:
+            item = BatchItemResult(file_path=file_path, status="failed", error=str(e))
+
+        manifest.record(
+            file_path,
+            content_hash,
+            item.status,
+            output_path=item.output_path,
+            error=item.error,
+        )
+        self._report(item, summary)
+
+    def _report(self, item: BatchItemResult, summary: BatchSummary) -> None:
+        """Count a finished document and pass it to the callback."""
+        DOCUMENTS.inc(source="batch", status=item.status)
+        if item.status == "success":
+            summary.success += 1
+        elif item.status == "skipped":
+            summary.skipped += 1
+        elif item.status == "duplicate":
+            summary.duplicates += 1
+        else:
+            summary.failed += 1
+
+        if self.on_result:
+            self.on_result(item)
+
+    def _output_path(self, file_path: Path) -> Path:
+        """
+        Choose the output file for a document (see output_stem).
+
+        An output name is owned by the input the manifest records for it.
+        """
+        manifest = self._get_manifest()
+        stem = output_stem(
+            file_path,
+            self.input_dir,
+            lambda stem: manifest.output_owner(self.output_dir / f"{stem}{self.extension}"),
+        )
+        output_path = self.output_dir / f"{stem}{self.extension}"
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        return output_path
+
+    def _write_output(self, file_path: Path, result: ExtractionResult) -> Path:
+        """Format a result and save it atomically next to the other outputs."""
+        output_path = self._output_path(file_path)
+        tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+        tmp_path.write_text(self.formatter.format(result), encoding="utf-8")
+        # An interrupted write never leaves a truncated output behind
+        os.replace(tmp_path, output_path)
+        return output_path
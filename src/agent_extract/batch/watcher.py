@@ -0,0 +1,242 @@
+"""Watch a folder and yield files once they have finished being written."""
+
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from agent_extract.batch.discovery import _matches, discover_files
+
+# (size, mtime_ns) of a file
+FileState = Tuple[int, int]
+
+# Filesystem events that can make a file new, changed or gone; opening and
+# reading a file (as extraction does) is not a change
+CHANGE_EVENTS = ("created", "modified", "moved", "deleted")
+
+
+class FolderWatcher:
+    """
+    Detect new and modified files in a directory.
+
+    Uses filesystem events through watchdog (inotify on Linux) when it is
+    installed, otherwise rescans the directory every poll_interval seconds.
+    A file is reported only after its size and modification time have been
+    stable for debounce seconds, so files still being copied in are not
+    picked up half-written.
+
+    The watcher only remembers files that still exist: deleted files are
+    forgotten, and with events, files are forgotten once handed off (a
+    later change raises a new event). Polling has to remember the files it
+    reported so a rescan does not report them again.
+    """
+
+    def __init__(
+        self,
+        input_dir: Path,
+        include: Sequence[str] = ("*.*",),
+        exclude: Sequence[str] = (),
+        recursive: bool = False,
+        debounce: float = 2.0,
+        poll_interval: float = 1.0,
+        use_polling: bool = False,
+        skip_dirs: Iterable[Path] = (),
+    ):
+        """
+        Initialize folder watcher.
+
+        Args:
+            input_dir: Directory to watch
+            include: Glob patterns a file must match (any)
+            exclude: Glob patterns that reject a file or directory (any)
+            recursive: Watch subdirectories too
+            debounce: Seconds a file must stay unchanged before it is reported
+            poll_interval: Seconds between checks (and rescans when polling)
+            use_polling: Force the polling fallback even if watchdog is available
+            skip_dirs: Directories to ignore (e.g. an output directory inside input_dir)
+        """
+        self.input_dir = Path(input_dir).resolve()
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.recursive = recursive
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.skip_dirs = [Path(d).resolve() for d in skip_dirs]
+
+        # Files reported and still present (polling), with their state when reported
+        self._known: Dict[Path, FileState] = {}
+        # Changed files waiting to settle: last seen state and when it last changed
+        self._candidates: Dict[Path, Tuple[FileState, float]] = {}
+        self._events: "queue.Queue[Path]" = queue.Queue()
+        self._observer = None if use_polling else self._start_observer()
+        self._scanned = False
+
+    @property
+    def mode(self) -> str:
+        """Detection mode in use: "events" or "polling"."""
+        return "events" if self._observer is not None else "polling"
+
+    def poll(self) -> List[Path]:
+        """
+        Collect changes and return files that are ready for processing.
+
+        Files already in the directory are reported on the first call.
+
+        Returns:
+            Paths whose content has settled since they last changed
+        """
+        if self._observer is None or not self._scanned:
+            self._scan()
+            self._scanned = True
+
+        while True:
+            try:
+                self._mark(self._events.get_nowait())
+            except queue.Empty:
+                break
+
+        return self._settled()
+
+    def batches(self, stop: Optional[threading.Event] = None) -> Iterator[List[Path]]:
+        """
+        Yield batches of ready files until stopped.
+
+        Args:
+            stop: Event that ends the loop when set
+
+        Yields:
+            Non-empty lists of ready files
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            ready = self.poll()
+            if ready:
+                yield ready
+            else:
+                stop.wait(self.poll_interval)
+
+    def close(self) -> None:
+        """Stop the filesystem observer."""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+
+    def __enter__(self) -> "FolderWatcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _start_observer(self):
+        """Start a watchdog observer, or return None to fall back to polling."""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+
+        events = self._events
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory or event.event_type not in CHANGE_EVENTS:
+                    return
+                # Moves report both names: the old one is gone, the new one changed
+                for path in (event.src_path, getattr(event, "dest_path", "")):
+                    if path:
+                        events.put(Path(os.fsdecode(path)))
+
+        try:
+            observer = Observer()
+            observer.schedule(Handler(), str(self.input_dir), recursive=self.recursive)
+            observer.start()
+        except OSError:
+            # e.g. inotify watch limit reached
+            return None
+        return observer
+
+    def _scan(self) -> None:
+        """Mark files that are new or changed since they were last reported."""
+        present = set()
+        for path in discover_files(
+            self.input_dir,
+            include=self.include,
+            exclude=self.exclude,
+            recursive=self.recursive,
+            skip_dirs=self.skip_dirs,
+        ):
+            present.add(self._mark(path))
+        for path in self._known.keys() - present:
+            del self._known[path]
+
+    def _mark(self, path: Path) -> Path:
+        """Record a possibly changed file as a candidate; forget it if it is gone."""
+        path = path.resolve()
+        if not self._accept(path):
+            return path
+        state = self._stat(path)
+        if state is None:
+            self._known.pop(path, None)
+            self._candidates.pop(path, None)
+            return path
+        if self._known.get(path) == state:
+            return path
+        previous = self._candidates.get(path)
+        if previous is None or previous[0] != state:
+            self._candidates[path] = (state, time.monotonic())
+        return path
+
+    def _settled(self) -> List[Path]:
+        """Return candidates that have not changed for the debounce period."""
+        now = time.monotonic()
+        ready = []
+
+        for path, (state, changed_at) in list(self._candidates.items()):
+            current = self._stat(path)
+            if current is None:
+                del self._candidates[path]
+            elif current != state:
+                self._candidates[path] = (current, now)
+            elif now - changed_at >= self.debounce:
+                del self._candidates[path]
+                if self._observer is None:
+                    self._known[path] = current
+                ready.append(path)
+
+        return sorted(ready)
+
+    def _accept(self, path: Path) -> bool:
+        """Apply recursion, skip directories and include/exclude patterns."""
+        try:
+            rel = path.relative_to(self.input_dir)
+        except ValueError:
+            return False
+        if any(path.is_relative_to(d) for d in self.skip_dirs):
+            return False
+        if not self.recursive and len(rel.parts) > 1:
+            return False
+
+        rel_path = rel.as_posix()
+        # Excluded directories exclude everything below them
+        for i in range(1, len(rel.parts)):
+            parent = "/".join(rel.parts[:i])
+            if _matches(parent, rel.parts[i - 1], self.exclude):
+                return False
+
+        return _matches(rel_path, path.name, self.include) and not _matches(
+            rel_path, path.name, self.exclude
+        )
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[FileState]:
+        """Return (size, mtime_ns) of a regular file, or None if it is gone."""
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        if not path.is_file():
+            return None
+        return stat.st_size, stat.st_mtime_ns
@@ -0,0 +1,114 @@
+"""Process-pool workers for CPU-bound document reading and OCR."""
+
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Tuple
+
+from agent_extract.core.metrics import MetricsSnapshot, registry
+from agent_extract.core.tracing import traced
+from agent_extract.core.types import ExtractionResult
+from agent_extract.ocr.ocr_manager import OCRManager
+from agent_extract.readers.factory import ReaderFactory
+
+logger = logging.getLogger(__name__)
+
+# One warm reader factory (and OCR engine) per worker process
+_factory: Optional[ReaderFactory] = None
+
+
+def init_reader_worker(use_ocr: bool = True) -> None:
+    """
+    Initialize the reader factory for this worker process.
+
+    Args:
+        use_ocr: Whether to initialize OCR engines for image reading
+    """
+    global _factory
+    ocr_engine = None
+    if use_ocr:
+        try:
+            ocr_engine = OCRManager.from_config()
+        except Exception as e:
+            logger.warning("OCR initialization failed in worker: %s", e)
+    _factory = ReaderFactory(ocr_engine=ocr_engine)
+
+
+def _init_pool_worker(use_ocr: bool) -> None:
+    """Pool initializer: drop metrics a forked worker inherited, then load readers."""
+    registry.reset()
+    init_reader_worker(use_ocr)
+
+
+def read_document(file_path: Path) -> ExtractionResult:
+    """
+    Read a document with the worker's reader factory.
+
+    Module-level so it can be sent to a ProcessPoolExecutor.
+
+    Args:
+        file_path: Path to the document
+
+    Returns:
+        ExtractionResult from the matching reader
+    """
+    if _factory is None:
+        init_reader_worker()
+    reader = _factory.get_reader(file_path)
+    return traced(reader.read, file_path)
+
+
+def read_document_in_pool(file_path: Path) -> Tuple[ExtractionResult, MetricsSnapshot]:
+    """
+    Read a document in a pool worker and return the metrics it recorded.
+
+    The worker's reader/OCR metrics are drained with every result; samples
+    of a read that raised travel with the worker's next result.
+
+    Args:
+        file_path: Path to the document
+
+    Returns:
+        Tuple of (ExtractionResult, metrics snapshot for merge_worker_metrics)
+    """
+    result = read_document(file_path)
+    return result, registry.drain()
+
+
+def merge_worker_metrics(outcome: Tuple[ExtractionResult, MetricsSnapshot]) -> ExtractionResult:
+    """
+    Add a pool worker's metrics to this process's registry.
+
+    Args:
+        outcome: Return value of read_document_in_pool
+
+    Returns:
+        The ExtractionResult
+    """
+    result, samples = outcome
+    registry.merge(samples)
+    return result
+
+
+def create_reader_pool(
+    workers: int, use_ocr: bool = True, start_method: Optional[str] = None
+) -> ProcessPoolExecutor:
+    """
+    Create a process pool whose workers keep a warm reader factory.
+
+    Args:
+        workers: Number of worker processes
+        use_ocr: Whether workers initialize OCR engines
+        start_method: multiprocessing start method (e.g. "spawn" when the
+            parent already runs threads); platform default if None
+
+    Returns:
+        ProcessPoolExecutor running read_document_in_pool
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(start_method) if start_method else None,
+        initializer=_init_pool_worker,
+        initargs=(use_ocr,),
+    )
@@ -0,0 +1,22 @@
+"""Performance benchmarks on a synthetic corpus."""
+
+from agent_extract.benchmarks.corpus import CorpusDocument, generate_corpus
+from agent_extract.benchmarks.suite import (
+    BenchmarkReport,
+    BenchmarkResult,
+    Comparison,
+    compare_reports,
+    measure,
+    run_benchmarks,
+)
+
+__all__ = [
+    "CorpusDocument",
+    "generate_corpus",
+    "BenchmarkReport",
+    "BenchmarkResult",
+    "Comparison",
+    "compare_reports",
+    "measure",
+    "run_benchmarks",
+]
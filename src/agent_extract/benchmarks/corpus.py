@@ -0,0 +1,201 @@
+"""Synthetic, reproducible document corpus for benchmarks."""
+
+import io
+import random
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+import numpy as np
+from docx import Document
+from PIL import Image, ImageDraw, ImageFont
+from pydantic import BaseModel
+
+# Documents generated per scale: text PDF pages, scanned PDF pages, DOCX
+# table rows and image sizes (pixels)
+SCALES: Dict[str, Dict[str, list]] = {
+    "small": {
+        "text_pdf": [1, 3],
+        "scanned_pdf": [1],
+        "docx": [10],
+        "image": [(640, 480)],
+    },
+    "full": {
+        "text_pdf": [1, 10, 50],
+        "scanned_pdf": [1, 5],
+        "docx": [10, 200],
+        "image": [(800, 600), (1700, 2200), (2480, 3508)],
+    },
+}
+
+VENDORS = ["Acme Corp", "Globex Ltd", "Initech GmbH", "Umbrella Inc", "Stark Industries"]
+ITEMS = ["Widget", "Gadget", "Sprocket", "Bracket", "Flange", "Gasket", "Bearing", "Valve"]
+
+# A4 at 150 dpi, the resolution of a typical office scan
+SCAN_SIZE = (1240, 1754)
+
+
+class CorpusDocument(BaseModel):
+    """A generated benchmark document."""
+
+    path: Path
+    kind: str
+    pages: int = 1
+    size: str = ""
+
+
+def generate_corpus(
+    directory: Path, scale: str = "small", seed: int = 0
+) -> List[CorpusDocument]:
+    """
+    Write the benchmark corpus: text PDFs, scanned (image-only) PDFs,
+    DOCX files with tables and noisy images at several sizes.
+
+    The same scale and seed always produce the same content, so timings
+    from different runs are comparable.
+
+    Args:
+        directory: Where to write the documents
+        scale: "small" (quick checks) or "full"
+        seed: Seed for the generated content and noise
+
+    Returns:
+        Generated documents
+
+    Raises:
+        ValueError: If the scale is unknown
+    """
+    if scale not in SCALES:
+        raise ValueError(f"Unknown corpus scale: {scale}. Supported: {sorted(SCALES)}")
+    spec = SCALES[scale]
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    noise = np.random.default_rng(seed)
+    documents = []
+
+    for pages in spec["text_pdf"]:
+        path = directory / f"text_{pages}p.pdf"
+        _write_text_pdf(path, [invoice_text(rng, page, pages) for page in range(1, pages + 1)])
+        documents.append(CorpusDocument(path=path, kind="text_pdf", pages=pages))
+
+    for pages in spec["scanned_pdf"]:
+        path = directory / f"scanned_{pages}p.pdf"
+        scans = [
+            render_page(invoice_text(rng, page, pages), SCAN_SIZE, noise)
+            for page in range(1, pages + 1)
+        ]
+        _write_scanned_pdf(path, scans)
+        documents.append(CorpusDocument(path=path, kind="scanned_pdf", pages=pages))
+
+    for rows in spec["docx"]:
+        path = directory / f"table_{rows}rows.docx"
+        _write_docx(path, rng, rows)
+        documents.append(CorpusDocument(path=path, kind="docx", size=f"{rows} rows"))
+
+    for width, height in spec["image"]:
+        path = directory / f"noisy_{width}x{height}.png"
+        render_page(invoice_text(rng, 1, 1), (width, height), noise).save(path)
+        documents.append(CorpusDocument(path=path, kind="image", size=f"{width}x{height}"))
+
+    return documents
+
+
+def invoice_text(rng: random.Random, page: int = 1, pages: int = 1) -> str:
+    """
+    One page of invoice-like text with a running header and footer.
+
+    Args:
+        rng: Random generator for the values
+        page: Page number
+        pages: Total pages
+
+    Returns:
+        Page text
+    """
+    vendor = rng.choice(VENDORS)
+    lines = [
+        f"{vendor} - Invoice",
+        "",
+        f"Invoice Number: INV-{rng.randint(1000, 9999)}",
+        f"Date: 2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        f"Bill To: {rng.choice(VENDORS)}, {rng.randint(1, 999)} Main St",
+        "",
+        "Item        Qty   Price",
+    ]
+    total = 0.0
+    for _ in range(rng.randint(8, 15)):
+        qty, price = rng.randint(1, 20), rng.randint(100, 10000) / 100
+        total += qty * price
+        lines.append(f"{rng.choice(ITEMS):<12}{qty:<6}${price:.2f}")
+    lines += ["", f"Total: ${total:.2f}", "", f"Page {page} of {pages}"]
+    return "\n".join(lines)
+
+
+def render_page(
+    text: str, size: Tuple[int, int], noise: Optional[np.random.Generator] = None
+) -> Image.Image:
+    """
+    Render text as a grayscale scan with Gaussian noise and a slight skew.
+
+    Args:
+        text: Text to draw
+        size: Image size (width, height)
+        noise: Generator for the noise (none if omitted)
+
+    Returns:
+        Grayscale image
+    """
+    width, height = size
+    image = Image.new("L", size, color=255)
+    draw = ImageDraw.Draw(image)
+    font_size = max(10, width // 50)
+    font = ImageFont.load_default(size=font_size)
+    draw.multiline_text(
+        (width // 15, height // 20), text, fill=0, font=font, spacing=font_size // 2
+    )
+    image = image.rotate(0.7, fillcolor=255)
+
+    if noise is not None:
+        pixels = np.asarray(image, dtype=np.float32)
+        pixels += noise.normal(0, 18, pixels.shape)
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    return image
+
+
+def _write_text_pdf(path: Path, pages: List[str]) -> None:
+    """PDF with a text layer."""
+    pdf = fitz.open()
+    for text in pages:
+        page = pdf.new_page()
+        page.insert_textbox(page.rect + (50, 50, -50, -50), text, fontsize=10, fontname="cour")
+    pdf.save(path)
+    pdf.close()
+
+
+def _write_scanned_pdf(path: Path, scans: List[Image.Image]) -> None:
+    """PDF whose pages are images only, as a scanner produces."""
+    pdf = fitz.open()
+    for scan in scans:
+        page = pdf.new_page()
+        buffer = io.BytesIO()
+        scan.save(buffer, format="JPEG", quality=75)
+        page.insert_image(page.rect, stream=buffer.getvalue())
+    pdf.save(path)
+    pdf.close()
+
+
+def _write_docx(path: Path, rng: random.Random, rows: int) -> None:
+    """DOCX with a heading, key: value paragraphs and an item table."""
+    document = Document()
+    for line in invoice_text(rng).split("\n")[:5]:
+        document.add_paragraph(line)
+
+    table = document.add_table(rows=1, cols=4)
+    for cell, header in zip(table.rows[0].cells, ["Item", "Qty", "Price", "Amount"]):
+        cell.text = header
+    for _ in range(rows):
+        qty, price = rng.randint(1, 20), rng.randint(100, 10000) / 100
+        values = [rng.choice(ITEMS), str(qty), f"{price:.2f}", f"{qty * price:.2f}"]
+        for cell, value in zip(table.add_row().cells, values):
+            cell.text = value
+    document.save(path)
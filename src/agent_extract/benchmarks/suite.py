@@ -0,0 +1,478 @@
+"""Timing, memory and throughput benchmarks per subsystem, with baseline comparison."""
+
+import asyncio
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from pydantic import BaseModel, Field
+
+from agent_extract.benchmarks.corpus import CorpusDocument
+from agent_extract.core.config import config
+from agent_extract.core.exceptions import OCRError
+from agent_extract.core.types import ExtractionResult
+
+SUBSYSTEMS = ("readers", "ocr", "formatters", "graph")
+
+# Graph workflows benchmarked: name -> DocumentExtractionGraph options; the others are
+# compared with the first (speedup_vs_supervised)
+GRAPH_MODES: Dict[str, Dict[str, Any]] = {
+    "supervised": {"topology": "supervised"},
+    "parallel": {"topology": "parallel"},
+    "fast": {"fast_mode": True},
+}
+
+
+class BenchmarkResult(BaseModel):
+    """Measurements of one benchmark."""
+
+    name: str
+    subsystem: str
+    status: str = "ok"
+    reason: Optional[str] = None
+    documents: int = 0
+    pages: int = 0
+    repeat: int = 0
+    timings: List[float] = Field(default_factory=list, description="Seconds per repetition")
+    median_seconds: Optional[float] = None
+    mean_seconds: Optional[float] = None
+    min_seconds: Optional[float] = None
+    stdev_seconds: Optional[float] = None
+    documents_per_second: Optional[float] = None
+    pages_per_second: Optional[float] = None
+    peak_memory_mb: Optional[float] = Field(
+        default=None, description="Peak traced Python allocations during one repetition"
+    )
+    extra: Dict[str, Any] = Field(default_factory=dict)
+
+
+class BenchmarkReport(BaseModel):
+    """A benchmark run: environment, settings and results."""
+
+    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    environment: Dict[str, Any] = Field(default_factory=dict)
+    settings: Dict[str, Any] = Field(default_factory=dict)
+    results: List[BenchmarkResult] = Field(default_factory=list)
+
+    def result(self, name: str) -> Optional[BenchmarkResult]:
+        """Result of a benchmark by name, if it ran."""
+        return next((result for result in self.results if result.name == name), None)
+
+    def save(self, path: Path) -> None:
+        """
+        Write the report as JSON.
+
+        Args:
+            path: Output file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.model_dump_json(indent=2), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "BenchmarkReport":
+        """
+        Read a report written by save().
+
+        Args:
+            path: Report file
+
+        Returns:
+            BenchmarkReport
+        """
+        return cls.model_validate(json.loads(path.read_text(encoding="utf-8")))
+
+
+class Comparison(BaseModel):
+    """One metric of a benchmark against the baseline."""
+
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    change: float = Field(description="Relative change; positive is slower or larger")
+    regressed: bool
+
+
+def measure(
+    name: str,
+    subsystem: str,
+    run: Callable[[], Any],
+    documents: int,
+    pages: int,
+    repeat: int = 3,
+    warmup: int = 1,
+) -> BenchmarkResult:
+    """
+    Time a workload and trace its peak memory.
+
+    Warm-up runs are not timed. Memory is traced in a separate, untimed
+    run because tracemalloc slows allocation-heavy code considerably.
+
+    Args:
+        name: Benchmark name
+        subsystem: Subsystem the benchmark belongs to
+        run: Processes every document once
+        documents: Documents processed per run
+        pages: Pages processed per run
+        repeat: Timed runs
+        warmup: Untimed runs before timing
+
+    Returns:
+        BenchmarkResult
+    """
+    for _ in range(warmup):
+        run()
+
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return BenchmarkResult(
+        name=name,
+        subsystem=subsystem,
+        documents=documents,
+        pages=pages,
+        repeat=repeat,
+        timings=timings,
+        median_seconds=median,
+        mean_seconds=statistics.mean(timings),
+        min_seconds=min(timings),
+        stdev_seconds=statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        documents_per_second=documents / median if median else None,
+        pages_per_second=pages / median if median else None,
+        peak_memory_mb=peak / 1024 / 1024,
+    )
+
+
+def run_benchmarks(
+    corpus: Sequence[CorpusDocument],
+    subsystems: Sequence[str] = SUBSYSTEMS,
+    repeat: int = 3,
+    warmup: int = 1,
+    llm_latency: str = "constant:0",
+    on_result: Optional[Callable[[BenchmarkResult], None]] = None,
+) -> BenchmarkReport:
+    """
+    Benchmark subsystems on a corpus.
+
+    - readers: each reader on the documents of each kind (no OCR)
+    - ocr: OCRManager on the images (skipped when no engine is installed)
+    - formatters: JSON and Markdown output of the read documents
+    - graph: the agent workflows on the text PDFs, with the offline fake
+      LLM provider so results do not depend on a model or network
+
+    Args:
+        corpus: Documents from generate_corpus()
+        subsystems: Subsystems to run
+        repeat: Timed runs per benchmark
+        warmup: Untimed runs per benchmark
+        llm_latency: Fake LLM latency distribution for the graph benchmarks
+            (the default measures orchestration overhead only)
+        on_result: Callback invoked for every finished benchmark
+
+    Returns:
+        BenchmarkReport
+
+    Raises:
+        ValueError: If a subsystem is unknown
+    """
+    unknown = set(subsystems) - set(SUBSYSTEMS)
+    if unknown:
+        raise ValueError(f"Unknown subsystems: {sorted(unknown)}. Supported: {list(SUBSYSTEMS)}")
+
+    report = BenchmarkReport(
+        environment=environment(),
+        settings={
+            "subsystems": list(subsystems),
+            "repeat": repeat,
+            "warmup": warmup,
+            "llm_latency": llm_latency,
+            "corpus": [f"{doc.path.name} ({doc.kind})" for doc in corpus],
+        },
+    )
+    benchmarks = {
+        "readers": lambda: _reader_benchmarks(corpus, repeat, warmup),
+        "ocr": lambda: _ocr_benchmarks(corpus, repeat, warmup),
+        "formatters": lambda: _formatter_benchmarks(corpus, repeat, warmup),
+        "graph": lambda: _graph_benchmarks(corpus, repeat, warmup, llm_latency),
+    }
+    for subsystem in SUBSYSTEMS:
+        if subsystem not in subsystems:
+            continue
+        for result in benchmarks[subsystem]():
+            report.results.append(result)
+            if on_result:
+                on_result(result)
+    return report
+
+
+def compare_reports(
+    current: BenchmarkReport,
+    baseline: BenchmarkReport,
+    time_threshold: float = 0.2,
+    memory_threshold: float = 0.2,
+    noise_seconds: float = 0.005,
+) -> List[Comparison]:
+    """
+    Compare time and peak memory of the benchmarks both reports ran.
+
+    Time is compared on the fastest run, which is far less affected by
+    scheduling noise than the mean or median.
+
+    Args:
+        current: New results
+        baseline: Stored reference results
+        time_threshold: Relative slowdown counted as a regression
+        memory_threshold: Relative memory growth counted as a regression
+        noise_seconds: Absolute slowdown below which timings are treated as
+            noise (very short benchmarks vary by more than the threshold)
+
+    Returns:
+        Comparisons, one per benchmark and metric
+    """
+    comparisons = []
+    for result in current.results:
+        reference = baseline.result(result.name)
+        if result.status != "ok" or reference is None or reference.status != "ok":
+            continue
+
+        metrics = [
+            ("min_seconds", time_threshold, noise_seconds),
+            ("peak_memory_mb", memory_threshold, 0.0),
+        ]
+        for metric, threshold, min_delta in metrics:
+            before, after = getattr(reference, metric), getattr(result, metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before if before else 0.0
+            comparisons.append(
+                Comparison(
+                    name=result.name,
+                    metric=metric,
+                    baseline=before,
+                    current=after,
+                    change=change,
+                    regressed=change > threshold and after - before > min_delta,
+                )
+            )
+    return comparisons
+
+
+def environment() -> Dict[str, Any]:
+    """Interpreter, platform and package version the results were taken with."""
+    from agent_extract import __version__
+
+    return {
+        "agent_extract": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def _by_kind(corpus: Sequence[CorpusDocument]) -> Dict[str, List[CorpusDocument]]:
+    kinds: Dict[str, List[CorpusDocument]] = {}
+    for document in corpus:
+        kinds.setdefault(document.kind, []).append(document)
+    return kinds
+
+
+def _reader_benchmarks(corpus, repeat, warmup) -> List[BenchmarkResult]:
+    from agent_extract.readers.factory import ReaderFactory
+
+    factory = ReaderFactory()
+    results = []
+    for kind, documents in _by_kind(corpus).items():
+
+        def read_all(documents=documents):
+            for document in documents:
+                factory.get_reader(document.path).read(document.path)
+
+        results.append(
+            measure(
+                f"readers.{kind}",
+                "readers",
+                read_all,
+                documents=len(documents),
+                pages=sum(document.pages for document in documents),
+                repeat=repeat,
+                warmup=warmup,
+            )
+        )
+    return results
+
+
+def _ocr_benchmarks(corpus, repeat, warmup) -> List[BenchmarkResult]:
+    from agent_extract.ocr.ocr_manager import OCRManager
+
+    images = _by_kind(corpus).get("image", [])
+    if not images:
+        return [_skipped("ocr.image", "ocr", "No images in the corpus")]
+    try:
+        manager = OCRManager.from_config()
+        # Engines load lazily; a missing one only shows on first use
+        manager.extract_text(images[0].path)
+    except OCRError as e:
+        return [_skipped("ocr.image", "ocr", str(e))]
+
+    def recognise_all():
+        for document in images:
+            manager.extract_text(document.path)
+
+    return [
+        measure(
+            "ocr.image",
+            "ocr",
+            recognise_all,
+            documents=len(images),
+            pages=len(images),
+            repeat=repeat,
+            warmup=warmup,
+        )
+    ]
+
+
+def _formatter_benchmarks(corpus, repeat, warmup) -> List[BenchmarkResult]:
+    from agent_extract.outputs.json_formatter import JSONFormatter
+    from agent_extract.outputs.markdown_formatter import MarkdownFormatter
+    from agent_extract.readers.factory import ReaderFactory
+
+    factory = ReaderFactory()
+    extracted: List[ExtractionResult] = [
+        factory.get_reader(document.path).read(document.path) for document in corpus
+    ]
+    results = []
+    for name, formatter in (("json", JSONFormatter()), ("markdown", MarkdownFormatter())):
+
+        def format_all(formatter=formatter):
+            for result in extracted:
+                formatter.format(result)
+
+        results.append(
+            measure(
+                f"formatters.{name}",
+                "formatters",
+                format_all,
+                documents=len(extracted),
+                pages=sum(document.pages for document in corpus),
+                repeat=repeat,
+                warmup=warmup,
+            )
+        )
+    return results
+
+
+def _graph_benchmarks(corpus, repeat, warmup, llm_latency) -> List[BenchmarkResult]:
+    from agent_extract.agents.graph import DocumentExtractionGraph
+    from agent_extract.core.usage import track_usage
+    from agent_extract.readers.factory import ReaderFactory
+
+    factory = ReaderFactory()
+    documents = _by_kind(corpus).get("text_pdf", [])
+    if not documents:
+        reason = "No text PDFs in the corpus"
+        return [_skipped(f"graph.{mode}", "graph", reason) for mode in GRAPH_MODES]
+    texts = [factory.get_reader(doc.path).read(doc.path).raw_text for doc in documents]
+    results = []
+    with _fake_llm(llm_latency):
+        for mode, options in GRAPH_MODES.items():
+            graph = DocumentExtractionGraph(use_vision=False, **options)
+            calls: List[int] = []
+
+            def extract_all(graph=graph, calls=calls):
+                async def run():
+                    for text in texts:
+                        await graph.extract(_initial_state(text))
+
+                with track_usage() as usage:
+                    asyncio.run(run())
+                calls.append(len(usage))
+
+            result = measure(
+                f"graph.{mode}",
+                "graph",
+                extract_all,
+                documents=len(texts),
+                pages=sum(document.pages for document in documents),
+                repeat=repeat,
+                warmup=warmup,
+            )
+            result.extra["llm_calls"] = calls[-1] if calls else 0
+            results.append(result)
+
+    # Topology comparison; meaningful with a non-zero --llm-latency
+    supervised = results[0]
+    for result in results[1:]:
+        if supervised.median_seconds and result.median_seconds:
+            result.extra["speedup_vs_supervised"] = round(
+                supervised.median_seconds / result.median_seconds, 2
+            )
+    return results
+
+
+def _skipped(name: str, subsystem: str, reason: str) -> BenchmarkResult:
+    return BenchmarkResult(name=name, subsystem=subsystem, status="skipped", reason=reason)
+
+
+def _initial_state(text: str) -> Dict[str, Any]:
+    return {
+        "file_path": "benchmark.pdf",
+        "raw_text": text,
+        "ocr_text": None,
+        "image_data": None,
+        "document_type": None,
+        "confidence_score": 0.0,
+        "detected_schema": None,
+        "structured_data": {},
+        "tables": [],
+        "entities": [],
+        "extraction_method": "ai_agents",
+        "processing_steps": [],
+        "errors": [],
+        "current_agent": "init",
+        "next_action": None,
+        "extraction_result": None,
+    }
+
+
+@contextmanager
+def _fake_llm(latency: str) -> Iterator[None]:
+    """Point the agents at the fake provider for the duration of the block."""
+    from agent_extract.core.llm_provider import LLMFactory
+
+    overrides = {
+        "llm_provider": "fake",
+        "llm_model": "fake",
+        "llm_vision_model": "fake",
+        "fake_llm_latency": latency,
+    }
+    previous = {name: getattr(config, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(config, name, value)
+        LLMFactory.clear()
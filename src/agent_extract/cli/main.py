@@ -1,7 +1,7 @@
 """Main CLI application using Typer."""
 
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 import sys
 import platform
 import typer
@@ -12,12 +12,20 @@ from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
 from rich import print as rprint
 
 from agent_extract.core.config import Config
+from agent_extract.core.metrics import TextfileExporter
+from agent_extract.core.tracing import export_spans, summarize_spans, trace, traced
+from agent_extract.core.usage import document_usage, track_usage
 from agent_extract.core.types import OutputFormat
 from agent_extract.readers.factory import ReaderFactory
 from agent_extract.ocr.ocr_manager import OCRManager
 from agent_extract.outputs.json_formatter import JSONFormatter
 from agent_extract.outputs.markdown_formatter import MarkdownFormatter
 from agent_extract.ai_extractor import AIDocumentExtractor
+from agent_extract.batch.broker import BatchSpec, open_broker
+from agent_extract.batch.discovery import discover_files, prefetch
+from agent_extract.batch.distributed import BatchCoordinator, DistributedWorker
+from agent_extract.batch.runner import BatchRunner
+from agent_extract.batch.watcher import FolderWatcher
 
 app = typer.Typer(
     name="agent-extract",
@@ -84,6 +92,21 @@ def extract(
         "-m",
         help="Override model name (e.g., qwen3:0.6b, gemini-pro, gpt-4o-mini)",
     ),
+    fast: bool = typer.Option(
+        False,
+        "--fast",
+        help="Single-call AI extraction; falls back to the full agent loop on low confidence",
+    ),
+    parallel: bool = typer.Option(
+        False,
+        "--parallel",
+        help="Run schema, table and vision agents concurrently instead of the supervisor loop",
+    ),
+    trace_file: Optional[Path] = typer.Option(
+        None,
+        "--trace",
+        help="Append per-stage timing spans to this JSON Lines file",
+    ),
 ):
     """
     Extract data from a document and output as JSON or Markdown.
@@ -100,6 +123,12 @@ def extract(
         
         # Custom model
         agent-extract extract document.pdf --ai --provider ollama --model qwen3:0.6b
+        
+        # Fast mode (one LLM call for confident documents)
+        agent-extract extract document.pdf --ai --fast
+
+        # Record where the time goes
+        agent-extract extract document.pdf --ai --trace spans.jsonl
     """
     try:
         # Configure LLM provider based on user selection
@@ -173,6 +202,8 @@ def extract(
                 ai_extractor = AIDocumentExtractor(
                     use_vision=not no_vision,
                     use_basic_extraction=True,
+                    fast_mode=fast,
+                    topology="parallel" if parallel else "supervised",
                 )
                 
                 # Extract with agent callback for logging
@@ -181,7 +212,7 @@ def extract(
                 progress.update(task, description="[green]OK[/green] AI extraction complete", completed=True)
             else:
                 # Use standard extraction
-                result = reader.read(file_path)
+                result = traced(reader.read, file_path)
                 progress.update(task, description="[green]OK[/green] Content extracted", completed=True)
 
             # Format output
@@ -210,6 +241,11 @@ def extract(
         # Show summary
         _show_summary(result)
 
+        if trace_file:
+            export_spans(result.spans, trace_file, document=file_path.name)
+            _show_spans(result.spans)
+            console.print(f"[green]SUCCESS[/green] Spans saved to: [bold]{trace_file}[/bold]")
+
     except Exception as e:
         console.print(f"\n[red]Error:[/red] {str(e)}")
         raise typer.Exit(1)
@@ -235,11 +271,91 @@ def batch(
         "-f",
         help="Output format: json or markdown",
     ),
-    pattern: str = typer.Option(
-        "*.*",
+    pattern: List[str] = typer.Option(
+        ["*.*"],
         "--pattern",
         "-p",
-        help="File pattern to match (e.g., '*.pdf')",
+        help="File pattern to match (e.g., '*.pdf'); repeat for several",
+    ),
+    exclude: List[str] = typer.Option(
+        [],
+        "--exclude",
+        "-x",
+        help="Pattern of files or directories to skip (e.g., '*.tmp', 'archive/*'); repeatable",
+    ),
+    recursive: bool = typer.Option(
+        False,
+        "--recursive",
+        "-r",
+        help="Include files in subdirectories",
+    ),
+    min_size_kb: Optional[float] = typer.Option(
+        None,
+        "--min-size",
+        help="Skip files smaller than this many KB",
+    ),
+    max_size_mb: Optional[float] = typer.Option(
+        None,
+        "--max-size",
+        help="Skip files larger than this many MB",
+    ),
+    use_ai: bool = typer.Option(
+        False,
+        "--ai",
+        help="Use AI-powered extraction (Phase 2)",
+    ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        "-w",
+        help="Reader processes for CPU-bound reading/OCR (1 = read in-process)",
+    ),
+    llm_concurrency: int = typer.Option(
+        4,
+        "--llm-concurrency",
+        help="Maximum documents in the AI agent workflow at once (with --ai)",
+    ),
+    no_vision: bool = typer.Option(
+        False,
+        "--no-vision",
+        help="Disable vision model for AI extraction",
+    ),
+    fast: bool = typer.Option(
+        False,
+        "--fast",
+        help="Single-call AI extraction; falls back to the full agent loop on low confidence",
+    ),
+    llm_provider: str = typer.Option(
+        "ollama",
+        "--provider",
+        help="LLM provider: 'ollama' (local, private) or 'gemini' (cloud, fast)",
+    ),
+    llm_model: str = typer.Option(
+        None,
+        "--model",
+        "-m",
+        help="Override model name (e.g., qwen3:0.6b, gemini-pro, gpt-4o-mini)",
+    ),
+    force: bool = typer.Option(
+        False,
+        "--force",
+        help="Reprocess files already completed in the output directory's manifest",
+    ),
+    no_dedupe: bool = typer.Option(
+        False,
+        "--no-dedupe",
+        help="Extract every file even when its content duplicates another input",
+    ),
+    broker_url: Optional[str] = typer.Option(
+        None,
+        "--broker",
+        help="Queue files on a shared broker (redis:// URL or SQLite path) for "
+        "'agent-extract worker' processes and wait for their results",
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None,
+        "--metrics-file",
+        help="Write Prometheus metrics to this file periodically (node_exporter textfile)",
     ),
 ):
     """
@@ -247,65 +363,106 @@ def batch(
     
     Example:
         agent-extract batch ./documents ./output --format json --pattern "*.pdf"
-    """
-    try:
-        # Create output directory
-        output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Find matching files
-        files = list(input_dir.glob(pattern))
+        # Whole tree, PDFs and DOCX only, skipping an archive folder
+        agent-extract batch ./documents ./output -r -p "*.pdf" -p "*.docx" -x "archive"
         
-        if not files:
-            console.print(f"[yellow]No files found matching pattern '{pattern}' in {input_dir}[/yellow]")
-            return
-
-        console.print(f"\n[bold cyan]Found {len(files)} file(s) to process[/bold cyan]\n")
+        # AI extraction with 4 reader processes and 8 concurrent agent workflows
+        agent-extract batch ./documents ./output --ai --workers 4 --llm-concurrency 8
 
-        # Initialize OCR and factory once
-        ocr_engine = OCRManager.from_config()
-        factory = ReaderFactory(ocr_engine=ocr_engine)
+        # Distribute over several hosts; run 'agent-extract worker' on each
+        agent-extract batch /shared/in /shared/out --ai --broker redis://queue:6379/0
 
-        # Process each file
-        success_count = 0
-        error_count = 0
+    Progress is checkpointed in the output directory: re-running the same
+    command skips completed files and retries only failures. Files with
+    identical content are extracted once and their outputs linked.
+    """
+    try:
+        if use_ai:
+            _configure_llm_provider(llm_provider, llm_model, console)
 
-        with Progress(console=console) as progress:
-            task = progress.add_task("[cyan]Processing files...", total=len(files))
+        # Stream matching files; extraction starts with the first one found
+        files = prefetch(
+            discover_files(
+                input_dir,
+                include=pattern,
+                exclude=exclude,
+                recursive=recursive,
+                min_size=int(min_size_kb * 1024) if min_size_kb is not None else None,
+                max_size=int(max_size_mb * 1024 * 1024) if max_size_mb is not None else None,
+                skip_dirs=[output_dir],
+            )
+        )
 
-            for file_path in files:
-                try:
-                    # Extract
-                    reader = factory.get_reader(file_path)
-                    result = reader.read(file_path)
-
-                    # Format
-                    output_fmt = "markdown" if output_format.lower() == "md" else output_format.lower()
-                    if output_fmt == "json":
-                        formatter = JSONFormatter()
-                        output_str = formatter.format(result)
-                        ext = ".json"
-                    else:
-                        formatter = MarkdownFormatter()
-                        output_str = formatter.format(result)
-                        ext = ".md"
-
-                    # Save
-                    output_file = output_dir / f"{file_path.stem}{ext}"
-                    output_file.write_text(output_str, encoding="utf-8")
-
-                    success_count += 1
-                    console.print(f"[green]OK[/green] {file_path.name}")
+        console.print(f"\n[bold cyan]Processing files in {input_dir}[/bold cyan]\n")
 
-                except Exception as e:
-                    error_count += 1
-                    console.print(f"[red]FAIL[/red] {file_path.name}: {str(e)}")
+        with Progress(console=console) as progress, _metrics_export(metrics_file):
+            task = progress.add_task("[cyan]Processing files...", total=None)
 
+            def on_result(item):
+                if item.status == "success":
+                    console.print(f"[green]OK[/green] {item.file_path.name}")
+                elif item.status == "skipped":
+                    console.print(f"[dim]SKIP {item.file_path.name} (already extracted)[/dim]")
+                elif item.status == "duplicate":
+                    source = item.duplicate_of.name if item.duplicate_of else "earlier file"
+                    console.print(f"[dim]DUP  {item.file_path.name} (same content as {source})[/dim]")
+                else:
+                    console.print(f"[red]FAIL[/red] {item.file_path.name}: {item.error}")
                 progress.update(task, advance=1)
 
+            if broker_url:
+                # Workers extract; this process only queues files and collects results
+                spec = BatchSpec(
+                    output_dir=output_dir.resolve(),
+                    output_format=output_format,
+                    use_ai=use_ai,
+                    use_vision=not no_vision,
+                    fast_mode=fast,
+                    dedupe=not no_dedupe,
+                )
+                with open_broker(broker_url) as broker:
+                    coordinator = BatchCoordinator(
+                        broker, spec, on_result=on_result, input_dir=input_dir
+                    )
+                    queued = coordinator.submit(files, force=force)
+                    console.print(f"[dim]Queued {queued} files, waiting for workers...[/dim]")
+                    summary = coordinator.wait()
+
+            else:
+                # One runner: shared formatters, reader pool and AI extractor
+                with BatchRunner(
+                    output_dir=output_dir,
+                    output_format=output_format,
+                    workers=workers,
+                    use_ai=use_ai,
+                    llm_concurrency=llm_concurrency,
+                    use_vision=not no_vision,
+                    fast_mode=fast,
+                    resume=not force,
+                    dedupe=not no_dedupe,
+                    on_result=on_result,
+                    input_dir=input_dir,
+                ) as runner:
+                    summary = runner.run(files)
+
+        if not summary.total:
+            patterns = ", ".join(f"'{p}'" for p in pattern)
+            console.print(f"[yellow]No files found matching {patterns} in {input_dir}[/yellow]")
+            return
+
         # Summary
         console.print(f"\n[bold]Summary:[/bold]")
-        console.print(f"  Success: [green]{success_count}[/green]")
-        console.print(f"  Failed:  [red]{error_count}[/red]")
+        console.print(f"  Success: [green]{summary.success}[/green]")
+        console.print(f"  Failed:  [red]{summary.failed}[/red]")
+        if summary.skipped:
+            console.print(f"  Skipped: [dim]{summary.skipped}[/dim] (already extracted)")
+        if summary.duplicates:
+            console.print(
+                f"  Duplicates: [dim]{summary.duplicates}[/dim] (outputs linked to the first copy)"
+            )
+        if summary.usage.calls:
+            console.print(f"  LLM:     [cyan]{_format_usage(summary.usage)}[/cyan]")
         console.print(f"  Output:  [cyan]{output_dir}[/cyan]")
 
     except Exception as e:
@@ -313,6 +470,461 @@ def batch(
         raise typer.Exit(1)
 
 
+@app.command()
+def watch(
+    input_dir: Path = typer.Argument(
+        ...,
+        help="Directory to watch for new or modified documents",
+        exists=True,
+        file_okay=False,
+        dir_okay=True,
+        resolve_path=True,
+    ),
+    output_dir: Path = typer.Argument(
+        ...,
+        help="Directory to save extraction results",
+    ),
+    output_format: str = typer.Option(
+        "json",
+        "--format",
+        "-f",
+        help="Output format: json or markdown",
+    ),
+    pattern: List[str] = typer.Option(
+        ["*.*"],
+        "--pattern",
+        "-p",
+        help="File pattern to match (e.g., '*.pdf'); repeat for several",
+    ),
+    exclude: List[str] = typer.Option(
+        [],
+        "--exclude",
+        "-x",
+        help="Pattern of files or directories to skip; repeatable",
+    ),
+    recursive: bool = typer.Option(
+        False,
+        "--recursive",
+        "-r",
+        help="Watch subdirectories too",
+    ),
+    debounce: float = typer.Option(
+        2.0,
+        "--debounce",
+        help="Seconds a file must stay unchanged before it is processed",
+    ),
+    poll_interval: float = typer.Option(
+        1.0,
+        "--interval",
+        help="Seconds between checks for settled files",
+    ),
+    polling: bool = typer.Option(
+        False,
+        "--polling",
+        help="Rescan the directory instead of using filesystem events",
+    ),
+    use_ai: bool = typer.Option(
+        False,
+        "--ai",
+        help="Use AI-powered extraction (Phase 2)",
+    ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        "-w",
+        help="Reader processes for CPU-bound reading/OCR (1 = read in-process)",
+    ),
+    llm_concurrency: int = typer.Option(
+        4,
+        "--llm-concurrency",
+        help="Maximum documents in the AI agent workflow at once (with --ai)",
+    ),
+    no_vision: bool = typer.Option(
+        False,
+        "--no-vision",
+        help="Disable vision model for AI extraction",
+    ),
+    fast: bool = typer.Option(
+        False,
+        "--fast",
+        help="Single-call AI extraction; falls back to the full agent loop on low confidence",
+    ),
+    llm_provider: str = typer.Option(
+        "ollama",
+        "--provider",
+        help="LLM provider: 'ollama' (local, private) or 'gemini' (cloud, fast)",
+    ),
+    llm_model: str = typer.Option(
+        None,
+        "--model",
+        "-m",
+        help="Override model name (e.g., qwen3:0.6b, gemini-pro, gpt-4o-mini)",
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None,
+        "--metrics-file",
+        help="Write Prometheus metrics to this file periodically (node_exporter textfile)",
+    ),
+):
+    """
+    Watch a directory and extract documents as they arrive.
+
+    Runs until interrupted. Reader processes, OCR engines and the AI
+    extractor stay warm between files. Files already in the directory are
+    processed on start unless the output manifest shows them as done.
+
+    Example:
+        agent-extract watch ./inbox ./output --pattern "*.pdf"
+
+        # AI extraction with warm workers, subfolders included
+        agent-extract watch ./inbox ./output -r --ai --workers 2
+    """
+    try:
+        if use_ai:
+            _configure_llm_provider(llm_provider, llm_model, console)
+
+        def on_result(item):
+            if item.status == "success":
+                console.print(f"[green]OK[/green] {item.file_path.name}")
+            elif item.status == "duplicate":
+                source = item.duplicate_of.name if item.duplicate_of else "earlier file"
+                console.print(f"[dim]DUP  {item.file_path.name} (same content as {source})[/dim]")
+            elif item.status == "failed":
+                console.print(f"[red]FAIL[/red] {item.file_path.name}: {item.error}")
+
+        with FolderWatcher(
+            input_dir,
+            include=pattern,
+            exclude=exclude,
+            recursive=recursive,
+            debounce=debounce,
+            poll_interval=poll_interval,
+            use_polling=polling,
+            skip_dirs=[output_dir],
+        ) as watcher, _metrics_export(metrics_file), BatchRunner(
+            output_dir=output_dir,
+            output_format=output_format,
+            workers=workers,
+            use_ai=use_ai,
+            llm_concurrency=llm_concurrency,
+            use_vision=not no_vision,
+            fast_mode=fast,
+            on_result=on_result,
+            input_dir=input_dir,
+        ) as runner:
+            console.print(
+                f"\n[bold cyan]Watching {input_dir}[/bold cyan] "
+                f"[dim]({watcher.mode}, Ctrl+C to stop)[/dim]\n"
+            )
+            try:
+                for ready in watcher.batches():
+                    runner.run(ready)
+            except KeyboardInterrupt:
+                console.print("\n[yellow]Stopped watching[/yellow]")
+
+    except Exception as e:
+        console.print(f"\n[red]Error:[/red] {str(e)}")
+        raise typer.Exit(1)
+
+
+@app.command()
+def worker(
+    broker_url: str = typer.Argument(
+        ...,
+        help="Broker the batch was queued on (redis:// URL or SQLite path)",
+    ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        "-w",
+        help="Reader processes for CPU-bound reading/OCR (1 = read in-process)",
+    ),
+    llm_concurrency: int = typer.Option(
+        4,
+        "--llm-concurrency",
+        help="Maximum documents in the AI agent workflow at once",
+    ),
+    lease_seconds: float = typer.Option(
+        60.0,
+        "--lease",
+        help="Seconds a claimed file stays reserved without a heartbeat",
+    ),
+    keep_running: bool = typer.Option(
+        False,
+        "--keep-running",
+        help="Wait for new batches instead of exiting once the queue is empty",
+    ),
+    llm_provider: str = typer.Option(
+        "ollama",
+        "--provider",
+        help="LLM provider: 'ollama' (local, private) or 'gemini' (cloud, fast)",
+    ),
+    llm_model: str = typer.Option(
+        None,
+        "--model",
+        "-m",
+        help="Override model name (e.g., qwen3:0.6b, gemini-pro, gpt-4o-mini)",
+    ),
+    metrics_file: Optional[Path] = typer.Option(
+        None,
+        "--metrics-file",
+        help="Write Prometheus metrics to this file periodically (node_exporter textfile)",
+    ),
+):
+    """
+    Extract files queued by 'batch --broker' on this host.
+
+    Output directory, format and AI options come from the coordinator;
+    input and output paths must be visible at the same location on every
+    host. Files held by a worker that dies are retried by the others.
+
+    Example:
+        agent-extract worker redis://queue:6379/0 --workers 4 --llm-concurrency 8
+    """
+    try:
+        _configure_llm_provider(llm_provider, llm_model, console)
+
+        def on_result(item):
+            if item.status in ("success", "duplicate"):
+                console.print(f"[green]OK[/green] {item.file_path.name}")
+            else:
+                console.print(f"[red]FAIL[/red] {item.file_path.name}: {item.error}")
+
+        with open_broker(broker_url) as broker, _metrics_export(metrics_file):
+            distributed_worker = DistributedWorker(
+                broker,
+                workers=workers,
+                llm_concurrency=llm_concurrency,
+                lease_seconds=lease_seconds,
+                on_result=on_result,
+            )
+            console.print(
+                f"\n[bold cyan]Worker {distributed_worker.worker_id}[/bold cyan] "
+                f"[dim]pulling from {broker_url}[/dim]\n"
+            )
+            try:
+                summary = distributed_worker.run(exit_when_idle=not keep_running)
+            except KeyboardInterrupt:
+                console.print("\n[yellow]Worker stopped[/yellow]")
+                return
+
+        done = summary.success + summary.duplicates
+        console.print(f"\n[bold]Processed:[/bold] {done} ok, {summary.failed} failed")
+        if summary.usage.calls:
+            console.print(f"[bold]LLM:[/bold] {_format_usage(summary.usage)}")
+
+    except Exception as e:
+        console.print(f"\n[red]Error:[/red] {str(e)}")
+        raise typer.Exit(1)
+
+
+@app.command()
+def serve(
+    host: str = typer.Option(
+        None,
+        "--host",
+        help="Interface to bind (defaults to API_HOST)",
+    ),
+    port: int = typer.Option(
+        None,
+        "--port",
+        help="Port to listen on (defaults to API_PORT)",
+    ),
+    workers: int = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        help="Reader processes kept warm for reading/OCR (defaults to API_WORKERS)",
+    ),
+    max_concurrency: int = typer.Option(
+        None,
+        "--max-concurrency",
+        help="Extractions run at once (defaults to API_MAX_CONCURRENCY)",
+    ),
+    llm_provider: str = typer.Option(
+        None,
+        "--provider",
+        help="LLM provider for ?ai=true requests: 'ollama' or 'gemini'",
+    ),
+    llm_model: str = typer.Option(
+        None,
+        "--model",
+        "-m",
+        help="Override model name for AI requests",
+    ),
+):
+    """
+    Run the extraction HTTP API.
+
+    Requires the api extra: pip install agent-extract[api]
+
+    Example:
+        agent-extract serve --port 8000 --workers 4
+
+        curl -F file=@invoice.pdf "http://localhost:8000/extract?ai=true"
+    """
+    try:
+        import uvicorn
+    except ImportError:
+        console.print(
+            "[red]Error:[/red] uvicorn not installed. Install with: pip install agent-extract[api]"
+        )
+        raise typer.Exit(1)
+
+    try:
+        if llm_provider:
+            _configure_llm_provider(llm_provider, llm_model, console)
+
+        from agent_extract.api.app import create_app
+        from agent_extract.api.service import ExtractionService
+
+        service = ExtractionService(reader_workers=workers, max_concurrency=max_concurrency)
+        config = Config()
+        uvicorn.run(
+            create_app(service),
+            host=host or config.api_host,
+            port=port or config.api_port,
+        )
+
+    except Exception as e:
+        console.print(f"\n[red]Error:[/red] {str(e)}")
+        raise typer.Exit(1)
+
+
+@app.command()
+def benchmark(
+    output: Path = typer.Option(
+        Path("benchmark-results.json"),
+        "--output",
+        "-o",
+        help="Where to write the results (JSON)",
+    ),
+    baseline: Optional[Path] = typer.Option(
+        None,
+        "--baseline",
+        "-b",
+        help="Earlier results to compare against; regressions make the command fail",
+        exists=True,
+        dir_okay=False,
+    ),
+    threshold: float = typer.Option(
+        0.2,
+        "--threshold",
+        help="Relative slowdown or memory growth counted as a regression",
+    ),
+    subsystems: List[str] = typer.Option(
+        ["readers", "ocr", "formatters", "graph"],
+        "--subsystem",
+        "-s",
+        help="Subsystem to benchmark: readers, ocr, formatters or graph; repeat for several",
+    ),
+    scale: str = typer.Option(
+        "small",
+        "--scale",
+        help="Corpus size: small (quick) or full",
+    ),
+    repeat: int = typer.Option(3, "--repeat", "-n", help="Timed runs per benchmark"),
+    corpus_dir: Optional[Path] = typer.Option(
+        None,
+        "--corpus-dir",
+        help="Keep the generated corpus here (defaults to a temporary directory)",
+    ),
+    seed: int = typer.Option(0, "--seed", help="Seed for the generated corpus"),
+    llm_latency: str = typer.Option(
+        "constant:0",
+        "--llm-latency",
+        help="Fake LLM latency for the graph benchmarks, e.g. 'lognormal:0.8,0.5'",
+    ),
+):
+    """
+    Measure reading, OCR, output formatting and the agent workflow.
+
+    Runs on a generated corpus (text and scanned PDFs, DOCX with tables,
+    noisy images) with the offline fake LLM, so results are repeatable and
+    need no models or network.
+
+    Example:
+        agent-extract benchmark -o results.json --baseline baseline.json
+    """
+    import tempfile
+
+    from agent_extract.benchmarks import (
+        BenchmarkReport,
+        compare_reports,
+        generate_corpus,
+        run_benchmarks,
+    )
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="agent-extract-bench-") as tmp:
+            corpus = generate_corpus(corpus_dir or Path(tmp), scale=scale, seed=seed)
+            console.print(
+                f"\n[bold cyan]Benchmarking[/bold cyan] {len(corpus)} documents "
+                f"({scale} corpus), {repeat} runs each\n"
+            )
+
+            def on_result(result):
+                if result.status != "ok":
+                    console.print(f"[yellow]SKIP[/yellow] {result.name}: {result.reason}")
+                    return
+                console.print(
+                    f"[green]OK[/green] {result.name:<22} {result.median_seconds * 1000:>9.1f} ms "
+                    f"{result.documents_per_second:>8.1f} docs/s "
+                    f"{result.peak_memory_mb:>8.1f} MB"
+                )
+
+            report = run_benchmarks(
+                corpus,
+                subsystems=subsystems,
+                repeat=repeat,
+                llm_latency=llm_latency,
+                on_result=on_result,
+            )
+        report.settings.update({"scale": scale, "seed": seed})
+        report.save(output)
+        console.print(f"\n[dim]Results written to {output}[/dim]")
+
+        if baseline is None:
+            return
+
+        comparisons = compare_reports(
+            report,
+            BenchmarkReport.load(baseline),
+            time_threshold=threshold,
+            memory_threshold=threshold,
+        )
+        table = Table(title=f"Against {baseline.name}", show_header=True, header_style="bold")
+        table.add_column("Benchmark", style="cyan")
+        table.add_column("Metric")
+        table.add_column("Baseline", justify="right")
+        table.add_column("Current", justify="right")
+        table.add_column("Change", justify="right")
+        for item in comparisons:
+            colour = "red" if item.regressed else "green" if item.change < 0 else "white"
+            table.add_row(
+                item.name,
+                item.metric,
+                f"{item.baseline:.4g}",
+                f"{item.current:.4g}",
+                f"[{colour}]{item.change:+.1%}[/{colour}]",
+            )
+        console.print(table)
+
+        regressions = [item for item in comparisons if item.regressed]
+        if regressions:
+            console.print(
+                f"\n[red]{len(regressions)} regression(s)[/red] beyond {threshold:.0%}"
+            )
+            raise typer.Exit(1)
+        console.print("\n[green]No regressions[/green]")
+
+    except typer.Exit:
+        raise
+    except Exception as e:
+        console.print(f"\n[red]Error:[/red] {str(e)}")
+        raise typer.Exit(1)
+
+
 @app.command()
 def info():
     """
@@ -359,23 +971,25 @@ def _extract_with_logging(ai_extractor, file_path, console):
     async def extract_with_progress():
         """Run extraction with progress updates."""
         start_time = time.time()
-        
-        # Step 1: Basic extraction
-        console.print("  [dim]>[/dim] Running Phase 1 extraction (OCR/PDF parsing)...")
-        basic_result = await ai_extractor._basic_extraction(file_path)
-        console.print(f"    [green]+[/green] Text extracted: {len(basic_result.raw_text)} chars")
-        
-        # Step 2: Prepare state
-        initial_state = ai_extractor._prepare_agent_state(file_path, basic_result)
-        console.print("  [dim]>[/dim] Starting AI agent workflow...\n")
-        
-        # Step 3: Run agents with logging
-        final_state = await _run_agents_with_logging(
-            ai_extractor.agent_graph,
-            initial_state,
-            console
-        )
-        
+
+        with trace() as spans, track_usage() as llm_calls:
+            # Step 1: Basic extraction
+            console.print("  [dim]>[/dim] Running Phase 1 extraction (OCR/PDF parsing)...")
+            basic_result = await ai_extractor._basic_extraction(file_path)
+            spans.add(basic_result.spans)
+            console.print(f"    [green]+[/green] Text extracted: {len(basic_result.raw_text)} chars")
+
+            # Step 2: Prepare state
+            initial_state = ai_extractor._prepare_agent_state(file_path, basic_result)
+            console.print("  [dim]>[/dim] Starting AI agent workflow...\n")
+
+            # Step 3: Run agents with logging
+            final_state = await _run_agents_with_logging(
+                ai_extractor.agent_graph,
+                initial_state,
+                console
+            )
+
         # Step 4: Build result
         processing_time = time.time() - start_time
         result = ai_extractor._build_extraction_result(
@@ -383,8 +997,10 @@ def _extract_with_logging(ai_extractor, file_path, console):
             basic_result,
             final_state,
             processing_time,
+            llm_calls,
         )
-        
+        result.spans = list(spans.spans)
+
         return result
     
     return asyncio.run(extract_with_progress())
@@ -402,9 +1018,33 @@ async def _run_agents_with_logging(graph, initial_state, console):
     # Manual workflow execution with logging
     state = initial_state
     
+    # Parallel topology: let LangGraph schedule the fan-out, reporting agents as they finish
+    if graph.topology == "parallel":
+        from langgraph.graph import END
+
+        console.print("  [yellow]1. Parallel Workflow[/yellow] - Schema/table/vision agents run concurrently...")
+        async for node, update in graph.stream(state):
+            if node == END:
+                state = update
+                continue
+            for step in update.get("processing_steps", [])[-1:]:
+                console.print(f"     [green]+[/green] {step}")
+        console.print(f"\n  [bold green]DONE Workflow complete![/bold green]\n")
+        return state
+    
+    # Fast mode: single fused call, only continue if not confident enough
+    if graph.fast_mode and graph.fused_agent:
+        console.print("  [yellow]0. Fused Agent[/yellow] - Single-call extraction...")
+        state = await graph._run_agent(graph.fused_agent, state)
+        if state.get("next_action") == "complete":
+            console.print(f"     [green]+[/green] Confidence: {state.get('confidence_score', 0):.1%}")
+            console.print(f"\n  [bold green]DONE Workflow complete![/bold green] (1 agent call)\n")
+            return state
+        console.print("     [yellow]![/yellow] Low confidence, running full agent workflow")
+    
     # Step 1: Planner
     console.print("  [yellow]1. Planner Agent[/yellow] - Creating extraction strategy...")
-    state = await graph.planner_agent.process(state)
+    state = await graph._run_agent(graph.planner_agent, state)
     plan = state.get("structured_data", {}).get("extraction_plan", {})
     console.print(f"     [green]+[/green] Strategy: {plan.get('extraction_approach', 'unknown')} approach")
     console.print(f"     [green]+[/green] Category: {plan.get('document_category', 'unknown')}")
@@ -415,7 +1055,7 @@ async def _run_agents_with_logging(graph, initial_state, console):
         
         # Supervisor decides
         console.print(f"\n  [yellow]{step_count+1}. Supervisor Agent[/yellow] - Deciding next step...")
-        state = await graph.supervisor_agent.process(state)
+        state = await graph._run_agent(graph.supervisor_agent, state)
         next_action = state.get("next_action", "complete")
         
         if next_action == "complete":
@@ -428,14 +1068,14 @@ async def _run_agents_with_logging(graph, initial_state, console):
         step_count += 1
         if next_action == "schema":
             console.print(f"  [yellow]{step_count+1}. Schema Agent[/yellow] - Detecting document type...")
-            state = await graph.schema_agent.process(state)
+            state = await graph._run_agent(graph.schema_agent, state)
             schema = state.get("detected_schema", {})
             console.print(f"     [green]+[/green] Type: {schema.get('document_type', 'unknown')}")
             console.print(f"     [green]+[/green] Confidence: {schema.get('confidence', 0):.1%}")
             
         elif next_action == "extraction":
             console.print(f"  [yellow]{step_count+1}. Extraction Agent[/yellow] - Extracting structured data...")
-            state = await graph.extraction_agent.process(state)
+            state = await graph._run_agent(graph.extraction_agent, state)
             data = state.get("structured_data", {})
             entities = state.get("entities", [])
             console.print(f"     [green]+[/green] Fields extracted: {len([k for k in data.keys() if k not in ['extraction_plan', 'ai_processing', 'quality_critique']])}")
@@ -443,18 +1083,18 @@ async def _run_agents_with_logging(graph, initial_state, console):
             
         elif next_action == "table_parser":
             console.print(f"  [yellow]{step_count+1}. Table Parser Agent[/yellow] - Analyzing tables...")
-            state = await graph.table_agent.process(state)
+            state = await graph._run_agent(graph.table_agent, state)
             tables = state.get("tables", [])
             console.print(f"     [green]+[/green] Tables processed: {len(tables)}")
             
         elif next_action == "vision" and graph.vision_agent:
             console.print(f"  [yellow]{step_count+1}. Vision Agent (gemma3)[/yellow] - Analyzing image...")
-            state = await graph.vision_agent.process(state)
+            state = await graph._run_agent(graph.vision_agent, state)
             console.print(f"     [green]+[/green] Vision analysis complete")
             
         elif next_action == "critic":
             console.print(f"  [yellow]{step_count+1}. Critic Agent[/yellow] - Validating quality...")
-            state = await graph.critic_agent.process(state)
+            state = await graph._run_agent(graph.critic_agent, state)
             critique = state.get("structured_data", {}).get("quality_critique", {})
             console.print(f"     [green]+[/green] Quality: {critique.get('overall_quality', 'unknown')}")
             console.print(f"     [green]+[/green] Confidence: {state.get('confidence_score', 0):.1%}")
@@ -478,7 +1118,7 @@ def _configure_llm_provider(provider: str, model: str, console):
     from agent_extract.core.config import config
     
     # Validate provider
-    valid_providers = ["ollama", "gemini", "openai", "groq", "anthropic"]
+    valid_providers = ["ollama", "gemini", "openai", "groq", "anthropic", "fake"]
     if provider.lower() not in valid_providers:
         console.print(f"[yellow]Warning:[/yellow] Unknown provider '{provider}'. Using 'ollama'")
         provider = "ollama"
@@ -541,6 +1181,9 @@ def _show_summary(result):
         detected_type = ai_info.get("detected_document_type")
         if detected_type:
             console.print(f"  Detected Type: [cyan]{detected_type}[/cyan]")
+        usage = document_usage(result.structured_data)
+        if usage:
+            console.print(f"  LLM Usage: [cyan]{_format_usage(usage)}[/cyan]")
     
     if result.processing_time:
         console.print(f"  Processing Time: [cyan]{result.processing_time:.2f}s[/cyan]")
@@ -551,6 +1194,38 @@ def _show_summary(result):
     console.print()
 
 
+def _format_usage(usage) -> str:
+    """One-line LLM call, token and cost total."""
+    text = (
+        f"{usage.calls} calls, {usage.input_tokens:,} in / {usage.output_tokens:,} out tokens, "
+        f"${usage.cost:.4f}"
+    )
+    if usage.unpriced_calls:
+        text += f" ({usage.unpriced_calls} calls without a price)"
+    return text
+
+
+def _metrics_export(metrics_file: Optional[Path]):
+    """Periodic metrics textfile writer for long runs, or a no-op."""
+    from contextlib import nullcontext
+    from agent_extract.core.config import config as cfg
+
+    path = metrics_file or cfg.metrics_textfile
+    if path is None:
+        return nullcontext()
+    return TextfileExporter(path, interval=cfg.metrics_interval_seconds)
+
+
+def _show_spans(spans):
+    """Show time spent per stage."""
+    table = Table(title="Stage Timings")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Seconds", justify="right")
+    for name, seconds in summarize_spans(spans).items():
+        table.add_row(name, f"{seconds:.3f}")
+    console.print(table)
+
+
 if __name__ == "__main__":
     app()
 
@@ -2,7 +2,7 @@
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -42,7 +42,7 @@ class Config(BaseSettings):
     # LLM settings (supports local and cloud providers)
     llm_provider: str = Field(
         default="gemini",
-        description="LLM provider: gemini (default), openai, groq, anthropic, ollama"
+        description="LLM provider: gemini (default), openai, groq, anthropic, ollama, fake (offline)"
     )
     llm_model: str = Field(
         default="gemini-pro",
@@ -68,6 +68,161 @@ class Config(BaseSettings):
     enable_entity_extraction: bool = Field(default=True, description="Enable entity extraction")
     enable_vision_model: bool = Field(default=True, description="Enable vision model")
     parallel_processing: bool = Field(default=False, description="Enable parallel processing")
+    chunk_max_chars: int = Field(
+        default=3000, description="Maximum characters per chunk sent to an agent"
+    )
+    chunk_concurrency: int = Field(
+        default=4, description="Maximum chunks processed concurrently per document"
+    )
+    fast_mode_confidence_threshold: float = Field(
+        default=0.8,
+        description="Minimum self-assessed confidence to accept single-call (fast mode) extraction",
+    )
+    early_exit: bool = Field(
+        default=False,
+        description="Finish the agent workflow once extraction meets the early-exit criteria",
+    )
+    early_exit_min_confidence: float = Field(
+        default=0.85, description="Minimum schema detection confidence for an early exit"
+    )
+    early_exit_required_fields: List[str] = Field(
+        default_factory=list,
+        description="Fields that must be extracted for an early exit (empty = detected key fields)",
+    )
+    early_exit_require_validation: bool = Field(
+        default=True,
+        description=(
+            "Early exit also needs a clean run: no errors or conflicting values, and every "
+            "required value found in the document text"
+        ),
+    )
+    enable_tracing: bool = Field(
+        default=True, description="Record per-stage timing spans on extraction results"
+    )
+    llm_prices: Dict[str, Dict[str, float]] = Field(
+        default_factory=dict,
+        description=(
+            "USD per million tokens by model, e.g. "
+            '{"gpt-4o-mini": {"input": 0.15, "output": 0.6}}; extends the built-in table'
+        ),
+    )
+    enable_rate_limiting: bool = Field(
+        default=True, description="Limit and retry cloud LLM calls client-side"
+    )
+    llm_rate_limits: Dict[str, Dict[str, float]] = Field(
+        default_factory=dict,
+        description=(
+            "Limits by model or provider, e.g. "
+            '{"gpt-4o-mini": {"rpm": 500, "tpm": 200000}, "groq": {"rpm": 30}}'
+        ),
+    )
+    llm_initial_concurrency: int = Field(
+        default=4, description="Starting concurrent calls per cloud model (adapted by AIMD)"
+    )
+    llm_max_concurrency: int = Field(
+        default=32, description="Ceiling for adaptive concurrent calls per cloud model"
+    )
+    llm_max_retries: int = Field(default=5, description="Retries of rate-limited LLM calls")
+    llm_backoff_base_seconds: float = Field(
+        default=1.0, description="First retry backoff ceiling (doubles per retry, jittered)"
+    )
+    llm_backoff_max_seconds: float = Field(default=60.0, description="Maximum retry backoff")
+    llm_latency_backoff_factor: float = Field(
+        default=3.0,
+        description="Calls slower than this multiple of the average reduce concurrency",
+    )
+    llm_structured_output: bool = Field(
+        default=True,
+        description="Request agent answers in the provider's JSON-schema/tool-calling mode",
+    )
+    llm_structured_output_methods: Dict[str, str] = Field(
+        default_factory=lambda: {
+            "openai": "json_schema",
+            "ollama": "json_schema",
+            "groq": "function_calling",
+            "gemini": "function_calling",
+            "anthropic": "function_calling",
+            "fake": "json_mode",
+        },
+        description="Structured-output method by provider (json_schema, function_calling, json_mode)",
+    )
+    llm_stream_early_stop: bool = Field(
+        default=True,
+        description="Stream routing answers and stop generation once the decision is complete",
+    )
+    llm_timeout_seconds: float = Field(default=120.0, description="Timeout per LLM request")
+    agent_timeout_seconds: Optional[float] = Field(
+        default=300.0, description="Deadline per agent run (None = unbounded)"
+    )
+    agent_timeouts: Dict[str, float] = Field(
+        default_factory=dict,
+        description='Per-agent deadlines by agent class, e.g. {"ContentExtractionAgent": 600}',
+    )
+    document_timeout_seconds: Optional[float] = Field(
+        default=900.0, description="Deadline for the agent workflow of one document"
+    )
+    llm_hedge_model: Optional[str] = Field(
+        default=None, description="Model a duplicate request goes to when a call is slow"
+    )
+    llm_hedge_provider: Optional[str] = Field(
+        default=None, description="Provider of the hedge model (defaults to the agent's)"
+    )
+    llm_hedge_percentile: float = Field(
+        default=95.0, description="Latency percentile after which a request is hedged"
+    )
+    llm_hedge_min_samples: int = Field(
+        default=20, description="Calls observed before hedging starts"
+    )
+    fake_llm_script: Optional[Path] = Field(
+        default=None,
+        description="JSON file of response rules for the fake provider (replaces the built-in script)",
+    )
+    fake_llm_cassette: Optional[Path] = Field(
+        default=None, description="Recorded responses (JSONL) the fake provider replays"
+    )
+    fake_llm_latency: str = Field(
+        default="constant:0",
+        description="Fake provider latency in seconds: constant:S, uniform:A,B, normal:MU,SD, "
+        "lognormal:MEDIAN,SIGMA, exponential:MEAN or recorded",
+    )
+    fake_llm_tokens_per_second: str = Field(
+        default="constant:0",
+        description="Fake provider output token rate, same forms as fake_llm_latency (0 = instant)",
+    )
+    fake_llm_seed: int = Field(default=0, description="Seed of the fake provider's randomness")
+    llm_record_cassette: Optional[Path] = Field(
+        default=None, description="Append every real LLM call to this cassette for later replay"
+    )
+    llm_max_connections: int = Field(
+        default=20, description="Maximum open connections per LLM endpoint"
+    )
+    llm_max_keepalive_connections: int = Field(
+        default=10, description="Idle connections kept alive per LLM endpoint"
+    )
+    llm_keepalive_seconds: float = Field(
+        default=60.0, description="Seconds an idle LLM connection is kept alive"
+    )
+    prompt_token_budgets: Dict[str, int] = Field(
+        default_factory=lambda: {
+            "planner": 300,
+            "schema": 400,
+            "fused": 1000,
+            "critic": 500,
+            "validation": 400,
+            "default": 500,
+        },
+        description="Tokens of document text each agent may put in its prompt",
+    )
+    llm_context_window: Optional[int] = Field(
+        default=None,
+        description="Model context window in tokens (defaults to a per-model table)",
+    )
+    metrics_textfile: Optional[Path] = Field(
+        default=None, description="File batch, watch and worker runs write metrics to"
+    )
+    metrics_interval_seconds: float = Field(
+        default=15.0, description="Seconds between metrics textfile writes"
+    )
     
     # Cache settings
     enable_cache: bool = Field(default=True, description="Enable result caching")
@@ -81,7 +236,33 @@ class Config(BaseSettings):
     # API settings (for Phase 3)
     api_host: str = Field(default="0.0.0.0", description="API host")
     api_port: int = Field(default=8000, description="API port")
-    api_workers: int = Field(default=1, description="API workers")
+    api_workers: int = Field(
+        default=1, description="API reader worker processes (warm OCR/readers)"
+    )
+    api_max_concurrency: int = Field(
+        default=4, description="Maximum extractions the API runs at once"
+    )
+    api_max_pending: int = Field(
+        default=32, description="Maximum queued API jobs before rejecting with 429"
+    )
+    api_tenant_concurrency: int = Field(
+        default=2, description="Maximum API jobs running at once per tenant"
+    )
+    api_reserved_interactive: int = Field(
+        default=1, description="API worker slots bulk jobs may not use"
+    )
+    api_job_db: Optional[Path] = Field(
+        default=None, description="SQLite job store (defaults to data_dir/jobs.sqlite)"
+    )
+    api_spool_dir: Optional[Path] = Field(
+        default=None, description="Directory for spooled uploads (defaults to data_dir/uploads)"
+    )
+    api_job_retention_hours: Optional[float] = Field(
+        default=168.0, description="Hours finished API jobs and results are kept (None keeps all)"
+    )
+    api_job_max_rows: Optional[int] = Field(
+        default=10000, description="Finished API jobs kept in the job store (None keeps all)"
+    )
     
     model_config = {
         "env_file": ".env",
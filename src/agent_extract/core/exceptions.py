@@ -1,5 +1,7 @@
 """Custom exceptions for agent-extract."""
 
+from typing import Optional
+
 
 class AgentExtractError(Exception):
     """Base exception for all agent-extract errors."""
@@ -43,3 +45,22 @@ class ConfigurationError(AgentExtractError):
     pass
 
 
+class JobFailedError(ExtractionError):
+    """Raised when a queued extraction job failed."""
+
+    def __init__(self, message: str, error_type: Optional[str] = None):
+        """
+        Initialize job failure.
+
+        Args:
+            message: Error message of the failed job
+            error_type: Class name of the exception the job raised
+        """
+        super().__init__(message)
+        self.error_type = error_type
+
+
+class ServiceBusyError(AgentExtractError):
+    """Raised when the extraction service has no capacity for more work."""
+
+    pass
@@ -0,0 +1,484 @@
+"""Offline stand-in LLM: scripted and replayed responses with simulated latency."""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable, RunnableMap, RunnablePassthrough
+from pydantic import BaseModel, Field, PrivateAttr
+
+from agent_extract.core.exceptions import ConfigurationError
+from agent_extract.core.metrics import CACHE_LOOKUPS
+from agent_extract.core.usage import CHARS_PER_TOKEN
+
+# Rules matched against the prompt, in order, when a call is not in the
+# cassette. Each rule's "match" patterns must all be found and none of its
+# "exclude" patterns; "response" is returned as is (dicts as JSON). This
+# script walks the supervised graph schema -> extraction -> critic.
+DEFAULT_SCRIPT: List[Dict[str, Any]] = [
+    {
+        "match": ["supervisor AI", "NOT YET DETECTED"],
+        "response": {"next_agent": "schema", "reason": "Document type unknown"},
+    },
+    {
+        "match": ["supervisor AI"],
+        "exclude": [r"Entities: \d+"],
+        "response": {"next_agent": "extraction", "reason": "No data extracted yet"},
+    },
+    {
+        "match": ["supervisor AI"],
+        "response": {"next_agent": "critic", "reason": "Review the extraction"},
+    },
+    {
+        "match": ["extraction planning expert"],
+        "response": {
+            "document_category": "invoice",
+            "extraction_approach": "basic",
+            "key_fields_to_extract": ["invoice_number", "date", "vendor_name", "total"],
+            "has_tabular_data": False,
+            "has_form_fields": False,
+            "complexity": "simple",
+            "recommended_agents": ["schema", "extraction"],
+            "estimated_accuracy": 0.9,
+            "notes": "",
+        },
+    },
+    {
+        "match": ["document classification expert"],
+        "response": {
+            "document_type": "invoice",
+            "confidence": 0.9,
+            "key_fields": ["invoice_number", "date", "vendor_name", "total"],
+            "has_tables": False,
+            "has_forms": False,
+            "language": "en",
+        },
+    },
+    {
+        "match": ["In ONE pass"],
+        "response": {
+            "plan": {
+                "document_category": "invoice",
+                "extraction_approach": "basic",
+                "key_fields_to_extract": ["invoice_number", "date", "vendor_name", "total"],
+                "complexity": "simple",
+            },
+            "document_type": "invoice",
+            "key_fields": ["invoice_number", "date", "vendor_name", "total"],
+            "has_tables": False,
+            "has_forms": False,
+            "language": "en",
+            "fields": {
+                "invoice_number": "INV-0001",
+                "date": "2025-01-15",
+                "vendor_name": "Acme Corp",
+                "total": "100.00",
+            },
+            "entities": [],
+            "confidence": 0.9,
+            "missing_fields": [],
+        },
+    },
+    {
+        "match": ["expert at extracting structured data"],
+        "response": {
+            "invoice_number": "INV-0001",
+            "date": "2025-01-15",
+            "vendor_name": "Acme Corp",
+            "total": "100.00",
+        },
+    },
+    {
+        "match": ["quality assurance expert"],
+        "response": {
+            "overall_quality": "good",
+            "confidence_score": 0.9,
+            "completeness": 0.9,
+            "accuracy": 0.9,
+            "issues_found": [],
+            "missing_fields": [],
+            "corrections": {},
+            "recommendations": [],
+            "final_verdict": "approve",
+        },
+    },
+    {
+        "match": ["data quality expert"],
+        "response": {
+            "is_valid": True,
+            "confidence": 0.9,
+            "issues": [],
+            "corrections": {},
+            "completeness_score": 0.9,
+        },
+    },
+    {"match": ["table detection expert"], "response": {"tables": []}},
+    {"match": ["table analysis expert"], "response": {"issues": []}},
+    {"match": [], "response": "{}"},
+]
+
+# Distributions accepted for latency and token rate: name -> (parameters, sampler)
+_DISTRIBUTIONS: Dict[str, Tuple[int, Callable[[random.Random, List[float]], float]]] = {
+    "constant": (1, lambda rng, p: p[0]),
+    "uniform": (2, lambda rng, p: rng.uniform(p[0], p[1])),
+    "normal": (2, lambda rng, p: rng.gauss(p[0], p[1])),
+    "lognormal": (2, lambda rng, p: rng.lognormvariate(math.log(p[0]), p[1])),
+    "exponential": (1, lambda rng, p: rng.expovariate(1 / p[0]) if p[0] > 0 else 0.0),
+}
+
+_cassette_lock = threading.Lock()
+
+
+def parse_distribution(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parse a distribution such as "uniform:0.5,2" into a sampler.
+
+    Args:
+        spec: constant:S (or just S), uniform:A,B, normal:MU,SD,
+            lognormal:MEDIAN,SIGMA or exponential:MEAN
+
+    Returns:
+        Function drawing a non-negative value from a random generator
+
+    Raises:
+        ConfigurationError: If the spec is malformed
+    """
+    name, _, params = spec.strip().partition(":")
+    if not params:
+        name, params = "constant", name
+    name = name.lower()
+    if name not in _DISTRIBUTIONS:
+        raise ConfigurationError(
+            f"Unknown distribution: {spec}. Supported: {sorted(_DISTRIBUTIONS)}"
+        )
+    arity, sampler = _DISTRIBUTIONS[name]
+    try:
+        values = [float(value) for value in params.split(",")]
+    except ValueError as e:
+        raise ConfigurationError(f"Invalid distribution parameters: {spec}") from e
+    if len(values) != arity or (name == "lognormal" and values[0] <= 0):
+        raise ConfigurationError(f"Invalid distribution parameters: {spec}")
+    return lambda rng: max(0.0, sampler(rng, values))
+
+
+def message_key(messages: List[BaseMessage]) -> str:
+    """
+    Cassette key of a prompt.
+
+    Args:
+        messages: Messages sent to the model
+
+    Returns:
+        SHA-256 hex digest of the message roles and contents
+    """
+    payload = json.dumps(
+        [[message.type, message.content] for message in messages], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def load_cassette(path: Path) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Read recorded calls, grouped by prompt key.
+
+    Args:
+        path: Cassette file (JSONL)
+
+    Returns:
+        Records per key, in recording order
+
+    Raises:
+        ConfigurationError: If the file does not exist
+    """
+    if not path.exists():
+        raise ConfigurationError(f"LLM cassette not found: {path}")
+    recordings: Dict[str, List[Dict[str, Any]]] = {}
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                record = json.loads(line)
+                recordings.setdefault(record["key"], []).append(record)
+    return recordings
+
+
+def load_script(path: Path) -> List[Dict[str, Any]]:
+    """
+    Read response rules for the fake provider.
+
+    Args:
+        path: JSON file holding a list of rules
+
+    Returns:
+        Rules
+
+    Raises:
+        ConfigurationError: If the file is missing or not a list of rules
+    """
+    if not path.exists():
+        raise ConfigurationError(f"Fake LLM script not found: {path}")
+    rules = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(rules, list) or not all(
+        isinstance(rule, dict) and "response" in rule for rule in rules
+    ):
+        raise ConfigurationError(f"Fake LLM script must be a list of rules with a response: {path}")
+    return rules
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that answers without a network.
+
+    A call is answered from the cassette when its prompt was recorded
+    (repeated prompts replay their recordings in turn), otherwise by the
+    first script rule matching the prompt. The call then takes the
+    sampled latency plus the response's tokens at the sampled token rate,
+    so concurrency, deadlines and hedging behave as they would against a
+    real endpoint. Token usage is reported like a provider would.
+    """
+
+    model: str = "fake"
+    script: List[Dict[str, Any]] = Field(default_factory=lambda: list(DEFAULT_SCRIPT))
+    cassette: Optional[Path] = None
+    latency: str = "constant:0"
+    tokens_per_second: str = "constant:0"
+    seed: int = 0
+
+    _rng: random.Random = PrivateAttr()
+    _rng_lock: Any = PrivateAttr()
+    _latency: Optional[Callable[[random.Random], float]] = PrivateAttr()
+    _token_rate: Callable[[random.Random], float] = PrivateAttr()
+    _recordings: Dict[str, List[Dict[str, Any]]] = PrivateAttr()
+    _replayed: Dict[str, int] = PrivateAttr()
+    _rules: List[Tuple[List[re.Pattern], List[re.Pattern], str]] = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+        # "recorded" replays cassette latencies (0 for calls not in it)
+        self._latency = None if self.latency == "recorded" else parse_distribution(self.latency)
+        self._token_rate = parse_distribution(self.tokens_per_second)
+        self._recordings = load_cassette(self.cassette) if self.cassette else {}
+        self._replayed = {}
+        self._rules = [
+            (
+                [re.compile(pattern) for pattern in rule.get("match", [])],
+                [re.compile(pattern) for pattern in rule.get("exclude", [])],
+                rule["response"] if isinstance(rule["response"], str)
+                else json.dumps(rule["response"], indent=2),
+            )
+            for rule in self.script
+        ]
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def with_structured_output(
+        self,
+        schema: type[BaseModel],
+        *,
+        method: Optional[str] = None,
+        include_raw: bool = False,
+        **kwargs: Any,
+    ) -> Runnable:
+        """
+        JSON mode: the scripted or replayed text validated against the schema.
+
+        Args:
+            schema: Pydantic response model
+            method: Ignored; the fake only has JSON mode
+            include_raw: Return {"raw", "parsed", "parsing_error"} instead of
+                the parsed model alone
+
+        Returns:
+            Runnable answering with the parsed model
+        """
+        parser = PydanticOutputParser(pydantic_object=schema)
+        if not include_raw:
+            return self | parser
+
+        parse = RunnablePassthrough.assign(
+            parsed=itemgetter("raw") | parser, parsing_error=lambda _: None
+        )
+        unparsed = RunnablePassthrough.assign(parsed=lambda _: None)
+        return RunnableMap(raw=self) | parse.with_fallbacks(
+            [unparsed], exception_key="parsing_error"
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text, usage, latency, token_seconds = self._respond(messages)
+        time.sleep(latency + usage["output_tokens"] * token_seconds)
+        return self._result(text, usage)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text, usage, latency, token_seconds = self._respond(messages)
+        await asyncio.sleep(latency + usage["output_tokens"] * token_seconds)
+        return self._result(text, usage)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """Stream the response a token at a time; usage comes with the last chunk."""
+        text, usage, latency, token_seconds = self._respond(messages)
+        await asyncio.sleep(latency)
+        pieces = [text[i:i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)]
+        for index, piece in enumerate(pieces, start=1):
+            await asyncio.sleep(token_seconds)
+            last = index == len(pieces)
+            chunk = AIMessageChunk(content=piece, usage_metadata=usage if last else None)
+            yield ChatGenerationChunk(message=chunk)
+
+    def _respond(
+        self, messages: List[BaseMessage]
+    ) -> Tuple[str, Dict[str, int], float, float]:
+        """(response text, usage, latency, seconds per output token) for a prompt."""
+        key = message_key(messages)
+        record = self._replay(key)
+        if self.cassette:
+            CACHE_LOOKUPS.inc(cache="llm_cassette", result="miss" if record is None else "hit")
+
+        if record is not None:
+            text = record["response"]
+            usage = record.get("usage") or {}
+        else:
+            prompt = "\n".join(str(message.content) for message in messages)
+            text = self._scripted(prompt)
+            usage = {}
+        input_tokens = usage.get("input_tokens")
+        if input_tokens is None:
+            input_tokens = -(-sum(len(str(m.content)) for m in messages) // CHARS_PER_TOKEN)
+        output_tokens = usage.get("output_tokens")
+        if output_tokens is None:
+            output_tokens = -(-len(text) // CHARS_PER_TOKEN)
+
+        with self._rng_lock:
+            if self._latency is None:
+                latency = float(record.get("latency", 0.0)) if record else 0.0
+            else:
+                latency = self._latency(self._rng)
+            rate = self._token_rate(self._rng)
+
+        usage = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        return text, usage, latency, 1 / rate if rate > 0 else 0.0
+
+    def _replay(self, key: str) -> Optional[Dict[str, Any]]:
+        """Next recording of a prompt (cycling through repeats), or None."""
+        records = self._recordings.get(key)
+        if not records:
+            return None
+        with self._rng_lock:
+            index = self._replayed.get(key, 0)
+            self._replayed[key] = index + 1
+        return records[index % len(records)]
+
+    def _scripted(self, prompt: str) -> str:
+        """Response of the first rule matching the prompt."""
+        for required, excluded, response in self._rules:
+            if all(p.search(prompt) for p in required) and not any(
+                p.search(prompt) for p in excluded
+            ):
+                return response
+        return "{}"
+
+    @staticmethod
+    def _result(text: str, usage: Dict[str, int]) -> ChatResult:
+        message = AIMessage(content=text, usage_metadata=usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class RecordingChatModel(BaseChatModel):
+    """
+    Wrap a real chat model and append every call to a cassette.
+
+    The cassette can later be replayed by FakeChatModel, which answers the
+    same prompts with the recorded responses, usage and latencies.
+    """
+
+    llm: BaseChatModel
+    path: Path
+    provider: str = ""
+    model: str = ""
+
+    @property
+    def _llm_type(self) -> str:
+        return f"recording-{self.llm._llm_type}"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        start = time.perf_counter()
+        response = self.llm.invoke(messages, stop=stop, **kwargs)
+        self._record(messages, response, time.perf_counter() - start)
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        start = time.perf_counter()
+        response = await self.llm.ainvoke(messages, stop=stop, **kwargs)
+        self._record(messages, response, time.perf_counter() - start)
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+    def _record(self, messages: List[BaseMessage], response: BaseMessage, latency: float) -> None:
+        """Append one call to the cassette."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        record = {
+            "key": message_key(messages),
+            "provider": self.provider,
+            "model": self.model,
+            "messages": [
+                {"role": message.type, "content": message.content} for message in messages
+            ],
+            "response": response.content if isinstance(response.content, str)
+            else json.dumps(response.content, default=str),
+            "usage": {
+                name: usage[name] for name in ("input_tokens", "output_tokens") if name in usage
+            },
+            "latency": round(latency, 4),
+        }
+        line = json.dumps(record, default=str)
+        with _cassette_lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
@@ -0,0 +1,135 @@
+"""Latency tracking and hedged LLM requests."""
+
+import asyncio
+import math
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from agent_extract.core.config import config
+from agent_extract.core.metrics import LLM_HEDGES
+
+T = TypeVar("T")
+
+# Latencies kept per model for the percentile
+LATENCY_WINDOW = 200
+
+
+class LatencyTracker:
+    """Recent call latencies per provider/model."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        """
+        Initialize latency tracker.
+
+        Args:
+            window: Latencies kept per model
+        """
+        self.window = window
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, model: str, seconds: float) -> None:
+        """
+        Record a call's latency.
+
+        Args:
+            provider: LLM provider
+            model: Model name
+            seconds: Call duration
+        """
+        with self._lock:
+            samples = self._samples.setdefault((provider, model), deque(maxlen=self.window))
+            samples.append(seconds)
+
+    def percentile(self, provider: str, model: str, percentile: float) -> Optional[float]:
+        """
+        Latency percentile of recent calls.
+
+        Args:
+            provider: LLM provider
+            model: Model name
+            percentile: 0-100
+
+        Returns:
+            Seconds, or None until config.llm_hedge_min_samples calls were seen
+        """
+        with self._lock:
+            samples = sorted(self._samples.get((provider, model), ()))
+        if not samples or len(samples) < config.llm_hedge_min_samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(percentile / 100 * len(samples)) - 1))
+        return samples[index]
+
+    def reset(self) -> None:
+        """Forget all latencies."""
+        with self._lock:
+            self._samples.clear()
+
+
+latencies = LatencyTracker()
+
+
+async def hedged(
+    primary: Callable[[], Awaitable[T]],
+    hedge: Callable[[], Awaitable[T]],
+    delay: float,
+) -> Tuple[T, bool]:
+    """
+    Run primary; if it is still running after delay, race it against hedge.
+
+    The first successful response wins and the other request is
+    cancelled. If one fails, the other's outcome is awaited.
+
+    Args:
+        primary: Coroutine factory for the normal request
+        hedge: Coroutine factory for the duplicate request
+        delay: Seconds to give the primary before hedging
+
+    Returns:
+        (response, hedge_won)
+
+    Raises:
+        Exception: The primary's error if both requests fail
+    """
+    first = asyncio.ensure_future(primary())
+    tasks = [first]
+    try:
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            LLM_HEDGES.inc(result="not_needed")
+            return first.result(), False
+
+        second = asyncio.ensure_future(hedge())
+        tasks.append(second)
+        pending = {first, second}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is None:
+                    won = task is second
+                    LLM_HEDGES.inc(result="hedge" if won else "primary")
+                    return task.result(), won
+        LLM_HEDGES.inc(result="failed")
+        return first.result(), False
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        # Let cancelled requests unwind (close their connections) before returning
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def hedge_delay(provider: str, model: str) -> Optional[float]:
+    """
+    How long to wait for a model before sending a hedged request.
+
+    Args:
+        provider: LLM provider of the primary request
+        model: Model of the primary request
+
+    Returns:
+        config.llm_hedge_percentile latency of recent calls, or None if
+        there are too few samples to hedge yet
+    """
+    return latencies.percentile(provider, model, config.llm_hedge_percentile)
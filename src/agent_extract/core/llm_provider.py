@@ -1,11 +1,19 @@
-"""LLM provider abstraction for multiple backends (Ollama, OpenAI, Gemini, Groq)."""
+"""LLM provider abstraction for multiple backends (Ollama, OpenAI, Gemini, Groq, offline fake)."""
 
-from typing import Optional, Literal
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional, Literal, Tuple
 from enum import Enum
 
+import httpx
 from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel
 from agent_extract.core.config import config
 from agent_extract.core.exceptions import ConfigurationError
+from agent_extract.core.metrics import CACHE_LOOKUPS
 
 
 class LLMProvider(str, Enum):
@@ -16,10 +24,90 @@ class LLMProvider(str, Enum):
     GEMINI = "gemini"
     GROQ = "groq"
     ANTHROPIC = "anthropic"
+    FAKE = "fake"
+
+
+# Providers whose client has a JSON mode, used for open schemas (free
+# key/value objects) that JSON schemas and tool definitions cannot describe
+JSON_MODE_PROVIDERS = ("openai", "ollama", "groq", "fake")
+
+
+class StructuredResponse:
+    """
+    Answer of a structured-output call: the parsed model and the raw message.
+
+    Content and usage come from the raw message, so code that accounts for
+    plain responses handles this one unchanged.
+    """
+
+    def __init__(self, raw: Any, parsed: Optional[BaseModel]):
+        """
+        Initialize structured response.
+
+        Args:
+            raw: Message the model returned
+            parsed: Response model, or None if the answer did not validate
+        """
+        self.raw = raw
+        self.parsed = parsed
+
+    @property
+    def content(self) -> str:
+        """Message text; for tool-calling providers, the tool arguments as JSON."""
+        tool_calls = getattr(self.raw, "tool_calls", None)
+        if not self.raw.content and tool_calls:
+            return json.dumps(tool_calls[0]["args"])
+        return self.raw.content
+
+    @property
+    def usage_metadata(self) -> Optional[Dict[str, Any]]:
+        """Token usage the provider reported."""
+        return getattr(self.raw, "usage_metadata", None)
+
+
+class _PerLoopTransport(httpx.AsyncBaseTransport):
+    """
+    Async httpx transport with one keep-alive pool per event loop.
+
+    Async connections belong to the loop that opened them, so a pool
+    shared by extractors running in different loops (extract_sync, batch
+    runs, tests) would hand out dead connections. Pools of closed loops are
+    dropped when a new loop first sends a request.
+    """
+
+    def __init__(self, limits: httpx.Limits):
+        self._limits = limits
+        self._pools: Dict[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            for other in list(self._pools):
+                if other.is_closed():
+                    self._pools.pop(other, None)
+            pool = self._pools[loop] = httpx.AsyncHTTPTransport(limits=self._limits)
+        return await pool.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        # Clients are shared; closing one must not close the pool under the others
+        pass
 
 
 class LLMFactory:
-    """Factory for creating LLM instances from different providers."""
+    """
+    Factory for creating LLM instances from different providers.
+
+    Clients are memoised by provider, model, temperature and endpoint, so
+    the agents of a graph, and every extractor in the process, share one
+    client and its keep-alive connections. Ollama, OpenAI and Groq clients
+    also share one connection pool per endpoint.
+    """
+
+    _clients: Dict[Tuple, BaseChatModel] = {}
+    _structured: Dict[Tuple[int, type], Tuple[BaseChatModel, Optional[Runnable]]] = {}
+    _transports: Dict[str, Tuple[httpx.HTTPTransport, _PerLoopTransport]] = {}
+    _lock = threading.RLock()
 
     @staticmethod
     def create_llm(
@@ -28,16 +116,19 @@ class LLMFactory:
         temperature: float = 0.1,
         api_key: Optional[str] = None,
         is_vision: bool = False,
+        shared: bool = True,
     ) -> BaseChatModel:
         """
         Create an LLM instance from the specified provider.
 
         Args:
-            provider: LLM provider (ollama, openai, gemini, groq)
+            provider: LLM provider (ollama, openai, gemini, groq, anthropic, fake)
             model_name: Model name
             temperature: LLM temperature
             api_key: API key for cloud providers
             is_vision: Whether this is a vision model
+            shared: Return the process-wide client for these settings
+                (False always builds a new one)
 
         Returns:
             BaseChatModel instance
@@ -64,7 +155,146 @@ class LLMFactory:
             elif provider == "anthropic":
                 api_key = config.anthropic_api_key or config.llm_api_key
 
-        # Create LLM based on provider
+        if not shared:
+            return LLMFactory._create(provider, model_name, temperature, api_key, is_vision)
+
+        key = (
+            provider,
+            model_name,
+            temperature,
+            is_vision,
+            LLMFactory._endpoint(provider),
+            # Keyed by a digest so the key itself holds no secret
+            hashlib.sha256(api_key.encode()).hexdigest() if api_key else None,
+        )
+        with LLMFactory._lock:
+            llm = LLMFactory._clients.get(key)
+            CACHE_LOOKUPS.inc(cache="llm_client", result="miss" if llm is None else "hit")
+            if llm is None:
+                llm = LLMFactory._create(provider, model_name, temperature, api_key, is_vision)
+                LLMFactory._clients[key] = llm
+        return llm
+
+    @staticmethod
+    def clear() -> None:
+        """Drop memoised clients and connection pools (e.g. after changing keys)."""
+        with LLMFactory._lock:
+            LLMFactory._clients.clear()
+            LLMFactory._structured.clear()
+            transports = list(LLMFactory._transports.values())
+            LLMFactory._transports.clear()
+        for sync_transport, _ in transports:
+            sync_transport.close()
+
+    @staticmethod
+    def structured(
+        llm: BaseChatModel, provider: str, schema: type[BaseModel]
+    ) -> Optional[Runnable]:
+        """
+        A model bound to a response schema in its provider's native mode.
+
+        The method comes from config.llm_structured_output_methods; schemas
+        without declared fields use JSON mode where the provider has one.
+        Bindings are memoised per client and schema.
+
+        Args:
+            llm: Chat model
+            provider: LLM provider of the model
+            schema: Pydantic response model
+
+        Returns:
+            Runnable answering {"raw", "parsed", "parsing_error"}, or None when
+            structured output is off or the model does not support it (the
+            caller then parses the text answer)
+        """
+        if not config.llm_structured_output:
+            return None
+
+        key = (id(llm), schema)
+        with LLMFactory._lock:
+            entry = LLMFactory._structured.get(key)
+        if entry is not None and entry[0] is llm:
+            return entry[1]
+
+        method = config.llm_structured_output_methods.get(provider)
+        if method and not schema.model_fields:
+            method = "json_mode" if provider in JSON_MODE_PROVIDERS else None
+        runnable = None
+        if method:
+            try:
+                runnable = llm.with_structured_output(schema, method=method, include_raw=True)
+            except (NotImplementedError, ValueError, TypeError):
+                # Clients without tool calling or this method answer in text
+                runnable = None
+
+        with LLMFactory._lock:
+            LLMFactory._structured[key] = (llm, runnable)
+        return runnable
+
+    @staticmethod
+    def _endpoint(provider: str) -> Optional[str]:
+        """Base URL a provider's client talks to (None for the SDK default)."""
+        return config.llm_base_url if provider == LLMProvider.OLLAMA else None
+
+    @staticmethod
+    def _transports_for(endpoint: str) -> Tuple[httpx.HTTPTransport, _PerLoopTransport]:
+        """Shared (sync, async) keep-alive transports for an endpoint."""
+        with LLMFactory._lock:
+            transports = LLMFactory._transports.get(endpoint)
+            if transports is None:
+                limits = httpx.Limits(
+                    max_connections=config.llm_max_connections,
+                    max_keepalive_connections=config.llm_max_keepalive_connections,
+                    keepalive_expiry=config.llm_keepalive_seconds,
+                )
+                transports = (
+                    httpx.HTTPTransport(limits=limits),
+                    _PerLoopTransport(limits=limits),
+                )
+                LLMFactory._transports[endpoint] = transports
+        return transports
+
+    @staticmethod
+    def _retry_kwargs() -> Dict[str, Any]:
+        """Turn off SDK retries when the rate limiter retries (and sees the 429s)."""
+        return {"max_retries": 0} if config.enable_rate_limiting else {}
+
+    @staticmethod
+    def _http_clients(endpoint: str) -> Dict[str, Any]:
+        """http_client/http_async_client arguments for OpenAI-compatible clients."""
+        sync_transport, async_transport = LLMFactory._transports_for(endpoint)
+        return {
+            "http_client": httpx.Client(transport=sync_transport),
+            "http_async_client": httpx.AsyncClient(transport=async_transport),
+        }
+
+    @staticmethod
+    def _create(
+        provider: str,
+        model_name: str,
+        temperature: float,
+        api_key: Optional[str],
+        is_vision: bool,
+    ) -> BaseChatModel:
+        """Build a new client for the provider (recording its calls if configured)."""
+        llm = LLMFactory._create_client(provider, model_name, temperature, api_key, is_vision)
+        if config.llm_record_cassette and provider != LLMProvider.FAKE:
+            from agent_extract.core.fake_llm import RecordingChatModel
+
+            llm = RecordingChatModel(
+                llm=llm, path=config.llm_record_cassette, provider=provider, model=model_name
+            )
+        return llm
+
+    @staticmethod
+    def _create_client(
+        provider: str,
+        model_name: str,
+        temperature: float,
+        api_key: Optional[str],
+        is_vision: bool,
+    ) -> BaseChatModel:
+        """Build the provider's chat model."""
         if provider == LLMProvider.OLLAMA:
             return LLMFactory._create_ollama(model_name, temperature)
         
@@ -80,6 +310,9 @@ class LLMFactory:
         elif provider == LLMProvider.ANTHROPIC:
             return LLMFactory._create_anthropic(model_name, temperature, api_key, is_vision)
         
+        elif provider == LLMProvider.FAKE:
+            return LLMFactory._create_fake(model_name)
+        
         else:
             raise ConfigurationError(
                 f"Unsupported LLM provider: {provider}. "
@@ -92,10 +325,20 @@ class LLMFactory:
         try:
             from langchain_ollama import ChatOllama
 
+            client_kwargs = {}
+            # Older langchain-ollama releases take one client_kwargs for both clients
+            if "async_client_kwargs" in ChatOllama.model_fields:
+                sync_transport, async_transport = LLMFactory._transports_for(config.llm_base_url)
+                client_kwargs = {
+                    "sync_client_kwargs": {"transport": sync_transport},
+                    "async_client_kwargs": {"transport": async_transport},
+                }
+
             return ChatOllama(
                 model=model_name,
                 temperature=temperature,
                 base_url=config.llm_base_url,
+                **client_kwargs,
             )
         except ImportError as e:
             raise ConfigurationError(
@@ -127,6 +370,8 @@ class LLMFactory:
                 model=model_name,
                 temperature=temperature,
                 api_key=api_key,
+                **LLMFactory._retry_kwargs(),
+                **LLMFactory._http_clients("https://api.openai.com/v1"),
             )
         except ImportError as e:
             raise ConfigurationError(
@@ -159,6 +404,7 @@ class LLMFactory:
                 model=model_name,
                 temperature=temperature,
                 google_api_key=api_key,
+                **LLMFactory._retry_kwargs(),
             )
         except ImportError as e:
             raise ConfigurationError(
@@ -186,6 +432,8 @@ class LLMFactory:
                 model=model_name,
                 temperature=temperature,
                 api_key=api_key,
+                **LLMFactory._retry_kwargs(),
+                **LLMFactory._http_clients("https://api.groq.com"),
             )
         except ImportError as e:
             raise ConfigurationError(
@@ -217,12 +465,28 @@ class LLMFactory:
                 model=model_name,
                 temperature=temperature,
                 api_key=api_key,
+                **LLMFactory._retry_kwargs(),
             )
         except ImportError as e:
             raise ConfigurationError(
                 "langchain-anthropic not installed. Install with: pip install langchain-anthropic"
             ) from e
 
+    @staticmethod
+    def _create_fake(model_name: str) -> BaseChatModel:
+        """Create the offline fake LLM (scripted/replayed responses, simulated latency)."""
+        from agent_extract.core.fake_llm import FakeChatModel, load_script
+
+        script = {"script": load_script(config.fake_llm_script)} if config.fake_llm_script else {}
+        return FakeChatModel(
+            model=model_name,
+            cassette=config.fake_llm_cassette,
+            latency=config.fake_llm_latency,
+            tokens_per_second=config.fake_llm_tokens_per_second,
+            seed=config.fake_llm_seed,
+            **script,
+        )
+
 
 def get_default_llm(is_vision: bool = False) -> BaseChatModel:
     """
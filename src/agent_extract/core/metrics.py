@@ -0,0 +1,528 @@
+"""In-process metrics registry with Prometheus text exposition."""
+
+import logging
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from agent_extract.core.types import ExtractionResult
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from a fast text read to a slow LLM workflow
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+# Buckets for per-document counts (LLM calls)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+
+# Buckets for per-document token totals
+TOKEN_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+# Samples of counters and histograms, by metric name then label values
+MetricsSnapshot = Dict[str, Dict[Tuple[str, ...], object]]
+
+
+class Metric:
+    """A named metric with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], lock: threading.RLock):
+        """
+        Initialize metric.
+
+        Args:
+            name: Metric name
+            help: Description shown in the exposition
+            labels: Label names
+            lock: Registry lock guarding all values
+        """
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = lock
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        """Label values in declaration order."""
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        """Render {name="value",...} for a label key."""
+        pairs = list(zip(self.labels, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> List[str]:
+        """Exposition lines for this metric's values."""
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing value."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        """
+        Increase the counter.
+
+        Args:
+            amount: Non-negative increment
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        """Current value for the given labels."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{self._format_labels(key)} {_number(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(Metric):
+    """Value that can go up and down (queue depth, jobs running)."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        """
+        Set the gauge.
+
+        Args:
+            value: New value
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, **labels) -> float:
+        """Current value for the given labels."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{self._format_labels(key)} {_number(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets, plus sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str],
+        lock: threading.RLock,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labels, lock)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        """
+        Record an observation.
+
+        Args:
+            value: Observed value (seconds, count, tokens)
+            **labels: Label values
+        """
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            counts = list(counts)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels) -> int:
+        """Number of observations for the given labels."""
+        with self._lock:
+            counts, _ = self._values.get(self._key(labels), ([0], 0.0))
+        return sum(counts)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else _number(bound)
+                labels = self._format_labels(key, ("le", le))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered in the Prometheus text format.
+
+    Metrics are registered once (getting an existing name returns it) and
+    updated from any thread. Reader processes keep their own registry; they
+    hand their samples back with drain() and the parent adds them with merge().
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._lock = threading.RLock()
+        self._metrics: Dict[str, Metric] = {}
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._register(Gauge, name, help, labels)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram, name, help, labels, buckets=buckets)
+
+    def _register(self, cls, name: str, help: str, labels: Sequence[str], **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, help, labels, self._lock, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls) or metric.labels != tuple(labels):
+                raise ValueError(f"Metric {name} already registered differently")
+            return metric
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            Exposition text (version 0.0.4)
+        """
+        lines = []
+        with self._lock:
+            for metric in self._metrics.values():
+                lines.append(f"# HELP {metric.name} {metric.help}")
+                lines.append(f"# TYPE {metric.name} {metric.kind}")
+                lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path) -> None:
+        """
+        Write the exposition to a file atomically (node_exporter textfile collector).
+
+        Args:
+            path: Output file, conventionally ending in .prom
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def drain(self) -> MetricsSnapshot:
+        """
+        Take the counter and histogram samples recorded since the last drain.
+
+        Gauges describe this process only and are not included.
+
+        Returns:
+            Snapshot to merge() into another registry
+        """
+        snapshot: MetricsSnapshot = {}
+        with self._lock:
+            for metric in self._metrics.values():
+                if isinstance(metric, Gauge) or not metric._values:
+                    continue
+                snapshot[metric.name] = dict(metric._values)
+                metric._values.clear()
+        return snapshot
+
+    def merge(self, snapshot: MetricsSnapshot) -> None:
+        """
+        Add samples drained from another process.
+
+        Args:
+            snapshot: Result of drain() on a registry with the same metrics
+        """
+        with self._lock:
+            for name, values in snapshot.items():
+                metric = self._metrics.get(name)
+                if metric is None:
+                    continue
+                for key, value in values.items():
+                    if isinstance(metric, Histogram):
+                        counts, total = metric._values.get(key, ([0] * len(metric.buckets), 0.0))
+                        metric._values[key] = (
+                            [a + b for a, b in zip(counts, value[0])],
+                            total + value[1],
+                        )
+                    else:
+                        metric._values[key] = metric._values.get(key, 0.0) + value
+
+    def reset(self) -> None:
+        """Clear all recorded values (metrics stay registered)."""
+        with self._lock:
+            for metric in self._metrics.values():
+                metric._values.clear()
+
+
+class TextfileExporter:
+    """
+    Write the registry to a textfile periodically from a background thread.
+
+    For batch jobs, which are not scraped: point the node_exporter textfile
+    collector at the file. A final write happens on stop().
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        interval: float = 15.0,
+        metrics_registry: Optional[MetricsRegistry] = None,
+    ):
+        """
+        Initialize exporter.
+
+        Args:
+            path: Output file
+            interval: Seconds between writes
+            metrics_registry: Registry to export (defaults to the global one)
+        """
+        self.path = path
+        self.interval = interval
+        self.registry = metrics_registry or registry
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start writing in the background."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="metrics-textfile", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and write the final values."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.registry.write_textfile(self.path)
+
+    def __enter__(self) -> "TextfileExporter":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.registry.write_textfile(self.path)
+            except OSError as e:
+                logger.warning("Failed to write metrics to %s: %s", self.path, e)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    """Format a sample value (integers without a trailing .0)."""
+    if value == math.inf:
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = MetricsRegistry()
+
+DOCUMENTS_READ = registry.counter(
+    "agent_extract_documents_read_total",
+    "Documents read by a format reader",
+    ["document_type", "status"],
+)
+READ_SECONDS = registry.histogram(
+    "agent_extract_read_seconds",
+    "Time to read a document (text, tables, OCR)",
+    ["document_type"],
+)
+PAGES_READ = registry.counter(
+    "agent_extract_pages_read_total",
+    "Pages read",
+    ["document_type"],
+)
+OCR_CALLS = registry.counter(
+    "agent_extract_ocr_calls_total",
+    "OCR engine calls",
+    ["engine", "status"],
+)
+OCR_SECONDS = registry.histogram(
+    "agent_extract_ocr_seconds",
+    "OCR engine call duration",
+    ["engine"],
+)
+OCR_FALLBACKS = registry.counter(
+    "agent_extract_ocr_fallbacks_total",
+    "Images the fallback OCR engine was used for",
+)
+LLM_CALLS = registry.counter(
+    "agent_extract_llm_calls_total",
+    "LLM calls",
+    ["provider", "model", "agent", "status"],
+)
+LLM_SECONDS = registry.histogram(
+    "agent_extract_llm_seconds",
+    "LLM call duration",
+    ["provider", "model"],
+)
+LLM_TOKENS = registry.counter(
+    "agent_extract_llm_tokens_total",
+    "LLM tokens reported by the provider",
+    ["provider", "model", "direction"],
+)
+LLM_COST = registry.counter(
+    "agent_extract_llm_cost_usd_total",
+    "Estimated LLM cost in USD (models in the price table)",
+    ["provider", "model"],
+)
+LLM_RATE_LIMITED = registry.counter(
+    "agent_extract_llm_rate_limited_total",
+    "LLM calls the provider rejected with 429 / quota errors",
+    ["provider", "model"],
+)
+LLM_RETRIES = registry.counter(
+    "agent_extract_llm_retries_total",
+    "LLM calls retried after backoff",
+    ["provider", "model"],
+)
+LLM_CONCURRENCY_LIMIT = registry.gauge(
+    "agent_extract_llm_concurrency_limit",
+    "Adaptive concurrency limit for LLM calls",
+    ["provider", "model"],
+)
+LLM_HEDGES = registry.counter(
+    "agent_extract_llm_hedges_total",
+    "Hedged LLM calls by outcome (not_needed, primary, hedge, failed)",
+    ["result"],
+)
+LLM_STRUCTURED_OUTPUT = registry.counter(
+    "agent_extract_llm_structured_output_total",
+    "Agent answers by how they were parsed (native schema output, early-stopped stream or text)",
+    ["agent", "mode"],
+)
+WORKFLOW_EARLY_EXITS = registry.counter(
+    "agent_extract_workflow_early_exits_total",
+    "Agent workflows finished right after extraction because it met the exit criteria",
+    ["topology"],
+)
+DEADLINES_EXCEEDED = registry.counter(
+    "agent_extract_deadlines_exceeded_total",
+    "LLM calls, agents and documents stopped by their deadline",
+    ["scope"],
+)
+DOCUMENTS = registry.counter(
+    "agent_extract_documents_total",
+    "Documents finished by batch runs and the API",
+    ["source", "status"],
+)
+DOCUMENT_SECONDS = registry.histogram(
+    "agent_extract_document_seconds",
+    "End-to-end extraction time per document",
+    ["document_type"],
+)
+STAGE_SECONDS = registry.histogram(
+    "agent_extract_stage_seconds",
+    "Time per document spent in each stage (read, ocr, agent, llm)",
+    ["document_type", "stage"],
+)
+DOCUMENT_LLM_CALLS = registry.histogram(
+    "agent_extract_document_llm_calls",
+    "LLM calls per document",
+    buckets=COUNT_BUCKETS,
+)
+DOCUMENT_LLM_TOKENS = registry.histogram(
+    "agent_extract_document_llm_tokens",
+    "LLM tokens per document",
+    buckets=TOKEN_BUCKETS,
+)
+API_JOBS = registry.gauge(
+    "agent_extract_api_jobs",
+    "API jobs by state",
+    ["state"],
+)
+CACHE_LOOKUPS = registry.counter(
+    "agent_extract_cache_lookups_total",
+    "Lookups of the batch manifest (resume), content-hash dedupe and LLM client pool",
+    ["cache", "result"],
+)
+
+
+def observe_document(result: ExtractionResult) -> None:
+    """
+    Record a finished document: total time, time per stage and LLM usage.
+
+    Stage times come from the result's spans; nested spans of the same
+    stage (pdf.read around pdf.text_extraction) are counted once.
+
+    Args:
+        result: Extraction result with spans
+    """
+    document_type = result.metadata.document_type.value
+    if result.processing_time is not None:
+        DOCUMENT_SECONDS.observe(result.processing_time, document_type=document_type)
+
+    stages = _stage_totals(result.spans)
+    for stage, seconds in stages.items():
+        STAGE_SECONDS.observe(seconds, document_type=document_type, stage=stage)
+
+    llm_spans = [item for item in result.spans if item.stage == "llm"]
+    if llm_spans:
+        DOCUMENT_LLM_CALLS.observe(len(llm_spans))
+        tokens = sum(
+            (item.attributes.get("input_tokens") or 0)
+            + (item.attributes.get("output_tokens") or 0)
+            for item in llm_spans
+        )
+        if tokens:
+            DOCUMENT_LLM_TOKENS.observe(tokens)
+
+
+def _stage_totals(spans: Iterable) -> Dict[str, float]:
+    """Seconds per stage, skipping spans nested in a span of the same stage."""
+    by_id = {item.span_id: item for item in spans}
+    totals: Dict[str, float] = {}
+    for item in by_id.values():
+        parent = by_id.get(item.parent_id)
+        if parent is not None and parent.stage == item.stage:
+            continue
+        totals[item.stage] = totals.get(item.stage, 0.0) + item.duration
+    return totals
@@ -0,0 +1,437 @@
+"""Client-side rate limiting, adaptive concurrency and retries for LLM calls."""
+
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from agent_extract.core.config import config
+from agent_extract.core.metrics import LLM_CONCURRENCY_LIMIT, LLM_RATE_LIMITED, LLM_RETRIES
+
+T = TypeVar("T")
+
+# Providers served locally; their calls are not limited
+LOCAL_PROVIDERS = ("ollama",)
+
+# Offline stand-ins; limited only when config.llm_rate_limits names them
+SIMULATED_PROVIDERS = ("fake",)
+
+# Exception class names and messages providers use for HTTP 429 / quota errors
+RATE_LIMIT_ERRORS = ("RateLimitError", "ResourceExhausted", "TooManyRequests")
+RATE_LIMIT_MESSAGES = (
+    "rate limit",
+    "too many requests",
+    "resource exhausted",
+    "resource_exhausted",
+)
+
+# Output tokens assumed per call when reserving tokens/min before the call
+OUTPUT_TOKEN_ALLOWANCE = 256
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a per-minute rate.
+
+    Safe to share between threads and event loops: waiting is done with
+    asyncio.sleep outside the lock.
+    """
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        """
+        Initialize token bucket.
+
+        Args:
+            per_minute: Tokens added per minute
+            burst: Bucket size (defaults to one minute's worth)
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """
+        Take tokens, waiting until the bucket holds enough.
+
+        Requests larger than the bucket wait for a full bucket and drive it
+        negative, so they still go through.
+
+        Args:
+            amount: Tokens to take
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                needed = min(amount, self.capacity)
+                if self._tokens >= needed:
+                    self._tokens -= amount
+                    return waited
+                delay = (needed - self._tokens) / self.rate
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def adjust(self, amount: float) -> None:
+        """
+        Correct an earlier acquire once the real cost is known.
+
+        Args:
+            amount: Tokens to take (positive) or give back (negative)
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after the provider answered 429."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limit tuned by AIMD.
+
+    Each successful call raises the limit by 1/limit (about one per round
+    of calls); a 429 halves it and a call much slower than the running
+    average cuts it by a tenth. Waiters on any thread or event loop are
+    woken through their own loop.
+    """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 64):
+        """
+        Initialize adaptive concurrency.
+
+        Args:
+            initial: Starting limit
+            minimum: Lowest limit
+            maximum: Highest limit
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        """Wait for a free slot."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            try:
+                await waiter
+            finally:
+                with self._lock:
+                    if (loop, waiter) in self._waiters:
+                        self._waiters.remove((loop, waiter))
+                    # A cancelled waiter may have been woken; pass the slot on
+                    self._wake()
+
+    def release(self, latency: Optional[float] = None, rate_limited: bool = False) -> None:
+        """
+        Free a slot and adjust the limit.
+
+        Args:
+            latency: Seconds the call took (None if it failed)
+            rate_limited: Whether the provider answered 429
+        """
+        with self._lock:
+            self.in_flight -= 1
+            if rate_limited:
+                self.limit = max(self.minimum, self.limit / 2)
+            elif latency is not None:
+                average = self.latency
+                if average is not None and latency > config.llm_latency_backoff_factor * average:
+                    self.limit = max(self.minimum, self.limit * 0.9)
+                else:
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+                self.latency = latency if average is None else 0.9 * average + 0.1 * latency
+            self._wake()
+
+    def _wake(self) -> None:
+        """Wake as many waiters as there are free slots (lock held)."""
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            loop, waiter = self._waiters.pop(0)
+            if loop.is_closed():
+                continue
+            loop.call_soon_threadsafe(_resolve, waiter)
+            free -= 1
+
+
+class RateLimiter:
+    """
+    Requests/min and tokens/min buckets plus adaptive concurrency for one model.
+
+    Use run() to make a call: it waits for capacity, retries 429s with
+    jittered exponential backoff (honouring Retry-After) and feeds the
+    outcome back into the concurrency limit.
+    """
+
+    def __init__(
+        self,
+        provider: str = "",
+        model: str = "",
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        """
+        Initialize rate limiter.
+
+        Args:
+            provider: LLM provider (metric label)
+            model: Model name (metric label)
+            rpm: Requests per minute (None = unlimited)
+            tpm: Tokens per minute (None = unlimited)
+            concurrency: Starting concurrency (defaults to config.llm_initial_concurrency)
+            max_concurrency: Concurrency ceiling (defaults to config.llm_max_concurrency)
+        """
+        self.labels = {"provider": provider, "model": model}
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = AdaptiveConcurrency(
+            concurrency or config.llm_initial_concurrency,
+            maximum=max_concurrency or config.llm_max_concurrency,
+        )
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int = 0) -> AsyncIterator["_Slot"]:
+        """
+        Hold capacity for one call.
+
+        Args:
+            estimated_tokens: Tokens the call is expected to use
+
+        Yields:
+            Slot on which to report the outcome (tokens, rate limiting)
+        """
+        await self.concurrency.acquire()
+        slot = _Slot(estimated_tokens)
+        started = time.perf_counter()
+        try:
+            if self.requests:
+                await self.requests.acquire()
+            if self.tokens and estimated_tokens:
+                await self.tokens.acquire(estimated_tokens)
+            started = time.perf_counter()
+            yield slot
+        finally:
+            latency = None if slot.failed else time.perf_counter() - started
+            self.concurrency.release(latency, rate_limited=slot.rate_limited)
+            LLM_CONCURRENCY_LIMIT.set(int(self.concurrency.limit), **self.labels)
+            if slot.rate_limited:
+                LLM_RATE_LIMITED.inc(**self.labels)
+                for bucket in (self.requests, self.tokens):
+                    if bucket:
+                        bucket.drain()
+            elif self.tokens and slot.actual_tokens is not None:
+                self.tokens.adjust(slot.actual_tokens - estimated_tokens)
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        estimated_tokens: int = 0,
+        count_tokens: Optional[Callable[[T], Optional[int]]] = None,
+    ) -> T:
+        """
+        Make a call within the limits, retrying rate-limit errors.
+
+        Args:
+            call: Coroutine factory making the request
+            estimated_tokens: Tokens the call is expected to use
+            count_tokens: Reads the real token count from the response
+
+        Returns:
+            The call's result
+
+        Raises:
+            Exception: The call's error, or the last 429 once retries run out
+        """
+        attempt = 0
+        while True:
+            async with self.slot(estimated_tokens) as slot:
+                try:
+                    result = await call()
+                except Exception as e:
+                    slot.failed = True
+                    slot.rate_limited = is_rate_limit_error(e)
+                    if not slot.rate_limited or attempt >= config.llm_max_retries:
+                        raise
+                    error = e
+                else:
+                    if count_tokens is not None:
+                        slot.actual_tokens = count_tokens(result)
+                    return result
+
+            LLM_RETRIES.inc(**self.labels)
+            await asyncio.sleep(backoff_delay(attempt, retry_after(error)))
+            attempt += 1
+
+
+class _Slot:
+    """Outcome of a call made in RateLimiter.slot()."""
+
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.actual_tokens: Optional[int] = None
+        self.failed = False
+        self.rate_limited = False
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(provider: str, model: str) -> Optional[RateLimiter]:
+    """
+    Shared limiter for a provider's model.
+
+    Limits come from config.llm_rate_limits, looked up by model name (exact,
+    then longest prefix) and then by provider. Local providers get none, nor
+    does the fake provider unless limits are configured for it.
+
+    Args:
+        provider: LLM provider
+        model: Model name
+
+    Returns:
+        RateLimiter, or None when calls are not limited
+    """
+    if provider in LOCAL_PROVIDERS or not config.enable_rate_limiting:
+        return None
+    if provider in SIMULATED_PROVIDERS and not _limits_for(provider, model):
+        return None
+    key = (provider, model)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limits = _limits_for(provider, model)
+            limiter = RateLimiter(
+                provider,
+                model,
+                rpm=limits.get("rpm"),
+                tpm=limits.get("tpm"),
+                concurrency=int(limits["concurrency"]) if "concurrency" in limits else None,
+            )
+            _limiters[key] = limiter
+    return limiter
+
+
+def reset_limiters() -> None:
+    """Forget learned limits and bucket levels (e.g. after changing config)."""
+    with _limiters_lock:
+        _limiters.clear()
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """
+    Whether an error means the provider is throttling us.
+
+    Args:
+        error: Exception raised by a chat model
+
+    Returns:
+        True for HTTP 429 and quota errors from any provider SDK
+    """
+    for item in _causes(error):
+        if getattr(item, "status_code", None) == 429 or getattr(item, "code", None) == 429:
+            return True
+        if type(item).__name__ in RATE_LIMIT_ERRORS:
+            return True
+        message = str(item).lower()
+        if any(phrase in message for phrase in RATE_LIMIT_MESSAGES):
+            return True
+    return False
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """
+    Seconds the provider asked us to wait, from a Retry-After header.
+
+    Args:
+        error: Exception raised by a chat model
+
+    Returns:
+        Seconds, or None if the error carries no hint
+    """
+    for item in _causes(error):
+        response = getattr(item, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            continue
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            try:
+                return float(value) / 1000
+            except ValueError:
+                pass
+        value = headers.get("retry-after")
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+    return None
+
+
+def backoff_delay(attempt: int, hint: Optional[float] = None) -> float:
+    """
+    Delay before a retry: full-jitter exponential backoff.
+
+    Args:
+        attempt: Retries made so far
+        hint: Retry-After from the provider, used as the minimum
+
+    Returns:
+        Seconds to wait
+    """
+    ceiling = min(config.llm_backoff_max_seconds, config.llm_backoff_base_seconds * 2**attempt)
+    delay = random.uniform(0, ceiling)
+    return max(delay, hint) if hint is not None else delay
+
+
+def _limits_for(provider: str, model: str) -> Dict[str, Any]:
+    limits = config.llm_rate_limits
+    name = model.split("/")[-1]
+    if name in limits:
+        return limits[name]
+    matches = [key for key in limits if key != provider and name.startswith(key)]
+    if matches:
+        return limits[max(matches, key=len)]
+    return limits.get(provider, {})
+
+
+def _causes(error: BaseException):
+    """The error and the exceptions it wraps (agents re-raise as RuntimeError)."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
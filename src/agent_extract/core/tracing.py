@@ -0,0 +1,177 @@
+"""Per-stage timing spans for extractions."""
+
+import json
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from agent_extract.core.config import config
+from agent_extract.core.types import ExtractionResult, Span
+
+# Trace collecting spans in the current task/thread, and the open span
+_active_trace: ContextVar[Optional["Trace"]] = ContextVar("agent_extract_trace", default=None)
+_open_span: ContextVar[Optional[Span]] = ContextVar("agent_extract_span", default=None)
+
+
+class Trace:
+    """Spans recorded while a trace is active."""
+
+    def __init__(self):
+        """Initialize an empty trace."""
+        self.spans: List[Span] = []
+
+    def add(self, spans: Iterable[Span]) -> None:
+        """
+        Add spans recorded elsewhere (e.g. in a reader process).
+
+        Top-level spans are attached to the span that is open here.
+
+        Args:
+            spans: Spans to add
+        """
+        parent = _open_span.get()
+        parent_id = parent.span_id if parent else None
+        for item in spans:
+            if item.parent_id is None and parent_id is not None:
+                item = item.model_copy(update={"parent_id": parent_id})
+            self.spans.append(item)
+
+
+@contextmanager
+def trace() -> Iterator[Trace]:
+    """
+    Record spans from this task or thread into a new trace.
+
+    Tasks created inside the block (e.g. LangGraph nodes) inherit it;
+    threads and processes do not, so work sent there runs through
+    traced(). Nothing is recorded when config.enable_tracing is off.
+
+    Yields:
+        The active Trace
+    """
+    current = Trace()
+    if not config.enable_tracing:
+        yield current
+        return
+
+    # set() rather than reset(): the block may span async generator yields
+    previous_trace, previous_span = _active_trace.get(), _open_span.get()
+    _active_trace.set(current)
+    _open_span.set(None)
+    try:
+        yield current
+    finally:
+        _active_trace.set(previous_trace)
+        _open_span.set(previous_span)
+
+
+@contextmanager
+def span(name: str, stage: str, **attributes) -> Iterator[Optional[Span]]:
+    """
+    Time a stage as a span of the active trace.
+
+    Without an active trace this does nothing and yields None, so library
+    code can be instrumented at no cost to callers that do not trace.
+
+    Args:
+        name: Span name, e.g. "pdf.text_extraction" or an agent name
+        stage: read, ocr, agent or llm
+        **attributes: Initial attributes (bytes, pages, model, ...)
+
+    Yields:
+        The open Span, or None
+    """
+    current = _active_trace.get()
+    if current is None:
+        yield None
+        return
+
+    parent = _open_span.get()
+    item = Span(
+        span_id=uuid.uuid4().hex[:16],
+        parent_id=parent.span_id if parent else None,
+        name=name,
+        stage=stage,
+        start=time.time(),
+        attributes=attributes,
+    )
+    previous_parent = _open_span.set(item)
+    started = time.perf_counter()
+    try:
+        yield item
+    except BaseException as e:
+        item.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        item.duration = time.perf_counter() - started
+        _open_span.reset(previous_parent)
+        current.spans.append(item)
+
+
+def annotate(**attributes) -> None:
+    """
+    Add attributes (sizes, counts, token usage) to the open span, if any.
+
+    Args:
+        **attributes: Attributes to set
+    """
+    item = _open_span.get()
+    if item is not None:
+        item.attributes.update(attributes)
+
+
+def traced(read: Callable[[Path], ExtractionResult], file_path: Path) -> ExtractionResult:
+    """
+    Run a reader in its own trace and attach the spans to its result.
+
+    Used where the reader runs in a pool thread or process, which does not
+    see the caller's trace.
+
+    Args:
+        read: Reader function, e.g. reader.read
+        file_path: Document to read
+
+    Returns:
+        The reader's result with its spans appended
+    """
+    with trace() as current:
+        result = read(file_path)
+    result.spans.extend(current.spans)
+    return result
+
+
+def summarize_spans(spans: Iterable[Span]) -> Dict[str, float]:
+    """
+    Total time per span name.
+
+    Args:
+        spans: Spans to summarize
+
+    Returns:
+        Seconds per name, largest first
+    """
+    totals: Dict[str, float] = {}
+    for item in spans:
+        totals[item.name] = totals.get(item.name, 0.0) + item.duration
+    return dict(sorted(totals.items(), key=lambda entry: entry[1], reverse=True))
+
+
+def export_spans(spans: Iterable[Span], path: Path, document: Optional[str] = None) -> None:
+    """
+    Append spans to a JSON Lines file.
+
+    Args:
+        spans: Spans to write
+        path: Output file (created if missing)
+        document: Document name added to every line
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for item in spans:
+            data = item.model_dump(mode="json")
+            if document is not None:
+                data["document"] = document
+            f.write(json.dumps(data) + "\n")
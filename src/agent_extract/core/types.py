@@ -84,6 +84,82 @@ class ExtractedEntity(BaseModel):
     confidence: Optional[float] = None
 
 
+class TextChunk(BaseModel):
+    """A slice of document text split on page/section boundaries."""
+
+    index: int
+    text: str
+    start: int = Field(description="Start offset in the source text")
+    end: int = Field(description="End offset in the source text")
+    pages: List[int] = Field(default_factory=list)
+
+
+class Span(BaseModel):
+    """Timed stage of an extraction: reading, OCR, an agent or an LLM call."""
+
+    span_id: str
+    parent_id: Optional[str] = None
+    name: str
+    stage: str = Field(description="read, ocr, agent or llm")
+    start: float = Field(description="Start time (Unix seconds)")
+    duration: float = Field(default=0.0, description="Duration in seconds")
+    attributes: Dict[str, Any] = Field(
+        default_factory=dict, description="Sizes and counts, e.g. bytes, pages, tokens"
+    )
+    error: Optional[str] = None
+
+
+class LLMCall(BaseModel):
+    """Token usage, latency and estimated cost of one LLM call."""
+
+    agent: str
+    provider: str
+    model: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    estimated_tokens: bool = Field(
+        default=False, description="Token counts estimated from text length (not reported)"
+    )
+    latency: float = Field(default=0.0, description="Seconds")
+    cost: Optional[float] = Field(default=None, description="USD; None if the model has no price")
+
+
+class TokenUsage(BaseModel):
+    """LLM usage summed over calls (per agent, document or batch)."""
+
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    latency: float = 0.0
+    cost: float = Field(default=0.0, description="USD, priced calls only")
+    unpriced_calls: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        """Input plus output tokens."""
+        return self.input_tokens + self.output_tokens
+
+    def add_call(self, call: LLMCall) -> None:
+        """Add one call."""
+        self.calls += 1
+        self.input_tokens += call.input_tokens
+        self.output_tokens += call.output_tokens
+        self.latency += call.latency
+        if call.cost is None:
+            self.unpriced_calls += 1
+        else:
+            self.cost += call.cost
+
+    def add(self, other: "TokenUsage") -> None:
+        """Add another total."""
+        self.calls += other.calls
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.latency += other.latency
+        self.cost += other.cost
+        self.unpriced_calls += other.unpriced_calls
+
+
 class ExtractionResult(BaseModel):
     """Complete extraction result."""
 
@@ -96,6 +172,7 @@ class ExtractionResult(BaseModel):
     confidence_score: Optional[float] = None
     processing_time: Optional[float] = None
     extraction_method: Optional[str] = None
+    spans: List[Span] = Field(default_factory=list, description="Per-stage timings")
 
     class Config:
         """Pydantic config."""
@@ -103,3 +180,18 @@ class ExtractionResult(BaseModel):
         json_encoders = {datetime: lambda v: v.isoformat()}
 
 
+class ExtractionEvent(BaseModel):
+    """Progress event emitted while a document is being extracted."""
+
+    event: str = Field(description="started, basic_extraction, agent, result or error")
+    agent: Optional[str] = Field(default=None, description="Graph node that just finished")
+    message: Optional[str] = Field(default=None, description="Latest processing step")
+    document_type: Optional[str] = None
+    confidence_score: Optional[float] = None
+    data: Dict[str, Any] = Field(
+        default_factory=dict, description="Partial results produced by this step"
+    )
+    result: Optional[ExtractionResult] = Field(
+        default=None, description="Final result (result events only)"
+    )
+    elapsed: float = Field(default=0.0, description="Seconds since extraction started")
@@ -0,0 +1,209 @@
+"""Token and cost accounting for LLM calls."""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from agent_extract.core.config import config
+from agent_extract.core.types import LLMCall, TokenUsage
+
+# Built-in list prices, USD per million tokens (input, output); extend or
+# override with config.llm_prices. Local and fake providers cost nothing.
+DEFAULT_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+}
+
+FREE_PROVIDERS = ("ollama", "fake")
+
+# Rough characters per token, for providers that report no usage
+CHARS_PER_TOKEN = 4
+
+# Calls recorded for the document being extracted in this task
+_ledger: ContextVar[Optional[List[LLMCall]]] = ContextVar("agent_extract_llm_calls", default=None)
+
+
+@contextmanager
+def track_usage() -> Iterator[List[LLMCall]]:
+    """
+    Collect the LLM calls made in this task (and tasks it starts).
+
+    Yields:
+        List that receives an LLMCall per call
+    """
+    calls: List[LLMCall] = []
+    # set() rather than reset(): the block may span async generator yields
+    previous = _ledger.get()
+    _ledger.set(calls)
+    try:
+        yield calls
+    finally:
+        _ledger.set(previous)
+
+
+def record_call(call: LLMCall) -> None:
+    """
+    Add a call to the active ledger, if any.
+
+    Args:
+        call: Completed LLM call
+    """
+    calls = _ledger.get()
+    if calls is not None:
+        calls.append(call)
+
+
+def price_for(provider: str, model: str) -> Optional[Tuple[float, float]]:
+    """
+    Look up the price of a model.
+
+    Exact names win; otherwise the longest table entry the model name
+    starts with (so dated or prefixed variants such as
+    "gpt-4o-mini-2024-07-18" or "models/gemini-1.5-flash" match).
+
+    Args:
+        provider: LLM provider
+        model: Model name
+
+    Returns:
+        (input, output) USD per million tokens, or None if unknown
+    """
+    if provider in FREE_PROVIDERS:
+        return (0.0, 0.0)
+
+    prices = dict(DEFAULT_PRICES)
+    for name, entry in config.llm_prices.items():
+        prices[name] = (entry.get("input", 0.0), entry.get("output", 0.0))
+
+    name = model.split("/")[-1]
+    if name in prices:
+        return prices[name]
+    matches = [key for key in prices if name.startswith(key)]
+    return prices[max(matches, key=len)] if matches else None
+
+
+def estimate_cost(
+    provider: str, model: str, input_tokens: int, output_tokens: int
+) -> Optional[float]:
+    """
+    Estimate the cost of a call.
+
+    Args:
+        provider: LLM provider
+        model: Model name
+        input_tokens: Prompt tokens
+        output_tokens: Completion tokens
+
+    Returns:
+        USD, or None if the model has no price
+    """
+    price = price_for(provider, model)
+    if price is None:
+        return None
+    return (input_tokens * price[0] + output_tokens * price[1]) / 1_000_000
+
+
+def make_call(
+    agent: str,
+    provider: str,
+    model: str,
+    usage: Optional[Dict[str, Any]],
+    prompt_chars: int,
+    response_chars: int,
+    latency: float,
+) -> LLMCall:
+    """
+    Build the accounting record of a call.
+
+    Token counts come from the response's usage_metadata; when the
+    provider reports none they are estimated from text length.
+
+    Args:
+        agent: Calling agent
+        provider: LLM provider
+        model: Model name
+        usage: response.usage_metadata (input_tokens/output_tokens) or None
+        prompt_chars: Characters sent
+        response_chars: Characters received
+        latency: Seconds the call took
+
+    Returns:
+        LLMCall with estimated cost
+    """
+    usage = usage or {}
+    estimated = usage.get("input_tokens") is None and usage.get("output_tokens") is None
+    if estimated:
+        input_tokens = -(-prompt_chars // CHARS_PER_TOKEN)
+        output_tokens = -(-response_chars // CHARS_PER_TOKEN)
+    else:
+        input_tokens = usage.get("input_tokens") or 0
+        output_tokens = usage.get("output_tokens") or 0
+
+    return LLMCall(
+        agent=agent,
+        provider=provider,
+        model=model,
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        estimated_tokens=estimated,
+        latency=latency,
+        cost=estimate_cost(provider, model, input_tokens, output_tokens),
+    )
+
+
+def summarize_usage(calls: Iterable[LLMCall]) -> Dict[str, Any]:
+    """
+    Aggregate calls for a document, in total and per agent and model.
+
+    Args:
+        calls: Calls made while extracting the document
+
+    Returns:
+        Dict with "total", "by_agent", "by_model" (TokenUsage dumps plus
+        total_tokens) and the individual "calls"
+    """
+    calls = list(calls)
+    total = TokenUsage()
+    by_agent: Dict[str, TokenUsage] = {}
+    by_model: Dict[str, TokenUsage] = {}
+    for call in calls:
+        total.add_call(call)
+        by_agent.setdefault(call.agent, TokenUsage()).add_call(call)
+        by_model.setdefault(f"{call.provider}/{call.model}", TokenUsage()).add_call(call)
+
+    return {
+        "total": _dump(total),
+        "by_agent": {name: _dump(usage) for name, usage in by_agent.items()},
+        "by_model": {name: _dump(usage) for name, usage in by_model.items()},
+        "calls": [call.model_dump() for call in calls],
+    }
+
+
+def document_usage(structured_data: Dict[str, Any]) -> Optional[TokenUsage]:
+    """
+    Read a document's total usage back from its structured data.
+
+    Args:
+        structured_data: ExtractionResult.structured_data
+
+    Returns:
+        TokenUsage, or None if the document made no recorded LLM calls
+    """
+    total = ((structured_data or {}).get("ai_processing") or {}).get("usage", {}).get("total")
+    if not total:
+        return None
+    return TokenUsage.model_validate(total)
+
+
+def _dump(usage: TokenUsage) -> Dict[str, Any]:
+    return {**usage.model_dump(), "total_tokens": usage.total_tokens}
@@ -1,10 +1,13 @@
 """OCR Manager to handle multiple OCR engines with fallback."""
 
+import time
 from pathlib import Path
 from typing import Optional, List, Tuple
 
 from agent_extract.core.exceptions import OCRError
 from agent_extract.core.config import config
+from agent_extract.core.metrics import OCR_CALLS, OCR_FALLBACKS, OCR_SECONDS
+from agent_extract.core.tracing import annotate, span
 from agent_extract.ocr.paddle_ocr import PaddleOCREngine
 from agent_extract.ocr.tesseract_ocr import TesseractOCREngine
 
@@ -73,19 +76,34 @@ class OCRManager:
         # Try primary engine
         if self.primary_engine:
             try:
-                return self.primary_engine.extract_text(image_path)
+                return self._run_engine(self.primary_engine_name, self.primary_engine, image_path)
             except Exception as e:
                 print(f"Primary OCR engine failed: {e}. Trying fallback...")
 
         # Try fallback engine
         if self.fallback_engine:
+            OCR_FALLBACKS.inc()
             try:
-                return self.fallback_engine.extract_text(image_path)
+                return self._run_engine(self.fallback_engine_name, self.fallback_engine, image_path)
             except Exception as e:
                 print(f"Fallback OCR engine failed: {e}")
 
         raise OCRError("All OCR engines failed to extract text from the image")
 
+    def _run_engine(self, name: str, engine, image_path: Path) -> str:
+        """Run one engine's detection and recognition as a timed span."""
+        started = time.perf_counter()
+        status = "failed"
+        try:
+            with span(f"ocr.{name}", "ocr", engine=name, lang=self.lang):
+                text = engine.extract_text(image_path)
+                annotate(chars=len(text), lines=text.count("\n") + 1 if text else 0)
+            status = "success"
+            return text
+        finally:
+            OCR_CALLS.inc(engine=name, status=status)
+            OCR_SECONDS.observe(time.perf_counter() - started, engine=name)
+
     def extract_with_boxes(
         self, image_path: Path
     ) -> List[Tuple[str, float, Tuple[float, float, float, float]]]:
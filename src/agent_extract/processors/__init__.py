@@ -1,5 +1,21 @@
 """Document processors for advanced extraction."""
 
 from agent_extract.processors.preprocessor import ImagePreprocessor
+from agent_extract.processors.chunker import DocumentChunker, map_chunks, merge_structured_results
+from agent_extract.processors.prompt_budget import (
+    TokenCounter,
+    compress_text,
+    pack_text,
+    prompt_budget,
+)
 
-__all__ = ["ImagePreprocessor"]
+__all__ = [
+    "ImagePreprocessor",
+    "DocumentChunker",
+    "map_chunks",
+    "merge_structured_results",
+    "TokenCounter",
+    "compress_text",
+    "pack_text",
+    "prompt_budget",
+]
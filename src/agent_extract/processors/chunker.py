@@ -0,0 +1,247 @@
+"""Chunking and map-reduce helpers for long documents."""
+
+import asyncio
+import json
+import re
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from agent_extract.core.types import TextChunk
+
+T = TypeVar("T")
+
+# Page markers written by PDFReader ("--- Page N ---")
+PAGE_MARKER = re.compile(r"^--- Page (\d+) ---[ \t]*$", re.MULTILINE)
+
+# Blank lines separate sections/paragraphs
+SECTION_BREAK = re.compile(r"\n[ \t]*\n")
+
+
+class DocumentChunker:
+    """Split document text into chunks on page and section boundaries."""
+
+    def __init__(self, max_chars: int = 3000):
+        """
+        Initialize document chunker.
+
+        Args:
+            max_chars: Maximum characters per chunk
+        """
+        if max_chars <= 0:
+            raise ValueError("max_chars must be positive")
+        self.max_chars = max_chars
+
+    def split(self, text: str) -> List[TextChunk]:
+        """
+        Split text into chunks of at most max_chars.
+
+        Whole pages are packed together while they fit; larger pages are
+        split on blank-line sections, then lines, and only as a last resort
+        mid-line.
+
+        Args:
+            text: Document text
+
+        Returns:
+            Chunks in document order
+        """
+        if not text.strip():
+            return []
+
+        pieces = []
+        for start, end, page in self._pages(text):
+            pieces.extend(self._split_span(text, start, end, page))
+
+        return self._pack(text, pieces)
+
+    def _pages(self, text: str) -> List[Tuple[int, int, Optional[int]]]:
+        """Return (start, end, page_number) spans for each page."""
+        markers = list(PAGE_MARKER.finditer(text))
+        if not markers:
+            return [(0, len(text), None)]
+
+        spans = []
+        if text[: markers[0].start()].strip():
+            spans.append((0, markers[0].start(), None))
+
+        for i, marker in enumerate(markers):
+            end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+            spans.append((marker.start(), end, int(marker.group(1))))
+
+        return spans
+
+    def _split_span(
+        self, text: str, start: int, end: int, page: Optional[int]
+    ) -> List[Tuple[int, int, Optional[int]]]:
+        """Split a span that is too long on section, line, then hard boundaries."""
+        if end - start <= self.max_chars:
+            return [(start, end, page)]
+
+        for separator in (SECTION_BREAK, re.compile(r"\n")):
+            cuts = [m.end() for m in separator.finditer(text, start, end)]
+            if cuts:
+                pieces = []
+                prev = start
+                for cut in cuts + [end]:
+                    if cut > prev:
+                        pieces.append((prev, cut))
+                    prev = cut
+                if len(pieces) > 1:
+                    result = []
+                    for piece_start, piece_end in pieces:
+                        result.extend(self._split_span(text, piece_start, piece_end, page))
+                    return result
+
+        return [
+            (pos, min(pos + self.max_chars, end), page)
+            for pos in range(start, end, self.max_chars)
+        ]
+
+    def _pack(
+        self, text: str, pieces: List[Tuple[int, int, Optional[int]]]
+    ) -> List[TextChunk]:
+        """Greedily merge adjacent pieces into chunks up to max_chars."""
+        chunks: List[TextChunk] = []
+        current: List[Tuple[int, int, Optional[int]]] = []
+
+        def flush():
+            if not current:
+                return
+            chunk_start, chunk_end = current[0][0], current[-1][1]
+            chunk_text = text[chunk_start:chunk_end]
+            if chunk_text.strip():
+                pages = sorted({p for _, _, p in current if p is not None})
+                chunks.append(
+                    TextChunk(
+                        index=len(chunks),
+                        text=chunk_text,
+                        start=chunk_start,
+                        end=chunk_end,
+                        pages=pages,
+                    )
+                )
+            current.clear()
+
+        for piece in pieces:
+            if current and piece[1] - current[0][0] > self.max_chars:
+                flush()
+            current.append(piece)
+        flush()
+
+        return chunks
+
+
+async def map_chunks(
+    chunks: List[TextChunk],
+    func: Callable[[TextChunk], Awaitable[T]],
+    concurrency: int = 4,
+) -> List[T | BaseException]:
+    """
+    Run an async function over chunks with bounded concurrency.
+
+    Args:
+        chunks: Chunks to process
+        func: Coroutine function called once per chunk
+        concurrency: Maximum number of chunks in flight
+
+    Returns:
+        Results in chunk order; failed chunks hold their exception
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(chunk: TextChunk) -> T:
+        async with semaphore:
+            return await func(chunk)
+
+    return await asyncio.gather(*(run(chunk) for chunk in chunks), return_exceptions=True)
+
+
+def merge_structured_results(
+    partials: List[Dict[str, Any]],
+) -> Tuple[Dict[str, Any], Dict[str, List[Any]]]:
+    """
+    Merge per-chunk structured results into one result.
+
+    - Empty values never override non-empty ones
+    - Lists are concatenated without duplicates
+    - Nested dicts are merged recursively
+    - Conflicting scalars are resolved by majority vote, ties going to the
+      earliest chunk (document headers usually come first)
+
+    Args:
+        partials: Structured results in chunk order
+
+    Returns:
+        Tuple of (merged data, conflicts mapping key to candidate values)
+    """
+    merged: Dict[str, Any] = {}
+    conflicts: Dict[str, List[Any]] = {}
+
+    keys: List[str] = []
+    for partial in partials:
+        for key in partial:
+            if key not in keys:
+                keys.append(key)
+
+    for key in keys:
+        values = [p[key] for p in partials if key in p and not _is_empty(p[key])]
+        if not values:
+            merged[key] = next(p[key] for p in partials if key in p)
+            continue
+
+        if all(isinstance(v, list) for v in values):
+            merged[key] = _merge_lists(values)
+        elif all(isinstance(v, dict) for v in values):
+            nested, nested_conflicts = merge_structured_results(values)
+            merged[key] = nested
+            for nested_key, candidates in nested_conflicts.items():
+                conflicts[f"{key}.{nested_key}"] = candidates
+        else:
+            value, candidates = _vote(values)
+            merged[key] = value
+            if len(candidates) > 1:
+                conflicts[key] = candidates
+
+    return merged, conflicts
+
+
+def _is_empty(value: Any) -> bool:
+    """Check if a value carries no information."""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip() or value.strip().lower() in ("n/a", "null", "none", "unknown")
+    if isinstance(value, (list, dict)):
+        return len(value) == 0
+    return False
+
+
+def _normalize(value: Any) -> str:
+    """Normalize a value for comparison."""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _merge_lists(values: List[List[Any]]) -> List[Any]:
+    """Concatenate lists, dropping duplicate items."""
+    seen = set()
+    merged = []
+    for items in values:
+        for item in items:
+            marker = _normalize(item)
+            if marker not in seen:
+                seen.add(marker)
+                merged.append(item)
+    return merged
+
+
+def _vote(values: List[Any]) -> Tuple[Any, List[Any]]:
+    """Pick the most common value; ties go to the earliest one."""
+    counts = Counter(_normalize(v) for v in values)
+    first_seen: Dict[str, Any] = {}
+    for value in values:
+        first_seen.setdefault(_normalize(value), value)
+
+    best = max(first_seen, key=lambda marker: counts[marker])
+    return first_seen[best], list(first_seen.values())
@@ -0,0 +1,336 @@
+"""Token-budgeted prompt text: counting, compression and relevance packing."""
+
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from agent_extract.core.config import config
+from agent_extract.core.usage import CHARS_PER_TOKEN
+from agent_extract.processors.chunker import PAGE_MARKER
+
+# Context windows in tokens by model name prefix; ChatOllama runs with
+# Ollama's default context unless num_ctx is set
+CONTEXT_WINDOWS = {
+    "gpt-4o": 128_000,
+    "gpt-4.1": 1_000_000,
+    "gpt-4-vision": 128_000,
+    "gemini": 1_000_000,
+    "claude": 200_000,
+    "llama-3": 128_000,
+    "mixtral": 32_000,
+}
+OLLAMA_CONTEXT_WINDOW = 2048
+
+# Tokens kept free for the model's answer
+RESPONSE_RESERVE = 512
+
+# Marker left where content was dropped to fit the budget
+ELISION = "[...]"
+
+_SPACES = re.compile(r"[ \t\f\v\u00a0]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_PAGE_NUMBER = re.compile(r"^[-–\s]*(page\s*)?\d+(\s*(of|/)\s*\d+)?[-–\s]*$")
+_KEY_VALUE = re.compile(r"^\s*[^:\n]{1,40}:\s*\S", re.MULTILINE)
+_WORD = re.compile(r"\w+")
+
+# Lines looked at for headers/footers at each end of a page
+EDGE_LINES = 3
+
+
+class TokenCounter:
+    """
+    Count tokens for a provider's model.
+
+    Uses tiktoken for OpenAI models when it is installed (it comes with
+    langchain-openai); other providers do not ship a local tokenizer, so
+    their counts are estimated from text length.
+    """
+
+    def __init__(self, provider: Optional[str] = None, model: Optional[str] = None):
+        """
+        Initialize token counter.
+
+        Args:
+            provider: LLM provider
+            model: Model name
+        """
+        self.provider = provider or config.llm_provider
+        self.model = model or config.llm_model
+        self._encoding = self._load_encoding() if self.provider == "openai" else None
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from the model's tokenizer."""
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        """
+        Count the tokens in a text.
+
+        Args:
+            text: Text to count
+
+        Returns:
+            Number of tokens
+        """
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return -(-len(text) // CHARS_PER_TOKEN)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Cut a text to at most max_tokens.
+
+        Args:
+            text: Text to cut
+            max_tokens: Token limit
+
+        Returns:
+            Leading part of the text
+        """
+        if max_tokens <= 0:
+            return ""
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            return text if len(tokens) <= max_tokens else self._encoding.decode(tokens[:max_tokens])
+        return text[: max_tokens * CHARS_PER_TOKEN]
+
+    def _load_encoding(self):
+        try:
+            import tiktoken
+        except ImportError:
+            return None
+        try:
+            return tiktoken.encoding_for_model(self.model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base" if "4o" in self.model else "cl100k_base")
+
+
+@lru_cache(maxsize=None)
+def token_counter(provider: str, model: str) -> TokenCounter:
+    """
+    Shared token counter for a model (tokenizers are slow to load).
+
+    Args:
+        provider: LLM provider
+        model: Model name
+
+    Returns:
+        TokenCounter
+    """
+    return TokenCounter(provider, model)
+
+
+def context_window(provider: str, model: str) -> int:
+    """
+    Context window of a model.
+
+    Args:
+        provider: LLM provider
+        model: Model name
+
+    Returns:
+        Tokens the model accepts (config.llm_context_window if set)
+    """
+    if config.llm_context_window:
+        return config.llm_context_window
+    if provider == "ollama":
+        return OLLAMA_CONTEXT_WINDOW
+    name = model.split("/")[-1]
+    matches = [prefix for prefix in CONTEXT_WINDOWS if name.startswith(prefix)]
+    return CONTEXT_WINDOWS[max(matches, key=len)] if matches else 8192
+
+
+def prompt_budget(agent: str, provider: str, model: str, used_tokens: int = 0) -> int:
+    """
+    Tokens of document text an agent may put in its prompt.
+
+    The agent's configured budget, capped by what is left of the model's
+    context window after the rest of the prompt and the answer.
+
+    Args:
+        agent: Budget key (planner, schema, fused, critic, validation, extraction)
+        provider: LLM provider
+        model: Model name
+        used_tokens: Tokens of the prompt besides the document text
+
+    Returns:
+        Token budget for the document text
+    """
+    budget = config.prompt_token_budgets.get(agent, config.prompt_token_budgets.get("default", 500))
+    available = context_window(provider, model) - used_tokens - RESPONSE_RESERVE
+    return max(0, min(budget, available))
+
+
+def compress_text(text: str, keep_page_markers: bool = False) -> str:
+    """
+    Remove what costs tokens without carrying content.
+
+    Normalises whitespace, drops headers and footers repeated across
+    pages (keeping their first occurrence) and, unless asked to keep them,
+    the "--- Page N ---" markers.
+
+    Args:
+        text: Document text
+        keep_page_markers: Keep page markers (e.g. for page-aware chunking)
+
+    Returns:
+        Compressed text
+    """
+    if not text:
+        return ""
+
+    pages = _split_pages(text)
+    boilerplate = _repeated_edges([lines for _, lines in pages])
+    seen = set()
+    out: List[str] = []
+    for marker, lines in pages:
+        if marker and keep_page_markers:
+            out.append(marker)
+        for index, line in enumerate(lines):
+            key = _line_key(line)
+            at_edge = index < EDGE_LINES or index >= len(lines) - EDGE_LINES
+            if at_edge and key in boilerplate:
+                if key in seen:
+                    continue
+                seen.add(key)
+            out.append(line)
+        out.append("")
+
+    compressed = "\n".join(out)
+    return _BLANK_LINES.sub("\n\n", compressed).strip()
+
+
+def pack_text(
+    text: str,
+    max_tokens: int,
+    counter: TokenCounter,
+    keywords: Iterable[str] = (),
+) -> str:
+    """
+    Fit text into a token budget, keeping the most relevant sections.
+
+    The opening section (titles, parties, document numbers) is always
+    kept. Other sections are ranked by how many keywords they contain and
+    how much of them is label: value data; the best are kept in document
+    order and gaps are marked with "[...]".
+
+    Args:
+        text: Compressed document text
+        max_tokens: Token budget
+        counter: Token counter for the target model
+        keywords: Terms that make a section relevant (field names, values)
+
+    Returns:
+        Text within the budget
+    """
+    if counter.count(text) <= max_tokens:
+        return text
+
+    sections = _sections(text)
+    terms = {term.lower() for keyword in keywords for term in _WORD.findall(str(keyword))}
+    elision_cost = counter.count(f"\n{ELISION}\n")
+
+    ranked = sorted(
+        range(len(sections)),
+        key=lambda i: (i != 0, -_relevance(sections[i], terms), i),
+    )
+    chosen = set()
+    used = 0
+    for index in ranked:
+        cost = counter.count(sections[index]) + elision_cost
+        if used + cost <= max_tokens:
+            chosen.add(index)
+            used += cost
+
+    if not chosen:
+        return counter.truncate(sections[0], max_tokens - elision_cost) + f"\n{ELISION}"
+
+    parts: List[str] = []
+    for index, section in enumerate(sections):
+        if index in chosen:
+            parts.append(section)
+        elif not parts or parts[-1] != ELISION:
+            parts.append(ELISION)
+    return "\n\n".join(parts)
+
+
+def field_terms(data: Dict[str, Any]) -> List[str]:
+    """
+    Keywords for finding the source text of extracted data.
+
+    Args:
+        data: Extracted fields
+
+    Returns:
+        Field names and their scalar values
+    """
+    terms = []
+    for key, value in data.items():
+        if key in ("ai_processing", "extraction_plan", "quality_critique", "extraction_conflicts"):
+            continue
+        terms.append(str(key))
+        values = value if isinstance(value, list) else [value]
+        terms.extend(str(item) for item in values if isinstance(item, (str, int, float)))
+    return terms
+
+
+def _split_pages(text: str) -> List[Tuple[Optional[str], List[str]]]:
+    """(marker, normalised lines) per page; text before the first marker has no marker."""
+    pages = []
+    markers = list(PAGE_MARKER.finditer(text))
+    bounds = [(None, 0, markers[0].start() if markers else len(text))]
+    for i, marker in enumerate(markers):
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+        bounds.append((marker.group(0).strip(), marker.end(), end))
+
+    for marker, start, end in bounds:
+        lines = [_SPACES.sub(" ", line).strip() for line in text[start:end].split("\n")]
+        # Drop leading/trailing blanks so page edges are real content lines
+        while lines and not lines[0]:
+            lines.pop(0)
+        while lines and not lines[-1]:
+            lines.pop()
+        if lines or marker:
+            pages.append((marker, lines))
+    return pages
+
+
+def _repeated_edges(pages: List[List[str]]) -> set:
+    """Lines found at the top or bottom of at least half the pages (and at least two)."""
+    if len(pages) < 2:
+        return set()
+    counts: Counter = Counter()
+    for lines in pages:
+        edges = lines[:EDGE_LINES] + lines[-EDGE_LINES:]
+        counts.update({_line_key(line) for line in edges if line})
+    threshold = max(2, (len(pages) + 1) // 2)
+    return {key for key, count in counts.items() if count >= threshold}
+
+
+def _line_key(line: str) -> str:
+    """Compare lines ignoring case; page numbers ("Page 2 of 9", "- 2 -") all match."""
+    line = line.lower()
+    return "<page number>" if _PAGE_NUMBER.match(line) else line
+
+
+def _sections(text: str) -> List[str]:
+    """Blank-line separated sections; very long ones are split into line groups."""
+    sections = []
+    for section in re.split(r"\n\s*\n", text):
+        if not section.strip():
+            continue
+        lines = section.split("\n")
+        for start in range(0, len(lines), 20):
+            sections.append("\n".join(lines[start : start + 20]))
+    return sections
+
+
+def _relevance(section: str, terms: set) -> float:
+    """Keyword hits plus the share of label: value lines."""
+    words = {word.lower() for word in _WORD.findall(section)}
+    lines = max(1, section.count("\n") + 1)
+    return 2 * len(terms & words) + len(_KEY_VALUE.findall(section)) / lines
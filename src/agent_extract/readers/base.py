@@ -12,6 +12,7 @@ from agent_extract.core.types import (
     ExtractionResult,
 )
 from agent_extract.core.exceptions import DocumentReadError
+from agent_extract.core.metrics import DOCUMENTS_READ, PAGES_READ, READ_SECONDS
 
 
 class BaseReader(ABC):
@@ -80,6 +81,29 @@ class BaseReader(ABC):
         if not file_path.stat().st_size > 0:
             raise DocumentReadError(f"File is empty: {file_path}")
 
+    def _record_read(
+        self,
+        document_type: DocumentType,
+        seconds: float,
+        page_count: Optional[int] = None,
+        failed: bool = False,
+    ) -> None:
+        """
+        Count a read and its duration in the metrics registry.
+
+        Args:
+            document_type: Type of the document
+            seconds: Time spent reading
+            page_count: Pages read, if known
+            failed: Whether the read raised
+        """
+        DOCUMENTS_READ.inc(
+            document_type=document_type.value, status="failed" if failed else "success"
+        )
+        READ_SECONDS.observe(seconds, document_type=document_type.value)
+        if page_count:
+            PAGES_READ.inc(page_count, document_type=document_type.value)
+
     def _create_metadata(
         self,
         file_path: Path,
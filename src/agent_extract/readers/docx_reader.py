@@ -14,6 +14,7 @@ from agent_extract.core.types import (
     ExtractedTable,
 )
 from agent_extract.core.exceptions import DocumentReadError
+from agent_extract.core.tracing import annotate, span
 from agent_extract.readers.base import BaseReader
 
 
@@ -45,15 +46,21 @@ class DOCXReader(BaseReader):
         self._validate_file(file_path)
 
         try:
-            doc = Document(file_path)
-            
-            # Extract text and tables in document order
-            raw_text, tables = self._extract_content(doc)
-            
-            # Get metadata
-            metadata = self._get_docx_metadata(file_path, doc)
-            
+            with span("docx.read", "read", bytes=file_path.stat().st_size):
+                with span("docx.open", "read"):
+                    doc = Document(file_path)
+
+                # Extract text and tables in document order
+                with span("docx.text_extraction", "read"):
+                    raw_text, tables = self._extract_content(doc)
+                    annotate(chars=len(raw_text), tables=len(tables))
+
+                # Get metadata
+                metadata = self._get_docx_metadata(file_path, doc)
+                annotate(pages=metadata.page_count)
+
             processing_time = time.time() - start_time
+            self._record_read(DocumentType.DOCX, processing_time, metadata.page_count)
 
             return ExtractionResult(
                 metadata=metadata,
@@ -64,6 +71,7 @@ class DOCXReader(BaseReader):
             )
 
         except Exception as e:
+            self._record_read(DocumentType.DOCX, time.time() - start_time, failed=True)
             raise DocumentReadError(f"Failed to read DOCX {file_path}: {str(e)}") from e
 
     def _extract_content(self, doc: Document) -> tuple[str, List[ExtractedTable]]:
@@ -10,6 +10,7 @@ from agent_extract.core.types import (
     ExtractionResult,
 )
 from agent_extract.core.exceptions import DocumentReadError
+from agent_extract.core.tracing import annotate, span
 from agent_extract.readers.base import BaseReader
 
 
@@ -51,19 +52,22 @@ class ImageReader(BaseReader):
         self._validate_file(file_path)
 
         try:
-            # Load image
-            image = Image.open(file_path)
-            
-            # Basic image info
-            width, height = image.size
-            mode = image.mode
-            
-            # Extract text using OCR if available
-            raw_text = ""
-            if self.ocr_engine:
-                raw_text = self.ocr_engine.extract_text(file_path)
-            else:
-                raw_text = "[OCR not initialized - text extraction skipped]"
+            with span("image.read", "read", bytes=file_path.stat().st_size, pages=1):
+                # Load image
+                with span("image.open", "read"):
+                    image = Image.open(file_path)
+
+                # Basic image info
+                width, height = image.size
+                mode = image.mode
+                annotate(width=width, height=height)
+
+                # Extract text using OCR if available
+                raw_text = ""
+                if self.ocr_engine:
+                    raw_text = self.ocr_engine.extract_text(file_path)
+                else:
+                    raw_text = "[OCR not initialized - text extraction skipped]"
             
             # Get metadata
             metadata = self._create_metadata(
@@ -73,6 +77,7 @@ class ImageReader(BaseReader):
             )
             
             processing_time = time.time() - start_time
+            self._record_read(DocumentType.IMAGE, processing_time, metadata.page_count)
 
             # Store basic image info in structured_data
             structured_data = {
@@ -91,6 +96,7 @@ class ImageReader(BaseReader):
             )
 
         except Exception as e:
+            self._record_read(DocumentType.IMAGE, time.time() - start_time, failed=True)
             raise DocumentReadError(f"Failed to read image {file_path}: {str(e)}") from e
 
 
@@ -13,6 +13,7 @@ from agent_extract.core.types import (
     BoundingBox,
 )
 from agent_extract.core.exceptions import DocumentReadError
+from agent_extract.core.tracing import annotate, span
 from agent_extract.readers.base import BaseReader
 
 
@@ -42,16 +43,23 @@ class PDFReader(BaseReader):
         self._validate_file(file_path)
 
         try:
-            # Extract text using PyMuPDF (faster)
-            raw_text = self._extract_text_pymupdf(file_path)
-            
-            # Extract tables using pdfplumber (more accurate for tables)
-            tables = self._extract_tables_pdfplumber(file_path)
-            
-            # Get metadata
-            metadata = self._get_pdf_metadata(file_path)
-            
+            with span("pdf.read", "read", bytes=file_path.stat().st_size):
+                # Extract text using PyMuPDF (faster)
+                with span("pdf.text_extraction", "read"):
+                    raw_text = self._extract_text_pymupdf(file_path)
+                    annotate(chars=len(raw_text))
+
+                # Extract tables using pdfplumber (more accurate for tables)
+                with span("pdf.table_detection", "read"):
+                    tables = self._extract_tables_pdfplumber(file_path)
+                    annotate(tables=len(tables))
+
+                # Get metadata
+                metadata = self._get_pdf_metadata(file_path)
+                annotate(pages=metadata.page_count)
+
             processing_time = time.time() - start_time
+            self._record_read(DocumentType.PDF, processing_time, metadata.page_count)
 
             return ExtractionResult(
                 metadata=metadata,
@@ -62,6 +70,7 @@ class PDFReader(BaseReader):
             )
 
         except Exception as e:
+            self._record_read(DocumentType.PDF, time.time() - start_time, failed=True)
             raise DocumentReadError(f"Failed to read PDF {file_path}: {str(e)}") from e
 
     def _extract_text_pymupdf(self, file_path: Path) -> str:
@@ -69,7 +78,10 @@ class PDFReader(BaseReader):
         text_parts = []
 
         try:
-            with fitz.open(file_path) as doc:
+            with span("pdf.open", "read"):
+                doc = fitz.open(file_path)
+            with doc:
+                annotate(pages=len(doc))
                 for page_num, page in enumerate(doc, start=1):
                     text = page.get_text()
                     if text.strip():
@@ -0,0 +1,673 @@
+"""Unit tests for AI agents (no live LLM required)."""
+
+import json
+import pytest
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from agent_extract.core.config import config
+from agent_extract.core.types import DocumentType
+
+
+@pytest.fixture
+def local_llm_config(monkeypatch):
+    """Use the Ollama provider so agents can be built without API keys."""
+    monkeypatch.setattr(config, "llm_provider", "ollama")
+    monkeypatch.setattr(config, "llm_model", "qwen3:0.6b")
+    monkeypatch.setattr(config, "llm_vision_model", "gemma3:4b")
+
+
+@pytest.fixture
+def initial_state():
+    """Minimal agent state for a small invoice."""
+    return {
+        "file_path": "invoice.pdf",
+        "raw_text": "Invoice #12345\nDate: 2025-01-15\nTotal: $100",
+        "ocr_text": None,
+        "image_data": None,
+        "document_type": None,
+        "confidence_score": 0.0,
+        "detected_schema": None,
+        "structured_data": {},
+        "tables": [],
+        "entities": [],
+        "extraction_method": "ai_agents",
+        "processing_steps": [],
+        "errors": [],
+        "current_agent": "init",
+        "next_action": None,
+        "extraction_result": None,
+    }
+
+
+def fake_llm(*responses):
+    """Create a fake chat model returning the given responses in order."""
+    return FakeListChatModel(
+        responses=[r if isinstance(r, str) else json.dumps(r) for r in responses]
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("local_llm_config")
+class TestFusedExtractionAgent:
+    """Tests for FusedExtractionAgent."""
+
+    async def test_confident_result_completes(self, initial_state):
+        """Test that a confident single-call result finishes the workflow."""
+        from agent_extract.agents.fused_agent import FusedExtractionAgent
+
+        agent = FusedExtractionAgent(confidence_threshold=0.8)
+        agent.llm = fake_llm({
+            "plan": {"document_category": "invoice"},
+            "document_type": "invoice",
+            "key_fields": ["invoice_number", "total"],
+            "fields": {"invoice_number": "12345", "total": "$100"},
+            "entities": [{"text": "12345", "entity_type": "number"}],
+            "confidence": 0.92,
+        })
+
+        state = await agent.process(initial_state)
+
+        assert state["next_action"] == "complete"
+        assert state["confidence_score"] == pytest.approx(0.92)
+        assert state["structured_data"]["invoice_number"] == "12345"
+        assert state["structured_data"]["extraction_plan"]["document_category"] == "invoice"
+        assert state["detected_schema"]["document_type"] == "invoice"
+        assert state["document_type"] == DocumentType.UNKNOWN
+        assert [e.text for e in state["entities"]] == ["12345"]
+        assert state["structured_data"]["quality_critique"]["final_verdict"] == "self_assessed"
+
+    async def test_low_confidence_escalates(self, initial_state):
+        """Test that a low-confidence result routes to the planner."""
+        from agent_extract.agents.fused_agent import FusedExtractionAgent
+
+        agent = FusedExtractionAgent(confidence_threshold=0.8)
+        agent.llm = fake_llm({"document_type": "invoice", "fields": {"a": "b"}, "confidence": 0.4})
+
+        state = await agent.process(initial_state)
+
+        assert state["next_action"] == "planner"
+        assert "a" not in state["structured_data"]
+        assert "fast_extraction" not in state["structured_data"]
+        assert "invoice, 1 fields) confidence 40.00%" in state["processing_steps"][-1]
+
+    async def test_unparseable_response_escalates(self, initial_state):
+        """Test that a non-JSON response is treated as zero confidence."""
+        from agent_extract.agents.fused_agent import FusedExtractionAgent
+
+        agent = FusedExtractionAgent()
+        agent.llm = fake_llm("I could not read this document.")
+
+        state = await agent.process(initial_state)
+
+        assert state["next_action"] == "planner"
+
+    async def test_fenced_text_answer(self, initial_state):
+        """Test that the text fallback reads JSON from a fenced answer."""
+        from agent_extract.agents.fused_agent import FusedExtractionAgent
+
+        agent = FusedExtractionAgent(confidence_threshold=0.8)
+        agent.llm = fake_llm('Here you go:\n```json\n{"fields": {"a": "b"}, "confidence": 0.9}\n```')
+
+        state = await agent.process(initial_state)
+
+        assert state["next_action"] == "complete"
+        assert state["structured_data"]["a"] == "b"
+
+
+@pytest.mark.usefixtures("local_llm_config")
+class TestFastModeGraph:
+    """Tests for the fast graph variant."""
+
+    @pytest.mark.asyncio
+    async def test_fast_mode_single_call(self, initial_state):
+        """Test that a confident fused call skips the multi-agent loop."""
+        from agent_extract.agents.graph import DocumentExtractionGraph
+
+        graph = DocumentExtractionGraph(use_vision=False, fast_mode=True)
+        graph.fused_agent.llm = fake_llm({"document_type": "invoice", "confidence": 0.95})
+        graph.planner_agent.llm = fake_llm("planner must not run")
+
+        final_state = await graph.extract(initial_state)
+
+        assert final_state["extraction_method"] == "ai_agents"
+        assert all("[PlannerAgent]" not in step for step in final_state["processing_steps"])
+        assert final_state["confidence_score"] == pytest.approx(0.95)
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_nodes_then_end(self, initial_state):
+        """Test that stream reports each node's update and ends with the final state."""
+        from langgraph.graph import END
+        from agent_extract.agents.graph import DocumentExtractionGraph
+
+        graph = DocumentExtractionGraph(use_vision=False, fast_mode=True)
+        graph.fused_agent.llm = fake_llm({"document_type": "invoice", "confidence": 0.95})
+
+        items = [item async for item in graph.stream(initial_state)]
+
+        assert [node for node, _ in items] == ["fused", END]
+        assert items[0][1]["detected_schema"]["document_type"] == "invoice"
+        assert items[-1][1]["confidence_score"] == pytest.approx(0.95)
+
+    @pytest.mark.asyncio
+    async def test_agent_and_llm_spans(self, initial_state):
+        """Test that each agent and its LLM call are recorded as spans."""
+        from agent_extract.agents.graph import DocumentExtractionGraph
+        from agent_extract.core.tracing import trace
+
+        graph = DocumentExtractionGraph(use_vision=False, fast_mode=True)
+        graph.fused_agent.llm = fake_llm({"document_type": "invoice", "confidence": 0.95})
+
+        with trace() as current:
+            await graph.extract(initial_state)
+
+        spans = {item.name: item for item in current.spans}
+        assert spans["FusedExtractionAgent"].stage == "agent"
+        llm_span = spans["llm.FusedExtractionAgent"]
+        assert llm_span.parent_id == spans["FusedExtractionAgent"].span_id
+        assert llm_span.attributes["model"] == "qwen3:0.6b"
+        assert llm_span.attributes["prompt_chars"] > 0
+
+    @pytest.mark.asyncio
+    async def test_usage_accounting(self, initial_state, monkeypatch):
+        """Test that reported tokens are priced and aggregated per agent."""
+        from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+        from langchain_core.messages import AIMessage
+        from agent_extract.agents.graph import DocumentExtractionGraph
+        from agent_extract.core.usage import summarize_usage, track_usage
+
+        monkeypatch.setattr(config, "llm_prices", {"qwen3": {"input": 1.0, "output": 2.0}})
+        graph = DocumentExtractionGraph(use_vision=False, fast_mode=True)
+        graph.fused_agent.provider = "openai"
+        graph.fused_agent.llm = GenericFakeChatModel(messages=iter([AIMessage(
+            content=json.dumps({"document_type": "invoice", "confidence": 0.95}),
+            usage_metadata={"input_tokens": 1000, "output_tokens": 500, "total_tokens": 1500},
+        )]))
+
+        with track_usage() as calls:
+            await graph.extract(initial_state)
+
+        usage = summarize_usage(calls)
+        assert usage["total"]["total_tokens"] == 1500
+        assert usage["total"]["cost"] == pytest.approx(0.002)
+        agent_usage = usage["by_agent"]["FusedExtractionAgent"]
+        assert agent_usage["calls"] == 1
+        assert agent_usage["input_tokens"] == 1000
+        assert usage["calls"][0]["estimated_tokens"] is False
+
+    def test_default_graph_has_no_fused_agent(self):
+        """Test that the supervised graph is unchanged by default."""
+        from agent_extract.agents.graph import DocumentExtractionGraph
+
+        graph = DocumentExtractionGraph(use_vision=False)
+        assert graph.fused_agent is None
+        assert "fused" not in graph.graph.get_graph().nodes
+
+
+@pytest.mark.usefixtures("local_llm_config")
+class TestParallelGraph:
+    """Tests for the parallel fan-out topology."""
+
+    def _build(self):
+        from agent_extract.agents.graph import DocumentExtractionGraph
+
+        graph = DocumentExtractionGraph(use_vision=True, topology="parallel")
+        graph.planner_agent.llm = fake_llm({"document_category": "invoice"})
+        graph.schema_agent.llm = fake_llm({"document_type": "invoice", "confidence": 0.9})
+        graph.table_agent.llm = fake_llm({"tables": [{"headers": ["Item"], "rows": [["A"]]}]})
+        graph.vision_agent.llm = fake_llm({"layout_type": "form"})
+        graph.extraction_agent.llm = fake_llm({"invoice_number": "12345", "total": "$100"})
+        graph.critic_agent.llm = fake_llm({"confidence_score": 0.85, "final_verdict": "approve"})
+        return graph
+
+    @pytest.mark.asyncio
+    async def test_branches_merge_into_state(self, initial_state):
+        """Test that concurrent branches are merged without duplicates."""
+        graph = self._build()
+        initial_state["file_path"] = "invoice.png"
+
+        final_state = await graph.extract(initial_state)
+
+        steps = final_state["processing_steps"]
+        assert len(steps) == len(set(steps))
+        for agent in ("PlannerAgent", "SchemaDetectionAgent", "TableParserAgent",
+                      "DocumentVisionAgent", "ContentExtractionAgent", "CriticAgent"):
+            assert any(step.startswith(f"[{agent}]") for step in steps)
+
+        assert final_state["errors"] == []
+        assert final_state["detected_schema"]["document_type"] == "invoice"
+        assert [t.headers for t in final_state["tables"]] == [["Item"]]
+        assert final_state["structured_data"]["vision_analysis"]["layout_type"] == "form"
+        assert final_state["structured_data"]["invoice_number"] == "12345"
+        assert final_state["confidence_score"] == pytest.approx(0.85)
+
+    @pytest.mark.asyncio
+    async def test_branch_returns_only_changes(self, initial_state):
+        """Test that a branch update holds only new list items and changed keys."""
+        graph = self._build()
+        initial_state["processing_steps"] = ["Basic extraction completed"]
+
+        update = await graph._run_branch(graph.schema_agent, initial_state)
+
+        assert len(update["processing_steps"]) == 1
+        assert "next_action" not in update
+        assert "raw_text" not in update
+        assert update["detected_schema"]["document_type"] == "invoice"
+        assert initial_state["processing_steps"] == ["Basic extraction completed"]
+
+    @pytest.mark.asyncio
+    async def test_branch_keeps_repeated_items(self, initial_state):
+        """Test that appending an object already in state still counts as new."""
+        graph = self._build()
+        error = "Table extraction failed"
+        initial_state["errors"] = [error]
+
+        async def process(state):
+            state["errors"].append(error)
+            return state
+
+        graph.schema_agent.process = process
+        update = await graph._run_branch(graph.schema_agent, initial_state)
+
+        assert update["errors"] == [error]
+
+    def test_unknown_topology(self):
+        """Test that an unknown topology is rejected."""
+        from agent_extract.agents.graph import DocumentExtractionGraph
+
+        with pytest.raises(ValueError):
+            DocumentExtractionGraph(use_vision=False, topology="mesh")
+
+
+@pytest.mark.asyncio
+class TestSupervisedLoop:
+    """Tests for the loop limits of the supervised topology."""
+
+    @pytest.fixture(autouse=True)
+    def fake_config(self, monkeypatch):
+        """Use the fake provider."""
+        from agent_extract.core.llm_provider import LLMFactory
+
+        monkeypatch.setattr(config, "llm_provider", "fake")
+        monkeypatch.setattr(config, "llm_model", "fake-model")
+        LLMFactory.clear()
+        yield
+        LLMFactory.clear()
+
+    async def run(self, initial_state, supervisor, verdict="approve"):
+        """Run the supervised graph; returns how many times each agent ran."""
+        from collections import Counter
+
+        from agent_extract.agents.graph import DocumentExtractionGraph
+        from agent_extract.core.fake_llm import DEFAULT_SCRIPT, FakeChatModel
+
+        script = [
+            {"match": ["supervisor AI"], "response": {"next_agent": supervisor}},
+            {"match": ["quality assurance expert"], "response": {"final_verdict": verdict}},
+            *DEFAULT_SCRIPT,
+        ]
+        graph = DocumentExtractionGraph(use_vision=False)
+        for agent in (graph.supervisor_agent, graph.extraction_agent, graph.critic_agent):
+            agent.llm = FakeChatModel(script=script)
+
+        state = await graph.extract(initial_state)
+        assert state["errors"] == []
+        return Counter(step.split("]")[0][1:] for step in state["processing_steps"])
+
+    async def test_supervisor_rounds_are_bounded(self, initial_state):
+        """Test that a supervisor that never finishes is sent to the critic."""
+        from agent_extract.agents.graph import MAX_SUPERVISOR_ROUNDS
+
+        runs = await self.run(initial_state, supervisor="extraction")
+
+        assert runs["SupervisorAgent"] == MAX_SUPERVISOR_ROUNDS == 6
+        assert runs["ContentExtractionAgent"] == MAX_SUPERVISOR_ROUNDS - 1
+        assert runs["CriticAgent"] == 1
+
+    async def test_reextractions_are_bounded(self, initial_state):
+        """Test that a critic that never approves reviews at most twice."""
+        from agent_extract.agents.graph import MAX_CRITIC_REVIEWS
+
+        runs = await self.run(initial_state, supervisor="critic", verdict="request_reextraction")
+
+        assert runs["CriticAgent"] == MAX_CRITIC_REVIEWS == 2
+        assert runs["SupervisorAgent"] == 2
+
+
+def slow_llm(seconds, *responses):
+    """Fake chat model that takes `seconds` to answer."""
+    import asyncio
+
+    class SlowModel(FakeListChatModel):
+        async def ainvoke(self, *args, **kwargs):
+            await asyncio.sleep(seconds)
+            return await super().ainvoke(*args, **kwargs)
+
+        async def astream(self, *args, **kwargs):
+            await asyncio.sleep(seconds)
+            async for chunk in super().astream(*args, **kwargs):
+                yield chunk
+
+    return SlowModel(responses=[r if isinstance(r, str) else json.dumps(r) for r in responses])
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("local_llm_config")
+class TestDeadlines:
+    """Tests for LLM, agent and document deadlines and hedged requests."""
+
+    async def test_llm_timeout_falls_back(self, initial_state, monkeypatch):
+        """Test that a request past the LLM timeout takes the agent's error path."""
+        from agent_extract.agents.planner_agent import PlannerAgent
+
+        monkeypatch.setattr(config, "llm_timeout_seconds", 0.05)
+        agent = PlannerAgent()
+        agent.llm = slow_llm(1, {"document_category": "invoice"})
+
+        state = await agent.process(initial_state)
+
+        assert state["structured_data"]["extraction_plan"]["document_category"] == "unknown"
+        assert "Planning failed" in state["errors"][-1]
+
+    async def test_agent_deadline(self, initial_state, monkeypatch):
+        """Test that an agent past its deadline is stopped and recorded."""
+        from agent_extract.agents.graph import DocumentExtractionGraph
+
+        monkeypatch.setattr(config, "agent_timeouts", {"FusedExtractionAgent": 0.05})
+        graph = DocumentExtractionGraph(use_vision=False, fast_mode=True)
+        graph.fused_agent.llm = slow_llm(1, {"confidence": 0.95})
+
+        state = await graph._run_agent(graph.fused_agent, initial_state)
+
+        assert state["next_action"] == "planner"
+        assert state["errors"] == ["FusedExtractionAgent timed out after 0.05s"]
+
+    async def test_document_deadline_keeps_finished_work(self, initial_state, monkeypatch):
+        """Test that the workflow stops at the document deadline with what it has."""
+        from agent_extract.agents.graph import DocumentExtractionGraph
+
+        monkeypatch.setattr(config, "document_timeout_seconds", 0.2)
+        graph = DocumentExtractionGraph(use_vision=False)
+        graph.planner_agent.llm = fake_llm({"document_category": "invoice"})
+        graph.supervisor_agent.llm = slow_llm(5, {"next_agent": "schema"})
+
+        final_state = await graph.extract(initial_state)
+
+        plan = final_state["structured_data"]["extraction_plan"]
+        assert plan["document_category"] == "invoice"
+        assert final_state["errors"][-1] == "Document deadline of 0.2s exceeded"
+
+    async def test_hedged_request_wins(self, initial_state, monkeypatch):
+        """Test that a slow call is hedged to the secondary model and billed to it."""
+        from agent_extract.agents.fused_agent import FusedExtractionAgent
+        from agent_extract.core.hedging import latencies
+        from agent_extract.core.usage import track_usage
+
+        monkeypatch.setattr(config, "llm_hedge_min_samples", 1)
+        latencies.reset()
+        latencies.record("ollama", "qwen3:0.6b", 0.01)
+        agent = FusedExtractionAgent()
+        agent.llm = slow_llm(5, {"confidence": 0.1})
+        agent.hedge_provider, agent.hedge_model = "ollama", "qwen3:4b"
+        agent.hedge_llm = fake_llm({"document_type": "invoice", "confidence": 0.95})
+
+        with track_usage() as calls:
+            state = await agent.process(initial_state)
+        latencies.reset()
+
+        assert state["confidence_score"] == pytest.approx(0.95)
+        assert [call.model for call in calls] == ["qwen3:4b"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("local_llm_config")
+class TestPromptBudgets:
+    """Tests for token-budgeted agent prompts."""
+
+    async def test_critic_excerpt_fits_budget(self, initial_state, monkeypatch):
+        """Test that the critic sends the passages its fields came from."""
+        from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+        from langchain_core.messages import AIMessage
+
+        from agent_extract.agents.critic_agent import CriticAgent
+        from agent_extract.processors.prompt_budget import TokenCounter
+
+        monkeypatch.setattr(config, "prompt_token_budgets", {"critic": 120})
+        filler = "\n\n".join(f"Terms clause {i}. " + "boilerplate " * 30 for i in range(40))
+        initial_state["raw_text"] = f"Invoice INV-7\n\n{filler}\n\nAmount due: $912.40"
+        initial_state["structured_data"] = {"amount_due": "$912.40"}
+
+        prompts = []
+
+        class RecordingModel(GenericFakeChatModel):
+            async def ainvoke(self, messages, *args, **kwargs):
+                prompts.append(messages[1].content)
+                return await super().ainvoke(messages, *args, **kwargs)
+
+        agent = CriticAgent()
+        agent.llm = RecordingModel(
+            messages=iter([AIMessage(content='{"final_verdict": "approve"}')])
+        )
+
+        await agent.process(initial_state)
+
+        excerpt = prompts[0].split("ORIGINAL TEXT (excerpt):\n")[1].split("\n\nEXTRACTED DATA")[0]
+        assert TokenCounter("ollama", "qwen3:0.6b").count(excerpt) <= 120
+        assert excerpt.startswith("Invoice INV-7")
+        assert "Amount due: $912.40" in excerpt
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("local_llm_config")
+class TestChunkedExtraction:
+    """Tests for map-reduce extraction of long documents."""
+
+    async def test_long_document_is_not_truncated(self, initial_state, monkeypatch):
+        """Test that every page of a long document is sent to the LLM."""
+        from agent_extract.agents.extraction_agent import ContentExtractionAgent
+
+        monkeypatch.setattr(config, "chunk_max_chars", 400)
+        agent = ContentExtractionAgent()
+        agent.llm = fake_llm(
+            {"invoice_number": "INV-1", "total": ""},
+            {"total": "$45.00"},
+            {"invoice_number": "INV-9"},
+        )
+        pages = [f"--- Page {i} ---\n" + f"page {i} " * 40 for i in range(1, 4)]
+        initial_state["raw_text"] = "\n\n".join(pages)
+
+        state = await agent.process(initial_state)
+
+        assert agent.llm.i == 0  # all three responses consumed
+        assert state["structured_data"]["total"] == "$45.00"
+        assert state["structured_data"]["invoice_number"] == "INV-1"
+        assert state["structured_data"]["extraction_conflicts"] == {
+            "invoice_number": ["INV-1", "INV-9"]
+        }
+        assert "from 3 chunks" in state["processing_steps"][-1]
+
+
+@pytest.mark.asyncio
+class TestStructuredOutput:
+    """Tests for answers parsed by the providers' structured-output modes."""
+
+    @pytest.fixture(autouse=True)
+    def fake_config(self, monkeypatch):
+        """Select the fake provider, whose client has a JSON mode."""
+        from agent_extract.core.llm_provider import LLMFactory
+
+        monkeypatch.setattr(config, "llm_provider", "fake")
+        monkeypatch.setattr(config, "llm_model", "fake-model")
+        LLMFactory.clear()
+        yield
+        LLMFactory.clear()
+
+    async def test_native_answer(self, initial_state):
+        """Test that a schema-valid answer is used without text scraping."""
+        from agent_extract.agents.critic_agent import CriticAgent
+        from agent_extract.core.fake_llm import FakeChatModel
+        from agent_extract.core.metrics import LLM_STRUCTURED_OUTPUT
+
+        before = LLM_STRUCTURED_OUTPUT.value(agent="CriticAgent", mode="native")
+        agent = CriticAgent()
+        answer = {"confidence_score": 0.95, "missing_fields": ["x"]}
+        agent.llm = FakeChatModel(script=[{"match": ["."], "response": answer}])
+
+        state = await agent.process(initial_state)
+
+        critique = state["structured_data"]["quality_critique"]
+        assert critique["final_verdict"] == "approve"
+        assert critique["missing_fields"] == ["x"]
+        assert "completeness" not in critique
+        assert LLM_STRUCTURED_OUTPUT.value(agent="CriticAgent", mode="native") == before + 1
+
+    async def test_invalid_answer_falls_back_to_text(self, initial_state):
+        """Test that an answer failing the schema is parsed from its text."""
+        from agent_extract.agents.supervisor_agent import SupervisorAgent
+        from agent_extract.core.fake_llm import FakeChatModel
+        from agent_extract.core.metrics import LLM_STRUCTURED_OUTPUT
+
+        before = LLM_STRUCTURED_OUTPUT.value(agent="SupervisorAgent", mode="text")
+        agent = SupervisorAgent()
+        agent.llm = FakeChatModel(script=[{"match": ["."], "response": "Send it to the critic."}])
+
+        state = await agent.process(initial_state)
+
+        assert state["next_action"] == "critic"
+        assert LLM_STRUCTURED_OUTPUT.value(agent="SupervisorAgent", mode="text") == before + 1
+
+    async def test_binding(self, monkeypatch):
+        """Test which providers and schemas get a structured-output binding."""
+        from agent_extract.agents.responses import ExtractedFields, RoutingDecision
+        from agent_extract.core.fake_llm import FakeChatModel
+        from agent_extract.core.llm_provider import LLMFactory
+
+        llm = FakeChatModel()
+        bound = LLMFactory.structured(llm, "fake", RoutingDecision)
+
+        assert bound is not None
+        assert LLMFactory.structured(llm, "fake", RoutingDecision) is bound
+        # Open schemas need a JSON mode, which tool-calling providers lack
+        assert LLMFactory.structured(llm, "anthropic", ExtractedFields) is None
+
+        monkeypatch.setattr(config, "llm_structured_output", False)
+        assert LLMFactory.structured(llm, "fake", ExtractedFields) is None
+
+    async def test_routing_stops_streaming_early(self, initial_state):
+        """Test that the supervisor stops generation once it has its routing decision."""
+        import time
+
+        from agent_extract.agents.supervisor_agent import SupervisorAgent
+        from agent_extract.core.fake_llm import FakeChatModel
+        from agent_extract.core.usage import track_usage
+
+        answer = {"next_agent": "critic", "reason": "long explanation " * 40}
+        agent = SupervisorAgent()
+        # ~180 output tokens at 200/s: 0.9s for the whole answer
+        agent.llm = FakeChatModel(
+            script=[{"match": ["."], "response": answer}], tokens_per_second="constant:200"
+        )
+
+        started = time.perf_counter()
+        with track_usage() as calls:
+            state = await agent.process(initial_state)
+
+        assert time.perf_counter() - started < 0.4
+        assert state["next_action"] == "critic"
+        assert calls[0].estimated_tokens
+        assert calls[0].output_tokens < 20
+
+    async def test_completed_fields(self):
+        """Test that required fields count only once their values are complete."""
+        from agent_extract.agents.responses import (
+            DocumentSchema,
+            RoutingDecision,
+            completed_fields,
+        )
+
+        assert completed_fields('{"next_agent": "cri', RoutingDecision) is None
+        assert completed_fields('```json\n{"next_agent": "critic"', RoutingDecision) == {
+            "next_agent": "critic"
+        }
+        assert completed_fields('{"document_type": "invoice"}', DocumentSchema) is None
+
+
+@pytest.mark.asyncio
+class TestEarlyExit:
+    """Tests for finishing the workflow once extraction meets the exit criteria."""
+
+    @pytest.fixture(autouse=True)
+    def fake_config(self, monkeypatch):
+        """Run the default fake script with early exit on."""
+        from agent_extract.core.llm_provider import LLMFactory
+
+        monkeypatch.setattr(config, "llm_provider", "fake")
+        monkeypatch.setattr(config, "llm_model", "fake-model")
+        monkeypatch.setattr(config, "early_exit", True)
+        LLMFactory.clear()
+        yield
+        LLMFactory.clear()
+
+    async def run(self, initial_state, topology="supervised"):
+        """Extract with the default script; returns (final state, agents called)."""
+        from agent_extract.agents.graph import DocumentExtractionGraph
+        from agent_extract.core.usage import track_usage
+
+        # The values the default script extracts
+        initial_state["raw_text"] = "Acme Corp\nInvoice INV-0001\nDate: 2025-01-15\nTotal: 100.00"
+        graph = DocumentExtractionGraph(use_vision=False, topology=topology)
+        with track_usage() as calls:
+            state = await graph.extract(initial_state)
+        return state, [call.agent for call in calls]
+
+    async def test_skips_review(self, initial_state):
+        """Test that a confident, complete and grounded extraction skips the critic."""
+        from agent_extract.core.metrics import WORKFLOW_EARLY_EXITS
+
+        before = WORKFLOW_EARLY_EXITS.value(topology="supervised")
+
+        state, agents = await self.run(initial_state)
+
+        assert agents[-1] == "ContentExtractionAgent"
+        assert "CriticAgent" not in agents
+        assert state["structured_data"]["invoice_number"] == "INV-0001"
+        # One step per agent run: node updates are deltas, not whole states
+        assert len(state["processing_steps"]) == len(agents) == 5
+        assert WORKFLOW_EARLY_EXITS.value(topology="supervised") == before + 1
+
+    async def test_criteria_not_met(self, initial_state, monkeypatch):
+        """Test that low confidence or missing fields send the result to the critic."""
+        monkeypatch.setattr(config, "early_exit_min_confidence", 0.95)
+        _, agents = await self.run(initial_state)
+        assert agents[-1] == "CriticAgent"
+
+        monkeypatch.setattr(config, "early_exit_min_confidence", 0.85)
+        monkeypatch.setattr(config, "early_exit_required_fields", ["invoice_number", "po_number"])
+        _, agents = await self.run(initial_state)
+        assert agents[-1] == "CriticAgent"
+
+    async def test_ungrounded_value(self, initial_state, monkeypatch):
+        """Test that validation requires the values to appear in the document."""
+        from agent_extract.agents.graph import DocumentExtractionGraph
+
+        graph = DocumentExtractionGraph(use_vision=False)
+        state = {
+            **initial_state,
+            "raw_text": "Invoice INV-0001, total 100.00",
+            "detected_schema": {"confidence": 0.9, "key_fields": ["invoice_number", "total"]},
+            "structured_data": {"invoice_number": "INV-0001", "total": "100.00"},
+        }
+        assert graph._meets_exit_criteria(state)
+
+        state["structured_data"] = {"invoice_number": "INV-0002", "total": "100.00"}
+        assert not graph._meets_exit_criteria(state)
+
+        monkeypatch.setattr(config, "early_exit_require_validation", False)
+        assert graph._meets_exit_criteria(state)
+
+    async def test_parallel_topology(self, initial_state):
+        """Test that the parallel workflow also ends after extraction."""
+        _, agents = await self.run(initial_state, topology="parallel")
+
+        assert agents[-1] == "ContentExtractionAgent"
+        assert "CriticAgent" not in agents
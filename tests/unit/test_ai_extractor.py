@@ -0,0 +1,128 @@
+"""Unit tests for AIDocumentExtractor batch APIs (no live LLM required)."""
+
+import asyncio
+import pytest
+from pathlib import Path
+
+from langgraph.graph import END
+
+from agent_extract.core.config import config
+from agent_extract.core.types import DocumentMetadata, DocumentType, ExtractionResult
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    """AI extractor with stubbed reader and agent stages."""
+    monkeypatch.setattr(config, "llm_provider", "ollama")
+    monkeypatch.setattr(config, "llm_model", "qwen3:0.6b")
+    monkeypatch.setattr(config, "llm_vision_model", "gemma3:4b")
+
+    from agent_extract.ai_extractor import AIDocumentExtractor
+
+    extractor = AIDocumentExtractor(use_vision=False)
+    extractor.in_flight = 0
+    extractor.peak = 0
+
+    async def basic_extraction(file_path):
+        await asyncio.sleep(0.001)
+        if file_path.name == "broken.pdf":
+            raise ValueError("cannot read")
+        return ExtractionResult(
+            metadata=DocumentMetadata(
+                filename=file_path.name, file_size=1, document_type=DocumentType.PDF
+            ),
+            raw_text=file_path.stem,
+        )
+
+    async def run_agents(state):
+        extractor.in_flight += 1
+        extractor.peak = max(extractor.peak, extractor.in_flight)
+        # Later documents finish first
+        await asyncio.sleep(0.05 if state["raw_text"] == "slow" else 0.01)
+        extractor.in_flight -= 1
+        yield END, state
+
+    monkeypatch.setattr(extractor, "_basic_extraction", basic_extraction)
+    monkeypatch.setattr(extractor.agent_graph, "stream", run_agents)
+    yield extractor
+    extractor.close()
+
+
+@pytest.mark.asyncio
+class TestExtractMany:
+    """Tests for AIDocumentExtractor.extract_many."""
+
+    async def test_completion_order_and_limit(self, extractor):
+        """Test that results stream as they finish under the LLM limit."""
+        paths = (Path(f"{name}.pdf") for name in ["slow", "a", "b", "c", "d"])
+
+        results = [item async for item in extractor.extract_many(paths, concurrency=2)]
+
+        names = [path.stem for path, _ in results]
+        assert sorted(names) == ["a", "b", "c", "d", "slow"]
+        assert names[0] != "slow"
+        assert extractor.peak == 2
+        assert all(isinstance(r, ExtractionResult) for _, r in results)
+
+    async def test_failures_are_yielded(self, extractor):
+        """Test that one failing document does not stop the batch."""
+        paths = [Path("broken.pdf"), Path("ok.pdf")]
+
+        results = dict([item async for item in extractor.extract_many(paths)])
+
+        assert isinstance(results[Path("broken.pdf")], ValueError)
+        assert isinstance(results[Path("ok.pdf")], ExtractionResult)
+
+    async def test_early_close_waits_for_cancelled_documents(self, extractor, monkeypatch):
+        """Test that closing the stream early lets in-flight documents unwind."""
+        unwound = []
+
+        async def run_agents(state):
+            try:
+                await asyncio.sleep(0.01 if state["raw_text"] == "fast" else 10)
+            finally:
+                unwound.append(state["raw_text"])
+            yield END, state
+
+        monkeypatch.setattr(extractor.agent_graph, "stream", run_agents)
+        results = extractor.extract_many([Path("fast.pdf"), Path("a.pdf"), Path("b.pdf")])
+
+        path, _ = await results.__anext__()
+        await results.aclose()
+
+        assert path == Path("fast.pdf")
+        assert sorted(unwound) == ["a", "b", "fast"]
+
+
+def test_extract_sync_reuses_event_loop(extractor):
+    """Test that extract_sync keeps one loop across calls."""
+    extractor.extract_sync(Path("a.pdf"))
+    loop = extractor._loop
+    extractor.extract_sync(Path("b.pdf"))
+
+    assert extractor._loop is loop
+    extractor.close()
+    assert loop.is_closed()
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_agent_progress(extractor, monkeypatch):
+    """Test that stream yields each agent's additions before the result."""
+
+    async def run_agents(state):
+        schema = {"document_category": "invoice"}
+        yield "schema_detection", {"detected_schema": schema, "processing_steps": ["Schema"]}
+        yield "data_extraction", {"detected_schema": schema, "structured_data": {"total": 42}}
+        yield END, {**state, "detected_schema": schema, "structured_data": {"total": 42}}
+
+    monkeypatch.setattr(extractor.agent_graph, "stream", run_agents)
+
+    events = [event async for event in extractor.stream(Path("invoice.pdf"))]
+
+    assert [e.event for e in events] == ["started", "basic_extraction", "agent", "agent", "result"]
+    assert events[2].agent == "schema_detection"
+    assert events[2].data == {"detected_schema": {"document_category": "invoice"}}
+    assert events[2].message == "Schema"
+    # The unchanged schema is not repeated
+    assert events[3].data == {"structured_data": {"total": 42}}
+    assert events[-1].result.structured_data["total"] == 42
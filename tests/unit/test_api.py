@@ -0,0 +1,331 @@
+"""Unit tests for the extraction API."""
+
+import asyncio
+import io
+import threading
+import time
+from datetime import timedelta
+import pytest
+
+from docx import Document
+
+pytest.importorskip("fastapi")
+from fastapi.testclient import TestClient
+
+from agent_extract.api.app import create_app
+from agent_extract.api.queue import JobQueue, JobStore
+from agent_extract.api.schemas import ExtractionOptions, JobStatus, Priority
+from agent_extract.api.service import ExtractionService
+from agent_extract.core.exceptions import ServiceBusyError
+
+
+def docx_bytes(text: str) -> bytes:
+    """Build a one-paragraph DOCX file in memory."""
+    buffer = io.BytesIO()
+    doc = Document()
+    doc.add_paragraph(text)
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def service(temp_dir):
+    """Service with one reader process and no OCR."""
+    return ExtractionService(
+        reader_workers=1,
+        max_concurrency=1,
+        max_pending=2,
+        spool_dir=temp_dir / "spool",
+        job_db=temp_dir / "jobs.sqlite",
+        use_ocr=False,
+    )
+
+
+@pytest.fixture
+def client(service):
+    """Test client whose lifespan starts and stops the service."""
+    with TestClient(create_app(service)) as client:
+        yield client
+
+
+def upload(name="memo.docx", text="Quarterly memo"):
+    return {"file": (name, docx_bytes(text))}
+
+
+class TestExtractionAPI:
+    """Tests for the HTTP endpoints."""
+
+    def test_health(self, client):
+        """Test that health reports load and limits."""
+        data = client.get("/health").json()
+        assert data["status"] == "ok"
+        assert data["max_concurrency"] == 1
+        assert data["queued"] == 0
+
+    def test_sync_extract_json_and_markdown(self, client, service):
+        """Test synchronous extraction keeps the file name and cleans the spool."""
+        response = client.post("/extract", files=upload())
+        assert response.status_code == 200
+        data = response.json()
+        assert "Quarterly memo" in data["raw_text"]
+        assert data["metadata"]["filename"] == "memo.docx"
+
+        response = client.post("/extract?format=markdown", files=upload())
+        assert response.headers["content-type"].startswith("text/markdown")
+        assert response.text.startswith("# memo.docx")
+
+        assert list(service.spool_dir.iterdir()) == []
+        assert service.queue.running == 0
+
+    def test_metrics_endpoint(self, client):
+        """Test that /metrics counts reads done in the reader process."""
+        from agent_extract.core.metrics import DOCUMENTS_READ
+
+        before = DOCUMENTS_READ.value(document_type="docx", status="success")
+        assert client.post("/extract", files=upload()).status_code == 200
+
+        response = client.get("/metrics")
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'agent_extract_api_jobs{state="running"} 0' in response.text
+        assert 'agent_extract_documents_total{source="api",status="success"}' in response.text
+        assert DOCUMENTS_READ.value(document_type="docx", status="success") == before + 1
+
+    def test_unreadable_file(self, client):
+        """Test that reader failures map to 422."""
+        response = client.post("/extract", files={"file": ("bad.docx", b"not a docx")})
+        assert response.status_code == 422
+
+    def test_unsupported_format(self, client):
+        """Test that files no reader handles map to 415."""
+        response = client.post("/extract", files={"file": ("notes.xyz", b"data")})
+        assert response.status_code == 415
+
+    @pytest.mark.parametrize(
+        "error, status", [(RuntimeError("pool broken"), 500), (TimeoutError("deadline"), 504)]
+    )
+    def test_internal_failures(self, client, service, monkeypatch, error, status):
+        """Test that faults other than bad input are not reported as 422."""
+        async def fail(job, file_path):
+            raise error
+
+        monkeypatch.setattr(service, "_extract", fail)
+        response = client.post("/extract", files=upload())
+        assert response.status_code == status
+
+        job = client.post("/jobs", files=upload()).json()
+        while client.get(f"/jobs/{job['job_id']}").json()["status"] != "failed":
+            time.sleep(0.01)
+        assert client.get(f"/jobs/{job['job_id']}/result").status_code == status
+
+    def test_upload_size_limit(self, client, service, monkeypatch):
+        """Test that oversized uploads are rejected and not left on disk."""
+        from agent_extract.core.config import config
+
+        monkeypatch.setattr(config, "max_file_size_mb", 0)
+        response = client.post("/extract", files=upload())
+        assert response.status_code == 413
+        assert list(service.spool_dir.iterdir()) == []
+
+    def test_async_job(self, client):
+        """Test submitting a job and polling for its result."""
+        response = client.post("/jobs", files=upload(text="Job document"))
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            status = client.get(f"/jobs/{job_id}").json()["status"]
+            if status in ("succeeded", "failed"):
+                break
+            time.sleep(0.05)
+
+        assert status == "succeeded"
+        result = client.get(f"/jobs/{job_id}/result").json()
+        assert "Job document" in result["raw_text"]
+        assert client.get("/jobs/unknown").status_code == 404
+
+    def test_stream_extract_events(self, client):
+        """Test that /extract/stream sends progress as server-sent events."""
+        with client.stream("POST", "/extract/stream", files=upload(text="Streamed")) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            job_id = response.headers["X-Job-ID"]
+            body = "".join(response.iter_text())
+
+        events = [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event:")]
+        assert events[-2:] == ["started", "result"]
+        assert "Streamed" in body
+
+        # A finished job replays only its final event
+        with client.websocket_connect(f"/jobs/{job_id}/ws") as websocket:
+            event = websocket.receive_json()
+        assert event["event"] == "result"
+        assert "Streamed" in event["result"]["raw_text"]
+        assert client.get("/jobs/unknown/events").status_code == 404
+
+    def test_rejects_when_queue_full(self, client, service):
+        """Test that submissions beyond the queue depth get 429."""
+        async def slow_run(job, file_path):
+            await asyncio.sleep(0.5)
+            raise RuntimeError("slow")
+
+        service.queue.run_job = slow_run
+
+        # One job runs, two wait, the fourth is rejected
+        responses = [client.post("/jobs", files=upload()) for _ in range(4)]
+        assert [r.status_code for r in responses] == [202, 202, 202, 429]
+        assert responses[-1].headers["Retry-After"]
+
+
+@pytest.mark.asyncio
+class TestJobQueue:
+    """Tests for JobQueue scheduling and persistence."""
+
+    def make_queue(self, temp_dir, log, gate=None, **kwargs):
+        """Queue whose jobs record their start order and wait on a gate."""
+        async def run_job(job, spool_path):
+            log.append(job.file_name)
+            if gate is not None:
+                await gate.wait()
+            return None
+
+        return JobQueue(JobStore(temp_dir / "jobs.sqlite"), run_job, **kwargs)
+
+    def spool(self, temp_dir, name):
+        path = temp_dir / name
+        path.write_text("x")
+        return path
+
+    async def test_interactive_before_bulk_with_reserved_slot(self, temp_dir):
+        """Test that bulk jobs leave a slot free and interactive jobs jump the queue."""
+        log = []
+        gate = asyncio.Event()
+        queue = self.make_queue(temp_dir, log, gate, max_concurrency=2, reserved_interactive=1)
+        options = ExtractionOptions()
+
+        bulk = [
+            queue.submit(self.spool(temp_dir, f"bulk{i}.pdf"), options, tenant=f"t{i}")
+            for i in range(3)
+        ]
+        await asyncio.sleep(0)
+        assert log == ["bulk0.pdf"]
+
+        queue.submit(
+            self.spool(temp_dir, "small.png"), options, tenant="t9", priority=Priority.INTERACTIVE
+        )
+        await asyncio.sleep(0)
+        assert log == ["bulk0.pdf", "small.png"]
+
+        gate.set()
+        await queue.wait(bulk[-1].job_id)
+        assert log == ["bulk0.pdf", "small.png", "bulk1.pdf", "bulk2.pdf"]
+        await queue.close()
+
+    async def test_tenant_limit(self, temp_dir):
+        """Test that one tenant's backlog does not block another tenant."""
+        log = []
+        gate = asyncio.Event()
+        queue = self.make_queue(
+            temp_dir, log, gate, max_concurrency=3, tenant_limit=1, reserved_interactive=0
+        )
+        options = ExtractionOptions()
+
+        queue.submit(self.spool(temp_dir, "a1.pdf"), options, tenant="a")
+        queue.submit(self.spool(temp_dir, "a2.pdf"), options, tenant="a")
+        queue.submit(self.spool(temp_dir, "b1.pdf"), options, tenant="b")
+        await asyncio.sleep(0)
+
+        assert log == ["a1.pdf", "b1.pdf"]
+        assert (queue.running, queue.queued) == (2, 1)
+        gate.set()
+        await asyncio.sleep(0.01)
+        assert log[-1] == "a2.pdf"
+        await queue.close()
+
+    async def test_depth_limit_and_status(self, temp_dir):
+        """Test queue depth rejection and persisted status."""
+        log = []
+        gate = asyncio.Event()
+        queue = self.make_queue(temp_dir, log, gate, max_concurrency=1, max_depth=1)
+        options = ExtractionOptions()
+
+        running = queue.submit(self.spool(temp_dir, "a.pdf"), options)
+        waiting = queue.submit(self.spool(temp_dir, "b.pdf"), options)
+        with pytest.raises(ServiceBusyError):
+            queue.submit(self.spool(temp_dir, "c.pdf"), options)
+
+        gate.set()
+        assert (await queue.wait(waiting.job_id)).status == JobStatus.SUCCEEDED
+        assert queue.store.get(running.job_id).status == JobStatus.SUCCEEDED
+        await queue.close()
+
+    async def test_unfinished_jobs_resume_after_restart(self, temp_dir):
+        """Test that queued jobs survive a restart and lost inputs fail."""
+        log = []
+        queue = self.make_queue(temp_dir, log, asyncio.Event(), max_concurrency=1)
+        options = ExtractionOptions()
+        queue.submit(self.spool(temp_dir, "a.pdf"), options)
+        kept = queue.submit(self.spool(temp_dir, "b.pdf"), options)
+        lost = queue.submit(self.spool(temp_dir, "c.pdf"), options)
+        await asyncio.sleep(0)
+        await queue.close()
+        (temp_dir / "c.pdf").unlink()
+
+        log.clear()
+        restarted = self.make_queue(temp_dir, log, max_concurrency=1)
+        restarted.start()
+        assert (await restarted.wait(kept.job_id)).status == JobStatus.SUCCEEDED
+        assert restarted.get(lost.job_id).status == JobStatus.FAILED
+        assert sorted(log) == ["a.pdf", "b.pdf"]
+        await restarted.close()
+
+    async def test_store_writes_run_off_the_event_loop(self, temp_dir):
+        """Test that job and result writes do not block the event loop thread."""
+        log = []
+        queue = self.make_queue(temp_dir, log)
+        store_save = queue.store.save
+        threads = []
+
+        def save(*args, **kwargs):
+            threads.append(threading.current_thread())
+            store_save(*args, **kwargs)
+
+        queue.store.save = save
+        job = queue.submit(self.spool(temp_dir, "a.pdf"), ExtractionOptions())
+        assert (await queue.wait(job.job_id)).status == JobStatus.SUCCEEDED
+
+        assert len(threads) == 3
+        assert threading.main_thread() not in threads
+        assert queue.store.get(job.job_id).status == JobStatus.SUCCEEDED
+        await queue.close()
+
+    async def test_purges_finished_jobs(self, temp_dir):
+        """Test that finished jobs past retention are purged and unfinished ones kept."""
+        log = []
+        queue = self.make_queue(temp_dir, log, asyncio.Event(), max_concurrency=1)
+        options = ExtractionOptions()
+        old = queue.submit(self.spool(temp_dir, "old.pdf"), options)
+        recent = [queue.submit(self.spool(temp_dir, f"r{i}.pdf"), options) for i in range(3)]
+        await asyncio.sleep(0)
+        await queue.close()
+
+        store = JobStore(temp_dir / "jobs.sqlite")
+        for job in [old, *recent[:2]]:
+            job.status = JobStatus.SUCCEEDED
+            store.save(job)
+        store._conn.execute(
+            "UPDATE jobs SET created_at = ? WHERE job_id = ?",
+            ((old.created_at - timedelta(days=30)).isoformat(), old.job_id),
+        )
+        store._conn.commit()
+        store.close()
+
+        restarted = self.make_queue(
+            temp_dir, log, asyncio.Event(), retention=timedelta(days=7), max_finished=1
+        )
+        restarted.start()
+        assert restarted.get(old.job_id) is None
+        assert restarted.get(recent[0].job_id) is None
+        assert restarted.get(recent[1].job_id).status == JobStatus.SUCCEEDED
+        assert restarted.get(recent[2].job_id) is not None
+        await restarted.close()
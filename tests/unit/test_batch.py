@@ -0,0 +1,511 @@
+"""Unit tests for batch processing."""
+
+import json
+import time
+import pytest
+from pathlib import Path
+
+from docx import Document
+
+from agent_extract.batch.broker import BatchSpec, RedisBroker, SQLiteBroker, open_broker
+from agent_extract.batch.discovery import discover_files, prefetch
+from agent_extract.batch.distributed import BatchCoordinator, DistributedWorker
+from agent_extract.batch.manifest import BatchManifest
+from agent_extract.batch.runner import BatchRunner
+from agent_extract.batch.watcher import FolderWatcher
+
+
+def make_docx(path: Path, text: str) -> Path:
+    """Write a one-paragraph DOCX file."""
+    doc = Document()
+    doc.add_paragraph(text)
+    doc.save(path)
+    return path
+
+
+@pytest.fixture
+def input_files(temp_dir):
+    """A few readable documents and one unreadable file."""
+    input_dir = temp_dir / "in"
+    input_dir.mkdir()
+    files = [make_docx(input_dir / f"doc{i}.docx", f"Document number {i}") for i in range(3)]
+    broken = input_dir / "broken.docx"
+    broken.write_text("not a docx", encoding="utf-8")
+    return files + [broken]
+
+
+class TestBatchRunner:
+    """Tests for BatchRunner."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_basic_batch(self, temp_dir, input_files, workers):
+        """Test reading in-process and in a process pool."""
+        results = []
+        output_dir = temp_dir / "out"
+
+        with BatchRunner(output_dir, workers=workers, use_ocr=False, on_result=results.append) as runner:
+            summary = runner.run(iter(input_files))
+
+        assert summary.success == 3
+        assert summary.failed == 1
+        assert summary.total == 4
+        assert len(results) == 4
+
+        data = json.loads((output_dir / "doc1.json").read_text(encoding="utf-8"))
+        assert "Document number 1" in data["raw_text"]
+        failed = [r for r in results if r.status == "failed"]
+        assert failed[0].file_path.name == "broken.docx"
+        assert not (output_dir / "broken.json").exists()
+
+    def test_pool_metrics_reach_parent(self, temp_dir, input_files):
+        """Test that reader metrics from pool workers and batch outcomes are recorded."""
+        from agent_extract.core.metrics import CACHE_LOOKUPS, DOCUMENTS, DOCUMENTS_READ
+
+        reads = DOCUMENTS_READ.value(document_type="docx", status="success")
+        failed = DOCUMENTS.value(source="batch", status="failed")
+        misses = CACHE_LOOKUPS.value(cache="manifest", result="miss")
+
+        with BatchRunner(temp_dir / "out", workers=2, use_ocr=False) as runner:
+            runner.run(iter(input_files))
+
+        assert DOCUMENTS_READ.value(document_type="docx", status="success") >= reads + 2
+        assert DOCUMENTS.value(source="batch", status="failed") == failed + 1
+        assert CACHE_LOOKUPS.value(cache="manifest", result="miss") == misses + 4
+
+    def test_markdown_output(self, temp_dir, input_files):
+        """Test that one shared Markdown formatter writes .md files."""
+        output_dir = temp_dir / "out"
+
+        with BatchRunner(output_dir, output_format="md", use_ocr=False) as runner:
+            runner.run(input_files[:1])
+
+        assert (output_dir / "doc0.md").read_text(encoding="utf-8").startswith("# doc0.docx")
+
+
+class TestBatchResume:
+    """Tests for manifest checkpointing and resume."""
+
+    def test_rerun_skips_completed_and_retries_failures(self, temp_dir, input_files):
+        """Test that a re-run only processes failed or changed documents."""
+        output_dir = temp_dir / "out"
+        with BatchRunner(output_dir, use_ocr=False) as runner:
+            runner.run(input_files)
+
+        # Fix the broken file and change one completed document
+        make_docx(input_files[3], "Repaired document")
+        make_docx(input_files[0], "Document number 0, revised")
+
+        results = []
+        with BatchRunner(output_dir, use_ocr=False, on_result=results.append) as runner:
+            summary = runner.run(input_files)
+
+        assert summary.skipped == 2
+        assert summary.success == 2
+        assert summary.failed == 0
+        processed = {r.file_path.name for r in results if r.status == "success"}
+        assert processed == {"doc0.docx", "broken.docx"}
+
+        data = json.loads((output_dir / "doc0.json").read_text(encoding="utf-8"))
+        assert "revised" in data["raw_text"]
+
+        manifest = BatchManifest.for_output_dir(output_dir)
+        assert manifest.counts() == {"success": 4}
+        assert manifest.get(input_files[3]).attempts == 2
+        manifest.close()
+
+    def test_missing_output_is_redone(self, temp_dir, input_files):
+        """Test that a deleted output is not treated as complete."""
+        output_dir = temp_dir / "out"
+        with BatchRunner(output_dir, use_ocr=False) as runner:
+            runner.run(input_files[:2])
+
+        (output_dir / "doc1.json").unlink()
+
+        with BatchRunner(output_dir, use_ocr=False) as runner:
+            summary = runner.run(input_files[:2])
+
+        assert (summary.skipped, summary.success) == (1, 1)
+        assert (output_dir / "doc1.json").exists()
+
+    def test_force_reprocesses(self, temp_dir, input_files):
+        """Test that resume=False ignores completed entries."""
+        output_dir = temp_dir / "out"
+        with BatchRunner(output_dir, use_ocr=False) as runner:
+            runner.run(input_files[:2])
+        with BatchRunner(output_dir, use_ocr=False, resume=False) as runner:
+            summary = runner.run(input_files[:2])
+
+        assert (summary.skipped, summary.success) == (0, 2)
+
+    def test_same_stem_does_not_overwrite(self, temp_dir, input_files):
+        """Test that inputs sharing a stem get distinct outputs."""
+        other_dir = temp_dir / "other"
+        other_dir.mkdir()
+        twin = make_docx(other_dir / "doc0.docx", "Another doc0")
+        output_dir = temp_dir / "out"
+
+        with BatchRunner(output_dir, use_ocr=False) as runner:
+            runner.run([input_files[0], twin])
+
+        first = json.loads((output_dir / "doc0.json").read_text(encoding="utf-8"))
+        second = json.loads((output_dir / "doc0.docx.json").read_text(encoding="utf-8"))
+        assert "Document number 0" in first["raw_text"]
+        assert "Another doc0" in second["raw_text"]
+
+    def test_same_name_in_subdirectories(self, temp_dir):
+        """Test that same-named inputs in different folders never share an output."""
+        input_dir = temp_dir / "in"
+        files = []
+        for folder in ("a", "b", "c"):
+            (input_dir / folder).mkdir(parents=True)
+            files.append(make_docx(input_dir / folder / "report.docx", f"Report {folder}"))
+        output_dir = temp_dir / "out"
+
+        with BatchRunner(output_dir, use_ocr=False, input_dir=input_dir) as runner:
+            runner.run(discover_files(input_dir, recursive=True))
+        for folder in ("a", "b", "c"):
+            data = json.loads((output_dir / folder / "report.json").read_text(encoding="utf-8"))
+            assert f"Report {folder}" in data["raw_text"]
+
+        # Without a root the names fall back to <stem>, <name> and a path hash
+        flat_dir = temp_dir / "flat"
+        with BatchRunner(flat_dir, use_ocr=False) as runner:
+            runner.run(files)
+        outputs = sorted(flat_dir.glob("*.json"))
+        assert len(outputs) == 3
+        texts = {json.loads(path.read_text(encoding="utf-8"))["raw_text"] for path in outputs}
+        assert len(texts) == 3
+
+        with BatchRunner(flat_dir, use_ocr=False) as runner:
+            assert runner.run(files).skipped == 3
+
+
+class TestDiscovery:
+    """Tests for streaming file discovery."""
+
+    @pytest.fixture
+    def tree(self, temp_dir):
+        """A small directory tree with nested and excluded files."""
+        root = temp_dir / "tree"
+        for rel, size in [
+            ("a.pdf", 10),
+            ("b.docx", 2000),
+            ("notes.tmp", 10),
+            ("sub/c.pdf", 10),
+            ("sub/deep/d.pdf", 10),
+            ("archive/old.pdf", 10),
+            ("out/result.json", 10),
+        ]:
+            path = root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"x" * size)
+        return root
+
+    def names(self, paths):
+        return sorted(p.name for p in paths)
+
+    def test_top_level_only_by_default(self, tree):
+        """Test that discovery is not recursive unless asked."""
+        assert self.names(discover_files(tree)) == ["a.pdf", "b.docx", "notes.tmp"]
+
+    def test_recursive_with_globs(self, tree):
+        """Test include/exclude patterns, directory pruning and skip_dirs."""
+        found = discover_files(
+            tree,
+            include=["*.pdf", "*.docx"],
+            exclude=["archive"],
+            recursive=True,
+            skip_dirs=[tree / "out"],
+        )
+        assert self.names(found) == ["a.pdf", "b.docx", "c.pdf", "d.pdf"]
+
+    def test_relative_path_patterns(self, tree):
+        """Test that patterns containing '/' match the relative path."""
+        found = discover_files(tree, include=["sub/*"], recursive=True)
+        assert self.names(found) == ["c.pdf", "d.pdf"]
+
+    def test_size_filters(self, tree):
+        """Test minimum and maximum size filters."""
+        assert self.names(discover_files(tree, min_size=100)) == ["b.docx"]
+        assert self.names(discover_files(tree, max_size=100)) == ["a.pdf", "notes.tmp"]
+
+    def test_streams_lazily(self, tree):
+        """Test that the first file is produced before the walk finishes."""
+        walker = discover_files(tree, recursive=True)
+        assert next(walker).exists()
+        walker.close()
+
+    def test_prefetch(self):
+        """Test that prefetch preserves order and propagates errors."""
+        assert list(prefetch(range(50), maxsize=4)) == list(range(50))
+
+        def failing():
+            yield 1
+            raise OSError("share went away")
+
+        items = prefetch(failing())
+        assert next(items) == 1
+        with pytest.raises(OSError):
+            next(items)
+
+
+class TestBatchDedupe:
+    """Tests for content-hash deduplication."""
+
+    @pytest.fixture
+    def copies(self, temp_dir, input_files):
+        """The first input plus two byte-identical copies under other names."""
+        copy_dir = temp_dir / "copies"
+        copy_dir.mkdir()
+        data = input_files[0].read_bytes()
+        extra = []
+        for name in ("attachment.docx", "doc0.docx"):
+            path = copy_dir / name
+            path.write_bytes(data)
+            extra.append(path)
+        return [input_files[0], input_files[1]] + extra
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_identical_content_extracted_once(self, temp_dir, copies, workers):
+        """Test that duplicates are linked to the canonical output."""
+        output_dir = temp_dir / "out"
+        results = []
+        with BatchRunner(output_dir, workers=workers, use_ocr=False, on_result=results.append) as runner:
+            summary = runner.run(copies)
+
+        assert (summary.success, summary.duplicates, summary.failed) == (2, 2, 0)
+        duplicates = [r for r in results if r.status == "duplicate"]
+        assert {r.duplicate_of for r in duplicates} == {copies[0].resolve()}
+
+        canonical = (output_dir / "doc0.json").read_bytes()
+        assert (output_dir / "attachment.json").read_bytes() == canonical
+        assert (output_dir / "doc0.docx.json").read_bytes() == canonical
+
+    def test_duplicates_resolved_from_previous_run(self, temp_dir, copies):
+        """Test that a later copy reuses an output from an earlier run."""
+        output_dir = temp_dir / "out"
+        with BatchRunner(output_dir, use_ocr=False) as runner:
+            runner.run(copies[:1])
+        with BatchRunner(output_dir, use_ocr=False) as runner:
+            summary = runner.run(copies[2:3])
+
+        assert summary.duplicates == 1
+        assert (output_dir / "attachment.json").exists()
+
+    def test_dedupe_disabled(self, temp_dir, copies):
+        """Test that dedupe=False extracts every copy."""
+        with BatchRunner(temp_dir / "out", use_ocr=False, dedupe=False) as runner:
+            summary = runner.run(copies)
+
+        assert (summary.success, summary.duplicates) == (4, 0)
+
+
+class TestFolderWatcher:
+    """Tests for FolderWatcher."""
+
+    @pytest.fixture(params=[True, False], ids=["polling", "events"])
+    def watcher(self, request, temp_dir):
+        """A watcher on an empty inbox, polling or event-driven."""
+        inbox = temp_dir / "inbox"
+        inbox.mkdir()
+        if not request.param:
+            pytest.importorskip("watchdog")
+        with FolderWatcher(
+            inbox,
+            include=["*.txt"],
+            debounce=0.2,
+            poll_interval=0.05,
+            use_polling=request.param,
+        ) as w:
+            yield w
+
+    def wait_for(self, watcher, timeout=3.0):
+        """Poll until some files are ready."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            ready = watcher.poll()
+            if ready:
+                return ready
+            time.sleep(0.05)
+        return []
+
+    def test_existing_files_reported_on_start(self, temp_dir):
+        """Test that files present at startup are picked up."""
+        inbox = temp_dir / "inbox"
+        inbox.mkdir()
+        (inbox / "old.txt").write_text("old")
+        with FolderWatcher(inbox, debounce=0, use_polling=True) as watcher:
+            assert [p.name for p in watcher.poll()] == ["old.txt"]
+            assert watcher.poll() == []
+
+    def test_debounces_files_being_written(self, watcher):
+        """Test that a growing file is reported once, after it settles."""
+        path = watcher.input_dir / "incoming.txt"
+        with open(path, "w") as f:
+            for _ in range(4):
+                f.write("chunk\n")
+                f.flush()
+                time.sleep(0.1)
+                assert watcher.poll() == []
+
+        assert [p.name for p in self.wait_for(watcher)] == ["incoming.txt"]
+        assert path.read_text() == "chunk\n" * 4
+
+    def test_modified_and_filtered_files(self, watcher):
+        """Test that modifications are re-reported and patterns apply."""
+        (watcher.input_dir / "a.txt").write_text("one")
+        (watcher.input_dir / "ignored.tmp").write_text("x")
+        assert [p.name for p in self.wait_for(watcher)] == ["a.txt"]
+
+        time.sleep(0.01)
+        (watcher.input_dir / "a.txt").write_text("two, longer")
+        assert [p.name for p in self.wait_for(watcher)] == ["a.txt"]
+
+    def test_forgets_handed_off_and_deleted_files(self, watcher):
+        """Test that a long-running watcher only remembers files still present."""
+        paths = [watcher.input_dir / f"{name}.txt" for name in ("a", "b")]
+        for path in paths:
+            path.write_text(path.name)
+        assert len(self.wait_for(watcher)) == 2
+        assert watcher._candidates == {}
+
+        for path in paths:
+            path.unlink()
+        time.sleep(0.2)
+        watcher.poll()
+        assert watcher._known == {}
+        assert watcher._candidates == {}
+
+        # A file deleted while it settles is dropped too
+        paths[0].write_text("again")
+        time.sleep(0.1)
+        watcher.poll()
+        paths[0].unlink()
+        assert self.wait_for(watcher, timeout=0.5) == []
+        assert watcher._candidates == {}
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def broker(request, temp_dir):
+    """SQLite broker, or a Redis broker on an in-memory server."""
+    if request.param == "sqlite":
+        broker = SQLiteBroker(temp_dir / "queue.sqlite", max_attempts=2)
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        broker = RedisBroker("", client=fakeredis.FakeRedis(), max_attempts=2)
+    yield broker
+    broker.close()
+
+
+class TestDistributedBatch:
+    """Tests for the task brokers, coordinator and workers."""
+
+    def test_lease_expiry_and_retry_limit(self, broker, input_files):
+        """Test that dead workers' tasks are retried and stale workers are rejected."""
+        broker.enqueue([(input_files[0], "doc0")])
+
+        task = broker.claim("dead", lease_seconds=0.05)
+        assert task.attempts == 1
+        assert broker.claim("other", lease_seconds=0.05) is None
+        time.sleep(0.1)
+
+        retry = broker.claim("alive", lease_seconds=30)
+        assert retry.task_id == task.task_id and retry.attempts == 2
+        assert not broker.complete(task.task_id, "dead", "success")
+        assert broker.renew(task.task_id, "alive", 30)
+
+        # The second failed attempt is final
+        assert broker.fail(task.task_id, "alive", "boom")
+        (final,) = broker.tasks([task.task_id])
+        assert (final.status, final.error) == ("failed", "boom")
+        assert broker.claim("alive", lease_seconds=30) is None
+
+    def test_completed_tasks_are_not_requeued(self, broker, input_files):
+        """Test that re-submitting skips completed, unchanged documents."""
+        task_id = next(iter(broker.enqueue([(input_files[0], "doc0")])))
+        task = broker.claim("w", lease_seconds=30)
+        broker.complete(task.task_id, "w", "success", duration=0.5)
+
+        assert broker.enqueue([(input_files[0], "doc0")]) == {task_id: False}
+        assert broker.enqueue([(input_files[0], "doc0")], force=True) == {task_id: True}
+        assert broker.counts() == {"pending": 1}
+
+    def test_deleted_files_are_reported_not_queued(self, broker, input_files, temp_dir):
+        """Test that a file deleted before submission fails alone without aborting the batch."""
+        input_files[1].unlink()
+        failed = []
+        coordinator = BatchCoordinator(
+            broker, BatchSpec(output_dir=temp_dir / "out"), on_result=failed.append
+        )
+
+        assert coordinator.submit(input_files[:3]) == 2
+        assert broker.counts() == {"pending": 2}
+        assert [(item.file_path, item.status) for item in failed] == [(input_files[1], "failed")]
+        assert coordinator._summary.failed == 1
+
+    def test_output_names_match_local_batches(self, broker, temp_dir):
+        """Test that same-named inputs in different folders get distinct output names."""
+        input_dir = temp_dir / "in"
+        files = []
+        for folder in ("x", "y"):
+            (input_dir / folder).mkdir(parents=True)
+            files.append(make_docx(input_dir / folder / "report.docx", folder))
+        files.append(make_docx(input_dir / "x" / "report.pdf", "not really a PDF"))
+
+        spec = BatchSpec(output_dir=temp_dir / "out")
+        BatchCoordinator(broker, spec, input_dir=input_dir).submit(files)
+
+        stems = {task.file_path.resolve(): task.output_stem for task in broker.tasks()}
+        assert [stems[path.resolve()] for path in files] == [
+            "x/report",
+            "y/report",
+            "x/report.pdf",
+        ]
+
+        # Without a root, every clash still gets a name of its own
+        flat = BatchCoordinator(broker, spec)
+        assert len({flat._output_stem(path) for path in files}) == 3
+
+    def test_workers_share_a_batch(self, temp_dir, input_files):
+        """Test that two workers drain one queue and the coordinator aggregates."""
+        import threading
+
+        output_dir = temp_dir / "out"
+        queue_path = temp_dir / "queue.sqlite"
+        extra = make_docx(temp_dir / "in" / "sub.docx", "Same stem elsewhere")
+        clash = temp_dir / "doc0.docx"
+        make_docx(clash, "Another doc0")
+
+        coordinator = BatchCoordinator(
+            open_broker(str(queue_path)), BatchSpec(output_dir=output_dir), poll_interval=0.05
+        )
+        assert coordinator.submit(input_files + [extra, clash]) == 6
+
+        summaries = []
+
+        def work(name):
+            with open_broker(f"sqlite://{queue_path}") as broker:
+                worker = DistributedWorker(
+                    broker, worker_id=name, use_ocr=False, manifest_dir=temp_dir / "manifests"
+                )
+                summaries.append(worker.run())
+
+        threads = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(2)]
+        for thread in threads:
+            thread.start()
+        summary = coordinator.wait(timeout=60)
+        for thread in threads:
+            thread.join()
+
+        assert (summary.success, summary.failed) == (5, 1)
+        assert sum(s.success for s in summaries) == 5
+        failed = [r for r in coordinator.results() if r.status == "failed"]
+        assert failed[0].file_path.name == "broken.docx"
+        assert "Another doc0" in (output_dir / "doc0.docx.json").read_text(encoding="utf-8")
+        assert "Document number 0" in (output_dir / "doc0.json").read_text(encoding="utf-8")
+
+        # A second coordinator run finds everything done
+        rerun = BatchCoordinator(open_broker(str(queue_path)), BatchSpec(output_dir=output_dir))
+        assert rerun.submit(input_files[:3]) == 0
+        assert rerun.wait(timeout=5).skipped == 3
@@ -0,0 +1,115 @@
+"""Unit tests for the benchmark corpus and suite."""
+
+import fitz
+import pytest
+from docx import Document
+from PIL import Image
+
+from agent_extract.benchmarks import (
+    BenchmarkReport,
+    BenchmarkResult,
+    compare_reports,
+    generate_corpus,
+    measure,
+    run_benchmarks,
+)
+from agent_extract.core.config import config
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    """Small generated corpus shared by the tests."""
+    return generate_corpus(tmp_path_factory.mktemp("corpus"), scale="small", seed=1)
+
+
+class TestCorpus:
+    """Tests for the synthetic corpus."""
+
+    def test_kinds(self, corpus):
+        """Test that every document kind is generated and readable as such."""
+        kinds = {document.kind: document for document in corpus}
+        assert set(kinds) == {"text_pdf", "scanned_pdf", "docx", "image"}
+
+        with fitz.open(kinds["text_pdf"].path) as pdf:
+            assert "Invoice Number" in pdf[0].get_text()
+        with fitz.open(kinds["scanned_pdf"].path) as pdf:
+            assert pdf[0].get_text().strip() == ""
+            assert pdf[0].get_images()
+        assert len(Document(kinds["docx"].path).tables[0].rows) == 11
+        assert Image.open(kinds["image"].path).size == (640, 480)
+
+    def test_reproducible(self, corpus, tmp_path):
+        """Test that the same seed generates the same content."""
+        again = generate_corpus(tmp_path, scale="small", seed=1)
+
+        with fitz.open(again[0].path) as first, fitz.open(corpus[0].path) as second:
+            assert first[0].get_text() == second[0].get_text()
+        assert again[-1].path.read_bytes() == corpus[-1].path.read_bytes()
+
+    def test_unknown_scale(self, tmp_path):
+        """Test that an unknown scale is rejected."""
+        with pytest.raises(ValueError):
+            generate_corpus(tmp_path, scale="huge")
+
+
+class TestSuite:
+    """Tests for measurements and baseline comparison."""
+
+    def test_measure(self):
+        """Test timing statistics, throughput and traced memory."""
+        result = measure(
+            "demo", "demo", lambda: [bytearray(1024 * 1024)], documents=4, pages=8, repeat=3
+        )
+
+        assert len(result.timings) == 3
+        assert result.min_seconds <= result.median_seconds
+        assert result.pages_per_second == pytest.approx(2 * result.documents_per_second)
+        assert result.peak_memory_mb >= 1
+
+    def test_run_and_round_trip(self, corpus, tmp_path):
+        """Test a run of the formatter and graph benchmarks saved and loaded as JSON."""
+        provider = config.llm_provider
+        report = run_benchmarks(corpus, subsystems=["formatters", "graph"], repeat=1, warmup=0)
+
+        assert config.llm_provider == provider
+        names = [result.name for result in report.results]
+        assert names == [
+            "formatters.json",
+            "formatters.markdown",
+            "graph.supervised",
+            "graph.parallel",
+            "graph.fast",
+        ]
+        # One fused call per text PDF
+        assert report.result("graph.fast").extra["llm_calls"] == 2
+        assert report.result("graph.parallel").extra["speedup_vs_supervised"] > 0
+
+        path = tmp_path / "results.json"
+        report.save(path)
+        assert BenchmarkReport.load(path) == report
+
+    def test_unknown_subsystem(self, corpus):
+        """Test that an unknown subsystem is rejected."""
+        with pytest.raises(ValueError):
+            run_benchmarks(corpus, subsystems=["gpu"])
+
+    def test_compare(self):
+        """Test that only slowdowns beyond threshold and noise are regressions."""
+
+        def report(**seconds):
+            return BenchmarkReport(
+                results=[
+                    BenchmarkResult(name=name, subsystem="x", min_seconds=value, peak_memory_mb=1)
+                    for name, value in seconds.items()
+                ]
+                + [BenchmarkResult(name="ocr", subsystem="ocr", status="skipped")]
+            )
+
+        baseline = report(slow=1.0, noisy=0.001, fast=1.0)
+        current = report(slow=1.5, noisy=0.003, fast=0.5)
+
+        comparisons = compare_reports(current, baseline, time_threshold=0.2)
+        regressed = {(item.name, item.metric) for item in comparisons if item.regressed}
+
+        assert regressed == {("slow", "min_seconds")}
+        assert "ocr" not in {item.name for item in comparisons}
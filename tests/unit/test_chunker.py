@@ -0,0 +1,135 @@
+"""Unit tests for document chunking and map-reduce helpers."""
+
+import asyncio
+import pytest
+
+from agent_extract.processors.chunker import (
+    DocumentChunker,
+    map_chunks,
+    merge_structured_results,
+)
+
+
+def make_pdf_text(pages: int, chars_per_page: int) -> str:
+    """Build text in the PDFReader page-marker format."""
+    parts = []
+    for page in range(1, pages + 1):
+        body = f"Section {page}\n" + ("x" * (chars_per_page - 20)) + "\n"
+        parts.append(f"--- Page {page} ---\n{body}")
+    return "\n\n".join(parts)
+
+
+class TestDocumentChunker:
+    """Tests for DocumentChunker."""
+
+    def test_short_text_single_chunk(self):
+        """Test that short text is returned as one chunk."""
+        chunks = DocumentChunker(max_chars=100).split("Invoice #1\nTotal: $5")
+        assert len(chunks) == 1
+        assert chunks[0].text == "Invoice #1\nTotal: $5"
+
+    def test_empty_text(self):
+        """Test that blank text yields no chunks."""
+        assert DocumentChunker().split("  \n ") == []
+
+    def test_splits_on_page_boundaries(self):
+        """Test that pages are packed whole and track page numbers."""
+        text = make_pdf_text(pages=4, chars_per_page=200)
+        chunks = DocumentChunker(max_chars=500).split(text)
+
+        assert len(chunks) == 2
+        assert chunks[0].pages == [1, 2]
+        assert chunks[1].pages == [3, 4]
+        assert chunks[1].text.startswith("--- Page 3 ---")
+        assert "".join(c.text for c in chunks) == text
+
+    def test_long_page_splits_on_sections(self):
+        """Test that an oversized page is split on blank lines."""
+        paragraphs = [f"Paragraph {i} " + "y" * 80 for i in range(10)]
+        text = "--- Page 1 ---\n" + "\n\n".join(paragraphs)
+        chunks = DocumentChunker(max_chars=250).split(text)
+
+        assert len(chunks) > 1
+        assert all(len(c.text) <= 250 for c in chunks)
+        assert all(c.pages == [1] for c in chunks)
+        assert "".join(c.text for c in chunks) == text
+
+    def test_hard_split_without_boundaries(self):
+        """Test that text without any boundary is still bounded."""
+        chunks = DocumentChunker(max_chars=100).split("z" * 350)
+        assert [len(c.text) for c in chunks] == [100, 100, 100, 50]
+
+    def test_invalid_max_chars(self):
+        """Test that max_chars must be positive."""
+        with pytest.raises(ValueError):
+            DocumentChunker(max_chars=0)
+
+
+class TestMergeStructuredResults:
+    """Tests for merge_structured_results."""
+
+    def test_empty_values_do_not_override(self):
+        """Test that later empty values keep earlier data."""
+        merged, conflicts = merge_structured_results([
+            {"invoice_number": "INV-1", "total": ""},
+            {"invoice_number": None, "total": "$45.00"},
+        ])
+        assert merged == {"invoice_number": "INV-1", "total": "$45.00"}
+        assert conflicts == {}
+
+    def test_lists_are_concatenated_without_duplicates(self):
+        """Test list merging across chunks."""
+        merged, _ = merge_structured_results([
+            {"line_items": [{"item": "Widget"}, {"item": "Gadget"}]},
+            {"line_items": [{"item": "Gadget"}, {"item": "Bolt"}]},
+        ])
+        assert merged["line_items"] == [{"item": "Widget"}, {"item": "Gadget"}, {"item": "Bolt"}]
+
+    def test_conflicts_majority_then_earliest(self):
+        """Test conflict resolution by majority vote with earliest tie-break."""
+        merged, conflicts = merge_structured_results([
+            {"date": "2025-01-15", "vendor": "Acme"},
+            {"date": "2025-02-01", "vendor": "ACME "},
+            {"date": "2025-02-01", "vendor": "Globex"},
+        ])
+        assert merged["date"] == "2025-02-01"
+        assert merged["vendor"] == "Acme"
+        assert conflicts["date"] == ["2025-01-15", "2025-02-01"]
+        assert conflicts["vendor"] == ["Acme", "Globex"]
+
+    def test_nested_dicts(self):
+        """Test recursive merge of nested dicts."""
+        merged, conflicts = merge_structured_results([
+            {"customer": {"name": "Bob"}},
+            {"customer": {"address": "1 Main St", "name": "Robert"}},
+        ])
+        assert merged["customer"] == {"name": "Bob", "address": "1 Main St"}
+        assert conflicts == {"customer.name": ["Bob", "Robert"]}
+
+
+@pytest.mark.asyncio
+class TestMapChunks:
+    """Tests for map_chunks."""
+
+    async def test_bounded_concurrency_and_order(self):
+        """Test that results keep chunk order under the concurrency limit."""
+        chunks = DocumentChunker(max_chars=10).split("a" * 60)
+        in_flight = 0
+        peak = 0
+
+        async def work(chunk):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if chunk.index == 2:
+                raise RuntimeError("boom")
+            return chunk.index
+
+        results = await map_chunks(chunks, work, concurrency=2)
+
+        assert peak == 2
+        assert results[:2] == [0, 1]
+        assert isinstance(results[2], RuntimeError)
+        assert results[3:] == [3, 4, 5]
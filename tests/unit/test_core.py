@@ -11,6 +11,9 @@ from agent_extract.core.exceptions import (
     ExtractionError,
     ValidationError,
 )
+from agent_extract.core import tracing
+from agent_extract.core import usage
+from agent_extract.core.metrics import MetricsRegistry, TextfileExporter
 from agent_extract.core.types import DocumentType, OutputFormat
 
 
@@ -85,3 +88,323 @@ class TestTypes:
         assert OutputFormat.MARKDOWN.value == "markdown"
 
 
+
+
+class TestTracing:
+    """Tests for per-stage timing spans."""
+
+    def test_nested_spans(self):
+        """Test that spans nest, carry attributes and record errors."""
+        with tracing.trace() as current:
+            with tracing.span("read", "read", bytes=10) as outer:
+                with tracing.span("read.text", "read"):
+                    tracing.annotate(pages=2)
+                with pytest.raises(ValueError):
+                    with tracing.span("read.tables", "read"):
+                        raise ValueError("bad table")
+
+        spans = {item.name: item for item in current.spans}
+        assert spans["read.text"].parent_id == outer.span_id
+        assert spans["read.text"].attributes == {"pages": 2}
+        assert spans["read"].attributes == {"bytes": 10}
+        assert spans["read"].parent_id is None
+        assert spans["read.tables"].error == "ValueError: bad table"
+        assert spans["read"].duration >= spans["read.text"].duration
+
+    def test_no_trace_is_noop(self, monkeypatch):
+        """Test that spans outside a trace, or with tracing disabled, record nothing."""
+        with tracing.span("read", "read") as item:
+            tracing.annotate(pages=1)
+        assert item is None
+
+        monkeypatch.setattr(tracing.config, "enable_tracing", False)
+        with tracing.trace() as current:
+            with tracing.span("read", "read"):
+                pass
+        assert current.spans == []
+
+    def test_export_and_summarize(self, temp_dir):
+        """Test JSON Lines export and per-name totals."""
+        with tracing.trace() as current:
+            for _ in range(2):
+                with tracing.span("llm", "llm"):
+                    pass
+            with tracing.span("read", "read"):
+                pass
+
+        output = temp_dir / "spans.jsonl"
+        tracing.export_spans(current.spans, output, document="a.pdf")
+        lines = output.read_text(encoding="utf-8").splitlines()
+
+        assert len(lines) == 3
+        assert '"document": "a.pdf"' in lines[0]
+        assert set(tracing.summarize_spans(current.spans)) == {"llm", "read"}
+
+
+class TestMetrics:
+    """Tests for the metrics registry."""
+
+    def test_render(self):
+        """Test counters, gauges and histograms in the text format."""
+        registry = MetricsRegistry()
+        calls = registry.counter("calls_total", "Calls", ["engine"])
+        calls.inc(engine="paddle")
+        calls.inc(2, engine="paddle")
+        registry.gauge("queued", "Queued jobs").set(3)
+        seconds = registry.histogram("read_seconds", "Read time", buckets=(0.1, 1.0))
+        seconds.observe(0.05)
+        seconds.observe(0.5)
+
+        text = registry.render()
+
+        assert "# TYPE calls_total counter" in text
+        assert 'calls_total{engine="paddle"} 3' in text
+        assert "queued 3" in text
+        assert 'read_seconds_bucket{le="0.1"} 1' in text
+        assert 'read_seconds_bucket{le="+Inf"} 2' in text
+        assert "read_seconds_count 2" in text
+        assert registry.counter("calls_total", "Calls", ["engine"]) is calls
+        with pytest.raises(ValueError):
+            calls.inc(model="x")
+
+    def test_drain_and_merge(self):
+        """Test moving samples from a worker registry into the parent."""
+        worker, parent = MetricsRegistry(), MetricsRegistry()
+        for registry in (worker, parent):
+            registry.counter("reads_total", "Reads", ["document_type"])
+            registry.histogram("read_seconds", "Read time", buckets=(1.0,))
+
+        worker.counter("reads_total", "Reads", ["document_type"]).inc(document_type="pdf")
+        worker.histogram("read_seconds", "Read time").observe(0.5)
+        parent.merge(worker.drain())
+        parent.merge(worker.drain())
+
+        reads = parent.counter("reads_total", "Reads", ["document_type"])
+        assert reads.value(document_type="pdf") == 1
+        assert parent.histogram("read_seconds", "Read time").count() == 1
+
+    def test_textfile_exporter(self, temp_dir):
+        """Test that stopping the exporter writes the final values."""
+        registry = MetricsRegistry()
+        registry.counter("docs_total", "Documents").inc()
+        path = temp_dir / "metrics" / "agent_extract.prom"
+
+        with TextfileExporter(path, interval=60, metrics_registry=registry):
+            registry.counter("docs_total", "Documents").inc()
+
+        assert "docs_total 2" in path.read_text(encoding="utf-8")
+
+
+class TestUsage:
+    """Tests for token and cost accounting."""
+
+    def test_price_lookup(self, monkeypatch):
+        """Test exact, prefix, local and configured prices."""
+        assert usage.price_for("openai", "gpt-4o-mini") == (0.15, 0.60)
+        assert usage.price_for("openai", "gpt-4o-mini-2024-07-18") == (0.15, 0.60)
+        assert usage.price_for("gemini", "models/gemini-1.5-flash") == (0.075, 0.30)
+        assert usage.price_for("ollama", "qwen3:0.6b") == (0.0, 0.0)
+        assert usage.price_for("openai", "unknown-model") is None
+
+        prices = {"unknown-model": {"input": 1, "output": 2}}
+        monkeypatch.setattr(usage.config, "llm_prices", prices)
+        assert usage.estimate_cost("openai", "unknown-model", 1_000_000, 500_000) == 2.0
+
+    def test_estimated_tokens_and_summary(self):
+        """Test token estimation without usage metadata and per-agent totals."""
+        estimated = usage.make_call("Planner", "openai", "mystery", None, 400, 41, latency=0.5)
+        reported = usage.make_call(
+            "Planner",
+            "openai",
+            "gpt-4o",
+            {"input_tokens": 100, "output_tokens": 10},
+            prompt_chars=0,
+            response_chars=0,
+            latency=1.0,
+        )
+        assert (estimated.input_tokens, estimated.output_tokens) == (100, 11)
+        assert estimated.estimated_tokens and estimated.cost is None
+
+        summary = usage.summarize_usage([estimated, reported])
+        planner = summary["by_agent"]["Planner"]
+        assert planner["calls"] == 2
+        assert planner["unpriced_calls"] == 1
+        assert planner["latency"] == 1.5
+        assert planner["cost"] == pytest.approx(0.00035)
+        assert set(summary["by_model"]) == {"openai/mystery", "openai/gpt-4o"}
+
+        data = {"ai_processing": {"usage": summary}}
+        assert usage.document_usage(data).total_tokens == 221
+        assert usage.document_usage({}) is None
+
+
+class TestLLMClientPool:
+    """Tests for memoised LLM clients."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_pool(self):
+        """Start and end each test with an empty client pool."""
+        from agent_extract.core.llm_provider import LLMFactory
+
+        LLMFactory.clear()
+        yield
+        LLMFactory.clear()
+
+    def test_clients_are_shared_by_settings(self):
+        """Test that equal settings reuse one client and different ones do not."""
+        from agent_extract.core.llm_provider import LLMFactory
+
+        llm = LLMFactory.create_llm("ollama", "qwen3:0.6b", temperature=0.1)
+
+        assert LLMFactory.create_llm("ollama", "qwen3:0.6b", temperature=0.1) is llm
+        assert LLMFactory.create_llm("ollama", "qwen3:0.6b", temperature=0.5) is not llm
+        assert LLMFactory.create_llm("ollama", "qwen3:0.6b", shared=False) is not llm
+
+    def test_agents_share_one_client(self, monkeypatch):
+        """Test that the agents of a graph do not each open their own client."""
+        from agent_extract.agents.graph import DocumentExtractionGraph
+        from agent_extract.core.config import config
+
+        monkeypatch.setattr(config, "llm_provider", "ollama")
+        monkeypatch.setattr(config, "llm_model", "qwen3:0.6b")
+        graph = DocumentExtractionGraph()
+
+        text_agents = [graph.planner_agent, graph.schema_agent, graph.critic_agent]
+        assert len({id(agent.llm) for agent in text_agents}) == 1
+
+    def test_async_pool_per_event_loop(self):
+        """Test that each event loop gets its own connections and closed loops are dropped."""
+        import asyncio
+
+        import httpx
+
+        from agent_extract.core.llm_provider import _PerLoopTransport
+
+        transport = _PerLoopTransport(limits=httpx.Limits())
+        pools = []
+
+        async def request():
+            # Nothing listens on port 9; the loop's pool is created all the same
+            with pytest.raises(httpx.ConnectError):
+                await transport.handle_async_request(httpx.Request("GET", "http://127.0.0.1:9"))
+            pools.append(list(transport._pools.values()))
+
+        asyncio.run(request())
+        asyncio.run(request())
+
+        assert len(pools[0]) == len(pools[1]) == 1
+        assert pools[0][0] is not pools[1][0]
+
+
+class RateLimitError(Exception):
+    """Stand-in for an SDK's 429 error."""
+
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("Error code: 429 - rate limit reached")
+        self.response = type("Response", (), {"headers": {"retry-after": retry_after}})()
+
+
+@pytest.mark.asyncio
+class TestRateLimit:
+    """Tests for client-side LLM rate limiting."""
+
+    @pytest.fixture(autouse=True)
+    def fast_backoff(self, monkeypatch):
+        """Retry without sleeping and start from fresh limiters."""
+        from agent_extract.core import rate_limit
+
+        monkeypatch.setattr(rate_limit.config, "llm_backoff_base_seconds", 0.0)
+        rate_limit.reset_limiters()
+        yield
+        rate_limit.reset_limiters()
+
+    async def test_retries_rate_limited_calls(self):
+        """Test that 429s are retried and halve the concurrency limit."""
+        from agent_extract.core.rate_limit import RateLimiter
+
+        limiter = RateLimiter(concurrency=8)
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RateLimitError()
+            return "ok"
+
+        assert await limiter.run(call) == "ok"
+        assert len(attempts) == 3
+        assert 2 <= limiter.concurrency.limit < 3
+
+    async def test_other_errors_are_not_retried(self):
+        """Test that non-rate-limit errors propagate on the first attempt."""
+        from agent_extract.core.rate_limit import RateLimiter
+
+        limiter = RateLimiter()
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            raise ValueError("bad request")
+
+        with pytest.raises(ValueError):
+            await limiter.run(call)
+        assert len(attempts) == 1
+        assert limiter.concurrency.in_flight == 0
+
+    async def test_concurrency_is_bounded_and_grows(self):
+        """Test that calls never exceed the limit and successes raise it."""
+        import asyncio
+
+        from agent_extract.core.rate_limit import RateLimiter
+
+        limiter = RateLimiter(concurrency=2, max_concurrency=4)
+        in_flight = peak = 0
+
+        async def call():
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        await asyncio.gather(*(limiter.run(call) for _ in range(6)))
+
+        assert peak == 2
+        assert limiter.concurrency.limit > 2
+
+    async def test_token_bucket_waits_for_refill(self):
+        """Test that a drained bucket delays the next request."""
+        from agent_extract.core.rate_limit import TokenBucket
+
+        bucket = TokenBucket(per_minute=600, burst=1)  # 10 per second
+
+        assert await bucket.acquire() == 0
+        assert await bucket.acquire() == pytest.approx(0.1, abs=0.05)
+
+    async def test_limits_and_error_detection(self, monkeypatch):
+        """Test per-model limit lookup and recognising wrapped 429s."""
+        from agent_extract.core import rate_limit
+
+        monkeypatch.setattr(
+            rate_limit.config,
+            "llm_rate_limits",
+            {"gpt-4o": {"rpm": 60}, "gpt-4o-mini": {"rpm": 500, "tpm": 1000}, "groq": {"rpm": 30}},
+        )
+        assert rate_limit.limiter_for("ollama", "qwen3:0.6b") is None
+        mini = rate_limit.limiter_for("openai", "gpt-4o-mini-2024-07-18")
+        assert mini.requests.capacity == 500 and mini.tokens.capacity == 1000
+        assert rate_limit.limiter_for("groq", "llama-3.3-70b").requests.capacity == 30
+        assert rate_limit.limiter_for("openai", "gpt-4o-mini-2024-07-18") is mini
+
+        try:
+            try:
+                raise RateLimitError(retry_after="7")
+            except RateLimitError as e:
+                raise RuntimeError("LLM invocation failed") from e
+        except RuntimeError as wrapped:
+            assert rate_limit.is_rate_limit_error(wrapped)
+            assert rate_limit.retry_after(wrapped) == 7.0
+        assert not rate_limit.is_rate_limit_error(ValueError("invoice 429"))
+        assert rate_limit.backoff_delay(3, hint=5.0) >= 5.0
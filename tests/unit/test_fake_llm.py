@@ -0,0 +1,153 @@
+"""Unit tests for the offline fake LLM provider."""
+
+import json
+import random
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from agent_extract.core.config import config
+from agent_extract.core.exceptions import ConfigurationError
+from agent_extract.core.fake_llm import (
+    FakeChatModel,
+    RecordingChatModel,
+    message_key,
+    parse_distribution,
+)
+
+
+def prompt(system: str, user: str = "Invoice #1"):
+    return [SystemMessage(content=system), HumanMessage(content=user)]
+
+
+class TestDistributions:
+    """Tests for latency and token-rate distributions."""
+
+    def test_forms(self):
+        """Test constant, bare and ranged specs."""
+        rng = random.Random(0)
+
+        assert parse_distribution("constant:0.5")(rng) == 0.5
+        assert parse_distribution("2")(rng) == 2.0
+        assert all(0.1 <= parse_distribution("uniform:0.1,0.2")(rng) <= 0.2 for _ in range(50))
+        assert parse_distribution("normal:0,1")(rng) >= 0
+
+    def test_invalid(self):
+        """Test that malformed specs are configuration errors."""
+        for spec in ("gamma:1", "uniform:1", "normal:a,b", "lognormal:0,1"):
+            with pytest.raises(ConfigurationError):
+                parse_distribution(spec)
+
+
+@pytest.mark.asyncio
+class TestFakeChatModel:
+    """Tests for scripted and replayed responses."""
+
+    async def test_script_rules(self):
+        """Test that the first rule matching (and not excluded) answers."""
+        llm = FakeChatModel(
+            script=[
+                {"match": ["supervisor"], "exclude": ["Entities"], "response": {"next": "a"}},
+                {"match": ["supervisor"], "response": "b"},
+            ]
+        )
+
+        first = await llm.ainvoke(prompt("supervisor"))
+        second = await llm.ainvoke(prompt("supervisor", "Entities: 3 found"))
+        unmatched = await llm.ainvoke(prompt("other"))
+
+        assert json.loads(first.content) == {"next": "a"}
+        assert second.content == "b"
+        assert unmatched.content == "{}"
+        assert first.usage_metadata["output_tokens"] > 0
+
+    async def test_latency_and_token_rate(self):
+        """Test that a call takes the latency plus its output tokens at the token rate."""
+        llm = FakeChatModel(
+            script=[{"response": "x" * 400}], latency="0.05", tokens_per_second="1000"
+        )
+
+        start = time.perf_counter()
+        await llm.ainvoke(prompt("anything"))
+
+        # 0.05s latency + 100 tokens at 1000 tokens/s
+        assert time.perf_counter() - start >= 0.15
+
+    async def test_record_and_replay(self, tmp_path):
+        """Test that recorded calls replay with their response and latency."""
+        cassette = tmp_path / "calls.jsonl"
+        recorder = RecordingChatModel(
+            llm=FakeChatModel(script=[{"response": "recorded"}], latency="0.05"),
+            path=cassette,
+            provider="openai",
+            model="gpt-4o-mini",
+        )
+        messages = prompt("planner")
+        await recorder.ainvoke(messages)
+
+        record = json.loads(cassette.read_text())
+        assert record["key"] == message_key(messages)
+        assert record["latency"] >= 0.05
+
+        replay = FakeChatModel(cassette=cassette, latency="recorded")
+        start = time.perf_counter()
+        response = await replay.ainvoke(messages)
+
+        assert response.content == "recorded"
+        assert time.perf_counter() - start >= 0.05
+        # Prompts that were not recorded fall back to the script
+        assert (await replay.ainvoke(prompt("other"))).content == "{}"
+
+
+@pytest.mark.asyncio
+class TestFakeProvider:
+    """Tests for the fake provider in the factory and the workflow."""
+
+    @pytest.fixture(autouse=True)
+    def fake_config(self, monkeypatch):
+        """Select the fake provider with an empty client pool."""
+        from agent_extract.core.llm_provider import LLMFactory
+
+        monkeypatch.setattr(config, "llm_provider", "fake")
+        monkeypatch.setattr(config, "llm_model", "fake-model")
+        LLMFactory.clear()
+        yield
+        LLMFactory.clear()
+
+    async def test_factory(self, monkeypatch, tmp_path):
+        """Test that the factory builds the fake and wraps real providers to record."""
+        from agent_extract.core.llm_provider import LLMFactory
+
+        assert isinstance(LLMFactory.create_llm(), FakeChatModel)
+
+        monkeypatch.setattr(config, "llm_record_cassette", tmp_path / "calls.jsonl")
+        recording = LLMFactory.create_llm("ollama", "qwen3:0.6b", shared=False)
+
+        assert isinstance(recording, RecordingChatModel)
+        assert isinstance(LLMFactory.create_llm(shared=False), FakeChatModel)
+
+    async def test_fast_mode_offline(self):
+        """Test that the default script drives a fast-mode extraction without a network."""
+        from agent_extract.agents.graph import DocumentExtractionGraph
+        from agent_extract.core.usage import track_usage
+
+        graph = DocumentExtractionGraph(use_vision=False, fast_mode=True)
+        state = {
+            "file_path": "invoice.pdf",
+            "raw_text": "Invoice #12345\nDate: 2025-01-15\nTotal: $100",
+            "structured_data": {},
+            "entities": [],
+            "tables": [],
+            "processing_steps": [],
+            "errors": [],
+        }
+
+        with track_usage() as calls:
+            final_state = await graph.extract(state)
+
+        assert final_state["structured_data"]["invoice_number"] == "INV-0001"
+        assert final_state["confidence_score"] == 0.9
+        assert [(call.provider, call.cost, call.estimated_tokens) for call in calls] == [
+            ("fake", 0.0, False)
+        ]
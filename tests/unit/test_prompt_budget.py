@@ -0,0 +1,117 @@
+"""Unit tests for token-budgeted prompt text."""
+
+import pytest
+
+from agent_extract.core.config import config
+from agent_extract.processors.prompt_budget import (
+    ELISION,
+    TokenCounter,
+    compress_text,
+    context_window,
+    field_terms,
+    pack_text,
+    prompt_budget,
+)
+
+
+def make_report(pages: int) -> str:
+    """Build PDF text with a running header and page footer on every page."""
+    parts = []
+    for page in range(1, pages + 1):
+        body = (
+            f"ACME Corp   Quarterly Report\nSection {page}\nRevenue:   {page}00\n\n"
+            f"Page {page} of {pages}"
+        )
+        parts.append(f"--- Page {page} ---\n{body}")
+    return "\n\n".join(parts)
+
+
+class TestCompressText:
+    """Tests for compress_text."""
+
+    def test_drops_markers_and_repeated_edges(self):
+        """Test that page markers and repeated headers/footers are removed."""
+        text = compress_text(make_report(4))
+
+        assert "--- Page" not in text
+        assert text.count("ACME Corp Quarterly Report") == 1
+        assert text.count(" of 4") == 1
+        assert [f"Section {i}" in text for i in range(1, 5)] == [True] * 4
+
+    def test_normalises_whitespace(self):
+        """Test that runs of spaces and blank lines are collapsed."""
+        assert compress_text("Total:    $5  \n\n\n\nDue:\t2025-01-01") == (
+            "Total: $5\n\nDue: 2025-01-01"
+        )
+
+    def test_keeps_page_markers_on_request(self):
+        """Test that markers survive for page-aware chunking."""
+        text = compress_text(make_report(2), keep_page_markers=True)
+
+        assert "--- Page 1 ---" in text and "--- Page 2 ---" in text
+
+    def test_single_page_keeps_everything(self):
+        """Test that a one-page document has no header to drop."""
+        text = compress_text("Header\nBody\nFooter")
+
+        assert text == "Header\nBody\nFooter"
+
+
+class TestPackText:
+    """Tests for pack_text."""
+
+    def test_text_within_budget_is_unchanged(self):
+        """Test that short text is returned as is."""
+        counter = TokenCounter("ollama", "qwen3:0.6b")
+
+        assert pack_text("Invoice #1", 100, counter) == "Invoice #1"
+
+    def test_keeps_opening_and_relevant_sections(self):
+        """Test that the opening and keyword sections win over filler."""
+        counter = TokenCounter("ollama", "qwen3:0.6b")
+        filler = [f"Paragraph {i} " + "lorem ipsum " * 30 for i in range(20)]
+        text = "\n\n".join(["Invoice INV-9", *filler, "Grand total: 500 USD"])
+
+        packed = pack_text(text, 150, counter, keywords=["total"])
+
+        assert counter.count(packed) <= 150
+        assert packed.startswith("Invoice INV-9")
+        assert packed.endswith("Grand total: 500 USD")
+        assert ELISION in packed
+
+    def test_oversized_opening_is_truncated(self):
+        """Test that a single section larger than the budget is cut."""
+        counter = TokenCounter("ollama", "qwen3:0.6b")
+
+        packed = pack_text("x" * 1000, 20, counter)
+
+        assert counter.count(packed) <= 20
+
+
+class TestBudgets:
+    """Tests for token counting and per-agent budgets."""
+
+    def test_estimated_count(self):
+        """Test that providers without a local tokenizer are estimated."""
+        counter = TokenCounter("ollama", "qwen3:0.6b")
+
+        assert not counter.exact
+        assert counter.count("a" * 10) == 3
+
+    def test_budget_capped_by_context_window(self, monkeypatch):
+        """Test that a long prompt leaves less room for document text."""
+        monkeypatch.setattr(config, "prompt_token_budgets", {"critic": 500})
+        monkeypatch.setattr(config, "llm_context_window", None)
+
+        assert context_window("ollama", "qwen3:0.6b") == 2048
+        assert prompt_budget("critic", "ollama", "qwen3:0.6b") == 500
+        assert prompt_budget("critic", "ollama", "qwen3:0.6b", used_tokens=1300) == 236
+        assert prompt_budget("critic", "ollama", "qwen3:0.6b", used_tokens=5000) == 0
+
+    def test_field_terms(self):
+        """Test that field names and scalar values become keywords."""
+        terms = field_terms(
+            {"total": "$100", "items": ["a", {"b": 1}], "extraction_plan": {"x": 1}}
+        )
+
+        assert terms == ["total", "$100", "items", "a"]
@@ -110,3 +110,25 @@ class TestReaderFactory:
         assert "Image" in formats
 
 
+
+
+class TestReaderSpans:
+    """Tests for reader timing spans."""
+
+    def test_docx_read_records_spans(self, temp_dir):
+        """Test that a traced DOCX read records open and text extraction spans."""
+        from docx import Document
+        from agent_extract.core.tracing import traced
+
+        file_path = temp_dir / "spans.docx"
+        doc = Document()
+        doc.add_paragraph("Traced document")
+        doc.save(file_path)
+
+        result = traced(DOCXReader().read, file_path)
+
+        spans = {item.name: item for item in result.spans}
+        assert {"docx.read", "docx.open", "docx.text_extraction"} <= set(spans)
+        assert spans["docx.open"].parent_id == spans["docx.read"].span_id
+        assert spans["docx.read"].attributes["bytes"] == file_path.stat().st_size
+        assert spans["docx.text_extraction"].attributes["chars"] > 0